@@ -0,0 +1,70 @@
+"""
+Command line interface of the stats package.
+
+Notes
+-----
+The stats are recorded without Jupyter as follows, and the recording
+is rendered by the display_replay function of the linux_stats_plot
+module.
+    $ python -m plot_playground.stats record --out run.stats \
+        --interval 0.5
+"""
+
+import argparse
+import signal
+import sys
+
+from plot_playground.stats import collector as stats_collector
+from plot_playground.stats import recording
+
+COMMAND_RECORD = 'record'
+
+
+def main(args=None):
+    """
+    Entry point of the command line interface.
+
+    Parameters
+    ----------
+    args : list of str or None, default None
+        Command line arguments. If None, sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m plot_playground.stats',
+        description='Command line tools of the Linux stats plot.')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+    record_parser = subparsers.add_parser(
+        COMMAND_RECORD, help='Record the stats to a file without Jupyter.')
+    record_parser.add_argument(
+        '--out', type=str, required=True,
+        help='Path of the recording file.')
+    record_parser.add_argument(
+        '--interval', type=float, default=None,
+        help='Sampling interval in seconds of all metrics. The default '
+             'interval of each metric is used by default.')
+    record_parser.add_argument(
+        '--metrics', type=str, nargs='+',
+        default=stats_collector.DEFAULT_METRIC_NAME_LIST,
+        help='Names of the metrics to record.')
+    record_parser.add_argument(
+        '--duration', type=float, default=None,
+        help='Seconds to record. The recording continues until the '
+             'process is terminated by default.')
+    parsed_args = parser.parse_args(args=args)
+
+    # The buffered rows are written to the file also when the recorder
+    # is terminated or interrupted.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit())
+    try:
+        recording.record(
+            out_file_path=parsed_args.out,
+            interval_seconds=parsed_args.interval,
+            metrics=parsed_args.metrics,
+            duration_seconds=parsed_args.duration)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
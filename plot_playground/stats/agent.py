@@ -0,0 +1,248 @@
+"""
+Module of the agent that collects the stats of a host of a distributed
+job. The agent runs the same sampling loop as the collector subprocess
+of the plot, but without a kernel: the samples of each host are saved
+to its own directory of a shared directory (e.g., on NFS), and the
+aggregator module of the kernel merges them into one plot.
+
+Notes
+-----
+The agent is started on each host as follows, and runs until it is
+terminated.
+    $ python -m plot_playground.stats.agent \
+        --shared_dir_path /mnt/shared/stats --metrics memory gpu
+The directory of each host has the log files of the collector and the
+agent meta file (the panels and the intervals of the host), written
+when the first sample has been saved. Like the collector module, this
+module only imports what the sampling needs.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import time
+
+from plot_playground.stats import collector as stats_collector
+from plot_playground.stats import collectors
+
+AGENT_META_FILE_NAME = 'agent.json'
+DEFAULT_INTERVAL_SECONDS = 1
+DEFAULT_BUFFER_SIZE = 600
+
+
+def main(args=None):
+    """
+    Entry point of the agent process.
+
+    Parameters
+    ----------
+    args : list of str or None, default None
+        Command line arguments. If None, sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(
+        description='Agent that collects the stats of a host of a '
+                    'distributed job into a shared directory.')
+    parser.add_argument(
+        '--shared_dir_path', type=str, required=True,
+        help='Shared directory where the directory of each host is made.')
+    parser.add_argument(
+        '--host_name', type=str, default='',
+        help='Name of the host in the plot. The host name of the machine '
+             'is used by default.')
+    parser.add_argument(
+        '--metrics', type=str, nargs='+',
+        default=stats_collector.DEFAULT_METRIC_NAME_LIST,
+        help='Names of the metrics to collect.')
+    parser.add_argument(
+        '--interval_seconds', type=float, default=DEFAULT_INTERVAL_SECONDS,
+        help='Interval in seconds at which the log file is saved.')
+    parser.add_argument(
+        '--buffer_size', type=int, default=DEFAULT_BUFFER_SIZE,
+        help='Number of the intervals kept in the raw log file.')
+    parser.add_argument(
+        '--metrics_port', type=int, default=None,
+        help='Port of the local HTTP endpoint that serves the latest '
+             'samples in the OpenMetrics text format. Not served by '
+             'default, and a free port is selected if 0 is specified.')
+    parsed_args = parser.parse_args(args=args)
+    # The finally block of the collector (closing the collectors) also
+    # runs when the agent is terminated.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit())
+    start_agent(
+        shared_dir_path=parsed_args.shared_dir_path,
+        host_name=parsed_args.host_name,
+        metrics=parsed_args.metrics,
+        interval_seconds=parsed_args.interval_seconds,
+        buffer_size=parsed_args.buffer_size,
+        metrics_port=parsed_args.metrics_port)
+
+
+def start_agent(
+        shared_dir_path, host_name='', metrics=None,
+        interval_seconds=DEFAULT_INTERVAL_SECONDS,
+        buffer_size=DEFAULT_BUFFER_SIZE, metrics_port=None):
+    """
+    Start collecting the stats of the host into the shared directory.
+    This blocks until the process is terminated.
+
+    Parameters
+    ----------
+    shared_dir_path : str
+        Shared directory where the directory of each host is made.
+    host_name : str, default ''
+        Name of the host in the plot. If an empty string is specified,
+        the host name of the machine is used.
+    metrics : list of str or None, default None
+        Names of the metrics to collect. If None, the metrics of
+        DEFAULT_METRIC_NAME_LIST of the collector module are used.
+    interval_seconds : int or float, default DEFAULT_INTERVAL_SECONDS
+        Interval in seconds at which the log file is saved.
+    buffer_size : int, default DEFAULT_BUFFER_SIZE
+        Number of the intervals kept in the raw log file.
+    metrics_port : int or None, default None
+        Port of the OpenMetrics endpoint of the collector. If zero, a
+        free port is selected and saved to the agent meta file. If
+        None, the endpoint is not served.
+    """
+    if host_name == '':
+        host_name = socket.gethostname()
+    if metrics is None:
+        metrics = stats_collector.DEFAULT_METRIC_NAME_LIST
+    host_dir_path = get_host_dir_path(
+        shared_dir_path=shared_dir_path, host_name=host_name)
+    stats_collector.start_collecting(
+        interval_seconds=interval_seconds, buffer_size=buffer_size,
+        log_dir_path=host_dir_path, parent_pid=None,
+        collector_list=collectors.make_collector_list(metrics=metrics),
+        metrics_port=metrics_port,
+        status_conn=_AgentMetaWriter(
+            host_dir_path=host_dir_path, host_name=host_name,
+            interval_seconds=interval_seconds, buffer_size=buffer_size))
+
+
+def get_host_dir_path(shared_dir_path, host_name):
+    """
+    Get the path of the directory of the host.
+
+    Parameters
+    ----------
+    shared_dir_path : str
+        Shared directory of the agents.
+    host_name : str
+        Name of the host.
+
+    Returns
+    -------
+    host_dir_path : str
+        The path of the directory.
+
+    Raises
+    ------
+    ValueError
+        If the host name is not a valid directory name.
+    """
+    if host_name in ('', '.', '..') or os.sep in host_name:
+        err_msg = 'Invalid host name: %s' % host_name
+        raise ValueError(err_msg)
+    return os.path.join(shared_dir_path, host_name)
+
+
+def get_agent_meta_file_path(host_dir_path):
+    """
+    Get the path of the agent meta file of the host.
+
+    Parameters
+    ----------
+    host_dir_path : str
+        The directory of the host.
+
+    Returns
+    -------
+    agent_meta_file_path : str
+        The path of the file.
+    """
+    return os.path.join(host_dir_path, AGENT_META_FILE_NAME)
+
+
+def save_agent_meta(host_dir_path, agent_meta_dict):
+    """
+    Save the agent meta file. The file is replaced atomically so that
+    the aggregator does not read a partially written file.
+
+    Parameters
+    ----------
+    host_dir_path : str
+        The directory of the host.
+    agent_meta_dict : dict
+        The meta of the agent.
+    """
+    agent_meta_file_path = get_agent_meta_file_path(
+        host_dir_path=host_dir_path)
+    tmp_file_path = agent_meta_file_path + '.tmp'
+    with open(tmp_file_path, 'w', encoding='utf-8') as f:
+        json.dump(agent_meta_dict, f)
+    os.replace(tmp_file_path, agent_meta_file_path)
+
+
+class _AgentMetaWriter():
+
+    def __init__(self, host_dir_path, host_name, interval_seconds,
+                 buffer_size):
+        """
+        Class that receives the status of the collecting loop in place
+        of the status connection of the collector subprocess, and saves
+        the agent meta file when the loop is ready.
+
+        Parameters
+        ----------
+        host_dir_path : str
+            The directory of the host.
+        host_name : str
+            Name of the host.
+        interval_seconds : int or float
+            Interval in seconds at which the log file is saved.
+        buffer_size : int
+            Number of the intervals kept in the raw log file.
+        """
+        self.host_dir_path = host_dir_path
+        self.host_name = host_name
+        self.interval_seconds = interval_seconds
+        self.buffer_size = buffer_size
+
+    def send(self, status_dict):
+        """
+        Save the agent meta file from the ready status. The meta has
+        the host_name, pid, start_timestamp, interval_seconds,
+        buffer_size, panel_list, metric_interval_seconds_dict and
+        metrics_port (None if not served) keys.
+
+        Parameters
+        ----------
+        status_dict : dict
+            The status sent by the collecting loop.
+        """
+        if status_dict['status'] != stats_collector.STATUS_READY:
+            return
+        panel_list = []
+        for collector in status_dict['collector_list']:
+            panel_list.extend(collector.get_panel_list())
+        save_agent_meta(
+            host_dir_path=self.host_dir_path,
+            agent_meta_dict={
+                'host_name': self.host_name,
+                'pid': os.getpid(),
+                'start_timestamp': round(time.time(), 3),
+                'interval_seconds': self.interval_seconds,
+                'buffer_size': self.buffer_size,
+                'panel_list': panel_list,
+                'metric_interval_seconds_dict':
+                    status_dict['metric_interval_seconds_dict'],
+                'metrics_port': status_dict.get('metrics_port'),
+            })
+
+
+if __name__ == '__main__':
+    main()
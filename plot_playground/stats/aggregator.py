@@ -0,0 +1,349 @@
+"""
+Module of the aggregator that merges the stats of the hosts of a
+distributed job. The agents of the agent module save the samples of
+each host to its directory of the shared directory, and a thread of
+the kernel merges the raw logs of the hosts by the timestamp into one
+CSV log plotted by the linux_stats_plot module.
+
+Notes
+-----
+The columns of each host are prefixed by the host name (e.g.,
+'[node-1] memory usage (MB)'), so the columns of the quantiles and
+the trends of a column keep their suffixes. The timestamps of the
+hosts are compared as they are, so the clocks of the hosts should be
+synchronized (e.g., by NTP).
+"""
+
+import json
+import os
+import threading
+import traceback
+
+from plot_playground.stats import agent
+from plot_playground.stats import collector as stats_collector
+from plot_playground.stats import collectors
+
+HOST_COLUMN_NAME_FORMAT = '[{host_name}] {column_name}'
+MERGED_LOG_FILE_NAME = 'log_linux_stats_plot_multi_node.csv'
+LAYOUT_OVERLAY = 'overlay'
+LAYOUT_PER_HOST = 'per_host'
+LAYOUT_LIST = [LAYOUT_OVERLAY, LAYOUT_PER_HOST]
+DEFAULT_MERGE_INTERVAL_SECONDS = 2
+STOP_TIMEOUT_SECONDS = 5
+
+
+def get_host_column_name(host_name, column_name):
+    """
+    Get the name of the column of the host in the merged log.
+
+    Parameters
+    ----------
+    host_name : str
+        Name of the host.
+    column_name : str
+        Name of the column in the log of the host.
+
+    Returns
+    -------
+    host_column_name : str
+        The column name prefixed by the host name.
+    """
+    return HOST_COLUMN_NAME_FORMAT.format(
+        host_name=host_name, column_name=column_name)
+
+
+def load_agent_meta_list(shared_dir_path):
+    """
+    Load the meta files of the agents in the shared directory.
+
+    Parameters
+    ----------
+    shared_dir_path : str
+        Shared directory of the agents.
+
+    Returns
+    -------
+    agent_meta_list : list of dicts
+        The meta of each host in the order of the host name. Hosts
+        whose agent has not saved the first sample yet are excluded.
+    """
+    if not os.path.isdir(shared_dir_path):
+        return []
+    agent_meta_list = []
+    for host_name in sorted(os.listdir(shared_dir_path)):
+        agent_meta_file_path = agent.get_agent_meta_file_path(
+            host_dir_path=os.path.join(shared_dir_path, host_name))
+        if not os.path.exists(agent_meta_file_path):
+            continue
+        with open(agent_meta_file_path, encoding='utf-8') as f:
+            agent_meta_list.append(json.load(f))
+    return agent_meta_list
+
+
+def make_multi_node_panel_list(agent_meta_list, layout=LAYOUT_OVERLAY):
+    """
+    Make the settings of the panels of the merged log.
+
+    Parameters
+    ----------
+    agent_meta_list : list of dicts
+        The meta of the hosts returned by the load_agent_meta_list
+        function.
+    layout : str, default 'overlay'
+        The layout of the hosts. 'overlay' draws the lines of all
+        hosts on a panel per metric (labeled by the host name), and
+        'per_host' draws the panels of each host one after another.
+
+    Returns
+    -------
+    panel_list : list of dicts
+        Settings of the panels, having the prefixed columns.
+
+    Raises
+    ------
+    ValueError
+        If an unknown layout is specified.
+    """
+    if layout not in LAYOUT_LIST:
+        err_msg = 'Unknown layout: %s (available: %s)' % (
+            layout, LAYOUT_LIST)
+        raise ValueError(err_msg)
+    if layout == LAYOUT_PER_HOST:
+        panel_list = []
+        for agent_meta_dict in agent_meta_list:
+            host_name = agent_meta_dict['host_name']
+            for panel_dict in agent_meta_dict['panel_list']:
+                host_panel_dict = dict(panel_dict)
+                host_panel_dict['title'] = get_host_column_name(
+                    host_name=host_name, column_name=panel_dict['title'])
+                host_panel_dict['column_list'] = [
+                    get_host_column_name(
+                        host_name=host_name, column_name=column_name)
+                    for column_name in panel_dict['column_list']]
+                panel_list.append(host_panel_dict)
+        return panel_list
+
+    # The panels of the same title are overlaid in the order of the
+    # first host that has the panel.
+    title_list = []
+    host_panel_list_dict = {}
+    for agent_meta_dict in agent_meta_list:
+        for panel_dict in agent_meta_dict['panel_list']:
+            title = panel_dict['title']
+            if title not in host_panel_list_dict:
+                title_list.append(title)
+                host_panel_list_dict[title] = []
+            host_panel_list_dict[title].append(
+                (agent_meta_dict['host_name'], panel_dict))
+    panel_list = []
+    for title in title_list:
+        column_list = []
+        label_list = []
+        for host_name, panel_dict in host_panel_list_dict[title]:
+            for i, column_name in enumerate(panel_dict['column_list']):
+                column_list.append(get_host_column_name(
+                    host_name=host_name, column_name=column_name))
+                if len(panel_dict['column_list']) == 1:
+                    label_list.append(host_name)
+                elif i < len(panel_dict['label_list']):
+                    label_list.append('%s %s' % (
+                        host_name, panel_dict['label_list'][i]))
+                else:
+                    label_list.append('%s %s' % (host_name, column_name))
+        first_panel_dict = host_panel_list_dict[title][0][1]
+        panel_list.append(collectors.make_panel(
+            title=title, column_list=column_list,
+            unit=first_panel_dict['unit'],
+            decimal_num=first_panel_dict['decimal_num'],
+            label_list=label_list,
+            quantile_list=first_panel_dict['quantile_list'],
+            trend_window_seconds=first_panel_dict['trend_window_seconds'],
+            alert_minutes_to_limit=first_panel_dict[
+                'alert_minutes_to_limit']))
+    return panel_list
+
+
+def merge_host_samples(shared_dir_path, host_name_list, window_seconds=None):
+    """
+    Merge the raw logs of the hosts by the timestamp.
+
+    Parameters
+    ----------
+    shared_dir_path : str
+        Shared directory of the agents.
+    host_name_list : list of str
+        Names of the hosts to merge.
+    window_seconds : int, float or None, default None
+        Seconds of the samples kept before the last timestamp of all
+        hosts. If None, all samples of the raw logs are kept.
+
+    Returns
+    -------
+    merged_df : pandas.DataFrame
+        DataFrame having the timestamp column and the prefixed columns
+        of the hosts, a row per timestamp in ascending order. Columns
+        of hosts not sampled at the timestamp are NaN.
+    """
+    import pandas as pd
+    host_df_list = []
+    for host_name in host_name_list:
+        log_file_path = stats_collector.get_log_file_path(
+            log_dir_path=agent.get_host_dir_path(
+                shared_dir_path=shared_dir_path, host_name=host_name))
+        if not os.path.exists(log_file_path):
+            continue
+        host_df = pd.read_csv(log_file_path)
+        host_df = host_df.rename(columns={
+            column_name: get_host_column_name(
+                host_name=host_name, column_name=column_name)
+            for column_name in host_df.columns
+            if column_name != stats_collector.COLUMN_NAME_TIMESTAMP})
+        host_df_list.append(host_df)
+    if len(host_df_list) == 0:
+        return pd.DataFrame(columns=[stats_collector.COLUMN_NAME_TIMESTAMP])
+    merged_df = pd.concat(host_df_list, sort=False)
+    column_list = list(merged_df.columns)
+    # The rows of the hosts sampled at the same timestamp are combined.
+    merged_df = merged_df.groupby(
+        by=stats_collector.COLUMN_NAME_TIMESTAMP, sort=True).first()
+    merged_df = merged_df.reset_index()[column_list]
+    if window_seconds is not None and len(merged_df) > 0:
+        timestamp_series = merged_df[stats_collector.COLUMN_NAME_TIMESTAMP]
+        merged_df = merged_df[
+            timestamp_series >= timestamp_series.max() - window_seconds]
+        merged_df = merged_df.reset_index(drop=True)
+    return merged_df
+
+
+def get_merged_log_file_path(log_dir_path):
+    """
+    Get the path of the merged log file.
+
+    Parameters
+    ----------
+    log_dir_path : str
+        Directory where the merged log is saved.
+
+    Returns
+    -------
+    merged_log_file_path : str
+        The path of the log file.
+    """
+    return os.path.join(log_dir_path, MERGED_LOG_FILE_NAME)
+
+
+class MultiNodeAggregator():
+
+    def __init__(
+            self, shared_dir_path, host_name_list, log_dir_path,
+            window_seconds,
+            merge_interval_seconds=DEFAULT_MERGE_INTERVAL_SECONDS):
+        """
+        Class of the thread of the kernel that merges the raw logs of
+        the hosts periodically.
+
+        Parameters
+        ----------
+        shared_dir_path : str
+            Shared directory of the agents.
+        host_name_list : list of str
+            Names of the hosts to merge.
+        log_dir_path : str
+            Directory where the merged log is saved.
+        window_seconds : int or float
+            Seconds of the samples kept in the merged log.
+        merge_interval_seconds : int or float, default 2
+            Interval in seconds at which the logs are merged.
+        """
+        self.shared_dir_path = shared_dir_path
+        self.host_name_list = list(host_name_list)
+        self.log_dir_path = log_dir_path
+        self.window_seconds = window_seconds
+        self.merge_interval_seconds = merge_interval_seconds
+        self.plot_meta = None
+        self.error_str = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def get_log_file_path(self):
+        """
+        Get the path of the merged log file.
+
+        Returns
+        -------
+        merged_log_file_path : str
+            The path of the log file.
+        """
+        return get_merged_log_file_path(log_dir_path=self.log_dir_path)
+
+    def update(self):
+        """
+        Merge the raw logs of the hosts and save the merged log. The
+        file is replaced atomically so that the browser does not read
+        a partially written file.
+
+        Returns
+        -------
+        merged_df : pandas.DataFrame
+            The merged samples returned by the merge_host_samples
+            function.
+        """
+        merged_df = merge_host_samples(
+            shared_dir_path=self.shared_dir_path,
+            host_name_list=self.host_name_list,
+            window_seconds=self.window_seconds)
+        os.makedirs(self.log_dir_path, exist_ok=True)
+        merged_log_file_path = self.get_log_file_path()
+        tmp_file_path = merged_log_file_path + '.tmp'
+        merged_df.to_csv(tmp_file_path, index=False)
+        os.replace(tmp_file_path, merged_log_file_path)
+        return merged_df
+
+    def start(self):
+        """
+        Save the merged log and start the merge thread.
+        """
+        self.update()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def is_alive(self):
+        """
+        Get whether the merge thread is running.
+
+        Returns
+        -------
+        is_alive : bool
+            True if the thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=STOP_TIMEOUT_SECONDS):
+        """
+        Stop the merge thread.
+
+        Parameters
+        ----------
+        timeout : int or float, default STOP_TIMEOUT_SECONDS
+            Seconds to wait for the thread to exit.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        """
+        Loop of the merge thread. The traceback of an error of a merge
+        (e.g., a host log being replaced by its agent) is set to the
+        error_str attribute, and the merge is retried at the next
+        interval. The error_str is reset when a merge succeeds.
+        """
+        while not self._stop_event.wait(
+                timeout=self.merge_interval_seconds):
+            try:
+                self.update()
+            except Exception:
+                self.error_str = traceback.format_exc()
+                continue
+            self.error_str = None
@@ -0,0 +1,441 @@
+"""
+Module of the benchmark of the tick cost of the collectors. The
+collectors are sampled against a fake proc file system and a fake GPU
+backend, so that the cost can be measured as the number of processes
+and GPUs grows, independently of the machine running it.
+
+Notes
+-----
+The benchmark is run as follows (the result is printed as a table).
+    $ python -m plot_playground.stats.benchmark \
+        --process_nums 10 100 1000 --gpu_nums 0 1 8
+The fake proc file system is used by psutil through its PROCFS_PATH
+setting while a collector is measured, so the benchmark should not be
+run in a process that is sampling the real metrics at the same time.
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import psutil
+
+from plot_playground.stats import collectors
+
+DEFAULT_PROCESS_NUM_LIST = [10, 100, 1000]
+DEFAULT_GPU_NUM_LIST = [0, 1, 8]
+DEFAULT_TICK_NUM = 50
+FAKE_CPU_NUM = 4
+FAKE_PROCESS_RSS_PAGES = 2560
+FAKE_GPU_MEMORY_USED_MB = 1024
+FAKE_GPU_MEMORY_TOTAL_MB = 11441
+FAKE_DISK_DEVICE_NAME = 'sda'
+FAKE_CGROUP_DIR_NAME = 'cgroup'
+_FAKE_BOOT_TIME = 1550000000
+_PID_STAT_FIELD_NUM = 52
+_FAKE_FD_NUM = 3
+
+
+class FakeGPUStat():
+
+    def __init__(self, gpu_num):
+        """
+        Fake backend of the gpustat command that returns the result
+        string of the specified number of GPUs.
+
+        Parameters
+        ----------
+        gpu_num : int
+            The number of the fake GPUs. If 0, the error string of an
+            environment without GPU is returned.
+        """
+        self.gpu_num = gpu_num
+
+    def __call__(self):
+        """
+        Get the fake result string of the gpustat command.
+
+        Returns
+        -------
+        command_result : str
+            The result string in the format of the gpustat command.
+        """
+        if self.gpu_num == 0:
+            return 'Error on querying NVIDIA devices. ' \
+                'Use --debug flag for details'
+        line_list = ['fake-host  Wed Feb 20 07:04:22 2019']
+        for gpu_idx in range(self.gpu_num):
+            # The process is the root of the fake proc file system.
+            line_list.append(
+                "[{gpu_idx}] Tesla K80        | 31'C,   0 %,   58 / 149 W | "
+                "{used} / {total} MB | root:python/1({used}M)".format(
+                    gpu_idx=gpu_idx, used=FAKE_GPU_MEMORY_USED_MB,
+                    total=FAKE_GPU_MEMORY_TOTAL_MB))
+        return '\n'.join(line_list) + '\n'
+
+
+def make_fake_proc_tree(proc_root, process_num, cpu_num=FAKE_CPU_NUM):
+    """
+    Make the fake proc file system read by the collectors. Each fake
+    process uses FAKE_PROCESS_RSS_PAGES resident pages. The fake
+    cgroup file system is made in the FAKE_CGROUP_DIR_NAME directory.
+
+    Parameters
+    ----------
+    proc_root : str
+        Root directory of the fake proc file system. It is created if
+        it does not exist.
+    process_num : int
+        The number of the fake processes. Their IDs start from 1.
+    cpu_num : int, default FAKE_CPU_NUM
+        The number of the fake CPU cores.
+    """
+    os.makedirs(os.path.join(proc_root, 'net'), exist_ok=True)
+    _write_file(
+        file_path=os.path.join(proc_root, 'meminfo'),
+        file_str='MemTotal:       16384000 kB\n'
+        'MemFree:         8192000 kB\n'
+        'MemAvailable:   12288000 kB\n'
+        'Buffers:          102400 kB\n')
+    cpu_line_list = ['cpu  %s' % ' '.join(
+        [str(value * cpu_num) for value in (100, 0, 50, 800, 50)]
+        + ['0'] * 5)]
+    for cpu_idx in range(cpu_num):
+        cpu_line_list.append(
+            'cpu%d 100 0 50 800 50 0 0 0 0 0' % cpu_idx)
+    cpu_line_list.append('btime %d' % _FAKE_BOOT_TIME)
+    _write_file(
+        file_path=os.path.join(proc_root, 'stat'),
+        file_str='\n'.join(cpu_line_list) + '\n')
+    _write_file(
+        file_path=os.path.join(proc_root, 'diskstats'),
+        file_str='   8       0 {device} 1000 0 20000 500 2000 0 40000 800 '
+        '0 900 1300\n'
+        '   8       1 {device}1 900 0 18000 450 1800 0 36000 700 '
+        '0 800 1150\n'
+        '   7       0 loop0 10 0 20 1 0 0 0 0 0 1 1\n'.format(
+            device=FAKE_DISK_DEVICE_NAME))
+    _write_file(
+        file_path=os.path.join(proc_root, 'net/dev'),
+        file_str='Inter-|   Receive                                                |  Transmit\n'
+        ' face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n'
+        '    lo: 1000 10 0 0 0 0 0 0 1000 10 0 0 0 0 0 0\n'
+        '  eth0: 2000000 2000 0 0 0 0 0 0 1000000 1000 0 0 0 0 0 0\n')
+    statm_str = '%d %d 300 5 0 100 0\n' % (
+        FAKE_PROCESS_RSS_PAGES * 2, FAKE_PROCESS_RSS_PAGES)
+    rss_kb = FAKE_PROCESS_RSS_PAGES * 4
+    smaps_rollup_str = 'Rss: {rss} kB\nPss: {pss} kB\n' \
+        'Shared_Clean: {shared} kB\nShared_Dirty: 0 kB\n' \
+        'Private_Clean: 0 kB\nPrivate_Dirty: {private} kB\n'.format(
+            rss=rss_kb, pss=rss_kb // 2, shared=rss_kb // 2,
+            private=rss_kb // 2)
+    os.makedirs(os.path.join(proc_root, 'self'), exist_ok=True)
+    _write_file(
+        file_path=os.path.join(proc_root, 'self/statm'),
+        file_str=statm_str)
+    os.makedirs(os.path.join(proc_root, 'pressure'), exist_ok=True)
+    for resource_name in collectors.PRESSURE_RESOURCE_NAME_LIST:
+        _write_file(
+            file_path=os.path.join(proc_root, 'pressure', resource_name),
+            file_str='some avg10=1.50 avg60=1.00 avg300=0.50 total=100000\n'
+            'full avg10=0.50 avg60=0.25 avg300=0.10 total=50000\n')
+    _make_fake_cgroup_tree(
+        cgroup_root=os.path.join(proc_root, FAKE_CGROUP_DIR_NAME))
+    for pid in range(1, process_num + 1):
+        pid_dir_path = os.path.join(proc_root, str(pid))
+        os.makedirs(pid_dir_path, exist_ok=True)
+        # state, ppid, ..., utime (14th), stime (15th), ..., starttime
+        # (22nd), vsize and rss (24th). The rest is filled with zero.
+        # The processes other than the first one are its children.
+        field_list = [
+            'S', '0' if pid == 1 else '1', str(pid), str(pid), '0', '-1', '4194304', '100',
+            '0', '0', '0', '10', '5', '0', '0', '20', '0', '1', '0',
+            '100', str(FAKE_PROCESS_RSS_PAGES * 2 * 4096),
+            str(FAKE_PROCESS_RSS_PAGES)]
+        field_list += ['0'] * (_PID_STAT_FIELD_NUM - 2 - len(field_list))
+        _write_file(
+            file_path=os.path.join(pid_dir_path, 'stat'),
+            file_str='%d (process %d) %s\n' % (
+                pid, pid, ' '.join(field_list)))
+        _write_file(
+            file_path=os.path.join(pid_dir_path, 'statm'),
+            file_str=statm_str)
+        _write_file(
+            file_path=os.path.join(pid_dir_path, 'smaps_rollup'),
+            file_str=smaps_rollup_str)
+        _write_file(
+            file_path=os.path.join(pid_dir_path, 'status'),
+            file_str='Name:\tprocess %d\nThreads:\t1\n'
+            'voluntary_ctxt_switches:\t100\n'
+            'nonvoluntary_ctxt_switches:\t10\n' % pid)
+        os.makedirs(os.path.join(pid_dir_path, 'fd'), exist_ok=True)
+        for fd in range(_FAKE_FD_NUM):
+            _write_file(
+                file_path=os.path.join(pid_dir_path, 'fd', str(fd)),
+                file_str='')
+
+
+def _make_fake_cgroup_tree(cgroup_root):
+    """
+    Make the fake cgroup v2 file system with the memory and the CPU
+    limits.
+
+    Parameters
+    ----------
+    cgroup_root : str
+        Root directory of the fake cgroup file system. It is created
+        if it does not exist.
+    """
+    os.makedirs(cgroup_root, exist_ok=True)
+    for file_name, file_str in (
+            ('cgroup.controllers', 'cpu memory\n'),
+            ('memory.current', '%d\n' % (2048 * 1048576)),
+            ('memory.max', '%d\n' % (8192 * 1048576)),
+            ('cpu.max', '200000 100000\n'),
+            ('cpu.stat', 'usage_usec 5000000\nuser_usec 4000000\n'
+             'system_usec 1000000\nnr_periods 100\nnr_throttled 5\n'
+             'throttled_usec 200000\n')):
+        _write_file(
+            file_path=os.path.join(cgroup_root, file_name),
+            file_str=file_str)
+
+
+def _write_file(file_path, file_str):
+    """
+    Write the string to the file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file.
+    file_str : str
+        Content of the file.
+    """
+    with open(file_path, 'w') as f:
+        f.write(file_str)
+
+
+@contextlib.contextmanager
+def use_fake_procfs(proc_root):
+    """
+    Context manager that makes psutil read the fake proc file system
+    (used by the memory metric).
+
+    Parameters
+    ----------
+    proc_root : str
+        Root directory of the fake proc file system.
+    """
+    pre_procfs_path = psutil.PROCFS_PATH
+    psutil.PROCFS_PATH = proc_root
+    _clear_process_iter_cache()
+    try:
+        yield
+    finally:
+        psutil.PROCFS_PATH = pre_procfs_path
+        _clear_process_iter_cache()
+
+
+def _clear_process_iter_cache():
+    """
+    Clear the processes cached by the process_iter function of psutil
+    (if the version of psutil supports it), so that the processes of
+    the other proc file system are not reused.
+    """
+    cache_clear = getattr(psutil.process_iter, 'cache_clear', None)
+    if cache_clear is not None:
+        cache_clear()
+
+
+def make_benchmark_collector_list(proc_root, gpu_num):
+    """
+    Make the collectors of all built-in metrics that read the fake
+    proc file system and the fake GPU backend.
+
+    Parameters
+    ----------
+    proc_root : str
+        Root directory of the fake proc file system.
+    gpu_num : int
+        The number of the fake GPUs.
+
+    Returns
+    -------
+    collector_list : list of MetricCollector
+        A list of collectors (not set up).
+    """
+    collector_list = [
+        collectors.MemoryCollector(),
+        collectors.DiskUsageCollector(path=proc_root),
+        collectors.GPUMemoryCollector(
+            gpustat_func=FakeGPUStat(gpu_num=gpu_num), pid=1,
+            proc_root=proc_root),
+        collectors.CPUCollector(proc_root=proc_root),
+        collectors.DiskIOCollector(
+            device_name_list=[FAKE_DISK_DEVICE_NAME], proc_root=proc_root),
+        collectors.NetworkCollector(proc_root=proc_root),
+        collectors.ProcStatsCollector(pid=1, proc_root=proc_root),
+        collectors.OverheadCollector(proc_root=proc_root),
+        collectors.ProcessTreeMemoryCollector(pid=1, proc_root=proc_root),
+        collectors.ProcessTreeCollector(pid=1, proc_root=proc_root),
+        collectors.CgroupCollector(
+            cgroup_root=os.path.join(proc_root, FAKE_CGROUP_DIR_NAME),
+            proc_root=proc_root),
+        collectors.PressureCollector(proc_root=proc_root, cgroup_root=None),
+        collectors.KernelLagCollector(),
+        collectors.HeapSnapshotCollector(),
+    ]
+    return collector_list
+
+
+def measure_tick_cost(collector, tick_num=DEFAULT_TICK_NUM):
+    """
+    Measure the wall time of the sampling of the collector.
+
+    Parameters
+    ----------
+    collector : MetricCollector
+        The collector that has been set up.
+    tick_num : int, default DEFAULT_TICK_NUM
+        The number of the measured samplings.
+
+    Returns
+    -------
+    tick_cost_dict : dict
+        A dictionary with the following keys.
+        - p50_us : Median of the sampling time in microseconds.
+        - p99_us : 99th percentile of the sampling time in
+            microseconds.
+        - max_us : Maximum of the sampling time in microseconds.
+    """
+    tick_seconds_array = np.zeros(tick_num)
+    for i in range(tick_num):
+        start_time = time.perf_counter()
+        collector.collect()
+        tick_seconds_array[i] = time.perf_counter() - start_time
+    p50, p99 = np.percentile(tick_seconds_array, [50, 99]) * 1e6
+    tick_cost_dict = {
+        'p50_us': round(float(p50), 1),
+        'p99_us': round(float(p99), 1),
+        'max_us': round(float(tick_seconds_array.max()) * 1e6, 1),
+    }
+    return tick_cost_dict
+
+
+def run_benchmark(
+        process_num_list=None, gpu_num_list=None,
+        tick_num=DEFAULT_TICK_NUM):
+    """
+    Measure the tick cost of every built-in collector for each
+    combination of the number of processes and GPUs.
+
+    Parameters
+    ----------
+    process_num_list : list of int or None, default None
+        The numbers of the fake processes. If None,
+        DEFAULT_PROCESS_NUM_LIST is used.
+    gpu_num_list : list of int or None, default None
+        The numbers of the fake GPUs. If None, DEFAULT_GPU_NUM_LIST
+        is used.
+    tick_num : int, default DEFAULT_TICK_NUM
+        The number of the measured samplings of each collector.
+
+    Returns
+    -------
+    result_list : list of dicts
+        The results. Each dictionary has metric_name, process_num,
+        gpu_num, p50_us, p99_us and max_us keys. Metrics that are not
+        available (GPU with no GPU) are not included.
+    """
+    if process_num_list is None:
+        process_num_list = DEFAULT_PROCESS_NUM_LIST
+    if gpu_num_list is None:
+        gpu_num_list = DEFAULT_GPU_NUM_LIST
+    result_list = []
+    for process_num in process_num_list:
+        proc_root = tempfile.mkdtemp(prefix='plot_playground_fake_proc_')
+        try:
+            make_fake_proc_tree(proc_root=proc_root, process_num=process_num)
+            with use_fake_procfs(proc_root=proc_root):
+                for gpu_num in gpu_num_list:
+                    collector_list = collectors.setup_collectors(
+                        collector_list=make_benchmark_collector_list(
+                            proc_root=proc_root, gpu_num=gpu_num))
+                    for collector in collector_list:
+                        result_dict = {
+                            'metric_name': collector.name,
+                            'process_num': process_num,
+                            'gpu_num': gpu_num,
+                        }
+                        result_dict.update(measure_tick_cost(
+                            collector=collector, tick_num=tick_num))
+                        collector.close()
+                        result_list.append(result_dict)
+        finally:
+            shutil.rmtree(proc_root, ignore_errors=True)
+    return result_list
+
+
+_RESULT_KEY_LIST = [
+    'metric_name', 'process_num', 'gpu_num', 'p50_us', 'p99_us', 'max_us']
+
+
+def format_result_table(result_list):
+    """
+    Format the results of the benchmark as a text table.
+
+    Parameters
+    ----------
+    result_list : list of dicts
+        The results of the run_benchmark function.
+
+    Returns
+    -------
+    table_str : str
+        The formatted table.
+    """
+    row_list = [_RESULT_KEY_LIST]
+    for result_dict in result_list:
+        row_list.append([str(result_dict[key]) for key in _RESULT_KEY_LIST])
+    width_list = [
+        max([len(row[i]) for row in row_list])
+        for i in range(len(_RESULT_KEY_LIST))]
+    line_list = []
+    for row in row_list:
+        line_list.append('  '.join(
+            [value.rjust(width) for value, width in zip(row, width_list)]))
+    table_str = '\n'.join(line_list)
+    return table_str
+
+
+def main(args=None):
+    """
+    Run the benchmark and print the result table.
+
+    Parameters
+    ----------
+    args : list of str or None, default None
+        Command line arguments. If None, sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(
+        description='Measure the tick cost of the stats collectors.')
+    parser.add_argument(
+        '--process_nums', type=int, nargs='+',
+        default=DEFAULT_PROCESS_NUM_LIST)
+    parser.add_argument(
+        '--gpu_nums', type=int, nargs='+', default=DEFAULT_GPU_NUM_LIST)
+    parser.add_argument('--tick_num', type=int, default=DEFAULT_TICK_NUM)
+    parsed_args = parser.parse_args(args)
+    result_list = run_benchmark(
+        process_num_list=parsed_args.process_nums,
+        gpu_num_list=parsed_args.gpu_nums,
+        tick_num=parsed_args.tick_num)
+    print(format_result_table(result_list=result_list))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,427 @@
+"""
+Module of the per-cell resource attribution of the stats plot. The
+IPython execution hooks of the kernel send the start and end markers
+of each cell to the collector, which saves them with the GPU memory
+change to the cell log, drawn as the bands of the plot.
+
+Notes
+-----
+The peak RSS of the kernel in a cell is measured in the kernel by
+resetting the high water mark of the process (writing 5 to
+/proc/self/clear_refs, Linux 4.0 or later) at the start of the cell
+and reading VmHWM of /proc/self/status at the end. Where the reset is
+not permitted, the peak is exact only when the cell raises the peak of
+the whole process, and the larger RSS of the start and the end is used
+otherwise.
+pandas is imported only when the summary is loaded, to keep the
+collector process light.
+"""
+
+import collections
+import csv
+import os
+import time
+
+CELL_MARKER_START = 'start'
+CELL_MARKER_END = 'end'
+CELL_LOG_FILE_NAME = 'log_linux_stats_plot_cells.csv'
+CELL_COLUMN_LIST = [
+    'execution_count', 'source_line', 'start_timestamp', 'end_timestamp',
+    'duration_seconds', 'peak_rss_mb', 'gpu_memory_delta_mb']
+MAX_CELL_NUM = 1000
+SOURCE_LINE_MAX_LENGTH = 80
+PROC_ROOT = '/proc'
+_GPU_MEMORY_COLUMN_PREFIX = 'gpu('
+_GPU_MEMORY_COLUMN_SUFFIX = ') memory usage (MB)'
+
+
+def get_cell_log_file_path(log_dir_path):
+    """
+    Get the path of the log file of the cells.
+
+    Parameters
+    ----------
+    log_dir_path : str
+        Directory where the log is saved.
+
+    Returns
+    -------
+    cell_log_file_path : str
+        The path of the log file.
+    """
+    return os.path.join(log_dir_path, CELL_LOG_FILE_NAME)
+
+
+def load_cell_summary(log_dir_path):
+    """
+    Load the summary of the executed cells.
+
+    Parameters
+    ----------
+    log_dir_path : str
+        Directory where the log is saved.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        DataFrame that has the columns of CELL_COLUMN_LIST, a row per
+        cell in the order of the execution. The end_timestamp,
+        duration_seconds and peak_rss_mb of the running cell are NaN,
+        and gpu_memory_delta_mb is NaN if the GPU is not sampled.
+    """
+    import pandas as pd
+    cell_log_file_path = get_cell_log_file_path(log_dir_path=log_dir_path)
+    if not os.path.exists(cell_log_file_path):
+        return pd.DataFrame(columns=CELL_COLUMN_LIST)
+    df = pd.read_csv(cell_log_file_path, keep_default_na=False, na_values=[''])
+    df['source_line'] = df['source_line'].fillna('')
+    return df
+
+
+def save_cell_csv(cell_list, file_path):
+    """
+    Save the cells as the CSV drawn as the bands of the plot. The file
+    is replaced atomically so that the browser does not read a
+    partially written file.
+
+    Parameters
+    ----------
+    cell_list : list of dicts
+        The cells. Each dictionary has the keys of CELL_COLUMN_LIST,
+        and None is saved as an empty value.
+    file_path : str
+        Path of the CSV file.
+    """
+    tmp_file_path = file_path + '.tmp'
+    with open(tmp_file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CELL_COLUMN_LIST)
+        for cell_dict in cell_list:
+            writer.writerow([
+                '' if cell_dict[column_name] is None
+                else cell_dict[column_name]
+                for column_name in CELL_COLUMN_LIST])
+    os.replace(tmp_file_path, file_path)
+
+
+def get_first_source_line(source):
+    """
+    Get the first line of the source of the cell, to label the cell.
+
+    Parameters
+    ----------
+    source : str
+        Source of the cell.
+
+    Returns
+    -------
+    source_line : str
+        The first non-empty line, truncated to SOURCE_LINE_MAX_LENGTH
+        characters.
+    """
+    for line_str in source.split('\n'):
+        line_str = line_str.strip()
+        if line_str == '':
+            continue
+        if len(line_str) > SOURCE_LINE_MAX_LENGTH:
+            line_str = line_str[:SOURCE_LINE_MAX_LENGTH - 3] + '...'
+        return line_str
+    return ''
+
+
+def _is_gpu_memory_column(column_name):
+    """
+    Get whether the column is the GPU memory usage of the gpu metric.
+
+    Parameters
+    ----------
+    column_name : str
+        Name of the column.
+
+    Returns
+    -------
+    is_gpu_memory_column : bool
+        True if the column is the GPU memory usage.
+        e.g., 'gpu(0) memory usage (MB)'
+    """
+    return column_name.startswith(_GPU_MEMORY_COLUMN_PREFIX) \
+        and column_name.endswith(_GPU_MEMORY_COLUMN_SUFFIX)
+
+
+class CellMarkerLog():
+
+    def __init__(self, max_cell_num=MAX_CELL_NUM):
+        """
+        Class that keeps the cells marked by the kernel in the
+        collector, with the change of the GPU memory during each
+        cell.
+
+        Parameters
+        ----------
+        max_cell_num : int, default MAX_CELL_NUM
+            The number of the kept cells. Older cells are dropped.
+        """
+        self.cell_deque = collections.deque(maxlen=max_cell_num)
+        self.gpu_memory_mb_dict = {}
+        self.start_gpu_memory_mb = None
+        self.is_changed = False
+
+    def update_values(self, row_dict):
+        """
+        Keep the latest GPU memory usage of the sampled row.
+
+        Parameters
+        ----------
+        row_dict : dict
+            The sampled row.
+        """
+        for column_name, value in row_dict.items():
+            if _is_gpu_memory_column(column_name=column_name):
+                self.gpu_memory_mb_dict[column_name] = value
+
+    def _get_gpu_memory_mb(self):
+        """
+        Get the total memory usage of all GPUs of the latest samples.
+
+        Returns
+        -------
+        gpu_memory_mb : int or None
+            The memory usage in megabytes. None if the GPU has not
+            been sampled.
+        """
+        if len(self.gpu_memory_mb_dict) == 0:
+            return None
+        return sum(self.gpu_memory_mb_dict.values())
+
+    def apply_marker(self, marker_dict):
+        """
+        Add the cell of the start marker, or set the end of the cell
+        of the end marker.
+
+        Parameters
+        ----------
+        marker_dict : dict
+            The marker made by the CellTracker.
+
+        Raises
+        ------
+        ValueError
+            If an unknown marker is specified.
+        """
+        marker_name = marker_dict['marker']
+        if marker_name == CELL_MARKER_START:
+            self.cell_deque.append({
+                'execution_count': marker_dict['execution_count'],
+                'source_line': marker_dict['source_line'],
+                'start_timestamp': marker_dict['timestamp'],
+                'end_timestamp': None,
+                'duration_seconds': None,
+                'peak_rss_mb': None,
+                'gpu_memory_delta_mb': None,
+            })
+            self.start_gpu_memory_mb = self._get_gpu_memory_mb()
+        elif marker_name == CELL_MARKER_END:
+            if len(self.cell_deque) == 0 \
+                    or self.cell_deque[-1]['end_timestamp'] is not None:
+                # The start marker has been sent before the collector
+                # started.
+                return
+            cell_dict = self.cell_deque[-1]
+            cell_dict['end_timestamp'] = marker_dict['timestamp']
+            cell_dict['duration_seconds'] = marker_dict['duration_seconds']
+            cell_dict['peak_rss_mb'] = marker_dict['peak_rss_mb']
+            gpu_memory_mb = self._get_gpu_memory_mb()
+            if gpu_memory_mb is not None \
+                    and self.start_gpu_memory_mb is not None:
+                cell_dict['gpu_memory_delta_mb'] = \
+                    gpu_memory_mb - self.start_gpu_memory_mb
+        else:
+            err_msg = 'Unknown cell marker is specified: %s' % marker_name
+            raise ValueError(err_msg)
+        self.is_changed = True
+
+    def save_csv(self, log_dir_path):
+        """
+        Save the cells to the log file if they have been changed.
+
+        Parameters
+        ----------
+        log_dir_path : str
+            Directory where the log is saved.
+        """
+        if not self.is_changed:
+            return
+        save_cell_csv(
+            cell_list=self.cell_deque,
+            file_path=get_cell_log_file_path(log_dir_path=log_dir_path))
+        self.is_changed = False
+
+
+class CellTracker():
+
+    def __init__(self, send_marker, proc_root=PROC_ROOT):
+        """
+        Class of the IPython pre_run_cell / post_run_cell callbacks
+        that measure each cell in the kernel and send its markers.
+
+        Parameters
+        ----------
+        send_marker : function
+            Function called with the marker dictionary of the start
+            and the end of each cell (e.g., to send it to the
+            collector).
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system.
+        """
+        self.send_marker = send_marker
+        self.proc_root = proc_root
+        self.shell = None
+        self.cell_num = 0
+        self.execution_count = None
+        self.start_time = None
+        self.start_rss_kb = None
+        self.start_peak_rss_kb = None
+        self.is_peak_rss_reset = False
+
+    def register(self, shell):
+        """
+        Register the callbacks to the IPython shell.
+
+        Parameters
+        ----------
+        shell : IPython.core.interactiveshell.InteractiveShell
+            The shell of the kernel.
+        """
+        self.shell = shell
+        shell.events.register('pre_run_cell', self.pre_run_cell)
+        shell.events.register('post_run_cell', self.post_run_cell)
+
+    def unregister(self):
+        """
+        Unregister the callbacks from the IPython shell. Nothing
+        happens if they have not been registered.
+        """
+        if self.shell is None:
+            return
+        for event_name, callback in (
+                ('pre_run_cell', self.pre_run_cell),
+                ('post_run_cell', self.post_run_cell)):
+            try:
+                self.shell.events.unregister(event_name, callback)
+            except ValueError:
+                pass
+        self.shell = None
+
+    def pre_run_cell(self, info=None):
+        """
+        Callback at the start of the cell. The high water mark of the
+        RSS is reset and the start marker is sent.
+
+        Parameters
+        ----------
+        info : IPython.core.interactiveshell.ExecutionInfo or None, \
+                default None
+            Information of the cell (IPython 7 or later).
+        """
+        self.cell_num += 1
+        if self.shell is not None:
+            self.execution_count = self.shell.execution_count
+        else:
+            self.execution_count = self.cell_num
+        source = getattr(info, 'raw_cell', None) or ''
+        self.is_peak_rss_reset = _reset_peak_rss(proc_root=self.proc_root)
+        self.start_rss_kb, self.start_peak_rss_kb = _read_rss_kb(
+            proc_root=self.proc_root)
+        self.start_time = time.perf_counter()
+        self.send_marker({
+            'marker': CELL_MARKER_START,
+            'execution_count': self.execution_count,
+            'source_line': get_first_source_line(source=source),
+            'timestamp': round(time.time(), 3),
+        })
+
+    def post_run_cell(self, result=None):
+        """
+        Callback at the end of the cell. The end marker with the
+        duration and the peak RSS of the cell is sent.
+
+        Parameters
+        ----------
+        result : IPython.core.interactiveshell.ExecutionResult or \
+                None, default None
+            Result of the cell.
+        """
+        if self.start_time is None:
+            # The tracker has been registered while the cell runs.
+            return
+        duration_seconds = time.perf_counter() - self.start_time
+        rss_kb, peak_rss_kb = _read_rss_kb(proc_root=self.proc_root)
+        if not self.is_peak_rss_reset \
+                and peak_rss_kb <= self.start_peak_rss_kb:
+            peak_rss_kb = max(self.start_rss_kb, rss_kb)
+        self.start_time = None
+        self.send_marker({
+            'marker': CELL_MARKER_END,
+            'execution_count': self.execution_count,
+            'timestamp': round(time.time(), 3),
+            'duration_seconds': round(duration_seconds, 3),
+            'peak_rss_mb': int(peak_rss_kb / 1024),
+        })
+
+
+def _reset_peak_rss(proc_root):
+    """
+    Reset the peak RSS (VmHWM) of the current process to the current
+    RSS.
+
+    Parameters
+    ----------
+    proc_root : str
+        Root directory of the proc file system.
+
+    Returns
+    -------
+    is_reset : bool
+        True if the peak RSS has been reset.
+    """
+    try:
+        # The file is not created if it does not exist.
+        fd = os.open(os.path.join(proc_root, 'self/clear_refs'), os.O_WRONLY)
+    except OSError:
+        return False
+    try:
+        os.write(fd, b'5')
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+    return True
+
+
+def _read_rss_kb(proc_root):
+    """
+    Read the current and the peak RSS of the current process from
+    /proc/self/status.
+
+    Parameters
+    ----------
+    proc_root : str
+        Root directory of the proc file system.
+
+    Returns
+    -------
+    rss_kb : int
+        The current RSS (VmRSS) in kilobytes.
+    peak_rss_kb : int
+        The peak RSS (VmHWM) in kilobytes.
+    """
+    with open(os.path.join(proc_root, 'self/status'), 'r') as f:
+        status_str = f.read()
+    value_dict = {}
+    for line_str in status_str.split('\n'):
+        if line_str.startswith(('VmRSS:', 'VmHWM:')):
+            key, value_str = line_str.split(':', 1)
+            value_dict[key] = int(value_str.split()[0])
+    rss_kb = value_dict.get('VmRSS', 0)
+    peak_rss_kb = value_dict.get('VmHWM', rss_kb)
+    return rss_kb, peak_rss_kb
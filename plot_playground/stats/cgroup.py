@@ -0,0 +1,343 @@
+"""
+Module of the reading of the cgroup (control group) of the process,
+to get the limits and the usage of the container running the kernel.
+Both the unified hierarchy (cgroup v2) and the legacy hierarchies
+(cgroup v1) are supported.
+
+Notes
+-----
+The following files are read.
+    - cgroup v2: memory.current, memory.max, cpu.max, cpu.stat and
+        the *.pressure files
+    - cgroup v1: memory.usage_in_bytes, memory.limit_in_bytes,
+        cpu.cfs_quota_us, cpu.cfs_period_us, cpu.stat and
+        cpuacct.usage
+The directory of the cgroup is taken from /proc/self/cgroup. If the
+directory is not visible (e.g., in a container with its own cgroup
+namespace), the root of the hierarchy is used.
+"""
+
+import os
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+PROC_SELF_CGROUP_PATH = '/proc/self/cgroup'
+CGROUP_VERSION_1 = 1
+CGROUP_VERSION_2 = 2
+# cgroup v1 reports a value close to the maximum of int64 if the
+# memory is not limited.
+_V1_UNLIMITED_MEMORY_BYTES = 1 << 60
+
+_FILE_NAME_DICT = {
+    CGROUP_VERSION_2: {
+        'memory_usage': 'memory.current',
+        'memory_limit': 'memory.max',
+        'cpu_max': 'cpu.max',
+        'cpu_stat': 'cpu.stat',
+    },
+    CGROUP_VERSION_1: {
+        'memory_usage': 'memory.usage_in_bytes',
+        'memory_limit': 'memory.limit_in_bytes',
+        'cpu_quota': 'cpu.cfs_quota_us',
+        'cpu_period': 'cpu.cfs_period_us',
+        'cpu_stat': 'cpu.stat',
+        'cpu_usage': 'cpuacct.usage',
+    },
+}
+
+
+def detect_cgroup(
+        cgroup_root=CGROUP_ROOT, proc_cgroup_path=PROC_SELF_CGROUP_PATH):
+    """
+    Detect the cgroup of the process.
+
+    Parameters
+    ----------
+    cgroup_root : str, default CGROUP_ROOT
+        Root directory of the cgroup file system.
+    proc_cgroup_path : str, default PROC_SELF_CGROUP_PATH
+        Path of the file listing the cgroups of the process.
+
+    Returns
+    -------
+    cgroup_dict : dict or None
+        A dictionary with the following keys. None if the cgroup with
+        the memory controller is not found.
+        - version : CGROUP_VERSION_2 or CGROUP_VERSION_1.
+        - memory_dir_path : Directory of the memory controller.
+        - cpu_dir_path : Directory of the cpu controller.
+        - cpuacct_dir_path : Directory of the cpuacct controller
+            (same as cpu_dir_path in cgroup v2).
+    """
+    controller_path_dict = _parse_proc_cgroup(
+        proc_cgroup_str=_read_file_str(file_path=proc_cgroup_path) or '')
+    if os.path.exists(os.path.join(cgroup_root, 'cgroup.controllers')):
+        dir_path = _get_controller_dir_path(
+            controller_root=cgroup_root,
+            relative_path=controller_path_dict.get(''))
+        cgroup_dict = {
+            'version': CGROUP_VERSION_2,
+            'memory_dir_path': dir_path,
+            'cpu_dir_path': dir_path,
+            'cpuacct_dir_path': dir_path,
+        }
+    elif os.path.isdir(os.path.join(cgroup_root, 'memory')):
+        cgroup_dict = {'version': CGROUP_VERSION_1}
+        for controller_name in ('memory', 'cpu', 'cpuacct'):
+            cgroup_dict['%s_dir_path' % controller_name] = \
+                _get_controller_dir_path(
+                    controller_root=os.path.join(
+                        cgroup_root, controller_name),
+                    relative_path=controller_path_dict.get(controller_name))
+    else:
+        return None
+    if not os.path.exists(get_file_path(
+            cgroup_dict=cgroup_dict, file_key='memory_usage')):
+        # e.g., the root cgroup of the host has no memory.current.
+        return None
+    return cgroup_dict
+
+
+def _parse_proc_cgroup(proc_cgroup_str):
+    """
+    Get the path of the cgroup of each controller from the content of
+    /proc/<pid>/cgroup.
+
+    Parameters
+    ----------
+    proc_cgroup_str : str
+        Content of /proc/<pid>/cgroup.
+        e.g., '0::/user.slice' (v2), '4:cpu,cpuacct:/docker/abc' (v1)
+
+    Returns
+    -------
+    controller_path_dict : dict
+        A dictionary that stores the controller name in key and the
+        path in value. The key of the unified hierarchy (v2) is an
+        empty string.
+    """
+    controller_path_dict = {}
+    for line_str in proc_cgroup_str.split('\n'):
+        splited_line = line_str.split(':', 2)
+        if len(splited_line) != 3:
+            continue
+        for controller_name in splited_line[1].split(','):
+            controller_path_dict[controller_name] = splited_line[2]
+    return controller_path_dict
+
+
+def _get_controller_dir_path(controller_root, relative_path):
+    """
+    Get the directory of the cgroup in the hierarchy of the
+    controller.
+
+    Parameters
+    ----------
+    controller_root : str
+        Root directory of the hierarchy.
+    relative_path : str or None
+        Path of the cgroup in the hierarchy. e.g., '/docker/abc'
+
+    Returns
+    -------
+    dir_path : str
+        The directory. The root directory is returned if the path is
+        None or not visible.
+    """
+    if relative_path and relative_path.strip('/') != '':
+        dir_path = os.path.join(controller_root, relative_path.strip('/'))
+        if os.path.isdir(dir_path):
+            return dir_path
+    return controller_root
+
+
+def get_file_path(cgroup_dict, file_key):
+    """
+    Get the path of the file of the cgroup.
+
+    Parameters
+    ----------
+    cgroup_dict : dict
+        The cgroup detected by the detect_cgroup function.
+    file_key : str
+        Key of the file. e.g., 'memory_usage', 'cpu_stat'
+
+    Returns
+    -------
+    file_path : str
+        Path of the file.
+    """
+    file_name = _FILE_NAME_DICT[cgroup_dict['version']][file_key]
+    controller_name = file_name.split('.')[0]
+    file_path = os.path.join(
+        cgroup_dict['%s_dir_path' % controller_name], file_name)
+    return file_path
+
+
+def get_pressure_file_path(cgroup_dict, resource_name):
+    """
+    Get the path of the pressure stall information (PSI) file of the
+    cgroup.
+
+    Parameters
+    ----------
+    cgroup_dict : dict
+        The cgroup detected by the detect_cgroup function.
+    resource_name : str
+        One of 'cpu', 'memory' and 'io'.
+
+    Returns
+    -------
+    file_path : str or None
+        Path of the file. e.g., '/sys/fs/cgroup/memory.pressure'
+        None in cgroup v1, which has no pressure file.
+    """
+    if cgroup_dict['version'] != CGROUP_VERSION_2:
+        return None
+    file_path = os.path.join(
+        cgroup_dict['memory_dir_path'], '%s.pressure' % resource_name)
+    return file_path
+
+
+def read_memory_limit_bytes(cgroup_dict):
+    """
+    Read the memory limit of the cgroup.
+
+    Parameters
+    ----------
+    cgroup_dict : dict
+        The cgroup detected by the detect_cgroup function.
+
+    Returns
+    -------
+    limit_bytes : int or None
+        The memory limit in bytes. None if the memory is not limited.
+    """
+    limit_str = _read_file_str(file_path=get_file_path(
+        cgroup_dict=cgroup_dict, file_key='memory_limit'))
+    if limit_str is None or limit_str == 'max':
+        return None
+    limit_bytes = int(limit_str)
+    if limit_bytes >= _V1_UNLIMITED_MEMORY_BYTES:
+        return None
+    return limit_bytes
+
+
+def read_cpu_limit_cores(cgroup_dict):
+    """
+    Read the CPU limit (CFS quota) of the cgroup.
+
+    Parameters
+    ----------
+    cgroup_dict : dict
+        The cgroup detected by the detect_cgroup function.
+
+    Returns
+    -------
+    limit_cores : float or None
+        The limit in the number of cores. e.g., 1.5
+        None if the CPU is not limited.
+    """
+    if cgroup_dict['version'] == CGROUP_VERSION_2:
+        return _parse_cpu_max(cpu_max_str=_read_file_str(
+            file_path=get_file_path(
+                cgroup_dict=cgroup_dict, file_key='cpu_max')))
+    quota_str = _read_file_str(file_path=get_file_path(
+        cgroup_dict=cgroup_dict, file_key='cpu_quota'))
+    period_str = _read_file_str(file_path=get_file_path(
+        cgroup_dict=cgroup_dict, file_key='cpu_period'))
+    if quota_str is None or period_str is None or int(quota_str) < 0:
+        return None
+    return int(quota_str) / int(period_str)
+
+
+def _parse_cpu_max(cpu_max_str):
+    """
+    Get the CPU limit from the content of cpu.max of cgroup v2.
+
+    Parameters
+    ----------
+    cpu_max_str : str or None
+        Content of cpu.max. e.g., '150000 100000', 'max 100000'
+
+    Returns
+    -------
+    limit_cores : float or None
+        The limit in the number of cores. None if the CPU is not
+        limited.
+    """
+    if cpu_max_str is None:
+        return None
+    quota_str, period_str = cpu_max_str.split()[:2]
+    if quota_str == 'max':
+        return None
+    return int(quota_str) / int(period_str)
+
+
+def parse_cpu_stat(version, cpu_stat_bytes, cpu_usage_bytes=None):
+    """
+    Get the cumulative CPU usage and throttling of the cgroup.
+
+    Parameters
+    ----------
+    version : int
+        CGROUP_VERSION_2 or CGROUP_VERSION_1.
+    cpu_stat_bytes : bytes or memoryview
+        Content of cpu.stat.
+    cpu_usage_bytes : bytes, memoryview or None, default None
+        Content of cpuacct.usage (only cgroup v1).
+
+    Returns
+    -------
+    cpu_stat_dict : dict
+        A dictionary with the following keys. The keys not found in
+        the file are omitted.
+        - usage_seconds : CPU time used by the cgroup.
+        - period_num : The number of the enforcement periods.
+        - throttled_num : The number of the throttled periods.
+        - throttled_seconds : Total time of the throttling.
+    """
+    value_dict = {}
+    for line_bytes in bytes(cpu_stat_bytes).split(b'\n'):
+        splited_line = line_bytes.split()
+        if len(splited_line) != 2:
+            continue
+        value_dict[splited_line[0]] = int(splited_line[1])
+    cpu_stat_dict = {}
+    if b'nr_periods' in value_dict:
+        cpu_stat_dict['period_num'] = value_dict[b'nr_periods']
+        cpu_stat_dict['throttled_num'] = value_dict[b'nr_throttled']
+    if version == CGROUP_VERSION_2:
+        if b'usage_usec' in value_dict:
+            cpu_stat_dict['usage_seconds'] = value_dict[b'usage_usec'] / 1e6
+        if b'throttled_usec' in value_dict:
+            cpu_stat_dict['throttled_seconds'] = \
+                value_dict[b'throttled_usec'] / 1e6
+        return cpu_stat_dict
+    if cpu_usage_bytes is not None:
+        cpu_stat_dict['usage_seconds'] = int(bytes(cpu_usage_bytes)) / 1e9
+    if b'throttled_time' in value_dict:
+        cpu_stat_dict['throttled_seconds'] = \
+            value_dict[b'throttled_time'] / 1e9
+    return cpu_stat_dict
+
+
+def _read_file_str(file_path):
+    """
+    Read the file of the cgroup.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file.
+
+    Returns
+    -------
+    file_str : str or None
+        The content without the surrounding white spaces. None if the
+        file can not be read.
+    """
+    try:
+        with open(file_path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
@@ -0,0 +1,840 @@
+"""
+Module of the stats collector process. The collector is started as a
+standalone subprocess instead of forking the notebook kernel, so it
+does not copy the page tables of a large kernel nor inherit its threads
+and locks. This module only imports what the sampling needs (no
+pandas, IPython or plotting modules).
+
+Notes
+-----
+The collector is started by the linux_stats_plot module as follows.
+    $ python -m plot_playground.stats.collector \
+        --command_fd <fd> --status_fd <fd> --sample_fd <fd>
+The settings are sent as the first message of the command connection,
+and the collector receives the subsequent commands (stop, interval
+change, metric addition, cell marker, kernel lag and heap snapshot)
+from the same connection. The collector
+reports through the status connection when the first sample has been
+written (with the collectors that have been set up), or the traceback
+when an error occurs.
+"""
+
+import argparse
+import csv
+import math
+from multiprocessing.connection import Connection
+import os
+import sys
+import threading
+import time
+import traceback
+
+from plot_playground.stats import cell_markers
+from plot_playground.stats import collectors
+from plot_playground.stats import history
+from plot_playground.stats import history_store
+from plot_playground.stats import openmetrics
+from plot_playground.stats import scheduler
+
+import psutil
+
+DEFAULT_METRIC_NAME_LIST = [
+    'memory', 'disk', 'gpu', 'cgroup', 'pressure', 'overhead']
+COMMAND_START = 'start'
+STATUS_READY = 'ready'
+STATUS_ERROR = 'error'
+
+
+def main(args=None):
+    """
+    Entry point of the collector subprocess.
+
+    Parameters
+    ----------
+    args : list of str or None, default None
+        Command line arguments. If None, sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(
+        description='Collector process of the linux stats plot.')
+    parser.add_argument(
+        '--command_fd', type=int, required=True,
+        help='File descriptor to receive the settings and the commands.')
+    parser.add_argument(
+        '--status_fd', type=int, default=-1,
+        help='File descriptor to send the ready and error status.')
+    parser.add_argument(
+        '--sample_fd', type=int, default=-1,
+        help='File descriptor to send the sample rows (push update).')
+    parsed_args = parser.parse_args(args=args)
+    command_conn = Connection(parsed_args.command_fd, writable=False)
+    status_conn = None
+    if parsed_args.status_fd >= 0:
+        status_conn = Connection(parsed_args.status_fd, readable=False)
+    sample_conn = None
+    if parsed_args.sample_fd >= 0:
+        sample_conn = Connection(parsed_args.sample_fd, readable=False)
+    try:
+        start_command_dict = command_conn.recv()
+    except EOFError:
+        return
+    try:
+        if start_command_dict.get('command') != COMMAND_START:
+            err_msg = 'The first command must be the start command: %s' \
+                % start_command_dict
+            raise ValueError(err_msg)
+        start_collecting(
+            command_conn=command_conn, sample_conn=sample_conn,
+            status_conn=status_conn, **start_command_dict['kwargs'])
+    except Exception:
+        send_status(
+            status_conn=status_conn,
+            status_dict={
+                'status': STATUS_ERROR, 'error': traceback.format_exc()})
+        raise
+
+
+def send_status(status_conn, status_dict):
+    """
+    Send the status to the kernel.
+
+    Parameters
+    ----------
+    status_conn : multiprocessing.connection.Connection or None
+        The connection to send the status. If None, nothing is sent.
+    status_dict : dict
+        The status. The status name (STATUS_READY or STATUS_ERROR) is
+        set to the status key.
+
+    Returns
+    -------
+    is_sent : bool
+        True if the status has been sent.
+    """
+    if status_conn is None:
+        return False
+    try:
+        status_conn.send(status_dict)
+    except (BrokenPipeError, OSError):
+        return False
+    return True
+
+
+def get_tier_setting_list(window_seconds):
+    """
+    Get the settings of the history tiers. The retention of the raw
+    tier is extended if the initial window is longer than it.
+
+    Parameters
+    ----------
+    window_seconds : int or float
+        Seconds of the initial time window of the plot.
+
+    Returns
+    -------
+    tier_setting_list : list of dicts
+        Settings of the tiers in the order of resolution.
+    """
+    tier_setting_list = [
+        dict(tier_setting) for tier_setting
+        in history.DEFAULT_TIER_SETTING_LIST]
+    tier_setting_list[0]['retention_seconds'] = max(
+        tier_setting_list[0]['retention_seconds'], window_seconds)
+    return tier_setting_list
+
+
+def start_collecting(
+        interval_seconds, buffer_size, log_dir_path, parent_pid,
+        sample_conn=None, metric_interval_seconds=None, collector_list=None,
+        history_db_path=None,
+        history_retention_seconds=history_store.DEFAULT_RETENTION_SECONDS,
+        command_conn=None, status_conn=None, metrics_port=None):
+    """
+    Start updating the plot data.
+
+    Parameters
+    ----------
+    interval_seconds : int or float
+        Interval in seconds at which the log file is saved.
+    buffer_size : int
+        Buffer size to handle in the plot. If the initial window of
+        `buffer_size * interval_seconds` seconds is longer than the
+        retention of the raw tier, the retention is extended.
+    log_dir_path : str
+        Directory where the log is saved.
+    parent_pid : int or None
+        The parent process id. If None, the collector does not exit
+        when the parent process dies (e.g., the agent of the agent
+        module).
+    sample_conn : multiprocessing.connection.Connection or None, \
+            default None
+        The connection to send each sample row to the kernel (push
+        update). If None, samples are only saved to the log file.
+    metric_interval_seconds : dict or None, default None
+        A dictionary that stores the metric name in key and the
+        sampling interval in seconds in value. Unspecified metrics
+        use the default interval of each collector.
+    collector_list : list of MetricCollector or None, default None
+        Collectors to sample. They are set up in this process and the
+        unavailable ones are excluded. If None, the collectors of
+        DEFAULT_METRIC_NAME_LIST are used.
+    history_db_path : str or None, default None
+        Path of the SQLite database to save the samples. If None, the
+        samples are not saved to the database.
+    history_retention_seconds : int or float, default 3 days
+        Seconds for which the samples are kept in the database.
+    command_conn : multiprocessing.connection.Connection or None, \
+            default None
+        The connection to receive the commands from the kernel (stop,
+        interval change and metric addition). If None, the collector
+        runs until the parent process dies.
+    status_conn : multiprocessing.connection.Connection or None, \
+            default None
+        The connection to send the ready status when the first sample
+        has been written. The status has the set up collector_list,
+        the metric_interval_seconds_dict and the metrics_port.
+    metrics_port : int or None, default None
+        Port of the local HTTP endpoint that serves the latest samples
+        in the OpenMetrics text format (see the openmetrics module).
+        If zero, a free port is selected and sent with the ready
+        status. If None, the endpoint is not served.
+    """
+
+    os.makedirs(log_dir_path, exist_ok=True)
+    if collector_list is None:
+        collector_list = collectors.make_collector_list(
+            metrics=DEFAULT_METRIC_NAME_LIST)
+    # The collectors are set up here so that slow probes (e.g., the
+    # gpustat command) do not block the kernel.
+    collector_list = collectors.setup_collectors(
+        collector_list=collector_list)
+    collector_dict = {
+        collector.name: collector for collector in collector_list}
+    column_list = get_column_list(collector_list=collector_list)
+    metric_interval_seconds_dict = get_metric_interval_seconds_dict(
+        collector_list=collector_list,
+        metric_interval_seconds=metric_interval_seconds)
+    tiered_history = history.TieredHistory(
+        column_list=column_list[1:],
+        row_num_per_second=get_row_num_per_second(
+            metric_interval_seconds_dict=metric_interval_seconds_dict),
+        tier_setting_list=get_tier_setting_list(
+            window_seconds=buffer_size * interval_seconds))
+    interval_scheduler = scheduler.IntervalScheduler()
+    for metric_name, metric_interval in \
+            metric_interval_seconds_dict.items():
+        interval_scheduler.add_job(
+            name=metric_name, interval_seconds=metric_interval)
+    interval_scheduler.add_job(
+        name=_JOB_NAME_SAVE_CSV, interval_seconds=interval_seconds)
+    interval_scheduler.add_job(
+        name=_JOB_NAME_CHECK_PARENT,
+        interval_seconds=PARENT_CHECK_INTERVAL_SECONDS)
+    store = None
+    if history_db_path is not None:
+        store = _make_history_store(
+            history_db_path=history_db_path,
+            history_retention_seconds=history_retention_seconds,
+            collector_list=collector_list)
+        interval_scheduler.add_job(
+            name=_JOB_NAME_FLUSH_HISTORY,
+            interval_seconds=HISTORY_FLUSH_INTERVAL_SECONDS)
+        interval_scheduler.add_job(
+            name=_JOB_NAME_DELETE_EXPIRED_HISTORY,
+            interval_seconds=HISTORY_DELETE_INTERVAL_SECONDS)
+
+    cell_marker_log = cell_markers.CellMarkerLog()
+
+    # The endpoint reads the history from its own threads, so the
+    # history is updated with the lock held.
+    history_lock = threading.Lock()
+    metrics_server = None
+    if metrics_port is not None:
+        metrics_server = openmetrics.OpenMetricsServer(
+            tiered_history=tiered_history, history_lock=history_lock,
+            port=metrics_port)
+        metrics_server.start()
+
+    # The logs of all tiers are written (header only) before the first
+    # bucket so that the browser does not read the stale logs of the
+    # previous kernel. After that, the rollup tiers are saved only when
+    # a bucket has been stored.
+    for tier_name in tiered_history.get_tier_names():
+        save_tier_csv(
+            tiered_history=tiered_history, tier_name=tier_name,
+            log_dir_path=log_dir_path)
+    unsaved_tier_name_set = set()
+    is_ready_sent = False
+    try:
+        while True:
+            _sleep_until_next_job(
+                interval_scheduler=interval_scheduler,
+                command_conn=command_conn)
+            for command_dict in _receive_commands(command_conn=command_conn):
+                with history_lock:
+                    is_stopped = apply_command(
+                        command_dict=command_dict,
+                        collector_dict=collector_dict,
+                        column_list=column_list,
+                        metric_interval_seconds_dict=(
+                            metric_interval_seconds_dict),
+                        interval_scheduler=interval_scheduler,
+                        tiered_history=tiered_history, store=store,
+                        cell_marker_log=cell_marker_log)
+                if is_stopped:
+                    return
+            due_job_name_list = interval_scheduler.pop_due_job_names()
+            tick_start_time = time.perf_counter()
+            tick_start_cpu_time = time.thread_time()
+            if _JOB_NAME_CHECK_PARENT in due_job_name_list:
+                _exit_if_parent_process_has_died(parent_pid=parent_pid)
+
+            row_dict = sample_metrics(
+                collector_dict=collector_dict,
+                metric_name_list=due_job_name_list)
+            if row_dict is not None:
+                timestamp = row_dict[COLUMN_NAME_TIMESTAMP]
+                with history_lock:
+                    stored_tier_name_list = tiered_history.append(
+                        timestamp=timestamp, row_dict=row_dict)
+                unsaved_tier_name_set.update(stored_tier_name_list)
+                if store is not None:
+                    store.add_row(timestamp=timestamp, row_dict=row_dict)
+                sample_conn = _send_sample_row(
+                    sample_conn=sample_conn, row_dict=row_dict)
+                cell_marker_log.update_values(row_dict=row_dict)
+
+            if _JOB_NAME_SAVE_CSV in due_job_name_list:
+                unsaved_tier_name_set.add(history.TIER_NAME_RAW)
+                for tier_name in unsaved_tier_name_set:
+                    save_tier_csv(
+                        tiered_history=tiered_history, tier_name=tier_name,
+                        log_dir_path=log_dir_path)
+                unsaved_tier_name_set.clear()
+                cell_marker_log.save_csv(log_dir_path=log_dir_path)
+                if not is_ready_sent:
+                    send_status(
+                        status_conn=status_conn,
+                        status_dict={
+                            'status': STATUS_READY,
+                            'collector_list': collector_list,
+                            'metric_interval_seconds_dict':
+                                metric_interval_seconds_dict,
+                            'metrics_port': None if metrics_server is None
+                            else metrics_server.port,
+                        })
+                    is_ready_sent = True
+            if _JOB_NAME_FLUSH_HISTORY in due_job_name_list:
+                store.flush()
+            if _JOB_NAME_DELETE_EXPIRED_HISTORY in due_job_name_list:
+                store.delete_expired()
+            record_tick(
+                collector_dict=collector_dict,
+                wall_seconds=time.perf_counter() - tick_start_time,
+                cpu_seconds=time.thread_time() - tick_start_cpu_time)
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+        # Save the pending samples also when the kernel has died.
+        if store is not None:
+            store.close()
+        for collector in collector_dict.values():
+            collector.close()
+
+
+PARENT_CHECK_INTERVAL_SECONDS = 1
+HISTORY_FLUSH_INTERVAL_SECONDS = 5
+HISTORY_DELETE_INTERVAL_SECONDS = 60
+_JOB_NAME_SAVE_CSV = '_save_csv'
+_JOB_NAME_CHECK_PARENT = '_check_parent'
+_JOB_NAME_FLUSH_HISTORY = '_flush_history'
+_JOB_NAME_DELETE_EXPIRED_HISTORY = '_delete_expired_history'
+COMMAND_STOP = 'stop'
+COMMAND_SET_INTERVAL = 'set_interval'
+COMMAND_ADD_METRIC = 'add_metric'
+COMMAND_CELL_MARKER = 'cell_marker'
+COMMAND_RECORD_LAG = 'record_lag'
+COMMAND_RECORD_HEAP = 'record_heap'
+
+
+def _sleep_until_next_job(interval_scheduler, command_conn):
+    """
+    Sleep until the next run time of any job. If a command arrives
+    while sleeping, this returns at once.
+
+    Parameters
+    ----------
+    interval_scheduler : plot_playground.stats.scheduler.\
+            IntervalScheduler
+        The scheduler of the jobs.
+    command_conn : multiprocessing.connection.Connection or None
+        The connection to receive the commands.
+    """
+    if command_conn is None:
+        interval_scheduler.sleep_until_next()
+        return
+    interval_scheduler.sleep_until_next(sleep_func=command_conn.poll)
+
+
+def _receive_commands(command_conn):
+    """
+    Receive all arrived commands without blocking.
+
+    Parameters
+    ----------
+    command_conn : multiprocessing.connection.Connection or None
+        The connection to receive the commands.
+
+    Returns
+    -------
+    command_dict_list : list of dicts
+        A list of the received commands. If the kernel side has been
+        closed, the stop command is returned.
+    """
+    if command_conn is None:
+        return []
+    command_dict_list = []
+    try:
+        while command_conn.poll():
+            command_dict_list.append(command_conn.recv())
+    except (EOFError, OSError):
+        command_dict_list.append({'command': COMMAND_STOP})
+    return command_dict_list
+
+
+def apply_command(
+        command_dict, collector_dict, column_list,
+        metric_interval_seconds_dict, interval_scheduler, tiered_history,
+        store, cell_marker_log=None):
+    """
+    Apply the command from the kernel to the collector state.
+
+    Parameters
+    ----------
+    command_dict : dict
+        The received command.
+    collector_dict : dict
+        A dictionary that stores the metric name in key and the
+        collector in value. Updated by the add_metric command, whose
+        collector is set up in the sampling process.
+    column_list : list of str
+        A list of column names of the log. Updated by the add_metric
+        command.
+    metric_interval_seconds_dict : dict
+        A dictionary of the sampling interval of all metrics.
+    interval_scheduler : plot_playground.stats.scheduler.\
+            IntervalScheduler
+        The scheduler of the jobs.
+    tiered_history : plot_playground.stats.history.TieredHistory
+        The history of the samples.
+    store : plot_playground.stats.history_store.SQLiteHistoryStore \
+            or None
+        The persistent store of the samples.
+    cell_marker_log : plot_playground.stats.cell_markers.CellMarkerLog \
+            or None, default None
+        The cells marked by the kernel. If None, the cell_marker
+        command is ignored.
+
+    Returns
+    -------
+    is_stopped : bool
+        True if the collector should stop.
+
+    Raises
+    ------
+    ValueError
+        If an unknown command is specified.
+    """
+    command_name = command_dict['command']
+    if command_name == COMMAND_STOP:
+        return True
+    if command_name == COMMAND_CELL_MARKER:
+        if cell_marker_log is not None:
+            cell_marker_log.apply_marker(marker_dict=command_dict['marker'])
+        return False
+    if command_name == COMMAND_RECORD_LAG:
+        lag_collector = collector_dict.get(
+            collectors.KernelLagCollector.name)
+        if lag_collector is not None:
+            lag_collector.record_lag(
+                lag_seconds_list=command_dict['lag_seconds_list'])
+        return False
+    if command_name == COMMAND_RECORD_HEAP:
+        heap_collector = collector_dict.get(
+            collectors.HeapSnapshotCollector.name)
+        if heap_collector is not None:
+            heap_collector.record_heap(heap_dict=command_dict['heap'])
+        return False
+    if command_name == COMMAND_SET_INTERVAL:
+        metric_name = command_dict['metric_name']
+        interval_scheduler.set_interval(
+            name=metric_name,
+            interval_seconds=command_dict['interval_seconds'])
+        metric_interval_seconds_dict[metric_name] = \
+            command_dict['interval_seconds']
+    elif command_name == COMMAND_ADD_METRIC:
+        collector = command_dict['collector']
+        # The collector set up by the kernel is set up again here, as
+        # the collectors at the start (e.g., to exclude the collector
+        # process from the process tree of the kernel).
+        collector.setup()
+        collector_dict[collector.name] = collector
+        column_list.extend(collector.get_column_list())
+        metric_interval_seconds_dict[collector.name] = \
+            command_dict['interval_seconds']
+        interval_scheduler.add_job(
+            name=collector.name,
+            interval_seconds=command_dict['interval_seconds'])
+        if store is not None:
+            store.register_columns(column_metric_dict={
+                column_name: collector.name for column_name
+                in collector.get_column_list()})
+    else:
+        err_msg = 'Unknown command is specified: %s' % command_name
+        raise ValueError(err_msg)
+    tiered_history.update_columns(
+        column_list=column_list[1:],
+        row_num_per_second=get_row_num_per_second(
+            metric_interval_seconds_dict=metric_interval_seconds_dict))
+    return False
+
+
+def _make_history_store(
+        history_db_path, history_retention_seconds, collector_list):
+    """
+    Make the persistent store of the samples and register the columns
+    of the collectors.
+
+    Parameters
+    ----------
+    history_db_path : str
+        Path of the SQLite database.
+    history_retention_seconds : int or float
+        Seconds for which the samples are kept in the database.
+    collector_list : list of MetricCollector
+        A list of available collectors.
+
+    Returns
+    -------
+    store : plot_playground.stats.history_store.SQLiteHistoryStore
+        The created store.
+    """
+    store = history_store.SQLiteHistoryStore(
+        db_path=history_db_path,
+        retention_seconds=history_retention_seconds)
+    column_metric_dict = {}
+    for collector in collector_list:
+        for column_name in collector.get_column_list():
+            column_metric_dict[column_name] = collector.name
+    store.register_columns(column_metric_dict=column_metric_dict)
+    return store
+
+
+def get_metric_interval_seconds_dict(
+        collector_list, metric_interval_seconds):
+    """
+    Get the sampling interval of each metric.
+
+    Parameters
+    ----------
+    collector_list : list of MetricCollector
+        A list of collectors.
+    metric_interval_seconds : dict or None
+        A dictionary that stores the metric name in key and the
+        sampling interval in seconds in value. Unspecified metrics
+        use the default interval of each collector.
+
+    Returns
+    -------
+    metric_interval_seconds_dict : dict
+        A dictionary of the sampling interval of all collectors.
+
+    Raises
+    ------
+    ValueError
+        If a metric name not included in the collectors is specified.
+    """
+    metric_interval_seconds_dict = {}
+    for collector in collector_list:
+        metric_interval_seconds_dict[collector.name] = \
+            collector.default_interval_seconds
+    if metric_interval_seconds is None:
+        return metric_interval_seconds_dict
+    for metric_name, interval_seconds in metric_interval_seconds.items():
+        if metric_name not in metric_interval_seconds_dict:
+            if metric_name in collectors.COLLECTOR_CLASS_DICT:
+                # e.g., GPU metric on the machine without GPU.
+                continue
+            err_msg = 'Unknown metric name is specified: %s' % metric_name
+            raise ValueError(err_msg)
+        metric_interval_seconds_dict[metric_name] = interval_seconds
+    return metric_interval_seconds_dict
+
+
+def get_max_row_num(window_seconds, metric_interval_seconds_dict):
+    """
+    Get the maximum number of rows kept in the window.
+
+    Parameters
+    ----------
+    window_seconds : int or float
+        Seconds of the window to keep.
+    metric_interval_seconds_dict : dict
+        A dictionary of the sampling interval of all metrics.
+
+    Returns
+    -------
+    max_row_num : int
+        The maximum number of rows.
+    """
+    row_num_per_second = get_row_num_per_second(
+        metric_interval_seconds_dict=metric_interval_seconds_dict)
+    max_row_num = int(math.ceil(window_seconds * row_num_per_second)) + 1
+    return max_row_num
+
+
+def get_row_num_per_second(metric_interval_seconds_dict):
+    """
+    Get the maximum number of sample rows per second. Since the runs
+    of the metrics do not always coincide, each metric may make its
+    own row.
+
+    Parameters
+    ----------
+    metric_interval_seconds_dict : dict
+        A dictionary of the sampling interval of all metrics.
+
+    Returns
+    -------
+    row_num_per_second : float
+        The maximum number of rows per second.
+    """
+    row_num_per_second = sum(
+        1 / interval_seconds for interval_seconds
+        in metric_interval_seconds_dict.values())
+    return row_num_per_second
+
+
+def sample_metrics(collector_dict, metric_name_list):
+    """
+    Sample the specified metrics.
+
+    Parameters
+    ----------
+    collector_dict : dict
+        A dictionary that stores the metric name in key and the
+        collector in value.
+    metric_name_list : list of str
+        Names of the metrics to sample. Names other than metrics
+        are ignored.
+
+    Returns
+    -------
+    row_dict : dict or None
+        A dictionary that stores the column name in key and the
+        sampled value in value. The timestamp (UNIX time in seconds)
+        at sampling, the updated quantile estimates and the trends
+        are also set. If no value is sampled, None is returned.
+    """
+    timestamp = round(time.time(), 3)
+    row_dict = {}
+    for metric_name in metric_name_list:
+        if metric_name not in collector_dict:
+            continue
+        collector = collector_dict[metric_name]
+        value_dict = collector.collect()
+        row_dict.update(value_dict)
+        row_dict.update(collector.update_quantiles(value_dict=value_dict))
+        row_dict.update(collector.update_trends(
+            timestamp=timestamp, value_dict=value_dict))
+    if len(row_dict) == 0:
+        return None
+    row_dict[COLUMN_NAME_TIMESTAMP] = timestamp
+    return row_dict
+
+
+def record_tick(collector_dict, wall_seconds, cpu_seconds):
+    """
+    Pass the cost of a tick of the sampling loop to all collectors.
+
+    Parameters
+    ----------
+    collector_dict : dict
+        A dictionary that stores the metric name in key and the
+        collector in value.
+    wall_seconds : float
+        Wall time of the tick in seconds.
+    cpu_seconds : float
+        CPU time of the sampling thread during the tick in seconds.
+    """
+    for collector in collector_dict.values():
+        collector.record_tick(
+            wall_seconds=wall_seconds, cpu_seconds=cpu_seconds)
+
+
+def _exit_if_parent_process_has_died(parent_pid):
+    """
+    If there is no parent process, stop the child process.
+
+    Parameters
+    ----------
+    parent_pid : int or None
+        The Parent process id. If None, nothing is checked.
+    """
+    if parent_pid is None:
+        return
+    if not psutil.pid_exists(parent_pid):
+        sys.exit()
+
+
+COLUMN_NAME_TIMESTAMP = 'timestamp'
+
+
+def get_column_list(collector_list):
+    """
+    Get the list of columns of the log.
+
+    Parameters
+    ----------
+    collector_list : list of MetricCollector
+        A list of available collectors.
+
+    Returns
+    -------
+    column_list : list of str
+        A list of column names. The timestamp column comes first.
+    """
+    column_list = [COLUMN_NAME_TIMESTAMP]
+    for collector in collector_list:
+        column_list.extend(collector.get_column_list())
+    return column_list
+
+
+def _save_csv(timestamp_array, value_array, column_list, log_file_path):
+    """
+    Save the acquired data as a CSV for plotting. Since each metric
+    is sampled at its own interval, columns of metrics not sampled
+    in a row are left empty. The file is replaced atomically so that
+    the browser does not read a partially written file.
+
+    Parameters
+    ----------
+    timestamp_array : numpy.ndarray
+        Timestamps of the rows.
+    value_array : numpy.ndarray
+        2-dimensional array of the values of the rows.
+    column_list : list of str
+        A list of column names of the values (excluding the
+        timestamp).
+    log_file_path : str
+        The file path of the log.
+    """
+    tmp_file_path = log_file_path + '.tmp'
+    with open(tmp_file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([COLUMN_NAME_TIMESTAMP] + list(column_list))
+        for timestamp, value_row in zip(
+                timestamp_array.round(3).tolist(), value_array.tolist()):
+            writer.writerow(
+                [timestamp] + [
+                    '' if math.isnan(value) else value
+                    for value in value_row])
+    os.replace(tmp_file_path, log_file_path)
+
+
+def save_tier_csv(tiered_history, tier_name, log_dir_path):
+    """
+    Save the rows of the history tier as the CSV log of the tier.
+
+    Parameters
+    ----------
+    tiered_history : plot_playground.stats.history.TieredHistory
+        The history of the samples.
+    tier_name : str
+        Name of the tier to save.
+    log_dir_path : str
+        Directory where the log is saved.
+    """
+    timestamp_array, value_array = tiered_history.get_tier_arrays(
+        tier_name=tier_name)
+    if tier_name == history.TIER_NAME_RAW:
+        column_list = tiered_history.column_list
+    else:
+        column_list = tiered_history.get_rollup_column_list()
+    _save_csv(
+        timestamp_array=timestamp_array, value_array=value_array,
+        column_list=column_list,
+        log_file_path=get_log_file_path(
+            log_dir_path=log_dir_path, tier_name=tier_name))
+
+
+def _send_sample_row(sample_conn, row_dict):
+    """
+    Send the sample row to the kernel for the push update.
+
+    Parameters
+    ----------
+    sample_conn : multiprocessing.connection.Connection or None
+        The connection to send the row. If None, nothing is sent.
+    row_dict : dict
+        The row to send.
+
+    Returns
+    -------
+    sample_conn : multiprocessing.connection.Connection or None
+        The connection to use from the next time. None is returned
+        if the kernel side has been closed.
+    """
+    if sample_conn is None:
+        return None
+    try:
+        sample_conn.send(row_dict)
+    except (BrokenPipeError, OSError):
+        return None
+    return sample_conn
+
+
+def get_log_file_path(log_dir_path, tier_name=history.TIER_NAME_RAW):
+    """
+    Get the path of the log file.
+
+    Parameters
+    ----------
+    log_dir_path : str
+        Directory where the log is saved.
+    tier_name : str, default 'raw'
+        Name of the history tier of the log.
+
+    Returns
+    -------
+    log_file_path : str
+        The path of the log file.
+    """
+    if tier_name == history.TIER_NAME_RAW:
+        file_name = 'log_linux_stats_plot.csv'
+    else:
+        file_name = 'log_linux_stats_plot_%s.csv' % tier_name
+    log_file_path = os.path.join(log_dir_path, file_name)
+    return log_file_path
+
+
+def get_history_db_path(log_dir_path):
+    """
+    Get the path of the SQLite database of the sample history.
+
+    Parameters
+    ----------
+    log_dir_path : str
+        Directory where the log is saved.
+
+    Returns
+    -------
+    history_db_path : str
+        The path of the database.
+    """
+    history_db_path = os.path.join(
+        log_dir_path, 'history_linux_stats_plot.sqlite3')
+    return history_db_path
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2902 @@
+"""
+Module of the metric collectors of the stats plot. Each collector
+samples one kind of metric and defines the panels to draw it, so that
+only the metrics requested are sampled and plotted.
+
+Notes
+-----
+The following libraries are required.
+    - $ pip install psutil==5.5.1
+    - $ pip install gpustat==0.5.0
+To add a custom metric, inherit MetricCollector (or RateCollector for
+cumulative counters) and register it with the register_collector
+function.
+"""
+
+import math
+import re
+import time
+import traceback
+import subprocess as sp
+import os
+
+from plot_playground.stats import cgroup
+from plot_playground.stats import quantiles
+from plot_playground.stats import trend
+
+try:
+    import psutil
+except ImportError:
+    print(traceback.format_exc())
+    err_msg = 'Installation of the psutil module is necessary to use this plot. Consider running the following pip command and please restart the notebook.'
+    err_msg += '\n$ pip install psutil==5.5.1'
+    raise ImportError(err_msg)
+
+is_gpu_stats_disabled = False
+# The power draw and the processes (with the user, the command and the
+# process ID) are shown in addition to the default columns.
+GPUSTAT_COMMAND_LIST = [
+    'gpustat', '--show-power', '--show-user', '--show-cmd', '--show-pid']
+
+try:
+    import gpustat
+except ImportError:
+    is_gpu_stats_disabled = True
+    print(traceback.format_exc())
+    info_msg = 'Installation of the gpustat module is required to use this plot. Consider the execution of the following pip command and please restart the notebook.'
+    info_msg += '\n$ pip install gpustat==0.5.0'
+    info_msg += '\nOr maybe your environment is windows (only linux, like Ubuntu, is supported).'
+    info_msg += '\nThe GPU information plot has been disabled.'
+    print(info_msg)
+
+
+PROC_ROOT = '/proc'
+SYS_BLOCK_DIR = '/sys/block'
+CGROUP_ROOT = cgroup.CGROUP_ROOT
+PANEL_HEIGHT = 200
+SMALL_PANEL_HEIGHT = 130
+INFO_TEXT_LINE_HEIGHT = 21
+
+
+def make_panel(
+        title, column_list, unit, decimal_num=0, label_list=None,
+        height=None, quantile_list=None, trend_window_seconds=None,
+        alert_minutes_to_limit=None):
+    """
+    Make the setting of a panel of the plot.
+
+    Parameters
+    ----------
+    title : str
+        Title of the panel.
+    column_list : list of str
+        Columns drawn as lines in the panel.
+    unit : str
+        Unit string of the values. e.g., 'MB'
+    decimal_num : int, default 0
+        Number of decimal places of the displayed values.
+    label_list : list of str or None, default None
+        Legend labels of each line. If None, no legend is displayed.
+    height : int or None, default None
+        Height of the panel in pixels. The information texts (title,
+        min, max, last, the labels, the quantiles and the trends)
+        need INFO_TEXT_LINE_HEIGHT pixels per line. If None,
+        PANEL_HEIGHT is used, or a larger height that fits the
+        information texts.
+    quantile_list : list of float or None, default None
+        Quantiles of the whole session estimated for each column and
+        displayed in the information texts (one more line per
+        column). e.g., [0.5, 0.95, 0.99]
+        If None, the quantiles are not estimated.
+    trend_window_seconds : int, float or None, default None
+        Seconds of the window of the linear trend (growth rate and
+        projected time to the limit) of each column. If None, the
+        trend is not calculated.
+    alert_minutes_to_limit : int, float or None, default None
+        The panel is highlighted when the projected minutes to the
+        limit of a column fall under this value. If None, the panel is
+        not highlighted.
+
+    Returns
+    -------
+    panel_dict : dict
+        The setting of the panel.
+    """
+    if label_list is None:
+        label_list = []
+    if quantile_list is None:
+        quantile_list = []
+    if height is None:
+        line_num = 4 + len(label_list)
+        if quantile_list:
+            line_num += len(column_list)
+        if trend_window_seconds is not None:
+            line_num += len(column_list)
+        # A line is left for the window selector of the first panel.
+        height = max(PANEL_HEIGHT, (line_num + 1) * INFO_TEXT_LINE_HEIGHT)
+    panel_dict = {
+        'title': title,
+        'column_list': column_list,
+        'unit': unit,
+        'decimal_num': decimal_num,
+        'label_list': label_list,
+        'height': height,
+        'quantile_list': quantile_list,
+        'trend_window_seconds': trend_window_seconds,
+        'alert_minutes_to_limit': alert_minutes_to_limit,
+    }
+    return panel_dict
+
+
+class MetricCollector():
+
+    name = ''
+    default_interval_seconds = 1
+    # Whether the collector can be sampled by the in-kernel sampler
+    # thread (only cheap reads that release the GIL, no subprocess).
+    supports_thread_sampling = False
+    # Streaming quantile sketches and rolling trends of the columns,
+    # made at the first update (after the setup).
+    quantile_sketch_dict = None
+    trend_dict = None
+
+    def setup(self):
+        """
+        Prepare the collector (e.g., detect the number of devices).
+        This is called once before the first sampling.
+        """
+        pass
+
+    def get_panel_list(self):
+        """
+        Get the settings of the panels drawn for this metric.
+
+        Returns
+        -------
+        panel_list : list of dicts
+            A list of panel settings made by the make_panel function.
+            If empty, the metric is not available and is not sampled.
+        """
+        return []
+
+    def get_column_list(self):
+        """
+        Get the columns sampled by this collector.
+
+        Returns
+        -------
+        column_list : list of str
+            A list of column names, including the columns of the
+            quantile estimates and the trends.
+        """
+        column_list = []
+        for panel_dict in self.get_panel_list():
+            column_list.extend(panel_dict['column_list'])
+            for column_name in panel_dict['column_list']:
+                column_list.extend([
+                    quantiles.get_quantile_column_name(
+                        column_name=column_name, quantile=quantile)
+                    for quantile in panel_dict['quantile_list']])
+                if panel_dict['trend_window_seconds'] is None:
+                    continue
+                column_list.append(trend.get_growth_rate_column_name(
+                    column_name=column_name))
+                column_list.append(trend.get_minutes_to_limit_column_name(
+                    column_name=column_name))
+        return column_list
+
+    def get_limit_dict(self):
+        """
+        Get the limits of the columns, to which the time is projected
+        by the trend (e.g., the memory limit).
+
+        Returns
+        -------
+        limit_dict : dict
+            A dictionary that stores the column name in key and the
+            limit in value. Columns without limit are omitted.
+        """
+        return {}
+
+    def collect(self):
+        """
+        Sample the metric.
+
+        Returns
+        -------
+        value_dict : dict
+            A dictionary that stores the column name in key and the
+            sampled value in value. Columns that could not be sampled
+            are omitted.
+        """
+        raise NotImplementedError()
+
+    def update_quantiles(self, value_dict):
+        """
+        Add the sampled values to the quantile sketches of the columns
+        of the panels with the quantile_list, and get the current
+        estimates of the whole session.
+
+        Parameters
+        ----------
+        value_dict : dict
+            The values returned by the collect method.
+
+        Returns
+        -------
+        quantile_value_dict : dict
+            A dictionary that stores the quantile column name in key
+            and the estimate in value.
+        """
+        if self.quantile_sketch_dict is None:
+            self.quantile_sketch_dict = {}
+            for panel_dict in self.get_panel_list():
+                if not panel_dict['quantile_list']:
+                    continue
+                for column_name in panel_dict['column_list']:
+                    self.quantile_sketch_dict[column_name] = \
+                        quantiles.QuantileSketch(
+                            column_name=column_name,
+                            quantile_list=panel_dict['quantile_list'])
+        quantile_value_dict = {}
+        for column_name, value in value_dict.items():
+            quantile_sketch = self.quantile_sketch_dict.get(column_name)
+            if quantile_sketch is None:
+                continue
+            quantile_sketch.add(value)
+            quantile_value_dict.update(quantile_sketch.get_value_dict())
+        return quantile_value_dict
+
+    def update_trends(self, timestamp, value_dict):
+        """
+        Add the sampled values to the rolling trends of the columns of
+        the panels with the trend_window_seconds, and get the growth
+        rates and the projected minutes to the limits.
+
+        Parameters
+        ----------
+        timestamp : float
+            Timestamp of the sampling in seconds.
+        value_dict : dict
+            The values returned by the collect method.
+
+        Returns
+        -------
+        trend_value_dict : dict
+            A dictionary that stores the trend column name in key and
+            the value in value.
+        """
+        if self.trend_dict is None:
+            self.trend_dict = {}
+            limit_dict = None
+            for panel_dict in self.get_panel_list():
+                if panel_dict['trend_window_seconds'] is None:
+                    continue
+                if limit_dict is None:
+                    limit_dict = self.get_limit_dict()
+                for column_name in panel_dict['column_list']:
+                    self.trend_dict[column_name] = trend.RollingLinearTrend(
+                        column_name=column_name,
+                        window_seconds=panel_dict['trend_window_seconds'],
+                        limit=limit_dict.get(column_name))
+        trend_value_dict = {}
+        for column_name, value in value_dict.items():
+            rolling_trend = self.trend_dict.get(column_name)
+            if rolling_trend is None:
+                continue
+            rolling_trend.add(timestamp=timestamp, value=value)
+            trend_value_dict.update(rolling_trend.get_value_dict())
+        return trend_value_dict
+
+    def record_tick(self, wall_seconds, cpu_seconds):
+        """
+        Receive the cost of a tick of the sampling loop. This is called
+        after each tick, so collectors that report the overhead of the
+        sampling itself override this.
+
+        Parameters
+        ----------
+        wall_seconds : float
+            Wall time of the tick in seconds.
+        cpu_seconds : float
+            CPU time of the sampling thread during the tick in seconds.
+        """
+        pass
+
+    def close(self):
+        """
+        Release the resources of the collector (e.g., opened files).
+        This is called when the sampling ends.
+        """
+        pass
+
+
+class RateCollector(MetricCollector):
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Base class of the collectors that turn cumulative counters
+        into rates. The first sampling only stores the counters, so
+        the values are returned from the second sampling.
+
+        Parameters
+        ----------
+        clock : function, default time.monotonic
+            Function that returns the current time in seconds.
+        """
+        self.clock = clock
+        self.pre_counter_dict = None
+        self.pre_time = None
+
+    def read_counters(self):
+        """
+        Read the current values of the cumulative counters.
+
+        Returns
+        -------
+        counter_dict : dict
+            A dictionary that stores the counter name in key and the
+            cumulative value in value.
+        """
+        raise NotImplementedError()
+
+    def compute_values(self, delta_dict, elapsed_seconds):
+        """
+        Convert the increase of the counters into the values of the
+        columns. By default, the increase per second is returned with
+        the counter name as the column name.
+
+        Parameters
+        ----------
+        delta_dict : dict
+            A dictionary that stores the counter name in key and the
+            increase since the previous sampling in value.
+        elapsed_seconds : float
+            Seconds since the previous sampling.
+
+        Returns
+        -------
+        value_dict : dict
+            A dictionary that stores the column name in key and the
+            value in value.
+        """
+        value_dict = {}
+        for counter_name, delta in delta_dict.items():
+            value_dict[counter_name] = delta / elapsed_seconds
+        return value_dict
+
+    def collect(self):
+        counter_dict = self.read_counters()
+        current_time = self.clock()
+        pre_counter_dict = self.pre_counter_dict
+        pre_time = self.pre_time
+        self.pre_counter_dict = counter_dict
+        self.pre_time = current_time
+        if pre_counter_dict is None or current_time <= pre_time:
+            return {}
+        delta_dict = {}
+        for counter_name, value in counter_dict.items():
+            if counter_name not in pre_counter_dict:
+                continue
+            delta = value - pre_counter_dict[counter_name]
+            if delta < 0:
+                # The counter has been reset or wrapped around.
+                continue
+            delta_dict[counter_name] = delta
+        value_dict = self.compute_values(
+            delta_dict=delta_dict,
+            elapsed_seconds=current_time - pre_time)
+        return value_dict
+
+
+COLUMN_NAME_MEMORY_USAGE = 'memory usage (MB)'
+
+
+class MemoryCollector(MetricCollector):
+
+    name = 'memory'
+    default_interval_seconds = 0.25
+
+    def __init__(
+            self, trend_window_seconds=trend.DEFAULT_TREND_WINDOW_SECONDS,
+            alert_minutes_to_limit=trend.DEFAULT_ALERT_MINUTES_TO_LIMIT,
+            proc_root=PROC_ROOT, cgroup_root=CGROUP_ROOT):
+        """
+        Collector of the total resident memory of all processes.
+
+        Parameters
+        ----------
+        trend_window_seconds : int, float or None, default 10 minutes
+            Seconds of the window of the growth rate of the memory
+            usage. If None, the growth rate is not calculated.
+        alert_minutes_to_limit : int, float or None, default 30
+            The panel is highlighted when the memory usage is
+            projected to reach the limit within these minutes.
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system (to read the
+            physical memory).
+        cgroup_root : str, default CGROUP_ROOT
+            Root directory of the cgroup file system (to read the
+            memory limit of the container).
+        """
+        self.trend_window_seconds = trend_window_seconds
+        self.alert_minutes_to_limit = alert_minutes_to_limit
+        self.proc_root = proc_root
+        self.cgroup_root = cgroup_root
+
+    def get_panel_list(self):
+        return [
+            make_panel(
+                title=COLUMN_NAME_MEMORY_USAGE,
+                column_list=[COLUMN_NAME_MEMORY_USAGE],
+                unit='MB', quantile_list=quantiles.DEFAULT_QUANTILE_LIST,
+                trend_window_seconds=self.trend_window_seconds,
+                alert_minutes_to_limit=self.alert_minutes_to_limit),
+        ]
+
+    def get_limit_dict(self):
+        return {
+            COLUMN_NAME_MEMORY_USAGE: get_memory_limit_mb(
+                proc_root=self.proc_root, cgroup_root=self.cgroup_root),
+        }
+
+    def collect(self):
+        return {COLUMN_NAME_MEMORY_USAGE: _get_memory_usage()}
+
+
+COLUMN_NAME_DISK_USAGE = 'disk usage (GB)'
+
+
+class DiskUsageCollector(MetricCollector):
+
+    name = 'disk'
+    default_interval_seconds = 5
+
+    def __init__(self, path='./'):
+        """
+        Collector of the disk usage.
+
+        Parameters
+        ----------
+        path : str, default './'
+            Path on the target disk.
+        """
+        self.path = path
+
+    def get_panel_list(self):
+        return [
+            make_panel(
+                title=COLUMN_NAME_DISK_USAGE,
+                column_list=[COLUMN_NAME_DISK_USAGE],
+                unit='GB', decimal_num=2),
+        ]
+
+    def collect(self):
+        return {COLUMN_NAME_DISK_USAGE: _get_disk_usage(path=self.path)}
+
+
+COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT = 'gpu({gpu_idx}) memory usage (MB)'
+COLUMN_NAME_GPU_KERNEL_MEMORY_FORMAT = 'gpu({gpu_idx}) kernel memory (MB)'
+COLUMN_NAME_GPU_UTILIZATION_FORMAT = 'gpu({gpu_idx}) utilization (%)'
+COLUMN_NAME_GPU_TEMPERATURE_FORMAT = 'gpu({gpu_idx}) temperature (C)'
+COLUMN_NAME_GPU_POWER_FORMAT = 'gpu({gpu_idx}) power (W)'
+
+
+class GPUMemoryCollector(MetricCollector):
+
+    name = 'gpu'
+    default_interval_seconds = 1
+
+    def __init__(
+            self, gpustat_func=None,
+            trend_window_seconds=trend.DEFAULT_TREND_WINDOW_SECONDS,
+            alert_minutes_to_limit=trend.DEFAULT_ALERT_MINUTES_TO_LIMIT,
+            pid=None, proc_root=PROC_ROOT, is_kernel_memory_enabled=True):
+        """
+        Collector of the memory usage, the utilization, the
+        temperature and the power draw of each GPU, and of the GPU
+        memory used by the kernel and its descendants. The gpustat
+        command is executed once per sampling for all GPUs and all
+        values are parsed from its result.
+
+        Parameters
+        ----------
+        gpustat_func : function or None, default None
+            Function that returns the result string of the gpustat
+            command (e.g., a fake backend of the benchmark). If None,
+            the gpustat command is executed.
+        trend_window_seconds : int, float or None, default 10 minutes
+            Seconds of the window of the growth rate of the memory
+            usage. If None, the growth rate is not calculated.
+        alert_minutes_to_limit : int, float or None, default 30
+            The panel is highlighted when the memory usage is
+            projected to reach the total memory of the GPU within
+            these minutes.
+        pid : int or None, default None
+            ID of the root process of the tree whose GPU memory is
+            plotted as the kernel memory. If None, the current process
+            (the kernel) is used.
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system (to list the
+            descendants of the kernel).
+        is_kernel_memory_enabled : bool, default True
+            If False, the kernel memory is not sampled (e.g., the
+            shared daemon, which is not the kernel of any plot).
+
+        Notes
+        -----
+        The power panel is drawn only if the GPUs report the power
+        draw. The GPU processes are reported with the process IDs of
+        the host, so the kernel memory stays zero in a container that
+        has its own PID namespace.
+        """
+        self.gpustat_func = gpustat_func
+        self.trend_window_seconds = trend_window_seconds
+        self.alert_minutes_to_limit = alert_minutes_to_limit
+        if pid is None:
+            pid = os.getpid()
+        self.pid = pid
+        self.proc_root = proc_root
+        self.is_kernel_memory_enabled = is_kernel_memory_enabled
+        self.gpu_num = 0
+        self.gpu_memory_total_list = []
+        self.is_power_available = False
+        self.pid_tracker = None
+
+    def setup(self):
+        # The gpustat command is executed only once for both checks.
+        if self.gpustat_func is None:
+            command_result = _update_gpu_disabled_bool()
+        else:
+            command_result = self.gpustat_func()
+        self.gpu_num = _get_gpu_num(command_result=command_result)
+        gpu_dict_list = [
+            _parse_gpustat_line(line_str=_get_gpustat_line_str_by_gpu_idx(
+                gpu_idx=i, command_result=command_result))
+            for i in range(self.gpu_num)]
+        self.gpu_memory_total_list = [
+            gpu_dict['memory_total_mb'] for gpu_dict in gpu_dict_list]
+        self.is_power_available = any(
+            gpu_dict['power_draw_w'] is not None
+            for gpu_dict in gpu_dict_list)
+        if self.is_kernel_memory_enabled:
+            self.pid_tracker = DescendantPidTracker(
+                root_pid=self.pid, proc_root=self.proc_root)
+
+    def get_panel_list(self):
+        panel_list = []
+        for i in range(self.gpu_num):
+            column_name = COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT.format(
+                gpu_idx=i)
+            if self.is_kernel_memory_enabled:
+                column_list = [
+                    column_name,
+                    COLUMN_NAME_GPU_KERNEL_MEMORY_FORMAT.format(gpu_idx=i)]
+                label_list = ['used', 'kernel']
+            else:
+                column_list = [column_name]
+                label_list = None
+            panel_list.append(
+                make_panel(
+                    title=column_name, column_list=column_list,
+                    unit='MB', label_list=label_list,
+                    quantile_list=quantiles.DEFAULT_QUANTILE_LIST,
+                    trend_window_seconds=self.trend_window_seconds,
+                    alert_minutes_to_limit=self.alert_minutes_to_limit))
+            column_format_list = [
+                (COLUMN_NAME_GPU_UTILIZATION_FORMAT, '%'),
+                (COLUMN_NAME_GPU_TEMPERATURE_FORMAT, 'C')]
+            if self.is_power_available:
+                column_format_list.append((COLUMN_NAME_GPU_POWER_FORMAT, 'W'))
+            for column_format, unit in column_format_list:
+                column_name = column_format.format(gpu_idx=i)
+                panel_list.append(
+                    make_panel(
+                        title=column_name, column_list=[column_name],
+                        unit=unit, height=SMALL_PANEL_HEIGHT))
+        return panel_list
+
+    def get_limit_dict(self):
+        limit_dict = {}
+        column_format_list = [COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT]
+        if self.is_kernel_memory_enabled:
+            column_format_list.append(COLUMN_NAME_GPU_KERNEL_MEMORY_FORMAT)
+        for i, gpu_memory_total in enumerate(self.gpu_memory_total_list):
+            for column_format in column_format_list:
+                limit_dict[column_format.format(gpu_idx=i)] = \
+                    gpu_memory_total
+        return limit_dict
+
+    def collect(self):
+        if self.gpustat_func is None:
+            command_result = _exec_gpustat_command()
+        else:
+            command_result = self.gpustat_func()
+        value_dict = {}
+        pid_set = None
+        for i in range(self.gpu_num):
+            gpu_dict = _parse_gpustat_line(
+                line_str=_get_gpustat_line_str_by_gpu_idx(
+                    gpu_idx=i, command_result=command_result))
+            value_dict[COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT.format(
+                gpu_idx=i)] = gpu_dict['memory_used_mb']
+            if self.is_kernel_memory_enabled:
+                kernel_memory_mb = 0
+                if gpu_dict['process_list'] and pid_set is None:
+                    # The processes are listed only if the GPU is used.
+                    pid_set = self.pid_tracker.refresh()
+                for process_dict in gpu_dict['process_list']:
+                    if process_dict['pid'] in pid_set:
+                        kernel_memory_mb += process_dict['memory_mb']
+                value_dict[COLUMN_NAME_GPU_KERNEL_MEMORY_FORMAT.format(
+                    gpu_idx=i)] = kernel_memory_mb
+            for column_format, key in (
+                    (COLUMN_NAME_GPU_UTILIZATION_FORMAT,
+                     'utilization_percent'),
+                    (COLUMN_NAME_GPU_TEMPERATURE_FORMAT, 'temperature_c'),
+                    (COLUMN_NAME_GPU_POWER_FORMAT, 'power_draw_w')):
+                if gpu_dict[key] is None:
+                    continue
+                if key == 'power_draw_w' and not self.is_power_available:
+                    continue
+                value_dict[column_format.format(gpu_idx=i)] = gpu_dict[key]
+        return value_dict
+
+
+COLUMN_NAME_CPU_UTILIZATION_FORMAT = 'cpu({cpu_idx}) utilization (%)'
+
+
+class CPUCollector(RateCollector):
+
+    name = 'cpu'
+    default_interval_seconds = 1
+
+    def __init__(self, proc_root=PROC_ROOT, clock=time.monotonic):
+        """
+        Collector of the utilization of each CPU core, calculated
+        from the cumulative times of /proc/stat.
+
+        Parameters
+        ----------
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system.
+        clock : function, default time.monotonic
+            Function that returns the current time in seconds.
+        """
+        super(CPUCollector, self).__init__(clock=clock)
+        self.proc_root = proc_root
+        self.cpu_num = 0
+
+    def setup(self):
+        cpu_time_dict = _parse_proc_stat_cpu_times(
+            proc_stat_str=_read_proc_file(
+                proc_root=self.proc_root, relative_path='stat'))
+        self.cpu_num = len(cpu_time_dict)
+
+    def get_panel_list(self):
+        if self.cpu_num == 0:
+            return []
+        column_list = [
+            COLUMN_NAME_CPU_UTILIZATION_FORMAT.format(cpu_idx=i)
+            for i in range(self.cpu_num)]
+        return [
+            make_panel(
+                title='cpu utilization (%)', column_list=column_list,
+                unit='%', decimal_num=1),
+        ]
+
+    def read_counters(self):
+        cpu_time_dict = _parse_proc_stat_cpu_times(
+            proc_stat_str=_read_proc_file(
+                proc_root=self.proc_root, relative_path='stat'))
+        counter_dict = {}
+        for cpu_idx, (busy_time, total_time) in cpu_time_dict.items():
+            counter_dict[(cpu_idx, 'busy')] = busy_time
+            counter_dict[(cpu_idx, 'total')] = total_time
+        return counter_dict
+
+    def compute_values(self, delta_dict, elapsed_seconds):
+        value_dict = {}
+        for cpu_idx in range(self.cpu_num):
+            total_delta = delta_dict.get((cpu_idx, 'total'))
+            busy_delta = delta_dict.get((cpu_idx, 'busy'))
+            if not total_delta or busy_delta is None:
+                continue
+            column_name = COLUMN_NAME_CPU_UTILIZATION_FORMAT.format(
+                cpu_idx=cpu_idx)
+            value_dict[column_name] = round(
+                busy_delta / total_delta * 100, 1)
+        return value_dict
+
+
+COLUMN_NAME_DISK_READ_THROUGHPUT = 'disk read (MB/s)'
+COLUMN_NAME_DISK_WRITE_THROUGHPUT = 'disk write (MB/s)'
+COLUMN_NAME_DISK_READ_IOPS = 'disk read (IOPS)'
+COLUMN_NAME_DISK_WRITE_IOPS = 'disk write (IOPS)'
+_DISKSTATS_SECTOR_BYTES = 512
+
+
+class DiskIOCollector(RateCollector):
+
+    name = 'disk_io'
+    default_interval_seconds = 1
+
+    def __init__(
+            self, device_name_list=None, proc_root=PROC_ROOT,
+            sys_block_dir=SYS_BLOCK_DIR, clock=time.monotonic):
+        """
+        Collector of the read / write throughput and IOPS of the
+        disks, calculated from /proc/diskstats.
+
+        Parameters
+        ----------
+        device_name_list : list of str or None, default None
+            Names of the target devices. e.g., ['sda']
+            If None, all whole disks except loop and ram devices
+            are totaled.
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system.
+        sys_block_dir : str, default SYS_BLOCK_DIR
+            Directory listing the block devices, used to exclude the
+            partitions.
+        clock : function, default time.monotonic
+            Function that returns the current time in seconds.
+        """
+        super(DiskIOCollector, self).__init__(clock=clock)
+        self.device_name_list = device_name_list
+        self.proc_root = proc_root
+        self.sys_block_dir = sys_block_dir
+
+    def setup(self):
+        if self.device_name_list is not None:
+            return
+        diskstats_dict = _parse_proc_diskstats(
+            diskstats_str=_read_proc_file(
+                proc_root=self.proc_root, relative_path='diskstats'))
+        self.device_name_list = _get_whole_disk_name_list(
+            device_name_list=list(diskstats_dict.keys()),
+            sys_block_dir=self.sys_block_dir)
+
+    def get_panel_list(self):
+        return [
+            make_panel(
+                title='disk io throughput (MB/s)',
+                column_list=[
+                    COLUMN_NAME_DISK_READ_THROUGHPUT,
+                    COLUMN_NAME_DISK_WRITE_THROUGHPUT],
+                unit='MB/s', decimal_num=2,
+                label_list=['read', 'write']),
+            make_panel(
+                title='disk io (IOPS)',
+                column_list=[
+                    COLUMN_NAME_DISK_READ_IOPS,
+                    COLUMN_NAME_DISK_WRITE_IOPS],
+                unit='', decimal_num=0,
+                label_list=['read', 'write']),
+        ]
+
+    def read_counters(self):
+        diskstats_dict = _parse_proc_diskstats(
+            diskstats_str=_read_proc_file(
+                proc_root=self.proc_root, relative_path='diskstats'))
+        counter_dict = {
+            COLUMN_NAME_DISK_READ_THROUGHPUT: 0,
+            COLUMN_NAME_DISK_WRITE_THROUGHPUT: 0,
+            COLUMN_NAME_DISK_READ_IOPS: 0,
+            COLUMN_NAME_DISK_WRITE_IOPS: 0,
+        }
+        for device_name in self.device_name_list:
+            if device_name not in diskstats_dict:
+                continue
+            device_dict = diskstats_dict[device_name]
+            counter_dict[COLUMN_NAME_DISK_READ_THROUGHPUT] += \
+                device_dict['read_sectors'] * _DISKSTATS_SECTOR_BYTES \
+                / 1048576
+            counter_dict[COLUMN_NAME_DISK_WRITE_THROUGHPUT] += \
+                device_dict['write_sectors'] * _DISKSTATS_SECTOR_BYTES \
+                / 1048576
+            counter_dict[COLUMN_NAME_DISK_READ_IOPS] += \
+                device_dict['read_count']
+            counter_dict[COLUMN_NAME_DISK_WRITE_IOPS] += \
+                device_dict['write_count']
+        return counter_dict
+
+    def compute_values(self, delta_dict, elapsed_seconds):
+        value_dict = super(DiskIOCollector, self).compute_values(
+            delta_dict=delta_dict, elapsed_seconds=elapsed_seconds)
+        for column_name, value in value_dict.items():
+            value_dict[column_name] = round(value, 2)
+        return value_dict
+
+
+COLUMN_NAME_NETWORK_RECEIVE_THROUGHPUT = 'network receive (MB/s)'
+COLUMN_NAME_NETWORK_SEND_THROUGHPUT = 'network send (MB/s)'
+
+
+class NetworkCollector(RateCollector):
+
+    name = 'network'
+    default_interval_seconds = 1
+
+    def __init__(
+            self, interface_name_list=None, proc_root=PROC_ROOT,
+            clock=time.monotonic):
+        """
+        Collector of the receive / send throughput of the network,
+        calculated from /proc/net/dev.
+
+        Parameters
+        ----------
+        interface_name_list : list of str or None, default None
+            Names of the target interfaces. e.g., ['eth0']
+            If None, all interfaces except the loopback are totaled.
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system.
+        clock : function, default time.monotonic
+            Function that returns the current time in seconds.
+        """
+        super(NetworkCollector, self).__init__(clock=clock)
+        self.interface_name_list = interface_name_list
+        self.proc_root = proc_root
+
+    def get_panel_list(self):
+        return [
+            make_panel(
+                title='network throughput (MB/s)',
+                column_list=[
+                    COLUMN_NAME_NETWORK_RECEIVE_THROUGHPUT,
+                    COLUMN_NAME_NETWORK_SEND_THROUGHPUT],
+                unit='MB/s', decimal_num=2,
+                label_list=['receive', 'send']),
+        ]
+
+    def read_counters(self):
+        net_dev_dict = _parse_proc_net_dev(
+            net_dev_str=_read_proc_file(
+                proc_root=self.proc_root, relative_path='net/dev'))
+        counter_dict = {
+            COLUMN_NAME_NETWORK_RECEIVE_THROUGHPUT: 0,
+            COLUMN_NAME_NETWORK_SEND_THROUGHPUT: 0,
+        }
+        for interface_name, byte_dict in net_dev_dict.items():
+            if self.interface_name_list is None:
+                if interface_name == 'lo':
+                    continue
+            elif interface_name not in self.interface_name_list:
+                continue
+            counter_dict[COLUMN_NAME_NETWORK_RECEIVE_THROUGHPUT] += \
+                byte_dict['receive_bytes'] / 1048576
+            counter_dict[COLUMN_NAME_NETWORK_SEND_THROUGHPUT] += \
+                byte_dict['send_bytes'] / 1048576
+        return counter_dict
+
+    def compute_values(self, delta_dict, elapsed_seconds):
+        value_dict = super(NetworkCollector, self).compute_values(
+            delta_dict=delta_dict, elapsed_seconds=elapsed_seconds)
+        for column_name, value in value_dict.items():
+            value_dict[column_name] = round(value, 2)
+        return value_dict
+
+
+READ_BUFFER_SIZE = 8192
+
+
+class ProcFileReader():
+
+    def __init__(self, file_path, buffer_size=READ_BUFFER_SIZE):
+        """
+        Class that reads a file of the proc file system repeatedly.
+        The file is kept open and read with os.preadv into a
+        preallocated buffer, so each read is a single system call
+        that releases the GIL and allocates no file object.
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the file.
+        buffer_size : int, default READ_BUFFER_SIZE
+            Initial size of the buffer in bytes. The buffer is doubled
+            when the content does not fit.
+        """
+        self.file_path = file_path
+        self.fd = os.open(file_path, os.O_RDONLY)
+        self.buffer = bytearray(buffer_size)
+
+    def read(self):
+        """
+        Read the whole content of the file.
+
+        Returns
+        -------
+        content : memoryview
+            View of the read bytes in the buffer. It is overwritten by
+            the next read.
+        """
+        while True:
+            read_size = os.preadv(self.fd, [self.buffer], 0)
+            if read_size < len(self.buffer):
+                break
+            self.buffer = bytearray(len(self.buffer) * 2)
+        return memoryview(self.buffer)[:read_size]
+
+    def close(self):
+        """
+        Close the file. Nothing happens if it has already been closed.
+        """
+        if self.fd is None:
+            return
+        os.close(self.fd)
+        self.fd = None
+
+
+COLUMN_NAME_SYSTEM_MEMORY_USED = 'system memory used (MB)'
+COLUMN_NAME_KERNEL_RSS = 'kernel rss (MB)'
+COLUMN_NAME_SYSTEM_CPU_UTILIZATION = 'system cpu (%)'
+COLUMN_NAME_KERNEL_CPU_UTILIZATION = 'kernel cpu (%)'
+
+
+class ProcStatsCollector(MetricCollector):
+
+    name = 'proc_stats'
+    default_interval_seconds = 0.5
+    supports_thread_sampling = True
+
+    def __init__(
+            self, pid=None, proc_root=PROC_ROOT, clock=time.monotonic,
+            trend_window_seconds=trend.DEFAULT_TREND_WINDOW_SECONDS,
+            alert_minutes_to_limit=trend.DEFAULT_ALERT_MINUTES_TO_LIMIT,
+            cgroup_root=CGROUP_ROOT):
+        """
+        Collector of the used memory and the CPU utilization of the
+        system and the kernel process, read from /proc/meminfo,
+        /proc/stat and /proc/<pid>/stat. Only three reads of the kept
+        open files are made per sampling, so this can be sampled in a
+        thread of the kernel.
+
+        Parameters
+        ----------
+        pid : int or None, default None
+            ID of the target process. If None, the current process
+            (the kernel) is used.
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system.
+        clock : function, default time.monotonic
+            Function that returns the current time in seconds.
+        trend_window_seconds : int, float or None, default 10 minutes
+            Seconds of the window of the growth rate of the memory.
+            If None, the growth rate is not calculated.
+        alert_minutes_to_limit : int, float or None, default 30
+            The memory panel is highlighted when the memory is
+            projected to reach the limit within these minutes.
+        cgroup_root : str, default CGROUP_ROOT
+            Root directory of the cgroup file system (to read the
+            memory limit of the kernel).
+        """
+        if pid is None:
+            pid = os.getpid()
+        self.pid = pid
+        self.proc_root = proc_root
+        self.clock = clock
+        self.trend_window_seconds = trend_window_seconds
+        self.alert_minutes_to_limit = alert_minutes_to_limit
+        self.cgroup_root = cgroup_root
+        self.clock_ticks_per_second = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.reader_dict = None
+        self.pre_cpu_times = None
+        self.pre_process_time = None
+        self.pre_time = None
+
+    def __getstate__(self):
+        # The opened files are not sent to the collector process.
+        state_dict = dict(self.__dict__)
+        state_dict['reader_dict'] = None
+        return state_dict
+
+    def get_panel_list(self):
+        return [
+            make_panel(
+                title='memory (MB)',
+                column_list=[
+                    COLUMN_NAME_SYSTEM_MEMORY_USED, COLUMN_NAME_KERNEL_RSS],
+                unit='MB', label_list=['system used', 'kernel rss'],
+                quantile_list=quantiles.DEFAULT_QUANTILE_LIST,
+                trend_window_seconds=self.trend_window_seconds,
+                alert_minutes_to_limit=self.alert_minutes_to_limit),
+            make_panel(
+                title='cpu (%)',
+                column_list=[
+                    COLUMN_NAME_SYSTEM_CPU_UTILIZATION,
+                    COLUMN_NAME_KERNEL_CPU_UTILIZATION],
+                unit='%', decimal_num=1, label_list=['system', 'kernel']),
+        ]
+
+    def get_limit_dict(self):
+        physical_memory_mb = get_memory_limit_mb(
+            proc_root=self.proc_root, cgroup_root=None)
+        return {
+            COLUMN_NAME_SYSTEM_MEMORY_USED: physical_memory_mb,
+            COLUMN_NAME_KERNEL_RSS: get_memory_limit_mb(
+                proc_root=self.proc_root, cgroup_root=self.cgroup_root),
+        }
+
+    def collect(self):
+        if self.reader_dict is None:
+            self.reader_dict = {
+                relative_path: ProcFileReader(
+                    file_path=os.path.join(self.proc_root, relative_path))
+                for relative_path
+                in ('meminfo', 'stat', '%s/stat' % self.pid)}
+        used_memory_kb = _parse_meminfo_used_kb(
+            meminfo_bytes=self.reader_dict['meminfo'].read())
+        cpu_times = _parse_proc_stat_total_cpu_times(
+            proc_stat_bytes=self.reader_dict['stat'].read())
+        process_time, rss_pages = _parse_proc_pid_stat(
+            pid_stat_bytes=self.reader_dict['%s/stat' % self.pid].read())
+        current_time = self.clock()
+        value_dict = {
+            COLUMN_NAME_SYSTEM_MEMORY_USED: int(used_memory_kb / 1024),
+            COLUMN_NAME_KERNEL_RSS: int(
+                rss_pages * self.page_size / 1048576),
+        }
+        if self.pre_time is not None and current_time > self.pre_time:
+            busy_delta = cpu_times[0] - self.pre_cpu_times[0]
+            total_delta = cpu_times[1] - self.pre_cpu_times[1]
+            if total_delta > 0:
+                value_dict[COLUMN_NAME_SYSTEM_CPU_UTILIZATION] = round(
+                    busy_delta / total_delta * 100, 1)
+            process_seconds = (process_time - self.pre_process_time) \
+                / self.clock_ticks_per_second
+            value_dict[COLUMN_NAME_KERNEL_CPU_UTILIZATION] = round(
+                process_seconds / (current_time - self.pre_time) * 100, 1)
+        self.pre_cpu_times = cpu_times
+        self.pre_process_time = process_time
+        self.pre_time = current_time
+        return value_dict
+
+    def close(self):
+        if self.reader_dict is None:
+            return
+        for reader in self.reader_dict.values():
+            reader.close()
+        self.reader_dict = None
+
+
+COLUMN_NAME_COLLECTOR_TICK_WALL_TIME = 'collector tick wall time (ms)'
+COLUMN_NAME_COLLECTOR_TICK_CPU_TIME = 'collector tick cpu time (ms)'
+COLUMN_NAME_COLLECTOR_RSS = 'collector rss (MB)'
+
+
+class OverheadCollector(MetricCollector):
+
+    name = 'overhead'
+    default_interval_seconds = 1
+    supports_thread_sampling = True
+
+    def __init__(self, proc_root=PROC_ROOT):
+        """
+        Collector of the overhead of the sampling itself: the maximum
+        wall time and CPU time of the ticks since the previous
+        sampling, and the resident memory of the sampling process
+        (the kernel in the thread mode), read from /proc/self/statm.
+
+        Parameters
+        ----------
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system.
+        """
+        self.proc_root = proc_root
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.reader = None
+        self.max_wall_seconds = None
+        self.max_cpu_seconds = None
+
+    def __getstate__(self):
+        # The opened file is not sent to the collector process.
+        state_dict = dict(self.__dict__)
+        state_dict['reader'] = None
+        return state_dict
+
+    def get_panel_list(self):
+        return [
+            make_panel(
+                title='collector tick (ms)',
+                column_list=[
+                    COLUMN_NAME_COLLECTOR_TICK_WALL_TIME,
+                    COLUMN_NAME_COLLECTOR_TICK_CPU_TIME],
+                unit='ms', decimal_num=2, label_list=['wall', 'cpu'],
+                height=SMALL_PANEL_HEIGHT),
+            make_panel(
+                title=COLUMN_NAME_COLLECTOR_RSS,
+                column_list=[COLUMN_NAME_COLLECTOR_RSS],
+                unit='MB', height=SMALL_PANEL_HEIGHT),
+        ]
+
+    def record_tick(self, wall_seconds, cpu_seconds):
+        if self.max_wall_seconds is None:
+            self.max_wall_seconds = wall_seconds
+            self.max_cpu_seconds = cpu_seconds
+            return
+        self.max_wall_seconds = max(self.max_wall_seconds, wall_seconds)
+        self.max_cpu_seconds = max(self.max_cpu_seconds, cpu_seconds)
+
+    def collect(self):
+        if self.reader is None:
+            self.reader = ProcFileReader(
+                file_path=os.path.join(self.proc_root, 'self/statm'))
+        rss_pages = int(bytes(self.reader.read()).split()[1])
+        value_dict = {
+            COLUMN_NAME_COLLECTOR_RSS: int(
+                rss_pages * self.page_size / 1048576),
+        }
+        if self.max_wall_seconds is not None:
+            value_dict[COLUMN_NAME_COLLECTOR_TICK_WALL_TIME] = round(
+                self.max_wall_seconds * 1000, 3)
+            value_dict[COLUMN_NAME_COLLECTOR_TICK_CPU_TIME] = round(
+                self.max_cpu_seconds * 1000, 3)
+            self.max_wall_seconds = None
+            self.max_cpu_seconds = None
+        return value_dict
+
+    def close(self):
+        if self.reader is None:
+            return
+        self.reader.close()
+        self.reader = None
+
+
+COLUMN_NAME_CGROUP_MEMORY_USED = 'cgroup memory used (%)'
+COLUMN_NAME_CGROUP_CPU_USED = 'cgroup cpu used (%)'
+COLUMN_NAME_CGROUP_CPU_THROTTLED = 'cgroup cpu throttled (%)'
+
+
+class CgroupCollector(MetricCollector):
+
+    name = 'cgroup'
+    default_interval_seconds = 1
+    supports_thread_sampling = True
+
+    def __init__(
+            self, cgroup_root=CGROUP_ROOT, proc_root=PROC_ROOT,
+            clock=time.monotonic,
+            trend_window_seconds=trend.DEFAULT_TREND_WINDOW_SECONDS,
+            alert_minutes_to_limit=trend.DEFAULT_ALERT_MINUTES_TO_LIMIT):
+        """
+        Collector of the memory and the CPU usage of the cgroup
+        (container) of the kernel, as the percentage of the limits of
+        the cgroup. Inside a container, psutil reports the figures of
+        the host, so this shows how close the kernel is to the limits
+        actually enforced on it. If the cgroup is not limited, the
+        physical memory and the number of the CPU cores are used as
+        the limits. No panel is made if the cgroup is not found.
+
+        Parameters
+        ----------
+        cgroup_root : str, default CGROUP_ROOT
+            Root directory of the cgroup file system.
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system (to read the
+            cgroup of the kernel and the physical memory).
+        clock : function, default time.monotonic
+            Function that returns the current time in seconds.
+        trend_window_seconds : int, float or None, default 10 minutes
+            Seconds of the window of the growth rate of the memory
+            usage. If None, the growth rate is not calculated.
+        alert_minutes_to_limit : int, float or None, default 30
+            The memory panel is highlighted when the memory usage is
+            projected to reach the limit within these minutes.
+
+        Notes
+        -----
+        The limits are read once in the setup.
+        """
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+        self.clock = clock
+        self.trend_window_seconds = trend_window_seconds
+        self.alert_minutes_to_limit = alert_minutes_to_limit
+        self.cgroup_dict = None
+        self.memory_limit_bytes = None
+        self.is_memory_limited = False
+        self.cpu_limit_cores = None
+        self.is_cpu_limited = False
+        self.reader_dict = None
+        self.pre_cpu_stat_dict = None
+        self.pre_time = None
+
+    def __getstate__(self):
+        # The opened files are not sent to the collector process.
+        state_dict = dict(self.__dict__)
+        state_dict['reader_dict'] = None
+        return state_dict
+
+    def setup(self):
+        self.cgroup_dict = cgroup.detect_cgroup(
+            cgroup_root=self.cgroup_root,
+            proc_cgroup_path=os.path.join(self.proc_root, 'self/cgroup'))
+        if self.cgroup_dict is None:
+            return
+        self.memory_limit_bytes = cgroup.read_memory_limit_bytes(
+            cgroup_dict=self.cgroup_dict)
+        self.is_memory_limited = self.memory_limit_bytes is not None
+        if not self.is_memory_limited:
+            self.memory_limit_bytes = get_memory_limit_mb(
+                proc_root=self.proc_root, cgroup_root=None) * 1048576
+        self.cpu_limit_cores = cgroup.read_cpu_limit_cores(
+            cgroup_dict=self.cgroup_dict)
+        self.is_cpu_limited = self.cpu_limit_cores is not None
+        if not self.is_cpu_limited:
+            self.cpu_limit_cores = os.cpu_count()
+
+    def get_panel_list(self):
+        if self.cgroup_dict is None:
+            return []
+        memory_limit_str = '%dMB %s' % (
+            self.memory_limit_bytes / 1048576,
+            'limit' if self.is_memory_limited else 'host')
+        cpu_limit_str = '%g cores %s' % (
+            round(self.cpu_limit_cores, 2),
+            'limit' if self.is_cpu_limited else 'host')
+        return [
+            make_panel(
+                title='cgroup memory (%% of %s)' % memory_limit_str,
+                column_list=[COLUMN_NAME_CGROUP_MEMORY_USED],
+                unit='%', decimal_num=1,
+                trend_window_seconds=self.trend_window_seconds,
+                alert_minutes_to_limit=self.alert_minutes_to_limit),
+            make_panel(
+                title='cgroup cpu (%% of %s)' % cpu_limit_str,
+                column_list=[
+                    COLUMN_NAME_CGROUP_CPU_USED,
+                    COLUMN_NAME_CGROUP_CPU_THROTTLED],
+                unit='%', decimal_num=1,
+                label_list=['used', 'throttled periods']),
+        ]
+
+    def get_limit_dict(self):
+        return {COLUMN_NAME_CGROUP_MEMORY_USED: 100}
+
+    def collect(self):
+        if self.cgroup_dict is None:
+            return {}
+        if self.reader_dict is None:
+            file_key_list = ['memory_usage', 'cpu_stat']
+            if self.cgroup_dict['version'] == cgroup.CGROUP_VERSION_1:
+                file_key_list.append('cpu_usage')
+            self.reader_dict = {}
+            for file_key in file_key_list:
+                file_path = cgroup.get_file_path(
+                    cgroup_dict=self.cgroup_dict, file_key=file_key)
+                if not os.path.exists(file_path):
+                    # e.g., the cpu controller is not enabled.
+                    continue
+                self.reader_dict[file_key] = ProcFileReader(
+                    file_path=file_path)
+        memory_usage_bytes = int(bytes(
+            self.reader_dict['memory_usage'].read()))
+        value_dict = {
+            COLUMN_NAME_CGROUP_MEMORY_USED: round(
+                memory_usage_bytes / self.memory_limit_bytes * 100, 1),
+        }
+        if 'cpu_stat' not in self.reader_dict:
+            return value_dict
+        cpu_usage_bytes = None
+        if 'cpu_usage' in self.reader_dict:
+            cpu_usage_bytes = self.reader_dict['cpu_usage'].read()
+        cpu_stat_dict = cgroup.parse_cpu_stat(
+            version=self.cgroup_dict['version'],
+            cpu_stat_bytes=self.reader_dict['cpu_stat'].read(),
+            cpu_usage_bytes=cpu_usage_bytes)
+        current_time = self.clock()
+        if self.pre_time is not None and current_time > self.pre_time:
+            pre_cpu_stat_dict = self.pre_cpu_stat_dict
+            if 'usage_seconds' in cpu_stat_dict:
+                usage_seconds = cpu_stat_dict['usage_seconds'] \
+                    - pre_cpu_stat_dict['usage_seconds']
+                value_dict[COLUMN_NAME_CGROUP_CPU_USED] = round(
+                    usage_seconds / (current_time - self.pre_time)
+                    / self.cpu_limit_cores * 100, 1)
+            if 'period_num' in cpu_stat_dict:
+                period_num = cpu_stat_dict['period_num'] \
+                    - pre_cpu_stat_dict['period_num']
+                throttled_num = cpu_stat_dict['throttled_num'] \
+                    - pre_cpu_stat_dict['throttled_num']
+                value_dict[COLUMN_NAME_CGROUP_CPU_THROTTLED] = round(
+                    throttled_num / period_num * 100, 1) \
+                    if period_num > 0 else 0.0
+        self.pre_cpu_stat_dict = cpu_stat_dict
+        self.pre_time = current_time
+        return value_dict
+
+    def close(self):
+        if self.reader_dict is None:
+            return
+        for reader in self.reader_dict.values():
+            reader.close()
+        self.reader_dict = None
+
+
+class DescendantPidTracker():
+
+    def __init__(self, root_pid, proc_root=PROC_ROOT, excluded_pid=None):
+        """
+        Class that keeps the set of the IDs of a process and its
+        descendants. The parent of each process is cached, so a
+        refresh lists the process IDs and reads /proc/<pid>/stat of
+        only the processes started since the previous refresh.
+
+        Parameters
+        ----------
+        root_pid : int
+            ID of the root process of the tree.
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system.
+        excluded_pid : int or None, default None
+            ID of the process excluded from the tree with its
+            descendants (e.g., the collector process started by the
+            kernel). The root process is never excluded.
+        """
+        self.root_pid = root_pid
+        self.proc_root = proc_root
+        self.excluded_pid = excluded_pid
+        self.ppid_dict = {}
+        self.pid_set = {root_pid}
+
+    def refresh(self):
+        """
+        Update the set of the process IDs of the tree.
+
+        Returns
+        -------
+        pid_set : set of int
+            IDs of the root process and its descendants.
+        """
+        current_pid_set = {
+            int(file_name) for file_name in os.listdir(self.proc_root)
+            if file_name.isdigit()}
+        for pid in set(self.ppid_dict) - current_pid_set:
+            del self.ppid_dict[pid]
+        for pid in current_pid_set - set(self.ppid_dict):
+            try:
+                pid_stat_str = _read_proc_file(
+                    proc_root=self.proc_root, relative_path='%d/stat' % pid)
+            except OSError:
+                # The process has exited after the listing.
+                continue
+            self.ppid_dict[pid] = _parse_proc_pid_stat_ppid(
+                pid_stat_bytes=pid_stat_str.encode())
+
+        children_dict = {}
+        for pid, ppid in self.ppid_dict.items():
+            children_dict.setdefault(ppid, []).append(pid)
+        pid_set = set()
+        pid_list = [self.root_pid]
+        while pid_list:
+            pid = pid_list.pop()
+            if pid in pid_set \
+                    or (pid == self.excluded_pid and pid != self.root_pid):
+                continue
+            pid_set.add(pid)
+            pid_list.extend(children_dict.get(pid, []))
+        self.pid_set = pid_set
+        return pid_set
+
+
+COLUMN_NAME_PROCESS_TREE_PSS = 'process tree pss (MB)'
+COLUMN_NAME_PROCESS_TREE_USS = 'process tree uss (MB)'
+COLUMN_NAME_PROCESS_TREE_RSS = 'process tree rss (MB)'
+COLUMN_NAME_PROCESS_TREE_PROCESS_NUM = 'process tree processes'
+
+
+class ProcessTreeMemoryCollector(MetricCollector):
+
+    name = 'pss'
+    default_interval_seconds = 5
+
+    def __init__(
+            self, pid=None, proc_root=PROC_ROOT,
+            trend_window_seconds=trend.DEFAULT_TREND_WINDOW_SECONDS,
+            alert_minutes_to_limit=trend.DEFAULT_ALERT_MINUTES_TO_LIMIT,
+            cgroup_root=CGROUP_ROOT):
+        """
+        Collector of the proportional set size (PSS) and the unique
+        set size (USS) of the kernel and its descendants (e.g., the
+        workers of the data loaders), read from
+        /proc/<pid>/smaps_rollup. The sum of the RSS counts the shared
+        libraries and the pages shared with the forked workers once
+        per process, while the PSS divides the shared pages among the
+        processes and the USS counts only the private pages. The
+        sampling process and its descendants are excluded.
+
+        Parameters
+        ----------
+        pid : int or None, default None
+            ID of the root process of the tree. If None, the current
+            process (the kernel) is used.
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system.
+        trend_window_seconds : int, float or None, default 10 minutes
+            Seconds of the window of the growth rate of the memory.
+            If None, the growth rate is not calculated.
+        alert_minutes_to_limit : int, float or None, default 30
+            The panel is highlighted when the memory is projected to
+            reach the limit within these minutes.
+        cgroup_root : str, default CGROUP_ROOT
+            Root directory of the cgroup file system (to read the
+            memory limit of the kernel).
+
+        Notes
+        -----
+        Reading smaps walks the page tables of the process in the
+        kernel, so this is sampled every 5 seconds by default and is
+        not supported by the thread sampler.
+        """
+        if pid is None:
+            pid = os.getpid()
+        self.pid = pid
+        self.proc_root = proc_root
+        self.trend_window_seconds = trend_window_seconds
+        self.alert_minutes_to_limit = alert_minutes_to_limit
+        self.cgroup_root = cgroup_root
+        self.smaps_file_name = 'smaps_rollup'
+        self.pid_tracker = None
+
+    def setup(self):
+        # The collector process (set up again there) and its commands
+        # are not counted as the descendants of the kernel.
+        self.pid_tracker = DescendantPidTracker(
+            root_pid=self.pid, proc_root=self.proc_root,
+            excluded_pid=os.getpid())
+        if not os.path.exists(os.path.join(
+                self.proc_root, str(self.pid), 'smaps_rollup')):
+            # Linux before 4.14. The smaps has the same fields for
+            # each mapping, which are summed up by the parsing.
+            self.smaps_file_name = 'smaps'
+
+    def get_panel_list(self):
+        return [
+            make_panel(
+                title='process tree memory (MB)',
+                column_list=[
+                    COLUMN_NAME_PROCESS_TREE_PSS,
+                    COLUMN_NAME_PROCESS_TREE_USS,
+                    COLUMN_NAME_PROCESS_TREE_RSS],
+                unit='MB', label_list=['pss', 'uss', 'rss sum'],
+                trend_window_seconds=self.trend_window_seconds,
+                alert_minutes_to_limit=self.alert_minutes_to_limit),
+            make_panel(
+                title=COLUMN_NAME_PROCESS_TREE_PROCESS_NUM,
+                column_list=[COLUMN_NAME_PROCESS_TREE_PROCESS_NUM],
+                unit='', height=SMALL_PANEL_HEIGHT),
+        ]
+
+    def get_limit_dict(self):
+        memory_limit_mb = get_memory_limit_mb(
+            proc_root=self.proc_root, cgroup_root=self.cgroup_root)
+        return {
+            COLUMN_NAME_PROCESS_TREE_PSS: memory_limit_mb,
+            COLUMN_NAME_PROCESS_TREE_USS: memory_limit_mb,
+            COLUMN_NAME_PROCESS_TREE_RSS: memory_limit_mb,
+        }
+
+    def collect(self):
+        total_kb_dict = {'rss': 0, 'pss': 0, 'uss': 0}
+        process_num = 0
+        for pid in self.pid_tracker.refresh():
+            try:
+                smaps_str = _read_proc_file(
+                    proc_root=self.proc_root,
+                    relative_path='%d/%s' % (pid, self.smaps_file_name))
+            except OSError:
+                # The process has exited, or is not readable.
+                continue
+            smaps_kb_dict = _parse_smaps_kb(smaps_bytes=smaps_str.encode())
+            for key, value in smaps_kb_dict.items():
+                total_kb_dict[key] += value
+            process_num += 1
+        value_dict = {
+            COLUMN_NAME_PROCESS_TREE_PSS: int(total_kb_dict['pss'] / 1024),
+            COLUMN_NAME_PROCESS_TREE_USS: int(total_kb_dict['uss'] / 1024),
+            COLUMN_NAME_PROCESS_TREE_RSS: int(total_kb_dict['rss'] / 1024),
+            COLUMN_NAME_PROCESS_TREE_PROCESS_NUM: process_num,
+        }
+        return value_dict
+
+
+COLUMN_NAME_PROCESS_CPU_FORMAT = 'process({process_name}) cpu (%)'
+COLUMN_NAME_PROCESS_THREADS_FORMAT = 'process({process_name}) threads'
+COLUMN_NAME_PROCESS_FDS_FORMAT = 'process({process_name}) fds'
+COLUMN_NAME_PROCESS_TREE_THREADS_PER_CPU = 'process tree threads per cpu'
+COLUMN_NAME_PROCESS_TREE_VOLUNTARY_CTXT_SWITCHES = \
+    'process tree voluntary context switches (/s)'
+COLUMN_NAME_PROCESS_TREE_INVOLUNTARY_CTXT_SWITCHES = \
+    'process tree involuntary context switches (/s)'
+OTHER_PROCESS_NAME = 'other'
+DEFAULT_MAX_PROCESS_NAME_NUM = 3
+
+
+class ProcessTreeCollector(MetricCollector):
+
+    name = 'process_tree'
+    default_interval_seconds = 2
+
+    def __init__(
+            self, pid=None, process_name_list=None,
+            max_process_name_num=DEFAULT_MAX_PROCESS_NAME_NUM,
+            proc_root=PROC_ROOT, clock=time.monotonic):
+        """
+        Collector of the CPU time, the threads, the open file
+        descriptors and the context switches of the kernel and its
+        descendants (e.g., the workers of the data loaders, the pools
+        of joblib and the spawned subprocesses), read from
+        /proc/<pid>/stat, /proc/<pid>/status and /proc/<pid>/fd. The
+        values are summed up per process name, so that too many
+        threads per CPU (oversubscription) and leaking file
+        descriptors can be seen next to the memory. The sampling
+        process and its descendants are excluded.
+
+        Parameters
+        ----------
+        pid : int or None, default None
+            ID of the root process of the tree. If None, the current
+            process (the kernel) is used.
+        process_name_list : list of str or None, default None
+            Process names (the comm of /proc/<pid>/stat, e.g.,
+            'python') plotted separately. If None, the names of the
+            processes of the tree at the setup are used (the name of
+            the root process first, then the most frequent names).
+            The processes of the other names are summed up as 'other'.
+        max_process_name_num : int, default 3
+            The maximum number of the names used when the
+            process_name_list is None.
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system.
+        clock : function, default time.monotonic
+            Function that returns the current time in seconds.
+
+        Notes
+        -----
+        The process IDs are listed and the files of each process of
+        the tree are read at each sampling, so this is sampled every 2
+        seconds by default and is not supported by the thread sampler.
+        The CPU time and the context switches of a process are counted
+        from its second sampling.
+        """
+        if pid is None:
+            pid = os.getpid()
+        self.pid = pid
+        self.process_name_list = process_name_list
+        self.max_process_name_num = max_process_name_num
+        self.proc_root = proc_root
+        self.clock = clock
+        self.clock_ticks_per_second = os.sysconf('SC_CLK_TCK')
+        self.cpu_num = 1
+        self.pid_tracker = None
+        self.pre_process_dict = {}
+        self.pre_time = None
+
+    def setup(self):
+        self.cpu_num = len(os.sched_getaffinity(0))
+        # The collector process (set up again there) and its commands
+        # are not counted as the descendants of the kernel.
+        self.pid_tracker = DescendantPidTracker(
+            root_pid=self.pid, proc_root=self.proc_root,
+            excluded_pid=os.getpid())
+        if self.process_name_list is not None:
+            return
+        process_num_dict = {}
+        root_process_name = None
+        for pid in self.pid_tracker.refresh():
+            process_dict = self._read_process(pid=pid)
+            if process_dict is None:
+                continue
+            process_name = process_dict['process_name']
+            process_num_dict[process_name] = \
+                process_num_dict.get(process_name, 0) + 1
+            if pid == self.pid:
+                root_process_name = process_name
+        process_name_list = sorted(
+            process_num_dict,
+            key=lambda process_name: (
+                process_name != root_process_name,
+                -process_num_dict[process_name], process_name))
+        self.process_name_list = \
+            process_name_list[:self.max_process_name_num]
+
+    def _get_process_name_list(self):
+        """
+        Get the process names of the columns.
+
+        Returns
+        -------
+        process_name_list : list of str
+            The names of the process_name_list attribute and 'other'.
+        """
+        process_name_list = [
+            process_name for process_name in self.process_name_list or []
+            if process_name != OTHER_PROCESS_NAME]
+        return process_name_list + [OTHER_PROCESS_NAME]
+
+    def get_panel_list(self):
+        process_name_list = self._get_process_name_list()
+        return [
+            make_panel(
+                title='process tree cpu (%)',
+                column_list=[
+                    COLUMN_NAME_PROCESS_CPU_FORMAT.format(
+                        process_name=process_name)
+                    for process_name in process_name_list],
+                unit='%', decimal_num=1, label_list=process_name_list),
+            make_panel(
+                title='process tree threads',
+                column_list=[
+                    COLUMN_NAME_PROCESS_THREADS_FORMAT.format(
+                        process_name=process_name)
+                    for process_name in process_name_list],
+                unit='', label_list=process_name_list),
+            make_panel(
+                title=COLUMN_NAME_PROCESS_TREE_THREADS_PER_CPU,
+                column_list=[COLUMN_NAME_PROCESS_TREE_THREADS_PER_CPU],
+                unit='', decimal_num=2, height=SMALL_PANEL_HEIGHT),
+            make_panel(
+                title='process tree open fds',
+                column_list=[
+                    COLUMN_NAME_PROCESS_FDS_FORMAT.format(
+                        process_name=process_name)
+                    for process_name in process_name_list],
+                unit='', label_list=process_name_list),
+            make_panel(
+                title='process tree context switches (/s)',
+                column_list=[
+                    COLUMN_NAME_PROCESS_TREE_VOLUNTARY_CTXT_SWITCHES,
+                    COLUMN_NAME_PROCESS_TREE_INVOLUNTARY_CTXT_SWITCHES],
+                unit='/s', decimal_num=1,
+                label_list=['voluntary', 'involuntary'],
+                height=SMALL_PANEL_HEIGHT),
+        ]
+
+    def _read_process(self, pid):
+        """
+        Read the values of the process.
+
+        Parameters
+        ----------
+        pid : int
+            ID of the process.
+
+        Returns
+        -------
+        process_dict : dict or None
+            A dictionary with the process_name, process_time (in clock
+            ticks), thread_num, voluntary_ctxt_switches,
+            nonvoluntary_ctxt_switches and fd_num keys. The fd_num is
+            None if the descriptors are not readable. None if the
+            process has exited.
+        """
+        try:
+            pid_stat_str = _read_proc_file(
+                proc_root=self.proc_root, relative_path='%d/stat' % pid)
+            pid_status_str = _read_proc_file(
+                proc_root=self.proc_root, relative_path='%d/status' % pid)
+        except OSError:
+            return None
+        process_name, process_time, thread_num = \
+            _parse_proc_pid_stat_process_tree(
+                pid_stat_bytes=pid_stat_str.encode())
+        voluntary_ctxt_switches, nonvoluntary_ctxt_switches = \
+            _parse_proc_pid_status_ctxt_switches(
+                pid_status_bytes=pid_status_str.encode())
+        try:
+            fd_num = len(os.listdir(
+                os.path.join(self.proc_root, str(pid), 'fd')))
+        except OSError:
+            fd_num = None
+        return {
+            'process_name': process_name,
+            'process_time': process_time,
+            'thread_num': thread_num,
+            'voluntary_ctxt_switches': voluntary_ctxt_switches,
+            'nonvoluntary_ctxt_switches': nonvoluntary_ctxt_switches,
+            'fd_num': fd_num,
+        }
+
+    def collect(self):
+        process_name_list = self._get_process_name_list()
+        thread_num_dict = {
+            process_name: 0 for process_name in process_name_list}
+        fd_num_dict = dict(thread_num_dict)
+        process_time_dict = dict(thread_num_dict)
+        ctxt_switches_list = [0, 0]
+        process_dict_dict = {}
+        for pid in self.pid_tracker.refresh():
+            process_dict = self._read_process(pid=pid)
+            if process_dict is None:
+                continue
+            process_dict_dict[pid] = process_dict
+            process_name = process_dict['process_name']
+            if process_name not in thread_num_dict:
+                process_name = OTHER_PROCESS_NAME
+            thread_num_dict[process_name] += process_dict['thread_num']
+            if process_dict['fd_num'] is not None:
+                fd_num_dict[process_name] += process_dict['fd_num']
+            pre_process_dict = self.pre_process_dict.get(pid)
+            if pre_process_dict is None \
+                    or pre_process_dict['process_time'] \
+                    > process_dict['process_time']:
+                # The new process (or the reused process ID).
+                continue
+            process_time_dict[process_name] += \
+                process_dict['process_time'] \
+                - pre_process_dict['process_time']
+            ctxt_switches_list[0] += \
+                process_dict['voluntary_ctxt_switches'] \
+                - pre_process_dict['voluntary_ctxt_switches']
+            ctxt_switches_list[1] += \
+                process_dict['nonvoluntary_ctxt_switches'] \
+                - pre_process_dict['nonvoluntary_ctxt_switches']
+        current_time = self.clock()
+
+        value_dict = {}
+        for process_name in process_name_list:
+            value_dict[COLUMN_NAME_PROCESS_THREADS_FORMAT.format(
+                process_name=process_name)] = thread_num_dict[process_name]
+            value_dict[COLUMN_NAME_PROCESS_FDS_FORMAT.format(
+                process_name=process_name)] = fd_num_dict[process_name]
+        value_dict[COLUMN_NAME_PROCESS_TREE_THREADS_PER_CPU] = round(
+            sum(thread_num_dict.values()) / self.cpu_num, 2)
+        if self.pre_time is not None and current_time > self.pre_time:
+            elapsed_seconds = current_time - self.pre_time
+            for process_name in process_name_list:
+                value_dict[COLUMN_NAME_PROCESS_CPU_FORMAT.format(
+                    process_name=process_name)] = round(
+                        process_time_dict[process_name]
+                        / self.clock_ticks_per_second / elapsed_seconds
+                        * 100, 1)
+            value_dict[COLUMN_NAME_PROCESS_TREE_VOLUNTARY_CTXT_SWITCHES] = \
+                round(ctxt_switches_list[0] / elapsed_seconds, 1)
+            value_dict[
+                COLUMN_NAME_PROCESS_TREE_INVOLUNTARY_CTXT_SWITCHES] = \
+                round(ctxt_switches_list[1] / elapsed_seconds, 1)
+        self.pre_process_dict = process_dict_dict
+        self.pre_time = current_time
+        return value_dict
+
+
+PRESSURE_RESOURCE_NAME_LIST = ['cpu', 'memory', 'io']
+COLUMN_NAME_PRESSURE_FORMAT = '{resource_name} pressure {kind} (%)'
+
+
+class PressureCollector(MetricCollector):
+
+    name = 'pressure'
+    default_interval_seconds = 1
+    supports_thread_sampling = True
+
+    def __init__(self, proc_root=PROC_ROOT, cgroup_root=CGROUP_ROOT):
+        """
+        Collector of the pressure stall information (PSI): the
+        percentage of the time in which some (or all) of the tasks
+        were stalled waiting for the CPU, the memory (reclaim) or the
+        IO, averaged over 10 seconds. The *.pressure files of the
+        cgroup v2 of the kernel are read if they exist, otherwise
+        /proc/pressure/{cpu,memory,io}. Each sampling is a single read
+        of each kept open file. No panel is made on kernels without
+        PSI.
+
+        Parameters
+        ----------
+        proc_root : str, default PROC_ROOT
+            Root directory of the proc file system.
+        cgroup_root : str or None, default CGROUP_ROOT
+            Root directory of the cgroup file system. If None, only
+            /proc/pressure is read.
+        """
+        self.proc_root = proc_root
+        self.cgroup_root = cgroup_root
+        self.file_path_dict = {}
+        self.reader_dict = None
+
+    def __getstate__(self):
+        # The opened files are not sent to the collector process.
+        state_dict = dict(self.__dict__)
+        state_dict['reader_dict'] = None
+        return state_dict
+
+    def setup(self):
+        cgroup_dict = None
+        if self.cgroup_root is not None:
+            cgroup_dict = cgroup.detect_cgroup(
+                cgroup_root=self.cgroup_root,
+                proc_cgroup_path=os.path.join(self.proc_root, 'self/cgroup'))
+        self.file_path_dict = {}
+        for resource_name in PRESSURE_RESOURCE_NAME_LIST:
+            file_path_list = [
+                os.path.join(self.proc_root, 'pressure', resource_name)]
+            if cgroup_dict is not None:
+                cgroup_file_path = cgroup.get_pressure_file_path(
+                    cgroup_dict=cgroup_dict, resource_name=resource_name)
+                if cgroup_file_path is not None:
+                    file_path_list.insert(0, cgroup_file_path)
+            for file_path in file_path_list:
+                try:
+                    # The file exists but can not be read if PSI is
+                    # disabled at boot (psi=0).
+                    with open(file_path, 'rb') as f:
+                        f.read()
+                except OSError:
+                    continue
+                self.file_path_dict[resource_name] = file_path
+                break
+
+    def get_panel_list(self):
+        panel_list = []
+        for resource_name in PRESSURE_RESOURCE_NAME_LIST:
+            if resource_name not in self.file_path_dict:
+                continue
+            panel_list.append(make_panel(
+                title='%s pressure avg10 (%%)' % resource_name,
+                column_list=[
+                    _get_pressure_column_name(
+                        resource_name=resource_name, kind=kind)
+                    for kind in ('some', 'full')],
+                unit='%', decimal_num=2, label_list=['some', 'full']))
+        return panel_list
+
+    def collect(self):
+        if self.reader_dict is None:
+            self.reader_dict = {
+                resource_name: ProcFileReader(file_path=file_path)
+                for resource_name, file_path
+                in self.file_path_dict.items()}
+        value_dict = {}
+        for resource_name, reader in self.reader_dict.items():
+            avg10_dict = _parse_pressure_avg10(pressure_bytes=reader.read())
+            for kind, avg10 in avg10_dict.items():
+                value_dict[_get_pressure_column_name(
+                    resource_name=resource_name, kind=kind)] = avg10
+        return value_dict
+
+    def close(self):
+        if self.reader_dict is None:
+            return
+        for reader in self.reader_dict.values():
+            reader.close()
+        self.reader_dict = None
+
+
+COLUMN_NAME_KERNEL_LAG_P50 = 'kernel lag p50 (ms)'
+COLUMN_NAME_KERNEL_LAG_P99 = 'kernel lag p99 (ms)'
+DEFAULT_LAG_PROBE_INTERVAL_SECONDS = 0.01
+
+
+class KernelLagCollector(MetricCollector):
+
+    name = 'kernel_lag'
+    default_interval_seconds = 1
+    supports_thread_sampling = True
+
+    def __init__(
+            self,
+            probe_interval_seconds=DEFAULT_LAG_PROBE_INTERVAL_SECONDS):
+        """
+        Collector of the scheduling delay of the kernel: the p50 and
+        p99 of the sleep overshoot measured by the probe thread of the
+        lag_probe module in the kernel since the previous sampling.
+        The overshoot grows when other threads of the kernel hold the
+        GIL or the kernel process is starved of the CPU, even though
+        the CPU of the host looks idle.
+
+        Parameters
+        ----------
+        probe_interval_seconds : float, default 0.01
+            Interval in seconds at which the probe thread sleeps.
+
+        Notes
+        -----
+        The probe thread is started by the session of the
+        linux_stats_plot module when this metric is sampled, and sends
+        the overshoots to the collector. Nothing is sampled while no
+        overshoot has been received (e.g., while the GIL of the kernel
+        is held for a long time, whose overshoot is received after
+        it is released).
+        """
+        self.probe_interval_seconds = probe_interval_seconds
+        self.lag_seconds_list = []
+
+    def get_panel_list(self):
+        return [
+            make_panel(
+                title='kernel event-loop lag (ms)',
+                column_list=[
+                    COLUMN_NAME_KERNEL_LAG_P50, COLUMN_NAME_KERNEL_LAG_P99],
+                unit='ms', decimal_num=2, label_list=['p50', 'p99'],
+                height=SMALL_PANEL_HEIGHT),
+        ]
+
+    def record_lag(self, lag_seconds_list):
+        """
+        Receive the sleep overshoots measured by the probe thread.
+
+        Parameters
+        ----------
+        lag_seconds_list : list of float
+            The overshoots in seconds.
+        """
+        self.lag_seconds_list.extend(lag_seconds_list)
+
+    def collect(self):
+        if len(self.lag_seconds_list) == 0:
+            return {}
+        sorted_lag_seconds_list = sorted(self.lag_seconds_list)
+        self.lag_seconds_list = []
+        return {
+            COLUMN_NAME_KERNEL_LAG_P50: round(_get_percentile(
+                sorted_value_list=sorted_lag_seconds_list,
+                percentile=50) * 1000, 3),
+            COLUMN_NAME_KERNEL_LAG_P99: round(_get_percentile(
+                sorted_value_list=sorted_lag_seconds_list,
+                percentile=99) * 1000, 3),
+        }
+
+
+COLUMN_NAME_PYTHON_HEAP_TRACED = 'python heap traced (MB)'
+COLUMN_NAME_TRACEMALLOC_MEMORY = 'tracemalloc memory (MB)'
+COLUMN_NAME_HEAP_SNAPSHOT_TIME = 'heap snapshot time (ms)'
+DEFAULT_HEAP_SNAPSHOT_INTERVAL_SECONDS = 60
+DEFAULT_HEAP_FRAME_NUM = 1
+DEFAULT_HEAP_TOP_NUM = 10
+
+
+class HeapSnapshotCollector(MetricCollector):
+
+    name = 'heap'
+    default_interval_seconds = 5
+    supports_thread_sampling = True
+
+    def __init__(
+            self,
+            snapshot_interval_seconds=DEFAULT_HEAP_SNAPSHOT_INTERVAL_SECONDS,
+            frame_num=DEFAULT_HEAP_FRAME_NUM, top_num=DEFAULT_HEAP_TOP_NUM):
+        """
+        Collector of the Python heap of the kernel traced by
+        tracemalloc. The snapshot thread of the heap_snapshot module in
+        the kernel compares each snapshot with the previous one and
+        saves the allocation sites that grew most, which are listed
+        under the panels of the plot. This collector plots the traced
+        heap and the overhead of the tracing (the memory of tracemalloc
+        and the time of each snapshot).
+
+        Parameters
+        ----------
+        snapshot_interval_seconds : int or float, default 60
+            Interval in seconds at which the snapshot is taken.
+        frame_num : int, default 1
+            The number of the frames stored in the traces. The
+            overhead of tracemalloc grows with it. If tracemalloc has
+            already been started in the kernel, its limit is used.
+        top_num : int, default 10
+            The number of the growing sites listed.
+
+        Notes
+        -----
+        This metric is not sampled by default since tracemalloc slows
+        down the allocations of the kernel. The snapshot thread is
+        started by the session of the linux_stats_plot module when
+        this metric is sampled, and tracemalloc is stopped with the
+        session.
+        """
+        self.snapshot_interval_seconds = snapshot_interval_seconds
+        self.frame_num = frame_num
+        self.top_num = top_num
+        self.heap_dict = None
+
+    def get_panel_list(self):
+        return [
+            make_panel(
+                title='python heap (MB)',
+                column_list=[
+                    COLUMN_NAME_PYTHON_HEAP_TRACED,
+                    COLUMN_NAME_TRACEMALLOC_MEMORY],
+                unit='MB', decimal_num=1,
+                label_list=['traced', 'tracemalloc']),
+            make_panel(
+                title=COLUMN_NAME_HEAP_SNAPSHOT_TIME,
+                column_list=[COLUMN_NAME_HEAP_SNAPSHOT_TIME],
+                unit='ms', decimal_num=1, height=SMALL_PANEL_HEIGHT),
+        ]
+
+    def record_heap(self, heap_dict):
+        """
+        Receive the values of the latest snapshot of the kernel.
+
+        Parameters
+        ----------
+        heap_dict : dict
+            A dictionary that has the traced_mb, tracemalloc_mb and
+            snapshot_seconds keys.
+        """
+        self.heap_dict = heap_dict
+
+    def collect(self):
+        if self.heap_dict is None:
+            return {}
+        heap_dict = self.heap_dict
+        self.heap_dict = None
+        return {
+            COLUMN_NAME_PYTHON_HEAP_TRACED: heap_dict['traced_mb'],
+            COLUMN_NAME_TRACEMALLOC_MEMORY: heap_dict['tracemalloc_mb'],
+            COLUMN_NAME_HEAP_SNAPSHOT_TIME: round(
+                heap_dict['snapshot_seconds'] * 1000, 3),
+        }
+
+
+COLLECTOR_CLASS_DICT = {}
+
+
+def register_collector(collector_class):
+    """
+    Register the collector class so that it can be specified by name
+    in the metrics argument of the plot.
+
+    Parameters
+    ----------
+    collector_class : class
+        A subclass of MetricCollector. Its name attribute is used
+        as the metric name.
+
+    Returns
+    -------
+    collector_class : class
+        The registered class (so that this can be used as a class
+        decorator).
+
+    Raises
+    ------
+    ValueError
+        If the name attribute of the class is empty.
+    """
+    if collector_class.name == '':
+        err_msg = 'The name attribute of the collector class is empty: %s' \
+            % collector_class
+        raise ValueError(err_msg)
+    COLLECTOR_CLASS_DICT[collector_class.name] = collector_class
+    return collector_class
+
+
+for _collector_class in (
+        MemoryCollector, DiskUsageCollector, GPUMemoryCollector,
+        CPUCollector, DiskIOCollector, NetworkCollector,
+        ProcStatsCollector, OverheadCollector, CgroupCollector,
+        ProcessTreeMemoryCollector, PressureCollector, KernelLagCollector,
+        HeapSnapshotCollector, ProcessTreeCollector):
+    register_collector(collector_class=_collector_class)
+
+
+def make_collector_list(metrics):
+    """
+    Make the list of collectors from the specified metrics.
+
+    Parameters
+    ----------
+    metrics : list of str or MetricCollector
+        Registered metric names or collector instances.
+        e.g., ['memory', 'cpu', DiskUsageCollector(path='/data')]
+
+    Returns
+    -------
+    collector_list : list of MetricCollector
+        A list of collectors.
+
+    Raises
+    ------
+    ValueError
+        - If an unregistered metric name is specified.
+        - If the same metric is specified more than once.
+    """
+    collector_list = []
+    name_list = []
+    for metric in metrics:
+        if isinstance(metric, MetricCollector):
+            collector = metric
+        elif metric in COLLECTOR_CLASS_DICT:
+            collector = COLLECTOR_CLASS_DICT[metric]()
+        else:
+            err_msg = 'Unregistered metric name is specified: %s' % metric
+            err_msg += '\nregistered names: %s' \
+                % list(COLLECTOR_CLASS_DICT.keys())
+            raise ValueError(err_msg)
+        if collector.name in name_list:
+            err_msg = 'The same metric is specified more than once: %s' \
+                % collector.name
+            raise ValueError(err_msg)
+        name_list.append(collector.name)
+        collector_list.append(collector)
+    return collector_list
+
+
+def setup_collectors(collector_list):
+    """
+    Set up each collector, and exclude the collectors that have no
+    panel (unavailable metrics such as GPU on a machine without GPU).
+
+    Parameters
+    ----------
+    collector_list : list of MetricCollector
+        A list of collectors.
+
+    Returns
+    -------
+    collector_list : list of MetricCollector
+        A list of available collectors.
+    """
+    available_collector_list = []
+    for collector in collector_list:
+        collector.setup()
+        if len(collector.get_panel_list()) == 0:
+            continue
+        available_collector_list.append(collector)
+    return available_collector_list
+
+
+def _read_proc_file(proc_root, relative_path):
+    """
+    Read the file of the proc file system.
+
+    Parameters
+    ----------
+    proc_root : str
+        Root directory of the proc file system.
+    relative_path : str
+        Path of the file under the root. e.g., 'net/dev'
+
+    Returns
+    -------
+    file_str : str
+        Content of the file.
+    """
+    file_path = os.path.join(proc_root, relative_path)
+    with open(file_path, 'r') as f:
+        file_str = f.read()
+    return file_str
+
+
+def _parse_proc_stat_cpu_times(proc_stat_str):
+    """
+    Get the cumulative busy time and total time of each CPU core
+    from the content of /proc/stat.
+
+    Parameters
+    ----------
+    proc_stat_str : str
+        Content of /proc/stat.
+
+    Returns
+    -------
+    cpu_time_dict : dict
+        A dictionary that stores the core index in key and the tuple
+        of (busy time, total time) in jiffies in value. The total
+        line (cpu) is not included.
+    """
+    cpu_time_dict = {}
+    for line_str in proc_stat_str.split('\n'):
+        if not line_str.startswith('cpu'):
+            continue
+        splited_line = line_str.split()
+        cpu_name = splited_line[0]
+        if cpu_name == 'cpu':
+            continue
+        # user, nice, system, idle, iowait, irq, softirq, steal. The guest
+        # times are already included in user and nice.
+        time_list = [int(value) for value in splited_line[1:9]]
+        total_time = sum(time_list)
+        idle_time = time_list[3] + time_list[4]
+        cpu_idx = int(cpu_name[3:])
+        cpu_time_dict[cpu_idx] = (total_time - idle_time, total_time)
+    return cpu_time_dict
+
+
+def _parse_proc_diskstats(diskstats_str):
+    """
+    Get the cumulative read / write counts and sectors of each device
+    from the content of /proc/diskstats.
+
+    Parameters
+    ----------
+    diskstats_str : str
+        Content of /proc/diskstats.
+
+    Returns
+    -------
+    diskstats_dict : dict
+        A dictionary that stores the device name in key and the
+        dictionary with read_count, read_sectors, write_count and
+        write_sectors keys in value.
+    """
+    diskstats_dict = {}
+    for line_str in diskstats_str.split('\n'):
+        splited_line = line_str.split()
+        if len(splited_line) < 10:
+            continue
+        diskstats_dict[splited_line[2]] = {
+            'read_count': int(splited_line[3]),
+            'read_sectors': int(splited_line[5]),
+            'write_count': int(splited_line[7]),
+            'write_sectors': int(splited_line[9]),
+        }
+    return diskstats_dict
+
+
+def _parse_meminfo_used_kb(meminfo_bytes):
+    """
+    Get the used memory of the system (total minus available) from
+    the content of /proc/meminfo.
+
+    Parameters
+    ----------
+    meminfo_bytes : bytes or memoryview
+        Content of /proc/meminfo.
+
+    Returns
+    -------
+    used_memory_kb : int
+        The used memory in kilobytes.
+    """
+    meminfo_bytes = bytes(meminfo_bytes)
+    value_dict = {}
+    for key in (b'MemTotal:', b'MemAvailable:'):
+        start_idx = meminfo_bytes.find(key) + len(key)
+        end_idx = meminfo_bytes.find(b'kB', start_idx)
+        value_dict[key] = int(meminfo_bytes[start_idx:end_idx])
+    used_memory_kb = value_dict[b'MemTotal:'] - value_dict[b'MemAvailable:']
+    return used_memory_kb
+
+
+def _parse_meminfo_total_kb(meminfo_bytes):
+    """
+    Get the physical memory of the system from the content of
+    /proc/meminfo.
+
+    Parameters
+    ----------
+    meminfo_bytes : bytes or memoryview
+        Content of /proc/meminfo.
+
+    Returns
+    -------
+    total_memory_kb : int
+        The physical memory in kilobytes.
+    """
+    meminfo_bytes = bytes(meminfo_bytes)
+    key = b'MemTotal:'
+    start_idx = meminfo_bytes.find(key) + len(key)
+    end_idx = meminfo_bytes.find(b'kB', start_idx)
+    total_memory_kb = int(meminfo_bytes[start_idx:end_idx])
+    return total_memory_kb
+
+
+def get_memory_limit_mb(proc_root=PROC_ROOT, cgroup_root=CGROUP_ROOT):
+    """
+    Get the memory limit: the memory limit of the cgroup (container),
+    or the physical memory if the cgroup is not limited.
+
+    Parameters
+    ----------
+    proc_root : str, default PROC_ROOT
+        Root directory of the proc file system.
+    cgroup_root : str or None, default CGROUP_ROOT
+        Root directory of the cgroup file system. If None, only the
+        physical memory is used.
+
+    Returns
+    -------
+    memory_limit_mb : int
+        The memory limit in megabytes.
+    """
+    memory_limit_mb = int(_parse_meminfo_total_kb(
+        meminfo_bytes=_read_proc_file(
+            proc_root=proc_root, relative_path='meminfo').encode()) / 1024)
+    if cgroup_root is None:
+        return memory_limit_mb
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=cgroup_root,
+        proc_cgroup_path=os.path.join(proc_root, 'self/cgroup'))
+    if cgroup_dict is None:
+        return memory_limit_mb
+    limit_bytes = cgroup.read_memory_limit_bytes(cgroup_dict=cgroup_dict)
+    if limit_bytes is not None:
+        memory_limit_mb = min(memory_limit_mb, int(limit_bytes / 1048576))
+    return memory_limit_mb
+
+
+def _parse_proc_stat_total_cpu_times(proc_stat_bytes):
+    """
+    Get the cumulative busy time and total time of all CPU cores
+    from the first line of /proc/stat.
+
+    Parameters
+    ----------
+    proc_stat_bytes : bytes or memoryview
+        Content of /proc/stat.
+
+    Returns
+    -------
+    cpu_times : tuple of int
+        The busy time and the total time in jiffies.
+    """
+    proc_stat_bytes = bytes(proc_stat_bytes)
+    first_line = proc_stat_bytes[:proc_stat_bytes.find(b'\n')]
+    time_list = [int(value) for value in first_line.split()[1:9]]
+    total_time = sum(time_list)
+    idle_time = time_list[3] + time_list[4]
+    return total_time - idle_time, total_time
+
+
+def _parse_proc_pid_stat(pid_stat_bytes):
+    """
+    Get the CPU time and the resident pages of the process from the
+    content of /proc/<pid>/stat.
+
+    Parameters
+    ----------
+    pid_stat_bytes : bytes or memoryview
+        Content of /proc/<pid>/stat.
+
+    Returns
+    -------
+    process_time : int
+        The user and system time of the process in clock ticks.
+    rss_pages : int
+        The number of resident pages.
+    """
+    pid_stat_bytes = bytes(pid_stat_bytes)
+    # The command name in parentheses may contain spaces.
+    splited_stat = pid_stat_bytes[pid_stat_bytes.rfind(b')') + 2:].split()
+    process_time = int(splited_stat[11]) + int(splited_stat[12])
+    rss_pages = int(splited_stat[21])
+    return process_time, rss_pages
+
+
+def _parse_proc_pid_stat_ppid(pid_stat_bytes):
+    """
+    Get the ID of the parent process from the content of
+    /proc/<pid>/stat.
+
+    Parameters
+    ----------
+    pid_stat_bytes : bytes or memoryview
+        Content of /proc/<pid>/stat.
+
+    Returns
+    -------
+    ppid : int
+        ID of the parent process.
+    """
+    pid_stat_bytes = bytes(pid_stat_bytes)
+    splited_stat = pid_stat_bytes[pid_stat_bytes.rfind(b')') + 2:].split()
+    ppid = int(splited_stat[1])
+    return ppid
+
+
+def _parse_proc_pid_stat_process_tree(pid_stat_bytes):
+    """
+    Get the name, the CPU time and the number of the threads of the
+    process from the content of /proc/<pid>/stat.
+
+    Parameters
+    ----------
+    pid_stat_bytes : bytes or memoryview
+        Content of /proc/<pid>/stat.
+
+    Returns
+    -------
+    process_name : str
+        The command name of the process (e.g., 'python').
+    process_time : int
+        The user and system time of the process in clock ticks.
+    thread_num : int
+        The number of the threads of the process.
+    """
+    pid_stat_bytes = bytes(pid_stat_bytes)
+    name_end_idx = pid_stat_bytes.rfind(b')')
+    process_name = pid_stat_bytes[
+        pid_stat_bytes.find(b'(') + 1:name_end_idx].decode(
+            errors='replace')
+    splited_stat = pid_stat_bytes[name_end_idx + 2:].split()
+    process_time = int(splited_stat[11]) + int(splited_stat[12])
+    thread_num = int(splited_stat[17])
+    return process_name, process_time, thread_num
+
+
+def _parse_proc_pid_status_ctxt_switches(pid_status_bytes):
+    """
+    Get the numbers of the context switches of the process from the
+    content of /proc/<pid>/status.
+
+    Parameters
+    ----------
+    pid_status_bytes : bytes or memoryview
+        Content of /proc/<pid>/status.
+
+    Returns
+    -------
+    voluntary_ctxt_switches : int
+        The number of the voluntary context switches (e.g., waiting
+        for IO or a lock).
+    nonvoluntary_ctxt_switches : int
+        The number of the involuntary context switches (preempted by
+        the scheduler, e.g., by too many runnable threads).
+    """
+    ctxt_switches_dict = {
+        b'voluntary_ctxt_switches:': 0, b'nonvoluntary_ctxt_switches:': 0}
+    for line_bytes in bytes(pid_status_bytes).split(b'\n'):
+        splited_line = line_bytes.split()
+        if len(splited_line) != 2 \
+                or splited_line[0] not in ctxt_switches_dict:
+            continue
+        ctxt_switches_dict[splited_line[0]] = int(splited_line[1])
+    return (
+        ctxt_switches_dict[b'voluntary_ctxt_switches:'],
+        ctxt_switches_dict[b'nonvoluntary_ctxt_switches:'])
+
+
+def _get_pressure_column_name(resource_name, kind):
+    """
+    Get the name of the column of the pressure stall information.
+
+    Parameters
+    ----------
+    resource_name : str
+        One of 'cpu', 'memory' and 'io'.
+    kind : str
+        'some' (some tasks were stalled) or 'full' (all non-idle
+        tasks were stalled).
+
+    Returns
+    -------
+    column_name : str
+        The column name. e.g., 'memory pressure some (%)'
+    """
+    return COLUMN_NAME_PRESSURE_FORMAT.format(
+        resource_name=resource_name, kind=kind)
+
+
+def _parse_pressure_avg10(pressure_bytes):
+    """
+    Get the 10 seconds averages from the content of a pressure file
+    (/proc/pressure/<resource> or <cgroup>/<resource>.pressure).
+
+    Parameters
+    ----------
+    pressure_bytes : bytes or memoryview
+        Content of the file.
+        e.g., b'some avg10=3.49 avg60=2.43 avg300=2.18 total=70239596'
+
+    Returns
+    -------
+    avg10_dict : dict
+        A dictionary that stores 'some' or 'full' in key and the
+        percentage in value. The full line is omitted if it does not
+        exist (the cpu file before Linux 5.13).
+    """
+    avg10_dict = {}
+    for line_bytes in bytes(pressure_bytes).split(b'\n'):
+        splited_line = line_bytes.split()
+        if len(splited_line) < 2 or not splited_line[1].startswith(
+                b'avg10='):
+            continue
+        avg10_dict[splited_line[0].decode()] = float(splited_line[1][6:])
+    return avg10_dict
+
+
+def _get_percentile(sorted_value_list, percentile):
+    """
+    Get the percentile of the values by the nearest-rank method.
+
+    Parameters
+    ----------
+    sorted_value_list : list of float
+        The values sorted in ascending order. It must not be empty.
+    percentile : int or float
+        The percentile (0 to 100).
+
+    Returns
+    -------
+    value : float
+        The smallest value of which at least `percentile` percent of
+        the values are less than or equal.
+    """
+    rank = math.ceil(percentile / 100 * len(sorted_value_list))
+    return sorted_value_list[max(rank, 1) - 1]
+
+
+_SMAPS_KEY_DICT = {
+    b'Rss:': 'rss',
+    b'Pss:': 'pss',
+    b'Private_Clean:': 'uss',
+    b'Private_Dirty:': 'uss',
+}
+
+
+def _parse_smaps_kb(smaps_bytes):
+    """
+    Get the RSS, PSS and USS of the process from the content of
+    /proc/<pid>/smaps_rollup (or /proc/<pid>/smaps, whose values of
+    the mappings are summed up).
+
+    Parameters
+    ----------
+    smaps_bytes : bytes or memoryview
+        Content of /proc/<pid>/smaps_rollup.
+
+    Returns
+    -------
+    smaps_kb_dict : dict
+        A dictionary with the rss, pss and uss keys (in kilobytes).
+        The USS is the sum of the private clean and dirty pages.
+    """
+    smaps_kb_dict = {'rss': 0, 'pss': 0, 'uss': 0}
+    for line_bytes in bytes(smaps_bytes).split(b'\n'):
+        splited_line = line_bytes.split()
+        if len(splited_line) != 3:
+            continue
+        key = _SMAPS_KEY_DICT.get(splited_line[0])
+        if key is None:
+            continue
+        smaps_kb_dict[key] += int(splited_line[1])
+    return smaps_kb_dict
+
+
+def _get_whole_disk_name_list(device_name_list, sys_block_dir):
+    """
+    Get the names of the whole disks, excluding partitions, loop
+    devices and ram disks.
+
+    Parameters
+    ----------
+    device_name_list : list of str
+        Names of all devices of /proc/diskstats.
+    sys_block_dir : str
+        Directory listing the block devices. If it does not exist,
+        the partitions are not excluded.
+
+    Returns
+    -------
+    whole_disk_name_list : list of str
+        A list of device names.
+    """
+    block_device_name_list = None
+    if os.path.isdir(sys_block_dir):
+        block_device_name_list = os.listdir(sys_block_dir)
+    whole_disk_name_list = []
+    for device_name in device_name_list:
+        if device_name.startswith(('loop', 'ram')):
+            continue
+        if block_device_name_list is not None \
+                and device_name not in block_device_name_list:
+            continue
+        whole_disk_name_list.append(device_name)
+    return whole_disk_name_list
+
+
+def _parse_proc_net_dev(net_dev_str):
+    """
+    Get the cumulative received and sent bytes of each interface
+    from the content of /proc/net/dev.
+
+    Parameters
+    ----------
+    net_dev_str : str
+        Content of /proc/net/dev.
+
+    Returns
+    -------
+    net_dev_dict : dict
+        A dictionary that stores the interface name in key and the
+        dictionary with receive_bytes and send_bytes keys in value.
+    """
+    net_dev_dict = {}
+    for line_str in net_dev_str.split('\n'):
+        if ':' not in line_str:
+            continue
+        interface_name, value_str = line_str.split(':', 1)
+        value_list = value_str.split()
+        if len(value_list) < 9:
+            continue
+        net_dev_dict[interface_name.strip()] = {
+            'receive_bytes': int(value_list[0]),
+            'send_bytes': int(value_list[8]),
+        }
+    return net_dev_dict
+
+
+def _update_gpu_disabled_bool():
+    """
+    Updates the boolean value of whether gpu stats is disabled.
+    When Linux environment and gpu stats are installed, and GPU
+    can not be detected, True will be set to that boolean.
+
+    Returns
+    -------
+    command_result : str
+        The result string of the executed gpustat command. An empty
+        string is returned if gpu stats is disabled.
+    """
+    global is_gpu_stats_disabled
+    try:
+        command_result = _exec_gpustat_command()
+    except Exception:
+        is_gpu_stats_disabled = True
+        command_result = ''
+    return command_result
+
+
+def _get_gpu_memory_usage(gpu_idx, command_result=None):
+    """
+    Get the GPU memory usage of the specified index.
+
+    Parameters
+    ----------
+    gpu_idx : int
+        Index of target GPU (starting from zero).
+    command_result : str or None, default None
+        The result string of the gpustat command. If None, the
+        command is executed.
+
+    Returns
+    -------
+    gpu_memory_usage_mb : int
+        GPU memory usage in megabytes.
+    """
+    target_line_str = _get_gpustat_line_str_by_gpu_idx(
+        gpu_idx=gpu_idx, command_result=command_result
+    )
+    gpu_memory_str = target_line_str.split('|')[2]
+    gpu_memory_str = gpu_memory_str.split('/')[0]
+    gpu_memory_str = gpu_memory_str.strip()
+    gpu_memory_usage_mb = int(gpu_memory_str)
+    return gpu_memory_usage_mb
+
+
+_GPUSTAT_TEMPERATURE_PATTERN = re.compile(r"(\d+)'C")
+_GPUSTAT_UTILIZATION_PATTERN = re.compile(r'(\d+) %')
+_GPUSTAT_POWER_PATTERN = re.compile(r'(\d+) / (\d+) W')
+_GPUSTAT_MEMORY_PATTERN = re.compile(r'(\d+) / (\d+) MB')
+_GPUSTAT_PROCESS_PATTERN = re.compile(
+    r'(?:(\S+?):)?([^\s/]+)/(\d+)\((\d+)M\)')
+
+
+def _parse_gpustat_line(line_str):
+    """
+    Get the values of the GPU from the line of the result of the
+    gpustat command.
+
+    Parameters
+    ----------
+    line_str : str
+        The line of the GPU. e.g.,
+        "[0] Tesla K80 | 45'C,  87 %,  120 / 149 W |  3010 / 11441 MB | root:python/1234(2998M)"
+
+    Returns
+    -------
+    gpu_dict : dict
+        A dictionary with the following keys. The values not shown in
+        the line (e.g., the power without the --show-power option, or
+        the temperature of some GPUs shown as ??) are None.
+        - temperature_c : int or None
+        - utilization_percent : int or None
+        - power_draw_w : int or None
+        - power_limit_w : int or None
+        - memory_used_mb : int
+        - memory_total_mb : int
+        - process_list : list of dicts with the username, command,
+          pid and memory_mb keys (the processes shown without the
+          process ID are omitted).
+    """
+    splited_line = line_str.split('|')
+    gpu_dict = {
+        'temperature_c': None,
+        'utilization_percent': None,
+        'power_draw_w': None,
+        'power_limit_w': None,
+    }
+    match = _GPUSTAT_TEMPERATURE_PATTERN.search(splited_line[1])
+    if match is not None:
+        gpu_dict['temperature_c'] = int(match.group(1))
+    match = _GPUSTAT_UTILIZATION_PATTERN.search(splited_line[1])
+    if match is not None:
+        gpu_dict['utilization_percent'] = int(match.group(1))
+    match = _GPUSTAT_POWER_PATTERN.search(splited_line[1])
+    if match is not None:
+        gpu_dict['power_draw_w'] = int(match.group(1))
+        gpu_dict['power_limit_w'] = int(match.group(2))
+    match = _GPUSTAT_MEMORY_PATTERN.search(splited_line[2])
+    gpu_dict['memory_used_mb'] = int(match.group(1))
+    gpu_dict['memory_total_mb'] = int(match.group(2))
+    process_str = '|'.join(splited_line[3:])
+    gpu_dict['process_list'] = [
+        {
+            'username': username or '',
+            'command': command,
+            'pid': int(pid_str),
+            'memory_mb': int(memory_mb_str),
+        }
+        for username, command, pid_str, memory_mb_str
+        in _GPUSTAT_PROCESS_PATTERN.findall(process_str)]
+    return gpu_dict
+
+
+def get_gpu_process_list(command_result=None):
+    """
+    Get the processes using the GPUs.
+
+    Parameters
+    ----------
+    command_result : str or None, default None
+        The result string of the gpustat command. If None, the
+        command is executed.
+
+    Returns
+    -------
+    gpu_process_list : list of dicts
+        A dictionary per process and GPU with the gpu_idx, pid,
+        username, command and memory_mb keys. Empty if no GPU is
+        available.
+    """
+    if command_result is None:
+        command_result = _exec_gpustat_command()
+    gpu_process_list = []
+    for gpu_idx in range(_get_gpu_num(command_result=command_result)):
+        gpu_dict = _parse_gpustat_line(
+            line_str=_get_gpustat_line_str_by_gpu_idx(
+                gpu_idx=gpu_idx, command_result=command_result))
+        for process_dict in gpu_dict['process_list']:
+            gpu_process_dict = {'gpu_idx': gpu_idx}
+            gpu_process_dict.update(process_dict)
+            gpu_process_list.append(gpu_process_dict)
+    return gpu_process_list
+
+
+def _get_gpu_memory_total(gpu_idx, command_result=None):
+    """
+    Get the total memory of the GPU of the specified index.
+
+    Parameters
+    ----------
+    gpu_idx : int
+        Index of target GPU (starting from zero).
+    command_result : str or None, default None
+        The result string of the gpustat command. If None, the
+        command is executed.
+
+    Returns
+    -------
+    gpu_memory_total_mb : int
+        The total memory of the GPU in megabytes.
+    """
+    target_line_str = _get_gpustat_line_str_by_gpu_idx(
+        gpu_idx=gpu_idx, command_result=command_result)
+    gpu_memory_str = target_line_str.split('|')[2]
+    gpu_memory_str = gpu_memory_str.split('/')[1]
+    gpu_memory_str = gpu_memory_str.replace('MB', '').strip()
+    gpu_memory_total_mb = int(gpu_memory_str)
+    return gpu_memory_total_mb
+
+
+def _get_gpustat_line_str_by_gpu_idx(gpu_idx, command_result=None):
+    """
+    Gets the command result string at the specified GPU index.
+
+    Parameters
+    ----------
+    gpu_idx : int
+        Index of target GPU (starting from zero).
+    command_result : str or None, default None
+        The result string of the gpustat command. If None, the
+        command is executed.
+
+    Returns
+    -------
+    target_line_str
+        The command result string at the specified GPU index.
+    """
+    if command_result is None:
+        command_result = _exec_gpustat_command()
+    target_line_str = command_result.split('\n')[gpu_idx + 1]
+    return target_line_str
+
+
+def _get_disk_usage(path='./'):
+    """
+    Get disk usage.
+
+    Parameters
+    ----------
+    path : str, default './'
+        Path on the target disk.
+
+    Returns
+    -------
+    disk_usage_gb : float
+        Disk usage in gigabytes.
+    """
+    disk_usage = psutil.disk_usage(path)
+    disk_usage_gb = round(disk_usage.used / (1024.0 ** 3), 2)
+    return disk_usage_gb
+
+
+def _get_memory_usage():
+    """
+    Get current memory usage (rss total).
+
+    Returns
+    -------
+    memory_usage : int
+        Memory consumption in megabytes.
+    """
+    memory_usage = 0
+    for process in psutil.process_iter():
+        try:
+            memory_usage += process.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            # The process has exited while iterating.
+            continue
+    memory_usage = int(memory_usage / 1048576)
+    return memory_usage
+
+
+def _get_gpu_num(command_result=None):
+    """
+    Get the number of GPUs.
+
+    Parameters
+    ----------
+    command_result : str or None, default None
+        The result string of the gpustat command. If None, the
+        command is executed.
+
+    Returns
+    -------
+    gpu_num : int
+        The number of GPUs. 0 is returned under the following
+        conditions.
+        - The gpustat library is not installed.
+        - In an environment without GPU.
+        - Environment such as windows.
+    """
+    if command_result is None:
+        command_result = _exec_gpustat_command()
+    if not command_result:
+        return 0
+    is_in = 'Error' in command_result
+    if is_in:
+        return 0
+    gpu_num = 0
+    splited_command_result = command_result.split('\n')
+    for i, unit_line_gpu_str in enumerate(splited_command_result):
+        if i == 0:
+            # Ignore the heading line.
+            continue
+        if unit_line_gpu_str == '':
+            continue
+        gpu_num += 1
+    return gpu_num
+
+
+def _exec_gpustat_command():
+    """
+    Execute the command of the gpustat library and obtain the result.
+
+    Returns
+    -------
+    command_result : str
+        String of command execution result. The string changes
+        under each condition as follows.
+        - If gpustat is disabled: An empty character will be returned.
+        - If there is no GPU: 'Error on querying NVIDIA devices. Use --debug flag for details'
+        - If GPU exists more than one: '28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 %,   58 / 149 W |     0 / 11441 MB |\n[1] Tesla K80        | 31'C,   0 %,   57 / 149 W |     0 / 11441 MB |\n'
+    """
+    global is_gpu_stats_disabled
+    if is_gpu_stats_disabled:
+        return ''
+    command_result = sp.check_output(GPUSTAT_COMMAND_LIST).decode('utf-8')
+    return command_result
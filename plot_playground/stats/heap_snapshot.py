@@ -0,0 +1,289 @@
+"""
+Module of the tracemalloc snapshots of the kernel for the heap
+metric. A thread of the kernel takes a snapshot of the Python heap at
+a low frequency and compares it with the previous one, and the
+allocation sites that grew most are saved to the heap log drawn under
+the panels of the plot.
+
+Notes
+-----
+tracemalloc slows down the allocations of the kernel and keeps a
+trace of each allocated block, so the number of the frames of the
+traces is bounded (1 by default) and tracemalloc is stopped when the
+snapshots are stopped (if it was not started by the user). The cost
+of each snapshot and the memory used by tracemalloc are sent to the
+collector to be plotted.
+"""
+
+import csv
+import os
+import threading
+import time
+import tracemalloc
+
+HEAP_LOG_FILE_NAME = 'log_linux_stats_plot_heap.csv'
+HEAP_COLUMN_LIST = [
+    'timestamp', 'site', 'size_diff_kb', 'size_kb', 'count_diff', 'count']
+STOP_TIMEOUT_SECONDS = 5
+_SITE_PATH_PART_NUM = 2
+_EXCLUDED_FILE_PATTERN_LIST = [
+    tracemalloc.__file__, '<frozen importlib._bootstrap>',
+    '<frozen importlib._bootstrap_external>', '<unknown>']
+
+
+def get_heap_log_file_path(log_dir_path):
+    """
+    Get the path of the log file of the growing allocation sites.
+
+    Parameters
+    ----------
+    log_dir_path : str
+        Directory where the log is saved.
+
+    Returns
+    -------
+    heap_log_file_path : str
+        The path of the log file.
+    """
+    return os.path.join(log_dir_path, HEAP_LOG_FILE_NAME)
+
+
+def load_heap_growth(log_dir_path):
+    """
+    Load the allocation sites that grew most between the last two
+    snapshots.
+
+    Parameters
+    ----------
+    log_dir_path : str
+        Directory where the log is saved.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        DataFrame that has the columns of HEAP_COLUMN_LIST, a row per
+        site in descending order of the growth. Empty until the
+        second snapshot has been taken.
+    """
+    import pandas as pd
+    heap_log_file_path = get_heap_log_file_path(log_dir_path=log_dir_path)
+    if not os.path.exists(heap_log_file_path):
+        return pd.DataFrame(columns=HEAP_COLUMN_LIST)
+    return pd.read_csv(heap_log_file_path)
+
+
+def _format_frame(frame):
+    """
+    Get the text of the frame of the allocation site.
+
+    Parameters
+    ----------
+    frame : tracemalloc.Frame
+        The frame.
+
+    Returns
+    -------
+    frame_str : str
+        The last path parts of the file and the line number.
+        e.g., 'pandas/core/frame.py:123'
+    """
+    path_part_list = frame.filename.replace('\\', '/').split('/')
+    file_path = '/'.join(path_part_list[-_SITE_PATH_PART_NUM:])
+    return '%s:%d' % (file_path, frame.lineno)
+
+
+def get_growth_list(snapshot, previous_snapshot, frame_num, top_num):
+    """
+    Get the allocation sites that grew most between the snapshots.
+
+    Parameters
+    ----------
+    snapshot : tracemalloc.Snapshot
+        The current snapshot.
+    previous_snapshot : tracemalloc.Snapshot
+        The previous snapshot.
+    frame_num : int
+        The number of the frames of the traces. If it is more than
+        one, the sites are grouped by the whole traceback.
+    top_num : int
+        The maximum number of the sites.
+
+    Returns
+    -------
+    growth_list : list of dicts
+        The sites that grew, in descending order of the growth. Each
+        dictionary has the site, size_diff_kb, size_kb, count_diff and
+        count keys. The frames of the traceback are joined by ' <- '
+        from the most recent one.
+    """
+    key_type = 'lineno' if frame_num == 1 else 'traceback'
+    stat_diff_list = snapshot.compare_to(
+        old_snapshot=previous_snapshot, key_type=key_type)
+    stat_diff_list = [
+        stat_diff for stat_diff in stat_diff_list if stat_diff.size_diff > 0]
+    stat_diff_list.sort(
+        key=lambda stat_diff: stat_diff.size_diff, reverse=True)
+    growth_list = []
+    for stat_diff in stat_diff_list[:top_num]:
+        growth_list.append({
+            'site': ' <- '.join(
+                _format_frame(frame=frame)
+                for frame in reversed(stat_diff.traceback)),
+            'size_diff_kb': round(stat_diff.size_diff / 1024, 1),
+            'size_kb': round(stat_diff.size / 1024, 1),
+            'count_diff': stat_diff.count_diff,
+            'count': stat_diff.count,
+        })
+    return growth_list
+
+
+def _save_growth_csv(timestamp, growth_list, heap_log_file_path):
+    """
+    Save the growing sites to the heap log. The file is replaced
+    atomically so that the browser does not read a partially written
+    file.
+
+    Parameters
+    ----------
+    timestamp : float
+        UNIX time in seconds of the snapshot.
+    growth_list : list of dicts
+        The sites returned by the get_growth_list function.
+    heap_log_file_path : str
+        The path of the log file.
+    """
+    tmp_file_path = heap_log_file_path + '.tmp'
+    with open(tmp_file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEAP_COLUMN_LIST)
+        for growth_dict in growth_list:
+            writer.writerow(
+                [timestamp] + [
+                    growth_dict[column_name]
+                    for column_name in HEAP_COLUMN_LIST[1:]])
+    os.replace(tmp_file_path, heap_log_file_path)
+
+
+class HeapSnapshotter():
+
+    def __init__(
+            self, send_heap, log_dir_path, snapshot_interval_seconds,
+            frame_num, top_num):
+        """
+        Class of the thread that takes the tracemalloc snapshots of
+        the kernel.
+
+        Parameters
+        ----------
+        send_heap : function
+            Function called from the thread with the dictionary of the
+            heap values after each snapshot (e.g., to send it to the
+            collector). The dictionary has the traced_mb,
+            tracemalloc_mb and snapshot_seconds keys.
+        log_dir_path : str
+            Directory where the heap log is saved.
+        snapshot_interval_seconds : int or float
+            Interval in seconds at which the snapshot is taken.
+        frame_num : int
+            The number of the frames stored in the traces.
+        top_num : int
+            The number of the growing sites saved to the heap log.
+        """
+        self.send_heap = send_heap
+        self.log_dir_path = log_dir_path
+        self.snapshot_interval_seconds = snapshot_interval_seconds
+        self.frame_num = frame_num
+        self.top_num = top_num
+        self.is_tracing_started = False
+        self.previous_snapshot = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start tracing the allocations (if not traced yet) and the
+        snapshot thread.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frame_num)
+            self.is_tracing_started = True
+        else:
+            self.frame_num = tracemalloc.get_traceback_limit()
+        os.makedirs(self.log_dir_path, exist_ok=True)
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def is_alive(self):
+        """
+        Get whether the snapshot thread is running.
+
+        Returns
+        -------
+        is_alive : bool
+            True if the thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=STOP_TIMEOUT_SECONDS):
+        """
+        Stop the snapshot thread, and stop tracing the allocations if
+        it has been started by this instance.
+
+        Parameters
+        ----------
+        timeout : int or float, default STOP_TIMEOUT_SECONDS
+            Seconds to wait for the thread to exit.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self.previous_snapshot = None
+        if self.is_tracing_started:
+            tracemalloc.stop()
+            self.is_tracing_started = False
+
+    def take_snapshot(self):
+        """
+        Take the snapshot, save the sites grown since the previous
+        snapshot to the heap log and send the heap values.
+
+        Returns
+        -------
+        growth_list : list of dicts or None
+            The sites returned by the get_growth_list function. None
+            at the first snapshot or if tracing has been stopped.
+        """
+        if not tracemalloc.is_tracing():
+            return None
+        start_time = time.perf_counter()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(
+                inclusive=False, filename_pattern=filename_pattern)
+            for filename_pattern in _EXCLUDED_FILE_PATTERN_LIST])
+        growth_list = None
+        if self.previous_snapshot is not None:
+            growth_list = get_growth_list(
+                snapshot=snapshot, previous_snapshot=self.previous_snapshot,
+                frame_num=self.frame_num, top_num=self.top_num)
+            _save_growth_csv(
+                timestamp=round(time.time(), 3), growth_list=growth_list,
+                heap_log_file_path=get_heap_log_file_path(
+                    log_dir_path=self.log_dir_path))
+        self.previous_snapshot = snapshot
+        traced_bytes, _ = tracemalloc.get_traced_memory()
+        self.send_heap({
+            'traced_mb': round(traced_bytes / 1048576, 2),
+            'tracemalloc_mb': round(
+                tracemalloc.get_tracemalloc_memory() / 1048576, 2),
+            'snapshot_seconds': time.perf_counter() - start_time,
+        })
+        return growth_list
+
+    def _run(self):
+        """
+        Loop of the snapshot thread.
+        """
+        while not self._stop_event.wait(
+                timeout=self.snapshot_interval_seconds):
+            self.take_snapshot()
@@ -0,0 +1,474 @@
+"""
+Module of the bounded multi-resolution history of the stats samples.
+The raw samples are kept for a short time, and older data is kept as
+min / mean / max rollups of coarser resolutions. Each tier is a ring
+buffer backed by preallocated arrays, so memory usage is constant no
+matter how long the kernel runs.
+"""
+
+import math
+
+import numpy as np
+
+TIER_NAME_RAW = 'raw'
+DEFAULT_TIER_SETTING_LIST = [
+    {'name': TIER_NAME_RAW, 'resolution_seconds': 0,
+     'retention_seconds': 600},
+    {'name': '10s', 'resolution_seconds': 10,
+     'retention_seconds': 3 * 60 * 60},
+    {'name': '1min', 'resolution_seconds': 60,
+     'retention_seconds': 3 * 24 * 60 * 60},
+]
+MIN_COLUMN_NAME_FORMAT = '{column_name} (min)'
+MAX_COLUMN_NAME_FORMAT = '{column_name} (max)'
+
+
+class RingBuffer():
+
+    def __init__(self, capacity, column_num):
+        """
+        Ring buffer of rows of a timestamp and float values. When it
+        is full, the oldest row is overwritten.
+
+        Parameters
+        ----------
+        capacity : int
+            Maximum number of rows.
+        column_num : int
+            Number of value columns (excluding the timestamp).
+        """
+        self.capacity = capacity
+        self.timestamp_array = np.full(capacity, np.nan)
+        self.value_array = np.full((capacity, column_num), np.nan)
+        self.next_idx = 0
+        self.size = 0
+
+    def append(self, timestamp, value_array):
+        """
+        Append a row.
+
+        Parameters
+        ----------
+        timestamp : float
+            Timestamp of the row (UNIX time in seconds).
+        value_array : numpy.ndarray
+            Values of the row. Missing values are NaN.
+        """
+        self.timestamp_array[self.next_idx] = timestamp
+        self.value_array[self.next_idx] = value_array
+        self.next_idx = (self.next_idx + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def get_arrays(self, start_timestamp=None):
+        """
+        Get the rows in chronological order.
+
+        Parameters
+        ----------
+        start_timestamp : float or None, default None
+            If specified, only the rows at or after this timestamp
+            are returned.
+
+        Returns
+        -------
+        timestamp_array : numpy.ndarray
+            Timestamps of the rows.
+        value_array : numpy.ndarray
+            2-dimensional array of the values of the rows.
+        """
+        if self.size < self.capacity:
+            idx_array = np.arange(0, self.size)
+        else:
+            idx_array = np.arange(
+                self.next_idx, self.next_idx + self.capacity) \
+                % self.capacity
+        timestamp_array = self.timestamp_array[idx_array]
+        value_array = self.value_array[idx_array]
+        if start_timestamp is not None:
+            is_target_array = timestamp_array >= start_timestamp
+            timestamp_array = timestamp_array[is_target_array]
+            value_array = value_array[is_target_array]
+        return timestamp_array, value_array
+
+    def copy_rows(self, capacity, column_num, column_idx_array):
+        """
+        Make a new ring buffer having the rows of this buffer. This is
+        used to change the capacity or the columns.
+
+        Parameters
+        ----------
+        capacity : int
+            Maximum number of rows of the new buffer. If it is smaller
+            than the number of rows, the oldest rows are dropped.
+        column_num : int
+            Number of value columns of the new buffer.
+        column_idx_array : numpy.ndarray
+            Indexes of the new columns in which the current columns
+            are stored. The other columns are NaN.
+
+        Returns
+        -------
+        ring_buffer : RingBuffer
+            The new ring buffer.
+        """
+        ring_buffer = RingBuffer(capacity=capacity, column_num=column_num)
+        timestamp_array, value_array = self.get_arrays()
+        timestamp_array = timestamp_array[-capacity:]
+        value_array = value_array[-capacity:]
+        row_num = len(timestamp_array)
+        ring_buffer.timestamp_array[:row_num] = timestamp_array
+        ring_buffer.value_array[:row_num, column_idx_array] = value_array
+        ring_buffer.next_idx = row_num % capacity
+        ring_buffer.size = row_num
+        return ring_buffer
+
+    def get_last_timestamp(self):
+        """
+        Get the timestamp of the latest row.
+
+        Returns
+        -------
+        timestamp : float or None
+            The timestamp. None if there is no row.
+        """
+        if self.size == 0:
+            return None
+        return self.timestamp_array[self.next_idx - 1]
+
+
+class RollupTier():
+
+    def __init__(self, name, resolution_seconds, capacity, column_num):
+        """
+        Tier that aggregates the samples into buckets of a fixed
+        resolution and keeps the min, mean and max of each bucket.
+
+        Parameters
+        ----------
+        name : str
+            Name of the tier.
+        resolution_seconds : int or float
+            Length of a bucket in seconds.
+        capacity : int
+            Maximum number of buckets to keep.
+        column_num : int
+            Number of value columns.
+        """
+        self.name = name
+        self.resolution_seconds = resolution_seconds
+        self.column_num = column_num
+        self.ring_buffer = RingBuffer(
+            capacity=capacity, column_num=column_num * 3)
+        self.bucket_idx = None
+        self._reset_bucket()
+
+    def _reset_bucket(self):
+        """
+        Reset the aggregation values of the current bucket.
+        """
+        self.min_array = np.full(self.column_num, np.inf)
+        self.max_array = np.full(self.column_num, -np.inf)
+        self.sum_array = np.zeros(self.column_num)
+        self.count_array = np.zeros(self.column_num)
+
+    def add(self, timestamp, value_array):
+        """
+        Add a sample. When the sample belongs to a new bucket, the
+        previous bucket is stored in the ring buffer.
+
+        Parameters
+        ----------
+        timestamp : float
+            Timestamp of the sample.
+        value_array : numpy.ndarray
+            Values of the sample. Missing values are NaN.
+
+        Returns
+        -------
+        is_stored : bool
+            True if a bucket has been stored by this call.
+        """
+        bucket_idx = math.floor(timestamp / self.resolution_seconds)
+        is_stored = False
+        if self.bucket_idx is not None and bucket_idx != self.bucket_idx:
+            self.flush()
+            is_stored = True
+        self.bucket_idx = bucket_idx
+        is_sampled_array = ~np.isnan(value_array)
+        sampled_value_array = value_array[is_sampled_array]
+        self.min_array[is_sampled_array] = np.minimum(
+            self.min_array[is_sampled_array], sampled_value_array)
+        self.max_array[is_sampled_array] = np.maximum(
+            self.max_array[is_sampled_array], sampled_value_array)
+        self.sum_array[is_sampled_array] += sampled_value_array
+        self.count_array[is_sampled_array] += 1
+        return is_stored
+
+    def set_column_num(self, column_num, column_idx_array):
+        """
+        Change the value columns. The stored buckets and the values of
+        the current bucket are kept.
+
+        Parameters
+        ----------
+        column_num : int
+            Number of the new value columns.
+        column_idx_array : numpy.ndarray
+            Indexes of the new columns in which the current columns
+            are stored.
+        """
+        prev_column_num = self.column_num
+        rollup_column_idx_array = np.concatenate([
+            column_idx_array + column_num * i for i in range(3)])
+        self.ring_buffer = self.ring_buffer.copy_rows(
+            capacity=self.ring_buffer.capacity, column_num=column_num * 3,
+            column_idx_array=rollup_column_idx_array)
+        prev_array_list = [
+            self.min_array, self.max_array, self.sum_array,
+            self.count_array]
+        self.column_num = column_num
+        self._reset_bucket()
+        for array, prev_array in zip(
+                [self.min_array, self.max_array, self.sum_array,
+                 self.count_array],
+                prev_array_list):
+            array[column_idx_array] = prev_array[:prev_column_num]
+
+    def flush(self):
+        """
+        Store the current bucket in the ring buffer. The timestamp of
+        the stored row is the start time of the bucket.
+        """
+        if self.bucket_idx is None:
+            return
+        is_sampled_array = self.count_array > 0
+        mean_array = np.full(self.column_num, np.nan)
+        mean_array[is_sampled_array] = \
+            self.sum_array[is_sampled_array] \
+            / self.count_array[is_sampled_array]
+        min_array = np.where(is_sampled_array, self.min_array, np.nan)
+        max_array = np.where(is_sampled_array, self.max_array, np.nan)
+        self.ring_buffer.append(
+            timestamp=self.bucket_idx * self.resolution_seconds,
+            value_array=np.concatenate([mean_array, min_array, max_array]))
+        self.bucket_idx = None
+        self._reset_bucket()
+
+
+class TieredHistory():
+
+    def __init__(
+            self, column_list, row_num_per_second,
+            tier_setting_list=None):
+        """
+        Class that keeps the raw samples and their rollups of each
+        tier.
+
+        Parameters
+        ----------
+        column_list : list of str
+            Value columns (excluding the timestamp).
+        row_num_per_second : float
+            Maximum number of raw rows per second, used to decide the
+            capacity of the raw tier.
+        tier_setting_list : list of dicts or None, default None
+            Settings of the tiers. Each dictionary has name,
+            resolution_seconds and retention_seconds keys. The first
+            tier must be the raw tier (resolution_seconds is 0).
+            If None, DEFAULT_TIER_SETTING_LIST is used.
+        """
+        if tier_setting_list is None:
+            tier_setting_list = DEFAULT_TIER_SETTING_LIST
+        self.column_list = list(column_list)
+        self.column_idx_dict = {
+            column_name: i for i, column_name in enumerate(column_list)}
+        self.tier_setting_list = tier_setting_list
+        raw_tier_setting = tier_setting_list[0]
+        self.raw_retention_seconds = raw_tier_setting['retention_seconds']
+        self.raw_ring_buffer = RingBuffer(
+            capacity=self._get_raw_capacity(
+                row_num_per_second=row_num_per_second),
+            column_num=len(column_list))
+        self.rollup_tier_list = []
+        for tier_setting in tier_setting_list[1:]:
+            capacity = int(math.ceil(
+                tier_setting['retention_seconds']
+                / tier_setting['resolution_seconds']))
+            self.rollup_tier_list.append(
+                RollupTier(
+                    name=tier_setting['name'],
+                    resolution_seconds=tier_setting['resolution_seconds'],
+                    capacity=capacity, column_num=len(column_list)))
+
+    def _get_raw_capacity(self, row_num_per_second):
+        """
+        Get the capacity of the raw tier.
+
+        Parameters
+        ----------
+        row_num_per_second : float
+            Maximum number of raw rows per second.
+
+        Returns
+        -------
+        capacity : int
+            Maximum number of rows of the raw tier.
+        """
+        capacity = int(
+            math.ceil(self.raw_retention_seconds * row_num_per_second)) + 1
+        return capacity
+
+    def update_columns(self, column_list, row_num_per_second):
+        """
+        Update the columns and the capacity of the raw tier when the
+        metrics or their intervals are changed. The kept rows are
+        carried over.
+
+        Parameters
+        ----------
+        column_list : list of str
+            New value columns. The current columns must be included.
+        row_num_per_second : float
+            New maximum number of raw rows per second.
+        """
+        column_idx_array = np.array(
+            [column_list.index(column_name)
+             for column_name in self.column_list],
+            dtype=int)
+        self.raw_ring_buffer = self.raw_ring_buffer.copy_rows(
+            capacity=self._get_raw_capacity(
+                row_num_per_second=row_num_per_second),
+            column_num=len(column_list),
+            column_idx_array=column_idx_array)
+        for rollup_tier in self.rollup_tier_list:
+            rollup_tier.set_column_num(
+                column_num=len(column_list),
+                column_idx_array=column_idx_array)
+        self.column_list = list(column_list)
+        self.column_idx_dict = {
+            column_name: i for i, column_name in enumerate(column_list)}
+
+    def get_rollup_column_list(self):
+        """
+        Get the value columns of the rollup tiers.
+
+        Returns
+        -------
+        rollup_column_list : list of str
+            Mean columns (same names as the raw columns), followed by
+            the min columns and the max columns.
+        """
+        rollup_column_list = list(self.column_list)
+        for column_name_format in (
+                MIN_COLUMN_NAME_FORMAT, MAX_COLUMN_NAME_FORMAT):
+            for column_name in self.column_list:
+                rollup_column_list.append(
+                    column_name_format.format(column_name=column_name))
+        return rollup_column_list
+
+    def append(self, timestamp, row_dict):
+        """
+        Append a raw sample row and add it to each rollup tier.
+
+        Parameters
+        ----------
+        timestamp : float
+            Timestamp of the row.
+        row_dict : dict
+            A dictionary that stores the column name in key and the
+            value in value. Missing columns are treated as NaN and
+            unknown columns are ignored.
+
+        Returns
+        -------
+        stored_tier_name_list : list of str
+            Names of the rollup tiers in which a bucket has been
+            stored by this call.
+        """
+        value_array = np.full(len(self.column_list), np.nan)
+        for column_name, value in row_dict.items():
+            column_idx = self.column_idx_dict.get(column_name)
+            if column_idx is None:
+                continue
+            value_array[column_idx] = value
+        self.raw_ring_buffer.append(
+            timestamp=timestamp, value_array=value_array)
+        stored_tier_name_list = []
+        for rollup_tier in self.rollup_tier_list:
+            is_stored = rollup_tier.add(
+                timestamp=timestamp, value_array=value_array)
+            if is_stored:
+                stored_tier_name_list.append(rollup_tier.name)
+        return stored_tier_name_list
+
+    def get_tier_names(self):
+        """
+        Get the names of all tiers.
+
+        Returns
+        -------
+        tier_name_list : list of str
+            Names of the tiers in the order of resolution.
+        """
+        return [
+            tier_setting['name'] for tier_setting
+            in self.tier_setting_list]
+
+    def get_tier_arrays(self, tier_name, start_timestamp=None):
+        """
+        Get the rows of the specified tier.
+
+        Parameters
+        ----------
+        tier_name : str
+            Name of the tier.
+        start_timestamp : float or None, default None
+            If specified, only the rows at or after this timestamp
+            are returned.
+
+        Returns
+        -------
+        timestamp_array : numpy.ndarray
+            Timestamps of the rows.
+        value_array : numpy.ndarray
+            2-dimensional array of the values. For the rollup tiers,
+            the columns are in the order of get_rollup_column_list.
+
+        Raises
+        ------
+        ValueError
+            If the tier does not exist.
+        """
+        if tier_name == self.tier_setting_list[0]['name']:
+            return self.raw_ring_buffer.get_arrays(
+                start_timestamp=start_timestamp)
+        for rollup_tier in self.rollup_tier_list:
+            if rollup_tier.name != tier_name:
+                continue
+            return rollup_tier.ring_buffer.get_arrays(
+                start_timestamp=start_timestamp)
+        err_msg = 'The tier does not exist: %s' % tier_name
+        raise ValueError(err_msg)
+
+
+def select_tier_name(tier_setting_list, window_seconds):
+    """
+    Select the finest tier that keeps the specified time window.
+
+    Parameters
+    ----------
+    tier_setting_list : list of dicts
+        Settings of the tiers in the order of resolution.
+    window_seconds : int or float
+        Seconds of the time window to display.
+
+    Returns
+    -------
+    tier_name : str
+        Name of the selected tier. If no tier keeps the window, the
+        coarsest tier is returned.
+    """
+    for tier_setting in tier_setting_list:
+        if tier_setting['retention_seconds'] >= window_seconds:
+            return tier_setting['name']
+    return tier_setting_list[-1]['name']
@@ -0,0 +1,281 @@
+"""
+Module of the persistent store of the stats samples. The samples are
+saved in a local SQLite database by the collector so that they can be
+analyzed after the kernel has died (e.g., by out of memory).
+
+Notes
+-----
+The samples are saved in the long format (one record per timestamp
+and column) since each metric is sampled at its own interval and the
+columns may change between sessions. Inserts are batched, and the
+records older than the retention period are deleted periodically.
+pandas is imported only when the history is loaded, to keep the
+collector process slim.
+"""
+
+import datetime
+import os
+import sqlite3
+import time
+
+DEFAULT_RETENTION_SECONDS = 3 * 24 * 60 * 60
+COLUMN_NAME_TIMESTAMP = 'timestamp'
+
+_CREATE_TABLE_SQL_LIST = [
+    """
+    CREATE TABLE IF NOT EXISTS stats_column (
+        column_id INTEGER PRIMARY KEY,
+        metric_name TEXT NOT NULL,
+        column_name TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stats_sample (
+        timestamp REAL NOT NULL,
+        column_id INTEGER NOT NULL,
+        value REAL NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS stats_sample_timestamp_idx
+    ON stats_sample (timestamp)
+    """,
+]
+
+
+class SQLiteHistoryStore():
+
+    def __init__(
+            self, db_path, retention_seconds=DEFAULT_RETENTION_SECONDS,
+            clock=time.time):
+        """
+        Class that saves the sample rows to the SQLite database.
+
+        Parameters
+        ----------
+        db_path : str
+            Path of the database file. It is created if it does not
+            exist.
+        retention_seconds : int or float, default 3 days
+            Seconds for which the samples are kept.
+        clock : function, default time.time
+            Function that returns the current UNIX time in seconds,
+            used to decide the expired samples. It is replaced in
+            tests.
+        """
+        self.db_path = db_path
+        self.retention_seconds = retention_seconds
+        self.clock = clock
+        self.connection = _connect(db_path=db_path)
+        with self.connection:
+            for create_table_sql in _CREATE_TABLE_SQL_LIST:
+                self.connection.execute(create_table_sql)
+        self.column_id_dict = {
+            column_name: column_id for column_id, column_name
+            in self.connection.execute(
+                'SELECT column_id, column_name FROM stats_column')}
+        self.pending_record_list = []
+
+    def register_columns(self, column_metric_dict):
+        """
+        Register the columns to save. Rows of unregistered columns are
+        ignored.
+
+        Parameters
+        ----------
+        column_metric_dict : dict
+            A dictionary that stores the column name in key and the
+            metric name in value.
+        """
+        with self.connection:
+            for column_name, metric_name in column_metric_dict.items():
+                if column_name in self.column_id_dict:
+                    continue
+                cursor = self.connection.execute(
+                    'INSERT INTO stats_column (metric_name, column_name) '
+                    'VALUES (?, ?)',
+                    (metric_name, column_name))
+                self.column_id_dict[column_name] = cursor.lastrowid
+
+    def add_row(self, timestamp, row_dict):
+        """
+        Add a sample row. It is saved to the database by the flush
+        method.
+
+        Parameters
+        ----------
+        timestamp : float
+            Timestamp of the row (UNIX time in seconds).
+        row_dict : dict
+            A dictionary that stores the column name in key and the
+            value in value.
+        """
+        for column_name, value in row_dict.items():
+            column_id = self.column_id_dict.get(column_name)
+            if column_id is None:
+                continue
+            self.pending_record_list.append((timestamp, column_id, value))
+
+    def flush(self):
+        """
+        Save the pending rows in a single transaction.
+
+        Returns
+        -------
+        record_num : int
+            Number of the saved records.
+        """
+        record_num = len(self.pending_record_list)
+        if record_num == 0:
+            return 0
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO stats_sample (timestamp, column_id, value) '
+                'VALUES (?, ?, ?)',
+                self.pending_record_list)
+        self.pending_record_list = []
+        return record_num
+
+    def delete_expired(self):
+        """
+        Delete the samples older than the retention period.
+
+        Returns
+        -------
+        record_num : int
+            Number of the deleted records.
+        """
+        oldest_timestamp = self.clock() - self.retention_seconds
+        with self.connection:
+            cursor = self.connection.execute(
+                'DELETE FROM stats_sample WHERE timestamp < ?',
+                (oldest_timestamp, ))
+        return cursor.rowcount
+
+    def close(self):
+        """
+        Save the pending rows and close the database.
+        """
+        self.flush()
+        self.connection.close()
+
+
+def _connect(db_path):
+    """
+    Connect to the database. The WAL journal mode is used so that the
+    database can be read while the collector is writing.
+
+    Parameters
+    ----------
+    db_path : str
+        Path of the database file.
+
+    Returns
+    -------
+    connection : sqlite3.Connection
+        The connection of the database.
+    """
+    connection = sqlite3.connect(db_path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+def load_history(db_path, start=None, end=None, metrics=None):
+    """
+    Load the saved samples as a DataFrame.
+
+    Parameters
+    ----------
+    db_path : str
+        Path of the database file.
+    start : float, str, datetime.datetime or None, default None
+        Start of the period to load. UNIX time in seconds, or local
+        date and time (e.g., '2019-03-01 12:00:00'). If None, the
+        period starts from the oldest sample.
+    end : float, str, datetime.datetime or None, default None
+        End of the period to load (inclusive). If None, the period
+        ends at the latest sample.
+    metrics : list of str or None, default None
+        Metric names (e.g., 'memory') or column names to load. If
+        None, all columns are loaded.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        DataFrame having the timestamp column and a column for each
+        loaded column name, sorted by the timestamp. Values of
+        columns not sampled at the timestamp are NaN.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the database file does not exist.
+    """
+    import pandas as pd
+    if not os.path.exists(db_path):
+        err_msg = 'The stats history database does not exist: %s' % db_path
+        raise FileNotFoundError(err_msg)
+    condition_sql_list = []
+    param_list = []
+    start_timestamp = _to_timestamp(value=start)
+    if start_timestamp is not None:
+        condition_sql_list.append('s.timestamp >= ?')
+        param_list.append(start_timestamp)
+    end_timestamp = _to_timestamp(value=end)
+    if end_timestamp is not None:
+        condition_sql_list.append('s.timestamp <= ?')
+        param_list.append(end_timestamp)
+    if metrics is not None:
+        placeholder_str = ', '.join(['?'] * len(metrics))
+        condition_sql_list.append(
+            '(c.metric_name IN ({placeholder_str}) '
+            'OR c.column_name IN ({placeholder_str}))'.format(
+                placeholder_str=placeholder_str))
+        param_list.extend(metrics)
+        param_list.extend(metrics)
+    sql = 'SELECT s.timestamp, c.column_id, c.column_name, s.value ' \
+        'FROM stats_sample AS s ' \
+        'INNER JOIN stats_column AS c ON s.column_id = c.column_id'
+    if condition_sql_list:
+        sql += ' WHERE ' + ' AND '.join(condition_sql_list)
+    connection = _connect(db_path=db_path)
+    try:
+        long_df = pd.read_sql_query(sql, connection, params=param_list)
+    finally:
+        connection.close()
+    if len(long_df) == 0:
+        return pd.DataFrame(columns=[COLUMN_NAME_TIMESTAMP])
+    column_list = long_df.sort_values(by='column_id')[
+        'column_name'].drop_duplicates().tolist()
+    df = long_df.pivot_table(
+        index=COLUMN_NAME_TIMESTAMP, columns='column_name',
+        values='value', aggfunc='last')
+    df = df[column_list].reset_index()
+    df.columns.name = None
+    return df
+
+
+def _to_timestamp(value):
+    """
+    Convert the specified date and time to the UNIX time.
+
+    Parameters
+    ----------
+    value : float, int, str, datetime.datetime or None
+        The value to convert. Strings and datetimes without a timezone
+        are treated as the local time.
+
+    Returns
+    -------
+    timestamp : float or None
+        UNIX time in seconds. None if None is specified.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, datetime.datetime):
+        import pandas as pd
+        value = pd.Timestamp(value).to_pydatetime()
+    return value.timestamp()
@@ -0,0 +1,100 @@
+"""
+Module of the probe thread that measures the scheduling delay of the
+kernel for the kernel_lag metric. The thread sleeps at a fixed
+interval and records how much later than requested it wakes up. The
+overshoot includes the time waiting for the GIL, so it shows the
+kernel starved by other threads (or by the CPU quota) even when the
+CPU of the host looks idle.
+
+Notes
+-----
+The probe only appends the overshoot to a list at each wakeup and
+sends the list at the report interval, so its own GIL usage is a few
+microseconds per wakeup. The percentiles are computed by the
+KernelLagCollector in the collector.
+"""
+
+import threading
+import time
+
+DEFAULT_REPORT_INTERVAL_SECONDS = 0.5
+STOP_TIMEOUT_SECONDS = 1
+
+
+class LagProbe():
+
+    def __init__(
+            self, send_lag, probe_interval_seconds,
+            report_interval_seconds=DEFAULT_REPORT_INTERVAL_SECONDS):
+        """
+        Class of the probe thread measuring the sleep overshoot.
+
+        Parameters
+        ----------
+        send_lag : function
+            Function called from the probe thread with the list of the
+            overshoots in seconds measured since the previous call
+            (e.g., to send them to the collector).
+        probe_interval_seconds : float
+            Interval in seconds at which the thread sleeps.
+        report_interval_seconds : float, \
+                default DEFAULT_REPORT_INTERVAL_SECONDS
+            Interval in seconds at which the overshoots are sent.
+        """
+        self.send_lag = send_lag
+        self.probe_interval_seconds = probe_interval_seconds
+        self.report_interval_seconds = report_interval_seconds
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start the probe thread.
+        """
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def is_alive(self):
+        """
+        Get whether the probe thread is running.
+
+        Returns
+        -------
+        is_alive : bool
+            True if the thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=STOP_TIMEOUT_SECONDS):
+        """
+        Stop the probe thread and wait for it to exit.
+
+        Parameters
+        ----------
+        timeout : int or float, default STOP_TIMEOUT_SECONDS
+            Seconds to wait for the thread to exit.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        """
+        Loop of the probe thread. The overshoots measured before the
+        stop are not sent.
+        """
+        lag_seconds_list = []
+        report_time = time.perf_counter() + self.report_interval_seconds
+        while True:
+            start_time = time.perf_counter()
+            if self._stop_event.wait(timeout=self.probe_interval_seconds):
+                return
+            current_time = time.perf_counter()
+            lag_seconds_list.append(max(
+                current_time - start_time - self.probe_interval_seconds, 0.0))
+            if current_time < report_time:
+                continue
+            self.send_lag(lag_seconds_list)
+            lag_seconds_list = []
+            report_time = current_time + self.report_interval_seconds
@@ -1,6 +1,7 @@
 """
 Module that handles monitoring plots such as memory usage, disk size,
-GPU memory and so on.
+GPU memory, CPU utilization, disk I/O, network and so on. The plotted
+metrics are sampled by the collectors of the collectors module.
 
 Notes
 -----
@@ -13,69 +14,145 @@ Please install it manually when you need to use this plot.
 who do not use this plot)
 
 This basically supports only Linux environment such as Ubuntu.
+The samples are collected by the collector subprocess of the
+collector module, or by the sampler thread of the thread_sampler module
+where child processes can not be spawned.
 """
 
 import time
-import traceback
-import multiprocessing as mp
-import subprocess as sp
-from collections import deque
+from multiprocessing.connection import Connection
+import json
+import math
 import os
+import re
+import subprocess as sp
 import sys
-from datetime import datetime
+import threading
 
-import pandas as pd
-import numpy as np
+from IPython import get_ipython
+import psutil
 
 from plot_playground.common import d3_helper
 from plot_playground.common import data_helper
 from plot_playground.common import js_helper_template_path
-
-try:
-    import psutil
-except ImportError:
-    print(traceback.format_exc())
-    err_msg = 'Installation of the psutil module is necessary to use this plot. Consider running the following pip command and please restart the notebook.'
-    err_msg += '\n$ pip install psutil==5.5.1'
-    raise ImportError(err_msg)
-
-is_gpu_stats_disabled = False
-
-try:
-    import gpustat
-except ImportError:
-    is_gpu_stats_disabled = True
-    print(traceback.format_exc())
-    info_msg = 'Installation of the gpustat module is required to use this plot. Consider the execution of the following pip command and please restart the notebook.'
-    info_msg += '\n$ pip install gpustat==0.5.0'
-    info_msg += '\nOr maybe your environment is windows (only linux, like Ubuntu, is supported).'
-    info_msg += '\nThe GPU information plot has been disabled.'
-    print(info_msg)
+from plot_playground.stats import aggregator
+from plot_playground.stats import cell_markers
+from plot_playground.stats import collector as stats_collector
+from plot_playground.stats import collectors
+from plot_playground.stats import heap_snapshot
+from plot_playground.stats import history
+from plot_playground.stats import history_store
+from plot_playground.stats import lag_probe
+from plot_playground.stats import push_channel
+from plot_playground.stats import recording
+from plot_playground.stats import shared_daemon
+from plot_playground.stats import thread_sampler
 
 
 INTERVAL_SECONDS = 1
 PATH_CSS_TEMPLATE = 'stats/linux_stats_plot.css'
 PATH_JS_TEMPLATE = 'stats/linux_stats_plot.js'
-_is_displayed = False
+DEFAULT_METRIC_NAME_LIST = stats_collector.DEFAULT_METRIC_NAME_LIST
+STOP_TIMEOUT_SECONDS = 5
+STARTUP_TIMEOUT_SECONDS = 60
+COLLECTOR_MODULE_NAME = 'plot_playground.stats.collector'
+SAMPLER_PROCESS = 'process'
+SAMPLER_THREAD = 'thread'
+SAMPLER_SHARED = 'shared'
+THREAD_METRIC_NAME_LIST = ['proc_stats', 'cgroup', 'pressure', 'overhead']
+WINDOW_SECONDS_LIST = [
+    5 * 60, 10 * 60, 60 * 60, 3 * 60 * 60, 24 * 60 * 60,
+    3 * 24 * 60 * 60]
+PROFILE_BUFFER_SIZE = 600
+PROFILE_WAIT_TIMEOUT_SECONDS = 5
+PROFILE_LOG_FILE_NAME_FORMAT = 'log_linux_stats_plot_profile_{svg_id}.csv'
+PROFILE_EVENT_LOG_FILE_NAME_FORMAT = \
+    'log_linux_stats_plot_profile_{svg_id}_events.csv'
+MULTI_NODE_WINDOW_SECONDS = 600
+MULTI_NODE_POLL_INTERVAL_SECONDS = 0.5
+REPLAY_LOG_FILE_NAME_FORMAT = 'log_linux_stats_plot_replay_{svg_id}.csv'
+# Name of the window option of the replay. Any name other than the raw
+# tier makes the plot draw the min / max bands of the buckets.
+TIER_NAME_REPLAY = 'replay'
+_current_session = None
+_current_aggregator = None
+_active_profile_list = []
 
 
 def display_plot(
         buffer_size=300,
         log_dir_path='./log_plotplayground_stats/',
-        svg_id=''):
+        svg_id='', push_updates=False, metric_interval_seconds=None,
+        metrics=None, persist_history=True,
+        history_retention_seconds=history_store.DEFAULT_RETENTION_SECONDS,
+        sampler=SAMPLER_PROCESS, track_cells=True, metrics_port=None):
     """
     Display plots of memory usage, disk usage, GPU information
     etc on Jupyter. Values ​​are updated at regular intervals.
+    If the collector of the previous call is still running, it is
+    stopped before starting the new one.
 
     Parameters
     ----------
-    buffer_size : int, default 600
-        Buffer size to handle in the plot.
+    buffer_size : int, default 300
+        Buffer size to handle in the plot. The time window of the
+        latest `buffer_size * INTERVAL_SECONDS` seconds is plotted
+        initially. The window can be switched on the plot, and longer
+        windows are read from the rollup tiers of the history.
     log_dir_path : str, default './log_plotplayground_stats/'
         Directory where the log is saved.
     svg_id : str, default ''
         ID to set for SVG element. When an empty value is specified,
         a unique character string is generated and used.
+    push_updates : bool, default False
+        If True, the samples are pushed from the kernel to the front
+        end over a Jupyter comm as they arrive, instead of polling the
+        log file from the browser. If the comm can not be used, the
+        plot falls back to polling.
+    metric_interval_seconds : dict or None, default None
+        Sampling interval in seconds of each metric. Specify the
+        metric name in key. Unspecified metrics use the
+        default_interval_seconds of each collector.
+        e.g., {'memory': 0.5, 'disk': 10}
+    metrics : list of str or MetricCollector, or None, default None
+        Metrics to sample and plot. Specify the names registered in
+        the collectors module ('memory', 'disk', 'gpu', 'cpu',
+        'disk_io', 'network', 'proc_stats', ...) or collector
+        instances. If None, DEFAULT_METRIC_NAME_LIST is used
+        (THREAD_METRIC_NAME_LIST for the thread sampler).
+    persist_history : bool, default True
+        If True, the samples are also saved to the SQLite database in
+        the log directory, so they can be loaded by the load_history
+        function even after the kernel has died.
+    history_retention_seconds : int or float, default 3 days
+        Seconds for which the samples are kept in the database.
+    sampler : str, default 'process'
+        Where the samples are collected.
+        - 'process' : In the collector subprocess.
+        - 'thread' : In a daemon thread of the kernel, for the
+            environments where child processes can not be spawned.
+            Only the metrics supporting the thread sampling (e.g.,
+            'proc_stats') can be used, the samples are kept only for
+            the initial window and are not saved to the database.
+        - 'shared' : In the host-wide daemon of the shared_daemon
+            module, shared with the other kernels that use it (the
+            daemon is started if it is not running). Only the
+            host-wide metrics can be used, the metrics and the
+            intervals are those of the running daemon (if any), and
+            the samples are kept only for the initial window and are
+            not saved to the database.
+    track_cells : bool, default True
+        If True, the start and the end of each executed cell are sent
+        to the collector with the peak RSS of the kernel, drawn as the
+        bands on all panels. The summary of the cells can be loaded by
+        the get_cell_summary method of the returned session.
+    metrics_port : int or None, default None
+        If specified, the collector serves the latest samples and the
+        quantiles in the OpenMetrics text format at
+        `http://127.0.0.1:<port>/metrics` for an external scraper
+        (e.g., Prometheus). If zero, a free port is selected and set
+        to the metrics_port attribute of the returned session. Only
+        the process sampler supports it.
 
     Notes
     -----
@@ -83,452 +160,2141 @@ def display_plot(
         not be acquired correctly in some cases.
     - Depending on the environment, memory usage and disk usage
         will be somewhat different values.
-    - This function can be executed only once after starting
-        the kernel.
+    - The raw samples are kept for 10 minutes, the 10 seconds
+        min / mean / max rollups for 3 hours and the 1 minute rollups
+        for 3 days, so the memory usage of the collector is bounded.
+    - Use the display method of the returned session (or of
+        get_current_session()) to show the plot again, instead of
+        calling this function again.
+
+    Returns
+    -------
+    stats_session : StatsSession
+        An object to control the running collector (ThreadStatsSession
+        for the thread sampler). The metadata of the displayed plot is
+        stored in its plot_meta attribute.
 
     Raises
     ------
+    ValueError
+        - If an unknown sampler is specified.
+        - If a metric not supporting the thread sampling is specified
+            for the thread sampler.
+        - If a metric of the kernel is specified for the shared
+            sampler.
+        - If the metrics port is specified for a sampler other than
+            the process sampler.
     Exception
-        If this function is executed more than once.
+        If the shared daemon has not started in time.
+    """
+    global _current_session
+    if sampler not in (SAMPLER_PROCESS, SAMPLER_THREAD, SAMPLER_SHARED):
+        err_msg = 'Unknown sampler is specified: %s' % sampler
+        raise ValueError(err_msg)
+    if metrics_port is not None and sampler != SAMPLER_PROCESS:
+        err_msg = 'The metrics port is only served by the process ' \
+                  'sampler: %s' % sampler
+        raise ValueError(err_msg)
+    if _current_session is not None:
+        _current_session.stop()
+        _current_session = None
+
+    if svg_id == '':
+        svg_id = d3_helper.make_svg_id()
+    comm_manager = None
+    if push_updates:
+        comm_manager = push_channel.get_kernel_comm_manager()
+        if comm_manager is None:
+            print('The Jupyter comm is not available. The plot is updated by polling the log file.')
+    stats_session = _start_session(
+        buffer_size=buffer_size, log_dir_path=log_dir_path, svg_id=svg_id,
+        comm_manager=comm_manager,
+        metric_interval_seconds=metric_interval_seconds, metrics=metrics,
+        persist_history=persist_history,
+        history_retention_seconds=history_retention_seconds,
+        sampler=sampler, metrics_port=metrics_port)
+    _current_session = stats_session
+    if track_cells:
+        stats_session.track_cells()
+
+    stats_session.wait_until_ready()
+    if stats_session.error_str is not None:
+        _print_collector_error(error_str=stats_session.error_str)
+    stats_session.display(svg_id=svg_id)
+    return stats_session
+
+
+def _start_session(
+        buffer_size, log_dir_path, svg_id, comm_manager,
+        metric_interval_seconds, metrics, persist_history,
+        history_retention_seconds, sampler, metrics_port=None):
+    """
+    Start the collector process, the sampler thread or the reader of
+    the shared daemon of the metrics.
+
+    Parameters
+    ----------
+    buffer_size : int
+        Buffer size to handle in the plot.
+    log_dir_path : str
+        Directory where the log is saved.
+    svg_id : str
+        ID of the SVG element of the plot.
+    comm_manager : ipykernel.comm.CommManager or None
+        The comm manager to push the samples. If None, the samples are
+        not pushed.
+    metric_interval_seconds : dict or None
+        Sampling interval in seconds of each metric.
+    metrics : list of str or MetricCollector, or None
+        Metrics to sample. If None, the default metrics of the
+        sampler are used.
+    persist_history : bool
+        Whether the samples are saved to the SQLite database (only
+        the process sampler).
+    history_retention_seconds : int or float
+        Seconds for which the samples are kept in the database.
+    sampler : str
+        SAMPLER_PROCESS, SAMPLER_THREAD or SAMPLER_SHARED.
+    metrics_port : int or None, default None
+        Port of the OpenMetrics endpoint of the collector (only the
+        process sampler). If None, the endpoint is not served.
 
     Returns
     -------
-    plot_meta : plot_playground.common.d3_helper.PlotMeta
-        An object that stores the metadata of the plot.
+    stats_session : StatsSession, ThreadStatsSession or \
+            SharedStatsSession
+        The session of the started collector.
+
+    Raises
+    ------
+    ValueError
+        - If a metric not supporting the thread sampling is specified
+            for the thread sampler.
+        - If a metric of the kernel is specified for the shared
+            sampler.
     """
-    global _is_displayed
-    if _is_displayed:
-        raise Exception('This function can be executed only once after starting the kernel.')
-    _update_gpu_disabled_bool()
+    if metrics is None:
+        if sampler == SAMPLER_THREAD:
+            metrics = THREAD_METRIC_NAME_LIST
+        elif sampler == SAMPLER_SHARED:
+            metrics = shared_daemon.SHARED_METRIC_NAME_LIST
+        else:
+            metrics = DEFAULT_METRIC_NAME_LIST
+    collector_list = collectors.make_collector_list(metrics=metrics)
+    if sampler == SAMPLER_THREAD:
+        thread_sampler.validate_collectors(collector_list=collector_list)
+        collector_list = collectors.setup_collectors(
+            collector_list=collector_list)
+    elif sampler == SAMPLER_SHARED:
+        shared_daemon.validate_collectors(collector_list=collector_list)
+    metric_interval_seconds_dict = stats_collector.\
+        get_metric_interval_seconds_dict(
+            collector_list=collector_list,
+            metric_interval_seconds=metric_interval_seconds)
+
+    window_seconds = buffer_size * INTERVAL_SECONDS
+    if sampler == SAMPLER_THREAD:
+        stats_session = _start_thread_session(
+            collector_list=collector_list,
+            metric_interval_seconds_dict=metric_interval_seconds_dict,
+            window_seconds=window_seconds, log_dir_path=log_dir_path,
+            svg_id=svg_id, comm_manager=comm_manager)
+    elif sampler == SAMPLER_SHARED:
+        stats_session = _start_shared_session(
+            metric_interval_seconds_dict=metric_interval_seconds_dict,
+            window_seconds=window_seconds, log_dir_path=log_dir_path,
+            svg_id=svg_id, comm_manager=comm_manager)
+    else:
+        stats_session = _start_process_session(
+            collector_list=collector_list,
+            metric_interval_seconds_dict=metric_interval_seconds_dict,
+            buffer_size=buffer_size, window_seconds=window_seconds,
+            log_dir_path=log_dir_path, svg_id=svg_id,
+            comm_manager=comm_manager, persist_history=persist_history,
+            history_retention_seconds=history_retention_seconds,
+            metrics_port=metrics_port)
+    stats_session.start_lag_probe()
+    stats_session.start_heap_snapshots()
+    return stats_session
+
+
+def _start_process_session(
+        collector_list, metric_interval_seconds_dict, buffer_size,
+        window_seconds, log_dir_path, svg_id, comm_manager,
+        persist_history, history_retention_seconds, metrics_port=None):
+    """
+    Start the collector subprocess and make the session to control it.
 
-    if svg_id == '':
-        svg_id = d3_helper.make_svg_id()
+    Parameters
+    ----------
+    collector_list : list of MetricCollector
+        Collectors that have already been set up.
+    metric_interval_seconds_dict : dict
+        A dictionary of the sampling interval of all metrics.
+    buffer_size : int
+        Buffer size to handle in the plot.
+    window_seconds : int or float
+        Seconds of the initial time window of the plot.
+    log_dir_path : str
+        Directory where the log is saved.
+    svg_id : str
+        ID of the SVG element of the plot.
+    comm_manager : ipykernel.comm.CommManager or None
+        The comm manager to push the samples. If None, the samples are
+        not pushed.
+    persist_history : bool
+        Whether the samples are saved to the SQLite database.
+    history_retention_seconds : int or float
+        Seconds for which the samples are kept in the database.
+    metrics_port : int or None, default None
+        Port of the OpenMetrics endpoint of the collector. If None,
+        the endpoint is not served.
+
+    Returns
+    -------
+    stats_session : StatsSession
+        The session of the started collector. The collectors are set
+        up in the collector process.
+    """
+    tier_setting_list = stats_collector.get_tier_setting_list(
+        window_seconds=window_seconds)
+    raw_retention_seconds = tier_setting_list[0]['retention_seconds']
     parent_pid = int(os.getpid())
-    process = mp.Process(
-        target=_start_plot_data_updating,
-        kwargs={
-            'interval_seconds': INTERVAL_SECONDS,
-            'buffer_size': buffer_size,
-            'log_dir_path': log_dir_path,
-            'parent_pid': parent_pid,
-            'save_error_to_file': True,
-        })
-    process.deamon = True
-    process.start()
+    history_db_path = None
+    if persist_history:
+        history_db_path = stats_collector.get_history_db_path(
+            log_dir_path=log_dir_path)
+    process, command_conn, status_conn, sample_conn = \
+        _start_collector_process(
+            collector_kwargs={
+                'interval_seconds': INTERVAL_SECONDS,
+                'buffer_size': buffer_size,
+                'log_dir_path': log_dir_path,
+                'parent_pid': parent_pid,
+                'metric_interval_seconds': metric_interval_seconds_dict,
+                'collector_list': collector_list,
+                'history_db_path': history_db_path,
+                'history_retention_seconds': history_retention_seconds,
+                'metrics_port': metrics_port,
+            },
+            push_updates=comm_manager is not None)
+    forwarder = None
+    if comm_manager is not None:
+        forwarder = push_channel.SamplePushForwarder(
+            sample_conn=sample_conn, svg_id=svg_id,
+            buffer_size=stats_collector.get_max_row_num(
+                window_seconds=raw_retention_seconds,
+                metric_interval_seconds_dict=metric_interval_seconds_dict))
+        forwarder.register_comm_target(comm_manager=comm_manager)
+        forwarder.start()
+
+    stats_session = StatsSession(
+        process=process, command_conn=command_conn, forwarder=forwarder,
+        collector_list=collector_list,
+        metric_interval_seconds_dict=metric_interval_seconds_dict,
+        log_dir_path=log_dir_path, window_seconds=window_seconds,
+        tier_setting_list=tier_setting_list, status_conn=status_conn)
+    return stats_session
+
+
+def _start_thread_session(
+        collector_list, metric_interval_seconds_dict, window_seconds,
+        log_dir_path, svg_id, comm_manager):
+    """
+    Start the sampler thread in the kernel and make the session to
+    control it.
 
-    log_file_path = _get_log_file_path(log_dir_path=log_dir_path)
-    count = 0
-    while not os.path.exists(log_file_path):
-        count += 1
-        if count > 60:
-            break
-        time.sleep(1)
+    Parameters
+    ----------
+    collector_list : list of MetricCollector
+        Collectors that have already been set up. All of them must
+        support the thread sampling.
+    metric_interval_seconds_dict : dict
+        A dictionary of the sampling interval of all metrics.
+    window_seconds : int or float
+        Seconds of the time window of the plot.
+    log_dir_path : str
+        Directory where the log is saved.
+    svg_id : str
+        ID of the SVG element of the plot.
+    comm_manager : ipykernel.comm.CommManager or None
+        The comm manager to push the samples. If None, the samples are
+        not pushed.
 
-    css_template_str = d3_helper.read_template_str(
-        template_file_path=PATH_CSS_TEMPLATE)
-    css_param = {
-        'svg_id': svg_id,
-    }
-    css_template_str = d3_helper.apply_css_param_to_template(
-        css_template_str=css_template_str,
-        css_param=css_param)
+    Returns
+    -------
+    stats_session : ThreadStatsSession
+        The session of the started sampler thread.
+    """
+    tier_setting_list = thread_sampler.get_tier_setting_list(
+        window_seconds=window_seconds)
+    forwarder = None
+    if comm_manager is not None:
+        # The rows are added from the sampler thread, so the receiving
+        # thread of the forwarder is not started.
+        forwarder = push_channel.SamplePushForwarder(
+            sample_conn=None, svg_id=svg_id,
+            buffer_size=stats_collector.get_max_row_num(
+                window_seconds=window_seconds,
+                metric_interval_seconds_dict=metric_interval_seconds_dict))
+        forwarder.register_comm_target(comm_manager=comm_manager)
+
+        def on_sample(row_dict):
+            forwarder.add_rows(row_list=[row_dict])
+            forwarder.flush()
+    else:
+        on_sample = None
+
+    sampler = thread_sampler.ThreadSampler(
+        collector_list=collector_list,
+        metric_interval_seconds_dict=metric_interval_seconds_dict,
+        window_seconds=window_seconds, interval_seconds=INTERVAL_SECONDS,
+        log_dir_path=log_dir_path, on_sample=on_sample)
+    sampler.start()
+    stats_session = ThreadStatsSession(
+        sampler=sampler, forwarder=forwarder,
+        collector_list=collector_list,
+        metric_interval_seconds_dict=metric_interval_seconds_dict,
+        log_dir_path=log_dir_path, window_seconds=window_seconds,
+        tier_setting_list=tier_setting_list)
+    return stats_session
+
+
+def _start_shared_session(
+        metric_interval_seconds_dict, window_seconds, log_dir_path, svg_id,
+        comm_manager, daemon_dir_path=shared_daemon.DEFAULT_DAEMON_DIR_PATH):
+    """
+    Subscribe to the host-wide shared daemon (starting it if it is not
+    running) and make the session to read its samples.
 
-    js_template_str = d3_helper.read_template_str(
-        template_file_path=PATH_JS_TEMPLATE)
-    gpu_num = _get_gpu_num()
-    js_param = {
-        'svg_id': svg_id,
-        'gpu_num': gpu_num,
-        'csv_log_file_path': log_file_path,
-        'js_helper_func_get_b_box_width': d3_helper.read_template_str(
-            template_file_path=js_helper_template_path.GET_B_BOX_WIDTH),
-    }
-    js_template_str = d3_helper.apply_js_param_to_template(
-        js_template_str=js_template_str,
-        js_param=js_param)
+    Parameters
+    ----------
+    metric_interval_seconds_dict : dict
+        A dictionary of the sampling interval of the metrics, used if
+        the daemon is started.
+    window_seconds : int or float
+        Seconds of the time window of the plot.
+    log_dir_path : str
+        Directory where the log is saved.
+    svg_id : str
+        ID of the SVG element of the plot.
+    comm_manager : ipykernel.comm.CommManager or None
+        The comm manager to push the samples. If None, the samples are
+        not pushed.
+    daemon_dir_path : str, default DEFAULT_DAEMON_DIR_PATH of the \
+            shared_daemon module
+        Directory of the daemon.
 
-    svg_height = 200 * (2 + gpu_num) + 20 * (3 + gpu_num)
-    html_str = d3_helper.exec_d3_js_script_on_jupyter(
-        js_script=js_template_str,
-        css_str=css_template_str,
-        svg_id=svg_id,
-        svg_width=950,
-        svg_height=svg_height,
-    )
+    Returns
+    -------
+    stats_session : SharedStatsSession
+        The session of the started reader. The collectors are those
+        of the running daemon.
 
-    time.sleep(3)
-    _print_error_if_exists(log_dir_path=log_dir_path)
-    _is_displayed = True
+    Raises
+    ------
+    Exception
+        If the daemon has not started in time.
+    """
+    daemon_meta_dict, subscriber_file_path = shared_daemon.connect_daemon(
+        daemon_dir_path=daemon_dir_path,
+        metrics=list(metric_interval_seconds_dict.keys()),
+        metric_interval_seconds=metric_interval_seconds_dict,
+        env=_get_collector_env(), timeout=STARTUP_TIMEOUT_SECONDS)
+    if daemon_meta_dict is None:
+        shared_daemon.unsubscribe(subscriber_file_path=subscriber_file_path)
+        err_msg = 'The shared daemon has not started. See the log: %s' \
+            % os.path.join(daemon_dir_path, shared_daemon.DAEMON_LOG_FILE_NAME)
+        raise Exception(err_msg)
+    tier_setting_list = thread_sampler.get_tier_setting_list(
+        window_seconds=window_seconds)
+    metric_interval_seconds_dict = daemon_meta_dict[
+        'metric_interval_seconds_dict']
+    forwarder = None
+    if comm_manager is not None:
+        # The rows are added from the reader thread, so the receiving
+        # thread of the forwarder is not started.
+        forwarder = push_channel.SamplePushForwarder(
+            sample_conn=None, svg_id=svg_id,
+            buffer_size=stats_collector.get_max_row_num(
+                window_seconds=window_seconds,
+                metric_interval_seconds_dict=metric_interval_seconds_dict))
+        forwarder.register_comm_target(comm_manager=comm_manager)
+
+        def on_rows(row_dict_list):
+            forwarder.add_rows(row_list=row_dict_list)
+            forwarder.flush()
+    else:
+        on_rows = None
+
+    reader = shared_daemon.SharedRingReader(
+        daemon_meta_dict=daemon_meta_dict, window_seconds=window_seconds,
+        interval_seconds=INTERVAL_SECONDS, log_dir_path=log_dir_path,
+        on_rows=on_rows)
+    reader.start()
+    stats_session = SharedStatsSession(
+        reader=reader, subscriber_file_path=subscriber_file_path,
+        forwarder=forwarder,
+        collector_list=shared_daemon.make_daemon_collector_list(
+            daemon_meta_dict=daemon_meta_dict),
+        metric_interval_seconds_dict=metric_interval_seconds_dict,
+        log_dir_path=log_dir_path, window_seconds=window_seconds,
+        tier_setting_list=tier_setting_list)
+    return stats_session
+
+
+def _start_collector_process(collector_kwargs, push_updates):
+    """
+    Start the collector as a standalone subprocess. Unlike forking the
+    kernel, the subprocess does not share the memory of the kernel,
+    and imports only the modules needed for sampling.
 
-    plot_meta = d3_helper.PlotMeta(
-        html_str=html_str,
-        js_template_str=js_template_str,
-        js_param=js_param,
-        css_template_str=css_template_str,
-        css_param=css_param)
-    return plot_meta
+    Parameters
+    ----------
+    collector_kwargs : dict
+        Keyword arguments of the start_collecting function of the
+        collector module (excluding the connections).
+    push_updates : bool
+        If True, the pipe to receive each sample row is also made.
+
+    Returns
+    -------
+    process : subprocess.Popen
+        The collector process.
+    command_conn : multiprocessing.connection.Connection
+        The connection to send the commands to the collector.
+    status_conn : multiprocessing.connection.Connection
+        The connection to receive the ready and error status of the
+        collector.
+    sample_conn : multiprocessing.connection.Connection or None
+        The connection to receive the sample rows. None if push_updates
+        is False.
+    """
+    command_read_fd, command_write_fd = os.pipe()
+    status_read_fd, status_write_fd = os.pipe()
+    pass_fd_list = [command_read_fd, status_write_fd]
+    args = [
+        sys.executable, '-m', COLLECTOR_MODULE_NAME,
+        '--command_fd', str(command_read_fd),
+        '--status_fd', str(status_write_fd)]
+    sample_conn = None
+    if push_updates:
+        sample_read_fd, sample_write_fd = os.pipe()
+        pass_fd_list.append(sample_write_fd)
+        args.extend(['--sample_fd', str(sample_write_fd)])
+        sample_conn = Connection(sample_read_fd, writable=False)
+    process = sp.Popen(
+        args, pass_fds=pass_fd_list, env=_get_collector_env(),
+        stdin=sp.DEVNULL, stdout=sp.DEVNULL)
+    # The child ends are closed so that EOF is detected when either
+    # process exits.
+    for fd in pass_fd_list:
+        os.close(fd)
+    command_conn = Connection(command_write_fd, readable=False)
+    status_conn = Connection(status_read_fd, writable=False)
+    command_conn.send({
+        'command': stats_collector.COMMAND_START,
+        'kwargs': collector_kwargs,
+    })
+    return process, command_conn, status_conn, sample_conn
+
+
+def _get_collector_env():
+    """
+    Get the environment variables of the collector subprocess. The
+    directory of this package is added to PYTHONPATH so that the
+    collector module can be imported even if the package is not
+    installed.
+
+    Returns
+    -------
+    env : dict
+        The environment variables.
+    """
+    env = dict(os.environ)
+    package_parent_dir_path = os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))))
+    python_path_list = [package_parent_dir_path]
+    if env.get('PYTHONPATH'):
+        python_path_list.append(env['PYTHONPATH'])
+    env['PYTHONPATH'] = os.pathsep.join(python_path_list)
+    return env
 
 
-def _print_error_if_exists(log_dir_path):
+def get_current_session():
     """
-    If content exists in the error log, print that error content
-    to the console.
+    Get the session started by the last display_plot call. This can
+    be used to display the plot again when the returned session has
+    been lost.
+
+    Returns
+    -------
+    stats_session : StatsSession or None
+        The session. None if display_plot has not been called.
+    """
+    return _current_session
+
+
+class StatsSession():
+
+    def __init__(
+            self, process, command_conn, forwarder, collector_list,
+            metric_interval_seconds_dict, log_dir_path, window_seconds,
+            tier_setting_list, status_conn=None):
+        """
+        Class that controls the running collector process and displays
+        the plots of its samples. The instance is created by the
+        display_plot function.
+
+        Parameters
+        ----------
+        process : subprocess.Popen
+            The collector process.
+        command_conn : multiprocessing.connection.Connection
+            The connection to send the commands to the collector.
+        forwarder : plot_playground.stats.push_channel.\
+                SamplePushForwarder or None
+            The forwarder of the pushed samples. None if the push
+            update is not used.
+        collector_list : list of MetricCollector
+            Collectors running in the collector process.
+        metric_interval_seconds_dict : dict
+            A dictionary of the sampling interval of all metrics.
+        log_dir_path : str
+            Directory where the log is saved.
+        window_seconds : int or float
+            Seconds of the initial time window of the plot.
+        tier_setting_list : list of dicts
+            Settings of the history tiers.
+        status_conn : multiprocessing.connection.Connection or None, \
+                default None
+            The connection to receive the ready and error status of
+            the collector.
+        """
+        self.process = process
+        self.command_conn = command_conn
+        self.status_conn = status_conn
+        self.forwarder = forwarder
+        self.collector_list = list(collector_list)
+        self.metric_interval_seconds_dict = dict(
+            metric_interval_seconds_dict)
+        self.log_dir_path = log_dir_path
+        self.window_seconds = window_seconds
+        self.tier_setting_list = tier_setting_list
+        self.plot_meta = None
+        self.cell_tracker = None
+        self.lag_probe = None
+        self.heap_snapshotter = None
+        self._command_lock = threading.Lock()
+        self.is_stopped = False
+        self.is_ready = False
+        self.error_str = None
+        self.metrics_port = None
+
+    def is_running(self):
+        """
+        Get whether the collector is running.
+
+        Returns
+        -------
+        is_running : bool
+            True if the collector process is running.
+        """
+        return not self.is_stopped and self.process.poll() is None
+
+    def wait_until_ready(self, timeout=STARTUP_TIMEOUT_SECONDS):
+        """
+        Wait until the collector has written the first sample. The
+        collectors set up in the collector process replace the
+        collector_list (unavailable metrics are excluded), and the
+        port of the OpenMetrics endpoint (if served) is set to the
+        metrics_port attribute.
+
+        Parameters
+        ----------
+        timeout : int or float, default STARTUP_TIMEOUT_SECONDS
+            Maximum seconds to wait.
+
+        Returns
+        -------
+        is_ready : bool
+            True if the first sample has been written. If the
+            collector has failed, False is returned and its traceback
+            is set to the error_str attribute.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.is_ready and self.error_str is None:
+            remaining_seconds = deadline - time.monotonic()
+            if remaining_seconds <= 0:
+                break
+            self._receive_status(timeout=remaining_seconds)
+        return self.is_ready
+
+    def get_error(self):
+        """
+        Get the error of the collector reported after the startup.
+
+        Returns
+        -------
+        error_str : str or None
+            The traceback of the error. None if no error has occurred.
+        """
+        self._receive_status(timeout=0)
+        return self.error_str
+
+    def _receive_status(self, timeout):
+        """
+        Receive the status sent by the collector and update the
+        attributes of the session.
+
+        Parameters
+        ----------
+        timeout : int or float
+            Seconds to wait for the first status.
+        """
+        if self.status_conn is None or self.status_conn.closed:
+            return
+        try:
+            if not self.status_conn.poll(timeout):
+                return
+            while True:
+                status_dict = self.status_conn.recv()
+                if status_dict['status'] == stats_collector.STATUS_READY:
+                    self.is_ready = True
+                    self.collector_list = list(
+                        status_dict['collector_list'])
+                    self.metric_interval_seconds_dict = dict(
+                        status_dict['metric_interval_seconds_dict'])
+                    self.metrics_port = status_dict.get('metrics_port')
+                elif status_dict['status'] == stats_collector.STATUS_ERROR:
+                    self.error_str = status_dict['error']
+                if not self.status_conn.poll(0):
+                    return
+        except (EOFError, OSError):
+            self.status_conn.close()
+            if self.error_str is None and not self.is_ready:
+                self.error_str = \
+                    'The collector process has exited before writing ' \
+                    'the first sample (exit code: %s).' % self.process.wait()
+
+    def display(self, svg_id=''):
+        """
+        Display a plot of the samples of the running collector. This
+        can be called any number of times, and all plots share the
+        same collector.
+
+        Parameters
+        ----------
+        svg_id : str, default ''
+            ID to set for SVG element. When an empty value is
+            specified, a unique character string is generated and
+            used.
+
+        Returns
+        -------
+        plot_meta : plot_playground.common.d3_helper.PlotMeta
+            An object that stores the metadata of the plot.
+        """
+        push_comm_target_name = ''
+        if self.forwarder is not None and not self.is_stopped:
+            push_comm_target_name = self.forwarder.target_name
+        self.plot_meta = _display_stats_plot(
+            svg_id=svg_id,
+            panel_list=_get_panel_list(collector_list=self.collector_list),
+            window_option_list=_get_window_option_list(
+                window_seconds=self.window_seconds,
+                tier_setting_list=self.tier_setting_list,
+                log_dir_path=self.log_dir_path),
+            window_seconds=self.window_seconds,
+            raw_retention_seconds=self.tier_setting_list[0][
+                'retention_seconds'],
+            push_comm_target_name=push_comm_target_name,
+            cell_log_file_path=cell_markers.get_cell_log_file_path(
+                log_dir_path=self.log_dir_path),
+            heap_log_file_path=heap_snapshot.get_heap_log_file_path(
+                log_dir_path=self.log_dir_path),
+            heap_site_num=_get_heap_site_num(
+                collector_list=self.collector_list),
+            is_static=False)
+        return self.plot_meta
+
+    def set_interval(self, metric_name, interval_seconds):
+        """
+        Change the sampling interval of the metric.
+
+        Parameters
+        ----------
+        metric_name : str
+            Name of the metric (e.g., 'memory').
+        interval_seconds : int or float
+            New sampling interval in seconds.
+
+        Raises
+        ------
+        ValueError
+            If the metric is not sampled or the interval is zero or
+            less.
+        Exception
+            If the session has been stopped.
+        """
+        if metric_name not in self.metric_interval_seconds_dict:
+            err_msg = 'The metric is not sampled: %s' % metric_name
+            raise ValueError(err_msg)
+        if interval_seconds <= 0:
+            err_msg = 'The interval must be greater than zero: %s' \
+                % interval_seconds
+            raise ValueError(err_msg)
+        self._send_command(command_dict={
+            'command': stats_collector.COMMAND_SET_INTERVAL,
+            'metric_name': metric_name,
+            'interval_seconds': interval_seconds,
+        })
+        self.metric_interval_seconds_dict[metric_name] = interval_seconds
+
+    def add_metric(self, metric, interval_seconds=None):
+        """
+        Add a metric to the running collector. The panels of the
+        metric are drawn in the plots displayed after this call.
+
+        Parameters
+        ----------
+        metric : str or MetricCollector
+            The name registered in the collectors module or a
+            collector instance.
+        interval_seconds : int, float or None, default None
+            Sampling interval in seconds. If None, the
+            default_interval_seconds of the collector is used.
+
+        Returns
+        -------
+        is_added : bool
+            True if the metric has been added. False if the metric is
+            not available in this environment (e.g., GPU metric on the
+            machine without GPU).
+
+        Notes
+        -----
+        The collector instance is sent to the collector subprocess by
+        pickle, so a custom collector class must be defined in an
+        importable module (not in the notebook).
+
+        Raises
+        ------
+        ValueError
+            If the metric is already sampled or the metric name is
+            unknown.
+        Exception
+            If the session has been stopped.
+        """
+        collector_list = collectors.make_collector_list(metrics=[metric])
+        collector = collector_list[0]
+        if collector.name in self.metric_interval_seconds_dict:
+            err_msg = 'The metric is already sampled: %s' % collector.name
+            raise ValueError(err_msg)
+        collector_list = collectors.setup_collectors(
+            collector_list=collector_list)
+        if len(collector_list) == 0:
+            return False
+        if interval_seconds is None:
+            interval_seconds = collector.default_interval_seconds
+        self._send_command(command_dict={
+            'command': stats_collector.COMMAND_ADD_METRIC,
+            'collector': collector,
+            'interval_seconds': interval_seconds,
+        })
+        self.collector_list.append(collector)
+        self.metric_interval_seconds_dict[collector.name] = interval_seconds
+        self.start_lag_probe()
+        self.start_heap_snapshots()
+        return True
+
+    def track_cells(self, shell=None):
+        """
+        Send the start and the end of each executed cell to the
+        collector, with the execution count, the first line of the
+        source, the duration and the peak RSS of the kernel. Nothing
+        happens if the cells are already tracked.
+
+        Parameters
+        ----------
+        shell : IPython.core.interactiveshell.InteractiveShell or \
+                None, default None
+            The shell to register the callbacks. If None, the shell of
+            the running kernel is used.
+
+        Returns
+        -------
+        is_tracked : bool
+            True if the cells are tracked. False if no IPython shell
+            is running.
+        """
+        if self.cell_tracker is not None:
+            return True
+        if shell is None:
+            shell = get_ipython()
+        if shell is None:
+            return False
+        self.cell_tracker = cell_markers.CellTracker(
+            send_marker=self._send_cell_marker)
+        self.cell_tracker.register(shell=shell)
+        return True
+
+    def start_lag_probe(self):
+        """
+        Start the probe thread of the kernel_lag metric in the kernel
+        if the metric is sampled. Nothing happens if it has already
+        been started.
+        """
+        if self.lag_probe is not None:
+            return
+        for collector in self.collector_list:
+            if collector.name != collectors.KernelLagCollector.name:
+                continue
+            self.lag_probe = lag_probe.LagProbe(
+                send_lag=self._send_lag,
+                probe_interval_seconds=collector.probe_interval_seconds)
+            self.lag_probe.start()
+            return
+
+    def start_heap_snapshots(self):
+        """
+        Start tracing the allocations of the kernel and the snapshot
+        thread of the heap metric if the metric is sampled. Nothing
+        happens if it has already been started.
+        """
+        if self.heap_snapshotter is not None:
+            return
+        for collector in self.collector_list:
+            if collector.name != collectors.HeapSnapshotCollector.name:
+                continue
+            self.heap_snapshotter = heap_snapshot.HeapSnapshotter(
+                send_heap=self._send_heap, log_dir_path=self.log_dir_path,
+                snapshot_interval_seconds=collector.snapshot_interval_seconds,
+                frame_num=collector.frame_num, top_num=collector.top_num)
+            self.heap_snapshotter.start()
+            return
+
+    def get_heap_growth(self):
+        """
+        Get the allocation sites of the kernel that grew most between
+        the last two snapshots of the heap metric.
+
+        Returns
+        -------
+        df : pandas.DataFrame
+            DataFrame having a row per site with the timestamp, site,
+            size_diff_kb, size_kb, count_diff and count columns, in
+            descending order of the growth. Empty until the second
+            snapshot has been taken.
+        """
+        return heap_snapshot.load_heap_growth(log_dir_path=self.log_dir_path)
+
+    def get_cell_summary(self):
+        """
+        Get the summary of the cells executed while tracking.
+
+        Returns
+        -------
+        df : pandas.DataFrame
+            DataFrame having a row per cell with the execution_count,
+            source_line, start_timestamp, end_timestamp,
+            duration_seconds, peak_rss_mb and gpu_memory_delta_mb
+            columns. The summary is saved at the interval of the log
+            file, so the latest cell may not be included yet.
+        """
+        return cell_markers.load_cell_summary(log_dir_path=self.log_dir_path)
+
+    def stop(self, timeout=STOP_TIMEOUT_SECONDS):
+        """
+        Stop the collector. The pending samples are saved before the
+        process exits. Nothing happens if it has already been stopped.
+
+        Parameters
+        ----------
+        timeout : int or float, default STOP_TIMEOUT_SECONDS
+            Seconds to wait for the collector to exit. If it does not
+            exit in time, it is terminated.
+        """
+        if self.is_stopped:
+            return
+        self._stop_cell_tracking()
+        self._stop_lag_probe()
+        self._stop_heap_snapshots()
+        self.is_stopped = True
+        try:
+            with self._command_lock:
+                self.command_conn.send(
+                    {'command': stats_collector.COMMAND_STOP})
+        except (BrokenPipeError, OSError):
+            pass
+        try:
+            self.process.wait(timeout=timeout)
+        except sp.TimeoutExpired:
+            self.process.terminate()
+            self.process.wait(timeout=timeout)
+        self.command_conn.close()
+        if self.status_conn is not None:
+            self.status_conn.close()
+        if self.forwarder is not None:
+            self.forwarder.stop()
+
+    def _send_command(self, command_dict):
+        """
+        Send the command to the collector.
+
+        Parameters
+        ----------
+        command_dict : dict
+            The command. The command name is set to the command key.
+
+        Raises
+        ------
+        Exception
+            If the session has been stopped.
+        """
+        if self.is_stopped:
+            raise Exception('The stats session has already been stopped.')
+        # The commands are also sent from the probe thread.
+        with self._command_lock:
+            self.command_conn.send(command_dict)
+
+    def _send_cell_marker(self, marker_dict):
+        """
+        Send the marker of the cell to the collector. Errors are
+        ignored so that the execution of the cells is not disturbed
+        by the collector that has died.
+
+        Parameters
+        ----------
+        marker_dict : dict
+            The marker made by the CellTracker.
+        """
+        if self.is_stopped:
+            return
+        try:
+            self._send_command(command_dict={
+                'command': stats_collector.COMMAND_CELL_MARKER,
+                'marker': marker_dict,
+            })
+        except (BrokenPipeError, OSError):
+            pass
+
+    def _send_lag(self, lag_seconds_list):
+        """
+        Send the sleep overshoots measured by the probe thread to the
+        collector. Errors are ignored, as the collector may have been
+        stopped while the probe is running.
+
+        Parameters
+        ----------
+        lag_seconds_list : list of float
+            The overshoots in seconds.
+        """
+        if self.is_stopped:
+            return
+        try:
+            self._send_command(command_dict={
+                'command': stats_collector.COMMAND_RECORD_LAG,
+                'lag_seconds_list': lag_seconds_list,
+            })
+        except (BrokenPipeError, OSError):
+            pass
+
+    def _send_heap(self, heap_dict):
+        """
+        Send the values of the heap snapshot to the collector. Errors
+        are ignored, as the collector may have been stopped while the
+        snapshot is taken.
+
+        Parameters
+        ----------
+        heap_dict : dict
+            A dictionary that has the traced_mb, tracemalloc_mb and
+            snapshot_seconds keys.
+        """
+        if self.is_stopped:
+            return
+        try:
+            self._send_command(command_dict={
+                'command': stats_collector.COMMAND_RECORD_HEAP,
+                'heap': heap_dict,
+            })
+        except (BrokenPipeError, OSError):
+            pass
+
+    def _stop_heap_snapshots(self):
+        """
+        Stop the snapshot thread of the heap metric and the tracing
+        of the allocations started by it.
+        """
+        if self.heap_snapshotter is None:
+            return
+        self.heap_snapshotter.stop()
+        self.heap_snapshotter = None
+
+    def _stop_lag_probe(self):
+        """
+        Stop the probe thread of the kernel_lag metric.
+        """
+        if self.lag_probe is None:
+            return
+        self.lag_probe.stop()
+        self.lag_probe = None
+
+    def _stop_cell_tracking(self):
+        """
+        Unregister the callbacks of the cells from the shell.
+        """
+        if self.cell_tracker is None:
+            return
+        self.cell_tracker.unregister()
+        self.cell_tracker = None
+
+
+class ThreadStatsSession(StatsSession):
+
+    def __init__(
+            self, sampler, forwarder, collector_list,
+            metric_interval_seconds_dict, log_dir_path, window_seconds,
+            tier_setting_list):
+        """
+        Class that controls the sampler thread running in the kernel.
+        The instance is created by the display_plot function when the
+        thread sampler is specified.
+
+        Parameters
+        ----------
+        sampler : plot_playground.stats.thread_sampler.ThreadSampler
+            The started sampler thread.
+        forwarder : plot_playground.stats.push_channel.\
+                SamplePushForwarder or None
+            The forwarder of the pushed samples. None if the push
+            update is not used.
+        collector_list : list of MetricCollector
+            Collectors sampled by the sampler thread.
+        metric_interval_seconds_dict : dict
+            A dictionary of the sampling interval of all metrics.
+        log_dir_path : str
+            Directory where the log is saved.
+        window_seconds : int or float
+            Seconds of the time window of the plot.
+        tier_setting_list : list of dicts
+            Settings of the history tiers (only the raw tier).
+        """
+        super(ThreadStatsSession, self).__init__(
+            process=None, command_conn=None, forwarder=forwarder,
+            collector_list=collector_list,
+            metric_interval_seconds_dict=metric_interval_seconds_dict,
+            log_dir_path=log_dir_path, window_seconds=window_seconds,
+            tier_setting_list=tier_setting_list)
+        self.sampler = sampler
+
+    def is_running(self):
+        return not self.is_stopped and self.sampler.is_alive()
+
+    def wait_until_ready(self, timeout=STARTUP_TIMEOUT_SECONDS):
+        self.sampler.ready_event.wait(timeout=timeout)
+        self.error_str = self.sampler.error_str
+        self.is_ready = self.sampler.ready_event.is_set() \
+            and self.error_str is None
+        return self.is_ready
+
+    def get_error(self):
+        self.error_str = self.sampler.error_str
+        return self.error_str
+
+    def add_metric(self, metric, interval_seconds=None):
+        collector_list = collectors.make_collector_list(metrics=[metric])
+        thread_sampler.validate_collectors(collector_list=collector_list)
+        return super(ThreadStatsSession, self).add_metric(
+            metric=collector_list[0], interval_seconds=interval_seconds)
+
+    def stop(self, timeout=STOP_TIMEOUT_SECONDS):
+        if self.is_stopped:
+            return
+        self._stop_cell_tracking()
+        self._stop_lag_probe()
+        self._stop_heap_snapshots()
+        self.is_stopped = True
+        self.sampler.stop(timeout=timeout)
+        if self.forwarder is not None:
+            self.forwarder.stop()
+
+    def get_tick_stats(self):
+        """
+        Get the statistics of the wall time of the recent ticks of the
+        sampler thread.
+
+        Returns
+        -------
+        tick_stats_dict : dict
+            A dictionary with the tick_num, p50_us, p99_us, max_us and
+            over_budget_num keys. See ThreadSampler.get_tick_stats.
+        """
+        return self.sampler.get_tick_stats()
+
+    def _send_command(self, command_dict):
+        if self.is_stopped:
+            raise Exception('The stats session has already been stopped.')
+        self.sampler.send_command(command_dict=command_dict)
+
+
+class SharedStatsSession(StatsSession):
+
+    def __init__(
+            self, reader, subscriber_file_path, forwarder, collector_list,
+            metric_interval_seconds_dict, log_dir_path, window_seconds,
+            tier_setting_list):
+        """
+        Class that controls the reader of the samples of the host-wide
+        shared daemon. The instance is created by the display_plot
+        function when the shared sampler is specified. The daemon
+        keeps running while any kernel subscribes to it.
+
+        Parameters
+        ----------
+        reader : plot_playground.stats.shared_daemon.SharedRingReader
+            The started reader thread.
+        subscriber_file_path : str
+            The path of the file of the subscription to the daemon.
+        forwarder : plot_playground.stats.push_channel.\
+                SamplePushForwarder or None
+            The forwarder of the pushed samples. None if the push
+            update is not used.
+        collector_list : list of MetricCollector
+            Collectors running in the daemon.
+        metric_interval_seconds_dict : dict
+            A dictionary of the sampling interval of all metrics.
+        log_dir_path : str
+            Directory where the log is saved.
+        window_seconds : int or float
+            Seconds of the time window of the plot.
+        tier_setting_list : list of dicts
+            Settings of the history tiers (only the raw tier).
+        """
+        super(SharedStatsSession, self).__init__(
+            process=None, command_conn=None, forwarder=forwarder,
+            collector_list=collector_list,
+            metric_interval_seconds_dict=metric_interval_seconds_dict,
+            log_dir_path=log_dir_path, window_seconds=window_seconds,
+            tier_setting_list=tier_setting_list)
+        self.reader = reader
+        self.subscriber_file_path = subscriber_file_path
+
+    def is_running(self):
+        return not self.is_stopped and self.reader.is_alive()
+
+    def wait_until_ready(self, timeout=STARTUP_TIMEOUT_SECONDS):
+        self.reader.ready_event.wait(timeout=timeout)
+        self.error_str = self.reader.error_str
+        self.is_ready = self.reader.ready_event.is_set() \
+            and self.error_str is None
+        return self.is_ready
+
+    def get_error(self):
+        self.error_str = self.reader.error_str
+        return self.error_str
+
+    def add_metric(self, metric, interval_seconds=None):
+        raise Exception(
+            'The metrics of the shared daemon can not be changed.')
+
+    def stop(self, timeout=STOP_TIMEOUT_SECONDS):
+        if self.is_stopped:
+            return
+        self._stop_cell_tracking()
+        self._stop_lag_probe()
+        self._stop_heap_snapshots()
+        self.is_stopped = True
+        self.reader.stop(timeout=timeout)
+        shared_daemon.unsubscribe(
+            subscriber_file_path=self.subscriber_file_path)
+        if self.forwarder is not None:
+            self.forwarder.stop()
+
+    def _send_command(self, command_dict):
+        if self.is_stopped:
+            raise Exception('The stats session has already been stopped.')
+        self.reader.send_command(command_dict=command_dict)
+
+
+def load_history(
+        start=None, end=None, metrics=None,
+        log_dir_path='./log_plotplayground_stats/'):
+    """
+    Load the samples saved by the display_plot function. This can be
+    used for the post-mortem analysis of the crashed session.
 
     Parameters
     ----------
-    log_dir_path : str
+    start : float, str, datetime.datetime or None, default None
+        Start of the period to load. UNIX time in seconds, or local
+        date and time (e.g., '2019-03-01 12:00:00'). If None, the
+        period starts from the oldest sample.
+    end : float, str, datetime.datetime or None, default None
+        End of the period to load (inclusive). If None, the period
+        ends at the latest sample.
+    metrics : list of str or None, default None
+        Metric names (e.g., 'memory', 'gpu') or column names to load.
+        If None, all columns are loaded.
+    log_dir_path : str, default './log_plotplayground_stats/'
         Directory where the log is saved.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        DataFrame having the timestamp column (UNIX time in seconds)
+        and the column of each metric value. Values of the metrics not
+        sampled at the timestamp are NaN.
+
+    Raises
+    ------
+    FileNotFoundError
+        If no history has been saved in the log directory.
     """
-    error_log_path = os.path.join(log_dir_path, ERR_FILE_NAME)
-    if not os.path.exists(error_log_path):
-        return
-    with open(error_log_path, 'r') as f:
-        error_log = f.read()
-    if error_log == '':
-        return
-    error_log = '---------------------------\nAn error occurred during processing. Please check the following error contents.\n%s' \
-        % error_log
-    print(error_log)
+    df = history_store.load_history(
+        db_path=stats_collector.get_history_db_path(
+            log_dir_path=log_dir_path),
+        start=start, end=end, metrics=metrics)
+    return df
 
 
-def _start_plot_data_updating(
-        interval_seconds, buffer_size, log_dir_path, parent_pid,
-        save_error_to_file=False):
+GPU_PROCESS_COLUMN_LIST = [
+    'gpu_idx', 'pid', 'username', 'command', 'memory_mb', 'kernel_id',
+    'is_current_kernel']
+_KERNEL_CONNECTION_FILE_PATTERN = re.compile(r'kernel-(.+)\.json$')
+
+
+def get_gpu_processes(command_result=None):
     """
-    Start updating the plot data.
+    Get the processes holding the GPU memory, with the notebook
+    kernel each process belongs to.
 
     Parameters
     ----------
-    interval_seconds : int
-        Update interval in seconds. Note: Since command execution
-        time etc. are not considered, it is basically longer than
-        this value.
-    buffer_size : int
-        Buffer size to handle in the plot.
-    log_dir_path : str
-        Directory where the log is saved.
-    parent_pid : int
-        The parent process id.
-    save_error_to_file : bool, default False
-        Boolean value as to whether to save error contents to file.
+    command_result : str or None, default None
+        The result string of the gpustat command. If None, the
+        command is executed.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        DataFrame having a row per process and GPU with the gpu_idx,
+        pid, username, command, memory_mb, kernel_id and
+        is_current_kernel columns, in descending order of the memory.
+        The kernel_id is the ID of the Jupyter kernel of the process
+        or of its ancestor (e.g., of the data loader worker), or an
+        empty string if the process is not started from a kernel.
+        The is_current_kernel is True for this kernel and its
+        descendants.
+    """
+    import pandas as pd
+    gpu_process_list = collectors.get_gpu_process_list(
+        command_result=command_result)
+    current_pid_set = collectors.DescendantPidTracker(
+        root_pid=os.getpid()).refresh()
+    for gpu_process_dict in gpu_process_list:
+        gpu_process_dict['kernel_id'] = _get_kernel_id(
+            pid=gpu_process_dict['pid'])
+        gpu_process_dict['is_current_kernel'] = \
+            gpu_process_dict['pid'] in current_pid_set
+    df = pd.DataFrame(gpu_process_list, columns=GPU_PROCESS_COLUMN_LIST)
+    df.sort_values(by='memory_mb', ascending=False, inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+
+def _get_kernel_id(pid):
     """
+    Get the ID of the Jupyter kernel from the command line of the
+    process or of its ancestors (the kernel is started with the
+    connection file named kernel-<id>.json).
 
-    os.makedirs(log_dir_path, exist_ok=True)
-    _set_error_setting(
-        log_dir_path=log_dir_path,
-        save_error_to_file=save_error_to_file)
-    log_file_path = _get_log_file_path(
-        log_dir_path=log_dir_path
-    )
+    Parameters
+    ----------
+    pid : int
+        ID of the process.
 
-    gpu_num = _get_gpu_num()
-    memory_usage_deque = deque([], maxlen=buffer_size)
-    disk_usage_deque = deque([], maxlen=buffer_size)
-    disk_free_size_deque = deque([], maxlen=buffer_size)
-    gpu_memory_usage_deque_list = []
-    for i in range(gpu_num):
-        gpu_memory_usage_deque_list.append(
-            deque([], maxlen=buffer_size)
-        )
-    pre_dt = datetime.now()
-    while True:
-        _exit_if_parent_process_has_died(parent_pid=parent_pid)
-
-        memory_usage = _get_memory_usage()
-        memory_usage_deque = _fill_deque_by_initial_value(
-            deque_obj=memory_usage_deque,
-            initial_value=memory_usage,
-            buffer_size=buffer_size)
-        memory_usage_deque.append(memory_usage)
-        disk_usage_gb = _get_disk_usage()
-        disk_usage_deque = _fill_deque_by_initial_value(
-            deque_obj=disk_usage_deque, initial_value=disk_usage_gb,
-            buffer_size=buffer_size)
-        disk_usage_deque.append(disk_usage_gb)
-        for i in range(gpu_num):
-            gpu_memory_usage_mb = _get_gpu_memory_usage(gpu_idx=i)
-            gpu_memory_usage_deque_list[i] = _fill_deque_by_initial_value(
-                deque_obj=gpu_memory_usage_deque_list[i],
-                initial_value=gpu_memory_usage_mb,
-                buffer_size=buffer_size
-            )
-            gpu_memory_usage_deque_list[i].append(gpu_memory_usage_mb)
-        _save_csv(
-            memory_usage_deque=memory_usage_deque,
-            disk_usage_deque=disk_usage_deque,
-            gpu_memory_usage_deque_list=gpu_memory_usage_deque_list,
-            log_file_path=log_file_path
-        )
-
-        current_dt = datetime.now()
-        timedelta = current_dt - pre_dt
-        if timedelta.total_seconds() < 1:
-            time.sleep(interval_seconds)
-        pre_dt = current_dt
-
-
-def _update_gpu_disabled_bool():
-    """
-    Updates the boolean value of whether gpu stats is disabled.
-    When Linux environment and gpu stats are installed, and GPU
-    can not be detected, True will be set to that boolean.
-    """
-    global is_gpu_stats_disabled
+    Returns
+    -------
+    kernel_id : str
+        The ID of the kernel. An empty string if no kernel is found
+        or the process is not accessible (e.g., in another PID
+        namespace).
+    """
     try:
-        _exec_gpustat_command()
-    except Exception:
-        is_gpu_stats_disabled = True
+        process = psutil.Process(pid)
+        while process is not None:
+            for arg_str in process.cmdline():
+                match = _KERNEL_CONNECTION_FILE_PATTERN.search(arg_str)
+                if match is not None:
+                    return match.group(1)
+            process = process.parent()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        pass
+    return ''
+
+
+def display_multi_node_plot(
+        shared_dir_path, layout=aggregator.LAYOUT_OVERLAY,
+        window_seconds=MULTI_NODE_WINDOW_SECONDS,
+        log_dir_path='./log_plotplayground_stats/multi_node/', svg_id='',
+        host_num=1, timeout=STARTUP_TIMEOUT_SECONDS,
+        merge_interval_seconds=aggregator.DEFAULT_MERGE_INTERVAL_SECONDS):
+    """
+    Display the plot of the stats of the hosts of a distributed job,
+    collected by the agents of the agent module into the shared
+    directory. The raw logs of the hosts are merged by the timestamp
+    in a thread of the kernel. If the aggregator of the previous call
+    is still running, it is stopped before starting the new one.
 
+    Parameters
+    ----------
+    shared_dir_path : str
+        Shared directory of the agents.
+    layout : str, default 'overlay'
+        The layout of the hosts.
+        - 'overlay' : The lines of all hosts are drawn on a panel per
+            metric, labeled by the host name.
+        - 'per_host' : The panels of each host are drawn one after
+            another.
+    window_seconds : int or float, default 600
+        Seconds of the time window of the plot.
+    log_dir_path : str, default './log_plotplayground_stats/multi_node/'
+        Directory where the merged log is saved.
+    svg_id : str, default ''
+        ID to set for SVG element. When an empty value is specified,
+        a unique character string is generated and used.
+    host_num : int, default 1
+        The number of the hosts to wait for. The hosts whose agent
+        has saved the first sample by then are plotted.
+    timeout : int or float, default STARTUP_TIMEOUT_SECONDS
+        Seconds to wait for the hosts.
+    merge_interval_seconds : int or float, default 2
+        Interval in seconds at which the logs of the hosts are merged.
 
-ERR_FILE_NAME = 'error.log'
+    Notes
+    -----
+    Start the agent on each host as follows.
+        $ python -m plot_playground.stats.agent \
+            --shared_dir_path <shared_dir_path>
 
+    Returns
+    -------
+    multi_node_aggregator : plot_playground.stats.aggregator.\
+            MultiNodeAggregator
+        The running aggregator. The metadata of the displayed plot is
+        stored in its plot_meta attribute.
 
-def _set_error_setting(
-        log_dir_path, save_error_to_file):
+    Raises
+    ------
+    ValueError
+        - If an unknown layout is specified.
+        - If no agent has saved the first sample within the timeout.
+    """
+    global _current_aggregator
+    if _current_aggregator is not None:
+        _current_aggregator.stop()
+        _current_aggregator = None
+
+    agent_meta_list = _wait_for_agent_meta_list(
+        shared_dir_path=shared_dir_path, host_num=host_num, timeout=timeout)
+    if len(agent_meta_list) == 0:
+        err_msg = 'No agent has saved the stats to %s.' % shared_dir_path
+        raise ValueError(err_msg)
+    panel_list = aggregator.make_multi_node_panel_list(
+        agent_meta_list=agent_meta_list, layout=layout)
+    multi_node_aggregator = aggregator.MultiNodeAggregator(
+        shared_dir_path=shared_dir_path,
+        host_name_list=[
+            agent_meta_dict['host_name']
+            for agent_meta_dict in agent_meta_list],
+        log_dir_path=log_dir_path, window_seconds=window_seconds,
+        merge_interval_seconds=merge_interval_seconds)
+    multi_node_aggregator.start()
+    _current_aggregator = multi_node_aggregator
+
+    multi_node_aggregator.plot_meta = _display_stats_plot(
+        svg_id=svg_id, panel_list=panel_list,
+        window_option_list=[{
+            'label': _get_window_label(window_seconds=window_seconds),
+            'window_seconds': window_seconds,
+            'tier_name': history.TIER_NAME_RAW,
+            'csv_log_file_path': multi_node_aggregator.get_log_file_path(),
+        }],
+        window_seconds=window_seconds,
+        raw_retention_seconds=window_seconds,
+        push_comm_target_name='', cell_log_file_path='',
+        heap_log_file_path='', heap_site_num=0, is_static=False)
+    return multi_node_aggregator
+
+
+def _wait_for_agent_meta_list(shared_dir_path, host_num, timeout):
     """
-    Function to set output of error.
+    Wait until the agents of the hosts have saved the first sample.
 
     Parameters
     ----------
-    log_dir_path : str
-        Directory where the log is saved.
-    save_error_to_file : bool
-        Boolean value as to whether to save error contents to file.
+    shared_dir_path : str
+        Shared directory of the agents.
+    host_num : int
+        The number of the hosts to wait for.
+    timeout : int or float
+        Seconds to wait.
+
+    Returns
+    -------
+    agent_meta_list : list of dicts
+        The meta of the ready hosts returned by the
+        load_agent_meta_list function of the aggregator module. Fewer
+        than host_num hosts if the timeout has passed.
+    """
+    start_time = time.time()
+    while True:
+        agent_meta_list = aggregator.load_agent_meta_list(
+            shared_dir_path=shared_dir_path)
+        if len(agent_meta_list) >= host_num \
+                or time.time() - start_time >= timeout:
+            return agent_meta_list
+        time.sleep(MULTI_NODE_POLL_INTERVAL_SECONDS)
+
+
+def display_replay(
+        file_path, svg_id='',
+        point_num=recording.DEFAULT_REPLAY_POINT_NUM,
+        log_dir_path='./log_plotplayground_stats/replay/'):
     """
-    error_log_path = os.path.join(log_dir_path, ERR_FILE_NAME)
+    Display the plot of a recording made by the record command
+    (`python -m plot_playground.stats record`). The whole recording
+    is downsampled to the width of the plot, and the min / max of
+    each bucket are drawn as the bands so that short spikes remain
+    visible.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the recording file.
+    svg_id : str, default ''
+        ID to set for SVG element. When an empty value is specified,
+        a unique character string is generated and used.
+    point_num : int, default DEFAULT_REPLAY_POINT_NUM
+        The number of the buckets over the whole recording.
+    log_dir_path : str, default './log_plotplayground_stats/replay/'
+        Directory where the CSV file of the plot is saved.
+
+    Returns
+    -------
+    plot_meta : plot_playground.common.d3_helper.PlotMeta
+        An object that stores the metadata of the plot.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a recording file.
+    """
+    meta_dict, sample_df = recording.load_recording(file_path=file_path)
+    if svg_id == '':
+        svg_id = d3_helper.make_svg_id()
     os.makedirs(log_dir_path, exist_ok=True)
-    if os.path.exists(error_log_path):
-        os.remove(error_log_path)
-    if not save_error_to_file:
-        return
-    sys.stderr = open(error_log_path, "w")
+    log_file_path = os.path.join(
+        log_dir_path, REPLAY_LOG_FILE_NAME_FORMAT.format(svg_id=svg_id))
+    rollup_df = recording.downsample_samples(
+        sample_df=sample_df, point_num=point_num)
+    rollup_df.to_csv(log_file_path, index=False)
+
+    window_seconds = recording.get_window_seconds(sample_df=sample_df)
+    plot_meta = _display_stats_plot(
+        svg_id=svg_id, panel_list=meta_dict['panel_list'],
+        window_option_list=[{
+            'label': _get_window_label(window_seconds=window_seconds),
+            'window_seconds': window_seconds,
+            'tier_name': TIER_NAME_REPLAY,
+            'csv_log_file_path': log_file_path,
+        }],
+        window_seconds=window_seconds,
+        raw_retention_seconds=window_seconds,
+        push_comm_target_name='', cell_log_file_path='',
+        heap_log_file_path='', heap_site_num=0, is_static=True)
+    return plot_meta
 
 
-def _fill_deque_by_initial_value(
-        deque_obj, initial_value, buffer_size):
+def profile(
+        label, burst_interval_seconds=None, metrics=None,
+        log_dir_path='./log_plotplayground_stats/',
+        sampler=SAMPLER_PROCESS):
     """
-    Fill the deque object with the initial value.
+    Get the context manager that profiles the resources used by the
+    code block. e.g.,
+
+    >>> with linux_stats_plot.profile('epoch 3') as epoch_profile:
+    ...     train()
+    ...     linux_stats_plot.mark('checkpoint saved')
+    >>> epoch_profile.timeline.display()
 
     Parameters
     ----------
-    deque_obj : collections.deque
-        The deque object to add to.
-    initial_value : int or float
-        Initial value to be referenced.
-    buffer_size : int
-        Buffer size to handle in the plot.
+    label : str
+        Label of the code block.
+    burst_interval_seconds : int, float or None, default None
+        If specified, the metrics sampled at a longer interval are
+        sampled at this interval in the block, and the intervals are
+        restored at the end of the block.
+    metrics : list of str or MetricCollector, or None, default None
+        Metrics to sample if no collector is running. The running
+        collector (e.g., of the display_plot function or of the outer
+        profile block) is used as it is. If None, the default metrics
+        of the sampler are used.
+    log_dir_path : str, default './log_plotplayground_stats/'
+        Directory where the log is saved if no collector is running.
+    sampler : str, default 'process'
+        Where the samples are collected if no collector is running
+        ('process' or 'thread', see the display_plot function).
 
     Returns
     -------
-    deque_obj : collections.deque
-        Deque object after adding data.
+    resource_profile : ResourceProfile
+        The context manager. The ProfileTimeline of the block is set
+        to its timeline attribute at the end of the block.
+
+    Raises
+    ------
+    ValueError
+        If an unknown sampler is specified.
     """
-    if len(deque_obj) != 0:
-        return deque_obj
-    while len(deque_obj) < buffer_size:
-        deque_obj.append(initial_value)
-    return deque_obj
+    if sampler not in (SAMPLER_PROCESS, SAMPLER_THREAD):
+        err_msg = 'Unknown sampler is specified: %s' % sampler
+        raise ValueError(err_msg)
+    resource_profile = ResourceProfile(
+        label=label, burst_interval_seconds=burst_interval_seconds,
+        metrics=metrics, log_dir_path=log_dir_path, sampler=sampler)
+    return resource_profile
 
 
-def _exit_if_parent_process_has_died(parent_pid):
+def mark(label):
     """
-    If there is no parent process, stop the child process.
+    Record the event of the label in the innermost running profile
+    block. This can be left in the code run without the profiler.
 
     Parameters
     ----------
-    parent_pid : int
-        The Parent process id.
+    label : str
+        Label of the event. e.g., 'checkpoint saved'
+
+    Returns
+    -------
+    is_marked : bool
+        True if the event has been recorded. False if no profile block
+        is running.
     """
-    is_parent_process_alive = False
-    for process in psutil.process_iter():
-        process_info_dict = process.as_dict(attrs=['pid'])
-        if int(process_info_dict['pid']) == parent_pid:
-            is_parent_process_alive = True
-            break
-    if not is_parent_process_alive:
-        sys.exit()
+    if len(_active_profile_list) == 0:
+        return False
+    _active_profile_list[-1].mark(label=label)
+    return True
+
+
+class ResourceProfile():
+
+    def __init__(
+            self, label, burst_interval_seconds, metrics, log_dir_path,
+            sampler):
+        """
+        Context manager that profiles the resources used by the code
+        block. The instance is created by the profile function.
+
+        Parameters
+        ----------
+        label : str
+            Label of the code block.
+        burst_interval_seconds : int, float or None
+            Sampling interval in the block. If None, the intervals are
+            not changed.
+        metrics : list of str or MetricCollector, or None
+            Metrics to sample if no collector is running.
+        log_dir_path : str
+            Directory where the log is saved if no collector is
+            running.
+        sampler : str
+            SAMPLER_PROCESS or SAMPLER_THREAD.
+        """
+        self.label = label
+        self.burst_interval_seconds = burst_interval_seconds
+        self.metrics = metrics
+        self.log_dir_path = log_dir_path
+        self.sampler = sampler
+        self.stats_session = None
+        self.is_session_started = False
+        self.restored_interval_seconds_dict = {}
+        self.start_timestamp = None
+        self.event_list = []
+        self.timeline = None
+
+    def __enter__(self):
+        # The nested blocks use the collector of the outermost block,
+        # so that only one collector writes the log directory. It is
+        # stopped by the block that has started it.
+        running_session_list = [
+            stats_session for stats_session in [_current_session] + [
+                active_profile.stats_session
+                for active_profile in _active_profile_list]
+            if stats_session is not None and stats_session.is_running()]
+        if running_session_list:
+            self.stats_session = running_session_list[0]
+        else:
+            self.stats_session = _start_session(
+                buffer_size=PROFILE_BUFFER_SIZE,
+                log_dir_path=self.log_dir_path,
+                svg_id=d3_helper.make_svg_id(), comm_manager=None,
+                metric_interval_seconds=None, metrics=self.metrics,
+                persist_history=True,
+                history_retention_seconds=history_store.
+                DEFAULT_RETENTION_SECONDS,
+                sampler=self.sampler)
+            self.is_session_started = True
+            self.stats_session.wait_until_ready()
+            if self.stats_session.error_str is not None:
+                _print_collector_error(
+                    error_str=self.stats_session.error_str)
+        if self.burst_interval_seconds is not None \
+                and self.stats_session.is_running():
+            self._start_burst()
+        self.start_timestamp = round(time.time(), 3)
+        _active_profile_list.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end_timestamp = round(time.time(), 3)
+        if self in _active_profile_list:
+            _active_profile_list.remove(self)
+        if self.stats_session.is_running():
+            for metric_name, interval_seconds in \
+                    self.restored_interval_seconds_dict.items():
+                self.stats_session.set_interval(
+                    metric_name=metric_name,
+                    interval_seconds=interval_seconds)
+            _wait_for_raw_log(
+                log_dir_path=self.stats_session.log_dir_path,
+                timestamp=end_timestamp)
+        sample_df = _load_profile_samples(
+            log_dir_path=self.stats_session.log_dir_path,
+            start_timestamp=self.start_timestamp,
+            end_timestamp=end_timestamp)
+        if self.is_session_started:
+            self.stats_session.stop()
+        self.timeline = ProfileTimeline(
+            label=self.label, start_timestamp=self.start_timestamp,
+            end_timestamp=end_timestamp, event_list=self.event_list,
+            sample_df=sample_df,
+            collector_list=self.stats_session.collector_list,
+            log_dir_path=self.stats_session.log_dir_path)
+        # The exception of the block is not suppressed.
+        return False
+
+    def mark(self, label):
+        """
+        Record the event of the label at the current time.
+
+        Parameters
+        ----------
+        label : str
+            Label of the event.
+        """
+        self.event_list.append({
+            'timestamp': round(time.time(), 3),
+            'label': label,
+        })
 
+    def _start_burst(self):
+        """
+        Shorten the sampling interval of the metrics sampled at a
+        longer interval than the burst interval, keeping their
+        intervals to restore.
+        """
+        metric_interval_seconds_dict = dict(
+            self.stats_session.metric_interval_seconds_dict)
+        for metric_name, interval_seconds in \
+                metric_interval_seconds_dict.items():
+            if interval_seconds <= self.burst_interval_seconds:
+                continue
+            self.stats_session.set_interval(
+                metric_name=metric_name,
+                interval_seconds=self.burst_interval_seconds)
+            self.restored_interval_seconds_dict[metric_name] = \
+                interval_seconds
+
+
+class ProfileTimeline():
+
+    def __init__(
+            self, label, start_timestamp, end_timestamp, event_list,
+            sample_df, collector_list, log_dir_path):
+        """
+        Class of the samples and the events of the profiled code
+        block. The instance is created at the end of the block.
+
+        Parameters
+        ----------
+        label : str
+            Label of the code block.
+        start_timestamp : float
+            UNIX time in seconds of the start of the block.
+        end_timestamp : float
+            UNIX time in seconds of the end of the block.
+        event_list : list of dicts
+            Events recorded by the mark function. Each dictionary has
+            the timestamp and label keys.
+        sample_df : pandas.DataFrame
+            The samples in the block, having the timestamp column and
+            the column of each metric value.
+        collector_list : list of MetricCollector
+            Collectors of the samples, to make the panels.
+        log_dir_path : str
+            Directory where the CSV files of the plot are saved.
+        """
+        self.label = label
+        self.start_timestamp = start_timestamp
+        self.end_timestamp = end_timestamp
+        self.duration_seconds = round(end_timestamp - start_timestamp, 3)
+        self.event_list = list(event_list)
+        self.sample_df = sample_df
+        self.collector_list = list(collector_list)
+        self.log_dir_path = log_dir_path
+        self.plot_meta = None
+
+    def get_event_df(self):
+        """
+        Get the events including the start and the end of the block.
+
+        Returns
+        -------
+        event_df : pandas.DataFrame
+            DataFrame having the timestamp, elapsed_seconds (from the
+            start of the block) and label columns.
+        """
+        import pandas as pd
+        event_list = [{
+            'timestamp': self.start_timestamp,
+            'label': 'start: %s' % self.label,
+        }]
+        event_list.extend(self.event_list)
+        event_list.append({
+            'timestamp': self.end_timestamp,
+            'label': 'end: %s' % self.label,
+        })
+        event_df = pd.DataFrame(event_list, columns=['timestamp', 'label'])
+        event_df.insert(
+            loc=1, column='elapsed_seconds',
+            value=(event_df['timestamp'] - self.start_timestamp).round(3))
+        return event_df
+
+    def display(self, svg_id=''):
+        """
+        Display the plot of the samples in the block. The block and
+        the events are drawn as the bands on all panels.
+
+        Parameters
+        ----------
+        svg_id : str, default ''
+            ID to set for SVG element. When an empty value is
+            specified, a unique character string is generated and
+            used.
+
+        Returns
+        -------
+        plot_meta : plot_playground.common.d3_helper.PlotMeta
+            An object that stores the metadata of the plot.
+        """
+        if svg_id == '':
+            svg_id = d3_helper.make_svg_id()
+        os.makedirs(self.log_dir_path, exist_ok=True)
+        log_file_path = os.path.join(
+            self.log_dir_path,
+            PROFILE_LOG_FILE_NAME_FORMAT.format(svg_id=svg_id))
+        self.sample_df.to_csv(log_file_path, index=False)
+        event_log_file_path = os.path.join(
+            self.log_dir_path,
+            PROFILE_EVENT_LOG_FILE_NAME_FORMAT.format(svg_id=svg_id))
+        cell_markers.save_cell_csv(
+            cell_list=self._get_cell_list(), file_path=event_log_file_path)
+
+        window_seconds = max(math.ceil(self.duration_seconds), 1)
+        self.plot_meta = _display_stats_plot(
+            svg_id=svg_id,
+            panel_list=_get_panel_list(collector_list=self.collector_list),
+            window_option_list=[{
+                'label': _get_window_label(window_seconds=window_seconds),
+                'window_seconds': window_seconds,
+                'tier_name': history.TIER_NAME_RAW,
+                'csv_log_file_path': log_file_path,
+            }],
+            window_seconds=window_seconds,
+            raw_retention_seconds=window_seconds,
+            push_comm_target_name='',
+            cell_log_file_path=event_log_file_path,
+            heap_log_file_path='', heap_site_num=0, is_static=True)
+        return self.plot_meta
+
+    def export(self, file_path):
+        """
+        Export the samples and the events of the block to a JSON file.
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the JSON file. The file has the label,
+            start_timestamp, end_timestamp, event_list and samples
+            keys, and the samples have the columns and data keys
+            (values not sampled at the timestamp are null).
+        """
+        timeline_dict = {
+            'label': self.label,
+            'start_timestamp': self.start_timestamp,
+            'end_timestamp': self.end_timestamp,
+            'event_list': self.event_list,
+            'samples': json.loads(self.sample_df.to_json(
+                orient='split', index=False)),
+        }
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(timeline_dict, f)
+
+    def _get_cell_list(self):
+        """
+        Get the block and the events in the format of the cells drawn
+        as the bands of the plot.
+
+        Returns
+        -------
+        cell_list : list of dicts
+            The block followed by the events (bands of no duration).
+        """
+        cell_list = [{
+            'execution_count': None,
+            'source_line': self.label,
+            'start_timestamp': self.start_timestamp,
+            'end_timestamp': self.end_timestamp,
+            'duration_seconds': self.duration_seconds,
+            'peak_rss_mb': None,
+            'gpu_memory_delta_mb': None,
+        }]
+        for event_dict in self.event_list:
+            cell_list.append({
+                'execution_count': None,
+                'source_line': event_dict['label'],
+                'start_timestamp': event_dict['timestamp'],
+                'end_timestamp': event_dict['timestamp'],
+                'duration_seconds': None,
+                'peak_rss_mb': None,
+                'gpu_memory_delta_mb': None,
+            })
+        return cell_list
+
+
+def _wait_for_raw_log(
+        log_dir_path, timestamp, timeout=PROFILE_WAIT_TIMEOUT_SECONDS):
+    """
+    Wait until the raw log file has been saved after the timestamp,
+    so that it has the samples until the timestamp.
 
-_COLUMN_NAME_MEMORY_USAGE = 'memory usage (MB)'
-_COLUMN_NAME_DISK_USAGE = 'disk usage (GB)'
-_COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT = 'gpu({gpu_idx}) memory usage (MB)'
+    Parameters
+    ----------
+    log_dir_path : str
+        Directory where the log is saved.
+    timestamp : float
+        UNIX time in seconds.
+    timeout : int or float, default PROFILE_WAIT_TIMEOUT_SECONDS
+        Seconds to wait.
+    """
+    log_file_path = stats_collector.get_log_file_path(
+        log_dir_path=log_dir_path)
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        if os.path.exists(log_file_path) \
+                and os.path.getmtime(log_file_path) > timestamp:
+            return
+        time.sleep(0.05)
 
 
-def _save_csv(
-        memory_usage_deque, disk_usage_deque,
-        gpu_memory_usage_deque_list, log_file_path):
+def _load_profile_samples(log_dir_path, start_timestamp, end_timestamp):
     """
-    Save the acquired data as a CSV for plotting.
+    Load the samples of the period of the profiled block from the raw
+    log file and, for the period older than the raw tier, from the
+    history database.
 
     Parameters
     ----------
-    memory_usage_deque : collections.deque
-        The deque object containing the memory usage value.
-    disk_usage_deque : collections.deque
-        The deque object containing the disk usage value.
-    gpu_memory_usage_deque_list : list of collections.deque
-        A list of deque objects containing memory usage of the GPU.
-    log_file_path : str
-        The file path of the log.
-    """
-    df_len = len(memory_usage_deque)
-    df = pd.DataFrame(
-        columns=[
-            _COLUMN_NAME_MEMORY_USAGE,
-            _COLUMN_NAME_DISK_USAGE,
-        ],
-        index=np.arange(0, df_len))
-    df[_COLUMN_NAME_MEMORY_USAGE] = memory_usage_deque
-    df[_COLUMN_NAME_DISK_USAGE] = disk_usage_deque
-    for i, gpu_memory_usage_deque in \
-            enumerate(gpu_memory_usage_deque_list):
-        column_name = _COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT.format(
-            gpu_idx=i
-        )
-        df[column_name] = gpu_memory_usage_deque
-    df.to_csv(log_file_path, index=False, encoding='utf-8')
-
-
-def _get_gpu_memory_usage(gpu_idx):
-    """
-    Get the GPU memory usage of the specified index.
+    log_dir_path : str
+        Directory where the log is saved.
+    start_timestamp : float
+        UNIX time in seconds of the start of the period.
+    end_timestamp : float
+        UNIX time in seconds of the end of the period (inclusive).
+
+    Returns
+    -------
+    sample_df : pandas.DataFrame
+        DataFrame having the timestamp column and the column of each
+        metric value, sorted by the timestamp.
+    """
+    import pandas as pd
+    log_file_path = stats_collector.get_log_file_path(
+        log_dir_path=log_dir_path)
+    sample_df = pd.DataFrame(columns=[stats_collector.COLUMN_NAME_TIMESTAMP])
+    if os.path.exists(log_file_path):
+        sample_df = pd.read_csv(log_file_path)
+    raw_start_timestamp = end_timestamp
+    if len(sample_df) > 0:
+        raw_start_timestamp = sample_df[
+            stats_collector.COLUMN_NAME_TIMESTAMP].min()
+    history_db_path = stats_collector.get_history_db_path(
+        log_dir_path=log_dir_path)
+    if raw_start_timestamp > start_timestamp \
+            and os.path.exists(history_db_path):
+        history_df = history_store.load_history(
+            db_path=history_db_path, start=start_timestamp,
+            end=float(raw_start_timestamp))
+        sample_df = pd.concat([history_df, sample_df], sort=False)
+    timestamp_series = sample_df[stats_collector.COLUMN_NAME_TIMESTAMP]
+    sample_df = sample_df[
+        (timestamp_series >= start_timestamp)
+        & (timestamp_series <= end_timestamp)]
+    sample_df = sample_df.drop_duplicates(
+        subset=stats_collector.COLUMN_NAME_TIMESTAMP, keep='last')
+    sample_df = sample_df.sort_values(
+        by=stats_collector.COLUMN_NAME_TIMESTAMP).reset_index(drop=True)
+    return sample_df
+
+
+PANEL_MARGIN = 20
+HEAP_SITE_LINE_HEIGHT = 21
+
+
+def _display_stats_plot(
+        svg_id, panel_list, window_option_list, window_seconds,
+        raw_retention_seconds, push_comm_target_name, cell_log_file_path,
+        heap_log_file_path, heap_site_num, is_static):
+    """
+    Display the plot of the panels by the template of the stats plot.
 
     Parameters
     ----------
-    gpu_idx : int
-        Index of target GPU (starting from zero).
+    svg_id : str
+        ID to set for SVG element. When an empty value is specified,
+        a unique character string is generated and used.
+    panel_list : list of dicts
+        Settings of the panels.
+    window_option_list : list of dicts
+        Options of the time window selector.
+    window_seconds : int or float
+        Seconds of the time window to plot initially.
+    raw_retention_seconds : int or float
+        Seconds for which the raw samples are kept.
+    push_comm_target_name : str
+        Target name of the Jupyter comm that pushes the samples. If an
+        empty string is specified, the CSV log file is polled.
+    cell_log_file_path : str
+        Path of the CSV log file of the cells drawn as the bands.
+    heap_log_file_path : str
+        Path of the CSV log file of the growing allocation sites.
+    heap_site_num : int
+        The number of the allocation sites listed under the panels.
+        If zero, the list is not displayed.
+    is_static : bool
+        If True, the CSV log files are read only once (e.g., the
+        replay of a recording). Otherwise they are polled.
 
     Returns
     -------
-    gpu_memory_usage_mb : int
-        GPU memory usage in megabytes.
+    plot_meta : plot_playground.common.d3_helper.PlotMeta
+        An object that stores the metadata of the plot.
     """
-    target_line_str = _get_gpustat_line_str_by_gpu_idx(
-        gpu_idx=gpu_idx
+    if svg_id == '':
+        svg_id = d3_helper.make_svg_id()
+    css_template_str = d3_helper.read_template_str(
+        template_file_path=PATH_CSS_TEMPLATE)
+    css_param = {
+        'svg_id': svg_id,
+    }
+    css_template_str = d3_helper.apply_css_param_to_template(
+        css_template_str=css_template_str,
+        css_param=css_param)
+
+    js_template_str = d3_helper.read_template_str(
+        template_file_path=PATH_JS_TEMPLATE)
+    js_param = {
+        'svg_id': svg_id,
+        'panel_list': panel_list,
+        'window_option_list': window_option_list,
+        'window_seconds': window_seconds,
+        'raw_retention_seconds': raw_retention_seconds,
+        'push_comm_target_name': push_comm_target_name,
+        'cell_log_file_path': cell_log_file_path,
+        'heap_log_file_path': heap_log_file_path,
+        'heap_site_num': heap_site_num,
+        'is_static': json.dumps(is_static),
+        'js_helper_func_get_b_box_width': d3_helper.read_template_str(
+            template_file_path=js_helper_template_path.GET_B_BOX_WIDTH),
+    }
+    js_template_str = d3_helper.apply_js_param_to_template(
+        js_template_str=js_template_str,
+        js_param=js_param)
+
+    html_str = d3_helper.exec_d3_js_script_on_jupyter(
+        js_script=js_template_str,
+        css_str=css_template_str,
+        svg_id=svg_id,
+        svg_width=950,
+        svg_height=_get_svg_height(
+            panel_list=panel_list, heap_site_num=heap_site_num),
     )
-    gpu_memory_str = target_line_str.split('|')[2]
-    gpu_memory_str = gpu_memory_str.split('/')[0]
-    gpu_memory_str = gpu_memory_str.strip()
-    gpu_memory_usage_mb = int(gpu_memory_str)
-    return gpu_memory_usage_mb
+
+    plot_meta = d3_helper.PlotMeta(
+        html_str=html_str,
+        js_template_str=js_template_str,
+        js_param=js_param,
+        css_template_str=css_template_str,
+        css_param=css_param)
+    return plot_meta
 
 
-def _get_gpustat_line_str_by_gpu_idx(gpu_idx):
+def _get_window_option_list(window_seconds, tier_setting_list, log_dir_path):
     """
-    Gets the command result string at the specified GPU index.
+    Get the options of the time window selector of the plot.
 
     Parameters
     ----------
-    gpu_idx : int
-        Index of target GPU (starting from zero).
+    window_seconds : int or float
+        Seconds of the initial time window of the plot.
+    tier_setting_list : list of dicts
+        Settings of the history tiers.
+    log_dir_path : str
+        Directory where the log is saved.
 
     Returns
     -------
-    target_line_str
-        The command result string at the specified GPU index.
+    window_option_list : list of dicts
+        A list of options in ascending order of the window. Each
+        dictionary has label, window_seconds, tier_name and
+        csv_log_file_path keys. Windows longer than the retention of
+        all tiers (other than the initial window) are excluded.
     """
-    command_result = _exec_gpustat_command()
-    target_line_str = command_result.split('\n')[gpu_idx + 1]
-    return target_line_str
+    window_seconds_list = sorted(set(WINDOW_SECONDS_LIST + [window_seconds]))
+    max_retention_seconds = max(
+        tier_setting['retention_seconds']
+        for tier_setting in tier_setting_list)
+    window_option_list = []
+    for option_window_seconds in window_seconds_list:
+        if option_window_seconds > max_retention_seconds \
+                and option_window_seconds != window_seconds:
+            continue
+        tier_name = history.select_tier_name(
+            tier_setting_list=tier_setting_list,
+            window_seconds=option_window_seconds)
+        window_option_list.append({
+            'label': _get_window_label(window_seconds=option_window_seconds),
+            'window_seconds': option_window_seconds,
+            'tier_name': tier_name,
+            'csv_log_file_path': stats_collector.get_log_file_path(
+                log_dir_path=log_dir_path, tier_name=tier_name),
+        })
+    return window_option_list
 
 
-def _get_disk_usage():
+def _get_window_label(window_seconds):
     """
-    Get disk usage.
+    Get the label of the time window displayed in the selector.
+
+    Parameters
+    ----------
+    window_seconds : int or float
+        Seconds of the time window.
 
     Returns
     -------
-    disk_usage_gb : float
-        Disk usage in gigabytes.
+    label : str
+        The label (e.g., '30s', '10min', '3h', '1d').
     """
-    disk_usage = psutil.disk_usage('./')
-    disk_usage_gb = round(disk_usage.used / (1024.0 ** 3), 2)
-    return disk_usage_gb
+    for unit_seconds, unit_str in ((86400, 'd'), (3600, 'h'), (60, 'min')):
+        if window_seconds >= unit_seconds \
+                and window_seconds % unit_seconds == 0:
+            return '%d%s' % (window_seconds // unit_seconds, unit_str)
+    return '%ss' % window_seconds
 
 
-def _get_memory_usage():
+def _get_panel_list(collector_list):
     """
-    Get current memory usage (rss total).
+    Get the settings of all panels drawn in the plot.
+
+    Parameters
+    ----------
+    collector_list : list of MetricCollector
+        A list of available collectors.
 
     Returns
     -------
-    memory_usage : int
-        Memory consumption in megabytes.
+    panel_list : list of dicts
+        A list of panel settings in the order of the collectors.
     """
-    memory_usage = 0
-    for process in psutil.process_iter():
-        memory_usage += process.memory_info().rss
-    memory_usage = int(memory_usage / 1048576)
-    return memory_usage
+    panel_list = []
+    for collector in collector_list:
+        panel_list.extend(collector.get_panel_list())
+    return panel_list
 
 
-def _get_gpu_num():
+def _get_heap_site_num(collector_list):
     """
-    Get the number of GPUs.
+    Get the number of the growing allocation sites listed under the
+    panels.
+
+    Parameters
+    ----------
+    collector_list : list of MetricCollector
+        Collectors of the plot.
 
     Returns
     -------
-    gpu_num : int
-        The number of GPUs. 0 is returned under the following
-        conditions.
-        - The gpustat library is not installed.
-        - In an environment without GPU.
-        - Environment such as windows.
-    """
-    command_result = _exec_gpustat_command()
-    if command_result == '':
-        return 0
-    is_in = 'Error' in command_result
-    if is_in:
-        return 0
-    gpu_num = 0
-    splited_command_result = command_result.split('\n')
-    for i, unit_line_gpu_str in enumerate(splited_command_result):
-        if i == 0:
-            # Ignore the heading line.
-            continue
-        if unit_line_gpu_str == '':
-            continue
-        gpu_num += 1
-    return gpu_num
+    heap_site_num : int
+        The top_num of the heap metric, or zero if the metric is not
+        sampled.
+    """
+    for collector in collector_list:
+        if collector.name == collectors.HeapSnapshotCollector.name:
+            return collector.top_num
+    return 0
 
 
-def _exec_gpustat_command():
+def _get_svg_height(panel_list, heap_site_num=0):
     """
-    Execute the command of the gpustat library and obtain the result.
+    Get the height of the SVG element.
+
+    Parameters
+    ----------
+    panel_list : list of dicts
+        Settings of the panels.
+    heap_site_num : int, default 0
+        The number of the allocation sites listed under the panels.
 
     Returns
     -------
-    command_result : str
-        String of command execution result. The string changes
-        under each condition as follows.
-        - If gpustat is disabled: An empty character will be returned.
-        - If there is no GPU: 'Error on querying NVIDIA devices. Use --debug flag for details'
-        - If GPU exists more than one: '28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n[1] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n'
+    svg_height : int
+        The height of the SVG element in pixels.
     """
-    global is_gpu_stats_disabled
-    if is_gpu_stats_disabled:
-        return ''
-    command_result = sp.check_output('gpustat').decode('utf-8')
-    return command_result
+    svg_height = PANEL_MARGIN * (len(panel_list) + 1)
+    for panel_dict in panel_list:
+        svg_height += panel_dict['height']
+    if heap_site_num > 0:
+        svg_height += HEAP_SITE_LINE_HEIGHT * (heap_site_num + 1) \
+            + PANEL_MARGIN
+    return svg_height
 
 
-def _get_log_file_path(log_dir_path):
+def _print_collector_error(error_str):
     """
-    Get the path of the log file.
+    Print the error reported by the collector to the console.
 
     Parameters
     ----------
-    log_dir_path : str
-        Directory where the log is saved.
-
-    Returns
-    -------
-    log_file_path : str
-        The path of the log file.
+    error_str : str
+        The traceback of the error.
     """
-    log_file_path = os.path.join(
-        log_dir_path,
-        'log_linux_stats_plot.csv'
-    )
-    return log_file_path
+    error_log = '---------------------------\nAn error occurred during processing. Please check the following error contents.\n%s' \
+        % error_str
+    print(error_log)
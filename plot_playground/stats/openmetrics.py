@@ -0,0 +1,304 @@
+"""
+Module of the OpenMetrics exposition of the samples of the collector.
+The collector optionally serves the latest samples of its in-memory
+history over a local HTTP endpoint, so that an external scraper (e.g.,
+Prometheus) reads the same samples as the plot without sampling again.
+
+Notes
+-----
+Each column is exposed as a gauge named after the column (e.g.,
+'memory usage (MB)' as plot_playground_memory_usage_mb), with the
+timestamp of its latest sample. The quantile columns estimated by the
+collector (e.g., 'memory usage (MB) (p99)') are exposed as the
+quantiles of a summary of the session (e.g.,
+plot_playground_memory_usage_mb_session{quantile="0.99"}).
+    $ curl http://127.0.0.1:<port>/metrics
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import math
+import re
+import threading
+
+import numpy as np
+
+DEFAULT_HOST = '127.0.0.1'
+METRICS_PATH = '/metrics'
+METRIC_NAME_PREFIX = 'plot_playground_'
+SESSION_SUMMARY_SUFFIX = '_session'
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+STOP_TIMEOUT_SECONDS = 5
+_QUANTILE_COLUMN_NAME_PATTERN = re.compile(
+    r'^(?P<column_name>.+) \(p(?P<percentile>[0-9.]+)\)$')
+
+
+def get_metric_name(column_name):
+    """
+    Get the name of the metric of the column.
+
+    Parameters
+    ----------
+    column_name : str
+        Name of the column. e.g., 'memory usage (MB)'
+
+    Returns
+    -------
+    metric_name : str
+        The name consisting of the lowercase letters, the digits and
+        the underscores with the prefix. e.g.,
+        'plot_playground_memory_usage_mb'
+    """
+    metric_name = column_name.lower().replace('%', ' percent ')
+    metric_name = re.sub(r'[^a-z0-9]+', '_', metric_name).strip('_')
+    return METRIC_NAME_PREFIX + metric_name
+
+
+def get_latest_samples(column_list, timestamp_array, value_array):
+    """
+    Get the latest sample of each column. Since each metric is sampled
+    at its own interval, the latest row may not have all columns.
+
+    Parameters
+    ----------
+    column_list : list of str
+        Names of the value columns.
+    timestamp_array : numpy.ndarray
+        Timestamps of the rows in chronological order.
+    value_array : numpy.ndarray
+        2-dimensional array of the values of the rows. Missing values
+        are NaN.
+
+    Returns
+    -------
+    latest_sample_dict : dict
+        A dictionary that stores the column name in key and the tuple
+        of the timestamp and the value of the latest sample in value.
+        Columns never sampled are excluded.
+    """
+    if len(timestamp_array) == 0:
+        return {}
+    is_sampled_array = ~np.isnan(value_array)
+    last_idx_array = len(timestamp_array) - 1 \
+        - np.argmax(is_sampled_array[::-1], axis=0)
+    latest_sample_dict = {}
+    for i, column_name in enumerate(column_list):
+        if not is_sampled_array[:, i].any():
+            continue
+        row_idx = last_idx_array[i]
+        latest_sample_dict[column_name] = (
+            float(timestamp_array[row_idx]), float(value_array[row_idx, i]))
+    return latest_sample_dict
+
+
+def _format_value(value):
+    """
+    Format the value of a sample.
+
+    Parameters
+    ----------
+    value : float
+        The value.
+
+    Returns
+    -------
+    value_str : str
+        The value in the OpenMetrics text format. e.g., '416.0',
+        '+Inf'
+    """
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+def _escape_help(help_str):
+    """
+    Escape the text of the HELP line.
+
+    Parameters
+    ----------
+    help_str : str
+        The text.
+
+    Returns
+    -------
+    escaped_help_str : str
+        The text with the backslashes and the line breaks escaped.
+    """
+    return help_str.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def format_openmetrics(column_list, timestamp_array, value_array):
+    """
+    Format the latest samples in the OpenMetrics text format.
+
+    Parameters
+    ----------
+    column_list : list of str
+        Names of the value columns.
+    timestamp_array : numpy.ndarray
+        Timestamps of the rows in chronological order.
+    value_array : numpy.ndarray
+        2-dimensional array of the values of the rows. Missing values
+        are NaN.
+
+    Returns
+    -------
+    openmetrics_str : str
+        The exposition, ending with the '# EOF' line. Columns never
+        sampled and the columns whose metric name duplicates that of
+        a preceding column are excluded.
+    """
+    latest_sample_dict = get_latest_samples(
+        column_list=column_list, timestamp_array=timestamp_array,
+        value_array=value_array)
+    gauge_column_list = []
+    quantile_column_list_dict = {}
+    for column_name in column_list:
+        match = _QUANTILE_COLUMN_NAME_PATTERN.match(column_name)
+        if match is None:
+            gauge_column_list.append(column_name)
+            continue
+        quantile_column_list_dict.setdefault(
+            match.group('column_name'), []).append(
+                ('%g' % (float(match.group('percentile')) / 100),
+                 column_name))
+
+    line_list = []
+    metric_name_set = set()
+    for column_name in gauge_column_list + [
+            column_name for column_name in quantile_column_list_dict
+            if column_name not in gauge_column_list]:
+        metric_name = get_metric_name(column_name=column_name)
+        if column_name in gauge_column_list \
+                and column_name in latest_sample_dict \
+                and metric_name not in metric_name_set:
+            metric_name_set.add(metric_name)
+            timestamp, value = latest_sample_dict[column_name]
+            line_list.append('# TYPE %s gauge' % metric_name)
+            line_list.append('# HELP %s %s' % (
+                metric_name, _escape_help(help_str=column_name)))
+            line_list.append('%s %s %.3f' % (
+                metric_name, _format_value(value=value), timestamp))
+
+        summary_name = metric_name + SESSION_SUMMARY_SUFFIX
+        quantile_line_list = []
+        for quantile_str, quantile_column_name in \
+                quantile_column_list_dict.get(column_name, []):
+            if quantile_column_name not in latest_sample_dict:
+                continue
+            timestamp, value = latest_sample_dict[quantile_column_name]
+            quantile_line_list.append('%s{quantile="%s"} %s %.3f' % (
+                summary_name, quantile_str, _format_value(value=value),
+                timestamp))
+        if len(quantile_line_list) == 0 or summary_name in metric_name_set:
+            continue
+        metric_name_set.add(summary_name)
+        line_list.append('# TYPE %s summary' % summary_name)
+        line_list.append('# HELP %s %s' % (
+            summary_name,
+            _escape_help(help_str='Quantiles of %s over the session of '
+                                  'the collector.' % column_name)))
+        line_list.extend(quantile_line_list)
+    line_list.append('# EOF')
+    return '\n'.join(line_list) + '\n'
+
+
+class OpenMetricsServer():
+
+    def __init__(self, tiered_history, history_lock, port=0,
+                 host=DEFAULT_HOST):
+        """
+        Class of the HTTP server that exposes the latest samples of
+        the raw tier of the history in the OpenMetrics text format.
+        The server runs in daemon threads of the collector.
+
+        Parameters
+        ----------
+        tiered_history : plot_playground.stats.history.TieredHistory
+            The history of the samples of the collector.
+        history_lock : threading.Lock
+            The lock held by the collector while it updates the
+            history.
+        port : int, default 0
+            Port to listen on. If zero, a free port is selected (see
+            the port attribute after starting).
+        host : str, default DEFAULT_HOST
+            Address to listen on. Only the local host by default.
+        """
+        self.tiered_history = tiered_history
+        self.history_lock = history_lock
+        self.host = host
+        self.port = port
+        self._http_server = None
+        self._thread = None
+
+    def render(self):
+        """
+        Format the latest samples of the history.
+
+        Returns
+        -------
+        openmetrics_str : str
+            The exposition returned by the format_openmetrics
+            function.
+        """
+        with self.history_lock:
+            column_list = list(self.tiered_history.column_list)
+            timestamp_array, value_array = \
+                self.tiered_history.raw_ring_buffer.get_arrays()
+        return format_openmetrics(
+            column_list=column_list, timestamp_array=timestamp_array,
+            value_array=value_array)
+
+    def start(self):
+        """
+        Start listening. The port attribute is set to the bound port.
+        """
+        self._http_server = ThreadingHTTPServer(
+            (self.host, self.port), _OpenMetricsRequestHandler)
+        self._http_server.openmetrics_server = self
+        self.port = self._http_server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._http_server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=STOP_TIMEOUT_SECONDS):
+        """
+        Stop listening.
+
+        Parameters
+        ----------
+        timeout : int or float, default STOP_TIMEOUT_SECONDS
+            Seconds to wait for the server thread to exit.
+        """
+        if self._http_server is None:
+            return
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        self._thread.join(timeout=timeout)
+        self._http_server = None
+
+
+class _OpenMetricsRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        """
+        Respond the exposition to the request of METRICS_PATH, and
+        404 to the other paths.
+        """
+        if self.path.split('?')[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+        body = self.server.openmetrics_server.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """
+        Do not write the access log to the stderr of the collector.
+        """
+        pass
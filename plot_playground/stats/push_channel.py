@@ -0,0 +1,242 @@
+"""
+Module that pushes the samples of the stats collector to the front end
+over a Jupyter comm, instead of letting the browser poll the CSV log.
+
+Notes
+-----
+The comm is opened from the front end side (classic Jupyter notebook).
+If the comm can not be used, the plot falls back to polling the log.
+"""
+
+import threading
+from collections import deque
+
+from IPython import get_ipython
+
+COMM_TARGET_NAME_FORMAT = 'plot_playground_linux_stats_{svg_id}'
+RECEIVE_TIMEOUT_SECONDS = 0.5
+
+
+def get_comm_target_name(svg_id):
+    """
+    Get the comm target name of the plot.
+
+    Parameters
+    ----------
+    svg_id : str
+        ID of the SVG element of the plot.
+
+    Returns
+    -------
+    target_name : str
+        The comm target name.
+    """
+    target_name = COMM_TARGET_NAME_FORMAT.format(svg_id=svg_id)
+    return target_name
+
+
+def get_kernel_comm_manager():
+    """
+    Get the comm manager of the running kernel.
+
+    Returns
+    -------
+    comm_manager : ipykernel.comm.CommManager or None
+        The comm manager. None is returned if it is not running on
+        the Jupyter kernel (e.g., plain Python or IPython terminal).
+    """
+    ipython = get_ipython()
+    if ipython is None:
+        return None
+    kernel = getattr(ipython, 'kernel', None)
+    if kernel is None:
+        return None
+    comm_manager = getattr(kernel, 'comm_manager', None)
+    return comm_manager
+
+
+class SamplePushForwarder():
+
+    def __init__(self, sample_conn, svg_id, buffer_size):
+        """
+        Class that receives samples from the collector process and
+        pushes them to the front end. While the tab is hidden, the
+        samples are coalesced and sent as one message when the tab
+        becomes visible again.
+
+        Parameters
+        ----------
+        sample_conn : multiprocessing.connection.Connection
+            The receiving end of the connection to which the collector
+            sends each sample row.
+        svg_id : str
+            ID of the SVG element of the plot.
+        buffer_size : int
+            Maximum number of rows to keep (same as the plot buffer).
+        """
+        self.sample_conn = sample_conn
+        self.target_name = get_comm_target_name(svg_id=svg_id)
+        self.buffer_size = buffer_size
+        self.history_deque = deque([], maxlen=buffer_size)
+        self.comm_state_dict = {}
+        self.is_stopped = False
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register_comm_target(self, comm_manager):
+        """
+        Register the comm target so that the front end can open the
+        comm.
+
+        Parameters
+        ----------
+        comm_manager : ipykernel.comm.CommManager
+            The comm manager of the running kernel.
+        """
+        comm_manager.register_target(self.target_name, self.open_comm)
+
+    def start(self):
+        """
+        Start the thread that receives samples from the collector.
+        """
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop receiving samples and close all opened comms.
+        """
+        self.is_stopped = True
+        with self._lock:
+            comm_state_list = list(self.comm_state_dict.values())
+            self.comm_state_dict = {}
+        for comm_state in comm_state_list:
+            comm_state['comm'].close()
+
+    def open_comm(self, comm, open_msg):
+        """
+        Callback when the front end opens the comm. The rows received
+        so far are sent immediately so that the plot is not empty.
+
+        Parameters
+        ----------
+        comm : ipykernel.comm.Comm
+            The opened comm.
+        open_msg : dict
+            The comm open message.
+        """
+        with self._lock:
+            self.comm_state_dict[comm.comm_id] = {
+                'comm': comm,
+                'is_visible': True,
+                'pending_row_deque': deque([], maxlen=self.buffer_size),
+            }
+            row_list = list(self.history_deque)
+
+        def on_msg(msg):
+            self.set_visible(
+                comm_id=comm.comm_id,
+                is_visible=msg['content']['data'].get('visible', True))
+
+        def on_close(msg):
+            with self._lock:
+                self.comm_state_dict.pop(comm.comm_id, None)
+
+        comm.on_msg(on_msg)
+        comm.on_close(on_close)
+        comm.send({'rows': row_list, 'reset': True})
+
+    def set_visible(self, comm_id, is_visible):
+        """
+        Set whether the tab of the target comm is visible. When it
+        becomes visible, the coalesced rows are sent.
+
+        Parameters
+        ----------
+        comm_id : str
+            ID of the target comm.
+        is_visible : bool
+            Whether the tab is visible or not.
+        """
+        with self._lock:
+            comm_state = self.comm_state_dict.get(comm_id)
+            if comm_state is None:
+                return
+            comm_state['is_visible'] = bool(is_visible)
+        self.flush()
+
+    def add_rows(self, row_list):
+        """
+        Add the received rows to the history and the pending queue of
+        each comm.
+
+        Parameters
+        ----------
+        row_list : list of dicts
+            Sample rows received from the collector.
+        """
+        with self._lock:
+            self.history_deque.extend(row_list)
+            for comm_state in self.comm_state_dict.values():
+                comm_state['pending_row_deque'].extend(row_list)
+
+    def flush(self):
+        """
+        Send the pending rows to each visible comm as one message.
+        """
+        send_list = []
+        with self._lock:
+            for comm_state in self.comm_state_dict.values():
+                if not comm_state['is_visible']:
+                    continue
+                pending_row_deque = comm_state['pending_row_deque']
+                if len(pending_row_deque) == 0:
+                    continue
+                send_list.append(
+                    (comm_state['comm'], list(pending_row_deque)))
+                pending_row_deque.clear()
+        for comm, row_list in send_list:
+            comm.send({'rows': row_list, 'reset': False})
+
+    def receive_rows(self, timeout=RECEIVE_TIMEOUT_SECONDS):
+        """
+        Receive the rows sent by the collector. All the rows already
+        arrived are read at once so that they are sent as one message.
+
+        Parameters
+        ----------
+        timeout : float, default RECEIVE_TIMEOUT_SECONDS
+            Seconds to wait for the first row.
+
+        Returns
+        -------
+        row_list : list of dicts
+            The received rows. Empty if nothing arrived.
+
+        Raises
+        ------
+        EOFError
+            If the collector side of the connection is closed.
+        """
+        row_list = []
+        if not self.sample_conn.poll(timeout):
+            return row_list
+        row_list.append(self.sample_conn.recv())
+        while self.sample_conn.poll(0):
+            row_list.append(self.sample_conn.recv())
+        return row_list
+
+    def _run(self):
+        """
+        Loop of the receiving thread.
+        """
+        while not self.is_stopped:
+            try:
+                row_list = self.receive_rows()
+            except (EOFError, OSError):
+                break
+            if len(row_list) == 0:
+                continue
+            self.add_rows(row_list=row_list)
+            self.flush()
@@ -0,0 +1,229 @@
+"""
+Module of the streaming quantile estimation of the stats samples. The
+quantiles of a whole session are estimated in constant memory with
+the P-square algorithm, so the collector does not need to keep the
+samples.
+
+Notes
+-----
+The algorithm is described in the following paper.
+    Jain, R. and Chlamtac, I., "The P2 algorithm for dynamic
+    calculation of quantiles and histograms without storing
+    observations", Communications of the ACM, 28(10), 1985.
+"""
+
+DEFAULT_QUANTILE_LIST = [0.5, 0.95, 0.99]
+QUANTILE_COLUMN_NAME_FORMAT = '{column_name} (p{percentile})'
+_MARKER_NUM = 5
+
+
+def get_quantile_column_name(column_name, quantile):
+    """
+    Get the name of the column of the quantile estimate.
+
+    Parameters
+    ----------
+    column_name : str
+        Name of the sampled column.
+    quantile : float
+        The quantile (0 to 1). e.g., 0.99
+
+    Returns
+    -------
+    quantile_column_name : str
+        The column name. e.g., 'memory usage (MB) (p99)'
+    """
+    quantile_column_name = QUANTILE_COLUMN_NAME_FORMAT.format(
+        column_name=column_name,
+        percentile='%g' % round(quantile * 100, 1))
+    return quantile_column_name
+
+
+class P2Quantile():
+
+    def __init__(self, quantile):
+        """
+        Class that estimates a quantile of the added values with the
+        P-square algorithm. Only five markers are kept regardless of
+        the number of the values.
+
+        Parameters
+        ----------
+        quantile : float
+            The target quantile (0 to 1).
+        """
+        self.quantile = quantile
+        self.count = 0
+        self.height_list = []
+        self.position_list = [1, 2, 3, 4, 5]
+        self.desired_position_list = [
+            1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increment_list = [
+            0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def add(self, value):
+        """
+        Add a value to the estimation.
+
+        Parameters
+        ----------
+        value : int or float
+            The added value.
+        """
+        self.count += 1
+        height_list = self.height_list
+        if self.count <= _MARKER_NUM:
+            height_list.append(value)
+            height_list.sort()
+            return
+
+        if value < height_list[0]:
+            height_list[0] = value
+            cell_idx = 0
+        elif value >= height_list[4]:
+            height_list[4] = value
+            cell_idx = 3
+        else:
+            cell_idx = 0
+            while value >= height_list[cell_idx + 1]:
+                cell_idx += 1
+        position_list = self.position_list
+        for i in range(cell_idx + 1, _MARKER_NUM):
+            position_list[i] += 1
+        for i in range(_MARKER_NUM):
+            self.desired_position_list[i] += self.increment_list[i]
+
+        for i in range(1, _MARKER_NUM - 1):
+            diff = self.desired_position_list[i] - position_list[i]
+            if (diff >= 1 and position_list[i + 1] - position_list[i] > 1) \
+                    or (diff <= -1
+                        and position_list[i - 1] - position_list[i] < -1):
+                direction = 1 if diff > 0 else -1
+                height = self._get_parabolic_height(
+                    marker_idx=i, direction=direction)
+                if not height_list[i - 1] < height < height_list[i + 1]:
+                    height = self._get_linear_height(
+                        marker_idx=i, direction=direction)
+                height_list[i] = height
+                position_list[i] += direction
+
+    def _get_parabolic_height(self, marker_idx, direction):
+        """
+        Get the adjusted height of the marker by the piecewise
+        parabolic prediction.
+
+        Parameters
+        ----------
+        marker_idx : int
+            Index of the adjusted marker (1 to 3).
+        direction : int
+            1 if the marker is moved to the right, otherwise -1.
+
+        Returns
+        -------
+        height : float
+            The adjusted height.
+        """
+        q = self.height_list
+        n = self.position_list
+        i = marker_idx
+        d = direction
+        height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+        return height
+
+    def _get_linear_height(self, marker_idx, direction):
+        """
+        Get the adjusted height of the marker by the linear
+        prediction (used when the parabolic one breaks the order of
+        the markers).
+
+        Parameters
+        ----------
+        marker_idx : int
+            Index of the adjusted marker (1 to 3).
+        direction : int
+            1 if the marker is moved to the right, otherwise -1.
+
+        Returns
+        -------
+        height : float
+            The adjusted height.
+        """
+        q = self.height_list
+        n = self.position_list
+        i = marker_idx
+        d = direction
+        height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+        return height
+
+    def get_value(self):
+        """
+        Get the current estimate of the quantile.
+
+        Returns
+        -------
+        value : float or None
+            The estimate. While five or fewer values have been added,
+            the nearest value of the sorted values is returned. None
+            if no value has been added.
+        """
+        if self.count == 0:
+            return None
+        if self.count <= _MARKER_NUM:
+            idx = int(round((self.count - 1) * self.quantile))
+            return self.height_list[idx]
+        return self.height_list[2]
+
+
+class QuantileSketch():
+
+    def __init__(self, column_name, quantile_list=DEFAULT_QUANTILE_LIST):
+        """
+        Class that estimates the quantiles of a column.
+
+        Parameters
+        ----------
+        column_name : str
+            Name of the sampled column.
+        quantile_list : list of float, default DEFAULT_QUANTILE_LIST
+            The estimated quantiles.
+        """
+        self.column_name = column_name
+        self.estimator_dict = {
+            get_quantile_column_name(
+                column_name=column_name, quantile=quantile):
+            P2Quantile(quantile=quantile)
+            for quantile in quantile_list}
+
+    def add(self, value):
+        """
+        Add a sampled value to the estimation.
+
+        Parameters
+        ----------
+        value : int or float
+            The sampled value.
+        """
+        for estimator in self.estimator_dict.values():
+            estimator.add(value)
+
+    def get_value_dict(self):
+        """
+        Get the current estimates.
+
+        Returns
+        -------
+        value_dict : dict
+            A dictionary that stores the quantile column name in key
+            and the estimate (rounded to 2 decimal places) in value.
+            Empty if no value has been added.
+        """
+        value_dict = {}
+        for quantile_column_name, estimator in self.estimator_dict.items():
+            value = estimator.get_value()
+            if value is None:
+                continue
+            value_dict[quantile_column_name] = round(value, 2)
+        return value_dict
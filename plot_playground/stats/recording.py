@@ -0,0 +1,633 @@
+"""
+Module of the headless recording of the stats. The recorder runs the
+same sampling loop as the collector without Jupyter and appends the
+samples to a compact recording file, which is rendered later by the
+display_replay function of the linux_stats_plot module.
+
+Notes
+-----
+The recording is started as follows, and runs until it is terminated
+(or for the specified duration).
+    $ python -m plot_playground.stats record --out run.stats \
+        --interval 0.5
+The file has a header (the magic bytes, the length of the meta and the
+meta as JSON) followed by the chunks of the samples. Each chunk has
+the number of the rows, the length of the payload and the payload: the
+timestamps in milliseconds as the deltas from the previous row, and
+the values of each column as the deltas of the fixed point numbers
+(most metrics have at most 3 decimals) or otherwise as the XOR of the
+bits of the previous row. The bytes of the words are shuffled and
+compressed by zstd (or zlib if the zstandard module is not installed).
+Unchanged values are zero bytes after the delta, so long recordings
+stay small (about 10 MB per week of the default metrics at 0.5
+seconds). A chunk partially written when the recorder was killed is
+ignored when loading. Like the collector module, the recording only
+imports what the sampling needs.
+"""
+
+import json
+import math
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from plot_playground.stats import collector as stats_collector
+from plot_playground.stats import collectors
+from plot_playground.stats import history
+from plot_playground.stats import scheduler
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC_BYTES = b'PPSTATS1'
+COMPRESSION_ZSTD = 'zstd'
+COMPRESSION_ZLIB = 'zlib'
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+DEFAULT_FLUSH_INTERVAL_SECONDS = 60
+DEFAULT_REPLAY_POINT_NUM = 950
+_META_LENGTH_STRUCT = struct.Struct('<I')
+_CHUNK_HEADER_STRUCT = struct.Struct('<II')
+_JOB_NAME_FLUSH = '_flush'
+_ENCODING_XOR = 0
+_ENCODING_FIXED_POINT = 1
+FIXED_POINT_SCALE = 1000
+MAX_FIXED_POINT_VALUE = 2 ** 53 / FIXED_POINT_SCALE
+
+
+def record(
+        out_file_path, interval_seconds=None, metrics=None,
+        duration_seconds=None,
+        flush_interval_seconds=DEFAULT_FLUSH_INTERVAL_SECONDS):
+    """
+    Record the stats to the file. This blocks until the duration has
+    passed or the process is terminated.
+
+    Parameters
+    ----------
+    out_file_path : str
+        Path of the recording file. An existing file is overwritten.
+    interval_seconds : int, float or None, default None
+        Sampling interval in seconds of all metrics. If None, the
+        default interval of each collector is used.
+    metrics : list of str or None, default None
+        Names of the metrics to record. If None, the metrics of
+        DEFAULT_METRIC_NAME_LIST of the collector module are used.
+    duration_seconds : int, float or None, default None
+        Seconds to record. If None, the recording continues until
+        the process is terminated.
+    flush_interval_seconds : int or float, default 60
+        Interval in seconds at which the buffered rows are written
+        to the file as a chunk.
+
+    Returns
+    -------
+    row_num : int
+        The number of the recorded rows.
+    """
+    if metrics is None:
+        metrics = stats_collector.DEFAULT_METRIC_NAME_LIST
+    collector_list = collectors.setup_collectors(
+        collector_list=collectors.make_collector_list(metrics=metrics))
+    collector_dict = {
+        collector.name: collector for collector in collector_list}
+    metric_interval_seconds = None
+    if interval_seconds is not None:
+        metric_interval_seconds = {
+            collector.name: interval_seconds
+            for collector in collector_list}
+    metric_interval_seconds_dict = \
+        stats_collector.get_metric_interval_seconds_dict(
+            collector_list=collector_list,
+            metric_interval_seconds=metric_interval_seconds)
+    panel_list = []
+    for collector in collector_list:
+        panel_list.extend(collector.get_panel_list())
+    interval_scheduler = scheduler.IntervalScheduler()
+    for metric_name, metric_interval in \
+            metric_interval_seconds_dict.items():
+        interval_scheduler.add_job(
+            name=metric_name, interval_seconds=metric_interval)
+    interval_scheduler.add_job(
+        name=_JOB_NAME_FLUSH, interval_seconds=flush_interval_seconds)
+
+    writer = RecordingWriter(
+        file_path=out_file_path,
+        column_list=stats_collector.get_column_list(
+            collector_list=collector_list)[1:],
+        panel_list=panel_list,
+        metric_interval_seconds_dict=metric_interval_seconds_dict)
+    start_time = time.monotonic()
+    try:
+        while duration_seconds is None \
+                or time.monotonic() - start_time < duration_seconds:
+            interval_scheduler.sleep_until_next()
+            due_job_name_list = interval_scheduler.pop_due_job_names()
+            tick_start_time = time.perf_counter()
+            tick_start_cpu_time = time.thread_time()
+            row_dict = stats_collector.sample_metrics(
+                collector_dict=collector_dict,
+                metric_name_list=due_job_name_list)
+            if row_dict is not None:
+                writer.add_row(row_dict=row_dict)
+            if _JOB_NAME_FLUSH in due_job_name_list:
+                writer.flush()
+            stats_collector.record_tick(
+                collector_dict=collector_dict,
+                wall_seconds=time.perf_counter() - tick_start_time,
+                cpu_seconds=time.thread_time() - tick_start_cpu_time)
+    finally:
+        writer.close()
+        for collector in collector_dict.values():
+            collector.close()
+    return writer.row_num
+
+
+def get_compression():
+    """
+    Get the compression of the new recording files.
+
+    Returns
+    -------
+    compression : str
+        'zstd' if the zstandard module is installed, otherwise
+        'zlib'.
+    """
+    if zstandard is not None:
+        return COMPRESSION_ZSTD
+    return COMPRESSION_ZLIB
+
+
+def _compress(data, compression):
+    """
+    Compress the bytes of a chunk.
+
+    Parameters
+    ----------
+    data : bytes
+        The bytes to compress.
+    compression : str
+        'zstd' or 'zlib'.
+
+    Returns
+    -------
+    compressed_data : bytes
+        The compressed bytes.
+    """
+    if compression == COMPRESSION_ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(data, compression):
+    """
+    Decompress the bytes of a chunk.
+
+    Parameters
+    ----------
+    data : bytes
+        The compressed bytes.
+    compression : str
+        'zstd' or 'zlib'.
+
+    Returns
+    -------
+    decompressed_data : bytes
+        The decompressed bytes.
+
+    Raises
+    ------
+    ValueError
+        If the file is compressed by zstd and the zstandard module
+        is not installed.
+    """
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            err_msg = 'The zstandard module is required to load the ' \
+                      'recording. Please install it: $ pip install zstandard'
+            raise ValueError(err_msg)
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _is_fixed_point(column_array):
+    """
+    Get whether the values of a column are stored as the fixed point
+    numbers of FIXED_POINT_SCALE without loss.
+
+    Parameters
+    ----------
+    column_array : numpy.ndarray
+        Values of the column. Missing values are NaN.
+
+    Returns
+    -------
+    is_fixed_point : bool
+        True if all finite values have at most 3 decimals.
+    """
+    finite_array = column_array[~np.isnan(column_array)]
+    if not np.all(np.abs(finite_array) < MAX_FIXED_POINT_VALUE):
+        # Including the infinite values.
+        return False
+    fixed_point_array = np.round(finite_array * FIXED_POINT_SCALE)
+    return bool(np.all(
+        fixed_point_array / FIXED_POINT_SCALE == finite_array))
+
+
+def _zigzag_encode(int_array):
+    """
+    Map the signed integers to the unsigned integers so that the
+    values close to zero have the small absolute values.
+
+    Parameters
+    ----------
+    int_array : numpy.ndarray
+        Array of int64.
+
+    Returns
+    -------
+    uint_array : numpy.ndarray
+        Array of uint64.
+    """
+    return ((int_array << 1) ^ (int_array >> 63)).view('<u8')
+
+
+def _zigzag_decode(uint_array):
+    """
+    Restore the signed integers mapped by the _zigzag_encode function.
+
+    Parameters
+    ----------
+    uint_array : numpy.ndarray
+        Array of uint64.
+
+    Returns
+    -------
+    int_array : numpy.ndarray
+        Array of int64.
+    """
+    return ((uint_array >> 1) ^ (np.uint64(0) - (uint_array & 1))).view(
+        '<i8')
+
+
+def encode_chunk(timestamp_array, value_array, compression):
+    """
+    Encode the rows into the payload of a chunk.
+
+    Parameters
+    ----------
+    timestamp_array : numpy.ndarray
+        Timestamps (UNIX time in seconds) of the rows. They are
+        stored in milliseconds.
+    value_array : numpy.ndarray
+        2-dimensional array of the values of the rows. Missing values
+        are NaN.
+    compression : str
+        'zstd' or 'zlib'.
+
+    Returns
+    -------
+    payload : bytes
+        The encoded payload.
+
+    Notes
+    -----
+    The payload has the encoding of each column (a byte), the bits of
+    the missing values of the fixed point columns and the shuffled
+    words of the timestamps and the columns.
+    """
+    timestamp_ms_array = np.round(
+        np.asarray(timestamp_array, dtype=np.float64) * 1000).astype('<i8')
+    word_array_list = [
+        _zigzag_encode(np.diff(timestamp_ms_array, prepend=0))]
+    encoding_list = []
+    mask_bytes_list = []
+    for column_array in np.asarray(value_array, dtype=np.float64).T:
+        if _is_fixed_point(column_array=column_array):
+            # The deltas of the values with at most 3 decimals (most
+            # of the metrics) fit in a few bytes.
+            is_nan_array = np.isnan(column_array)
+            fixed_point_array = np.round(
+                column_array[~is_nan_array] * FIXED_POINT_SCALE).astype('<i8')
+            encoding_list.append(_ENCODING_FIXED_POINT)
+            mask_bytes_list.append(np.packbits(is_nan_array).tobytes())
+            word_array_list.append(_zigzag_encode(
+                np.diff(fixed_point_array, prepend=0)))
+            continue
+        # The XOR of the bits of the consecutive values is mostly zero
+        # bits when the value is unchanged.
+        bits_array = column_array.astype('<f8').view('<u8')
+        encoding_list.append(_ENCODING_XOR)
+        word_array_list.append(
+            bits_array ^ np.concatenate([[np.uint64(0)], bits_array[:-1]]))
+    word_array = np.concatenate(word_array_list).astype('<u8')
+    # The same byte of the words are stored together (the high bytes
+    # are mostly zero).
+    shuffled_bytes = word_array.view(np.uint8).reshape(-1, 8).T.tobytes()
+    data = bytes(encoding_list) + b''.join(mask_bytes_list) \
+        + shuffled_bytes
+    return _compress(data=data, compression=compression)
+
+
+def decode_chunk(payload, row_num, column_num, compression):
+    """
+    Decode the payload of a chunk into the rows.
+
+    Parameters
+    ----------
+    payload : bytes
+        The payload made by the encode_chunk function.
+    row_num : int
+        The number of the rows of the chunk.
+    column_num : int
+        The number of the value columns.
+    compression : str
+        'zstd' or 'zlib'.
+
+    Returns
+    -------
+    timestamp_array : numpy.ndarray
+        Timestamps (UNIX time in seconds) of the rows.
+    value_array : numpy.ndarray
+        2-dimensional array of the values of the rows.
+    """
+    data = _decompress(data=payload, compression=compression)
+    encoding_list = list(data[:column_num])
+    offset = column_num
+    mask_length = (row_num + 7) // 8
+    is_nan_array_list = []
+    for encoding in encoding_list:
+        if encoding != _ENCODING_FIXED_POINT:
+            is_nan_array_list.append(None)
+            continue
+        is_nan_array_list.append(np.unpackbits(
+            np.frombuffer(data, dtype=np.uint8, count=mask_length,
+                          offset=offset),
+            count=row_num).astype(bool))
+        offset += mask_length
+    shuffled_array = np.frombuffer(data, dtype=np.uint8, offset=offset)
+    word_array = np.ascontiguousarray(
+        shuffled_array.reshape(8, -1).T).view('<u8').ravel()
+
+    timestamp_array = np.cumsum(
+        _zigzag_decode(word_array[:row_num])) / 1000
+    value_array = np.full((row_num, column_num), np.nan)
+    offset = row_num
+    for i, is_nan_array in enumerate(is_nan_array_list):
+        if is_nan_array is None:
+            value_array[:, i] = np.bitwise_xor.accumulate(
+                word_array[offset:offset + row_num]).view('<f8')
+            offset += row_num
+            continue
+        value_num = row_num - int(is_nan_array.sum())
+        value_array[~is_nan_array, i] = np.cumsum(_zigzag_decode(
+            word_array[offset:offset + value_num])) / FIXED_POINT_SCALE
+        offset += value_num
+    return timestamp_array, value_array
+
+
+class RecordingWriter():
+
+    def __init__(
+            self, file_path, column_list, panel_list,
+            metric_interval_seconds_dict, compression=None):
+        """
+        Class that buffers the sampled rows and appends them to the
+        recording file as chunks.
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the recording file. An existing file is
+            overwritten.
+        column_list : list of str
+            Names of the value columns (excluding the timestamp).
+        panel_list : list of dicts
+            Settings of the panels of the recorded metrics.
+        metric_interval_seconds_dict : dict
+            A dictionary that stores the metric name in key and the
+            sampling interval in seconds in value.
+        compression : str or None, default None
+            'zstd' or 'zlib'. If None, the get_compression function
+            selects it.
+        """
+        if compression is None:
+            compression = get_compression()
+        self.file_path = file_path
+        self.column_list = list(column_list)
+        self.compression = compression
+        self.row_num = 0
+        self._column_idx_dict = {
+            column_name: i for i, column_name in enumerate(column_list)}
+        self._timestamp_list = []
+        self._value_row_list = []
+        dir_path = os.path.dirname(file_path)
+        if dir_path != '':
+            os.makedirs(dir_path, exist_ok=True)
+        meta_bytes = json.dumps({
+            'column_list': self.column_list,
+            'panel_list': panel_list,
+            'metric_interval_seconds_dict': metric_interval_seconds_dict,
+            'start_timestamp': round(time.time(), 3),
+            'compression': compression,
+        }).encode('utf-8')
+        self._file = open(file_path, 'wb')
+        self._file.write(MAGIC_BYTES)
+        self._file.write(_META_LENGTH_STRUCT.pack(len(meta_bytes)))
+        self._file.write(meta_bytes)
+        self._file.flush()
+
+    def add_row(self, row_dict):
+        """
+        Buffer a sampled row.
+
+        Parameters
+        ----------
+        row_dict : dict
+            A dictionary that stores the column name in key and the
+            sampled value in value, having the timestamp. Columns not
+            sampled in the row are stored as NaN.
+        """
+        value_row = np.full(len(self.column_list), np.nan)
+        for column_name, value in row_dict.items():
+            column_idx = self._column_idx_dict.get(column_name)
+            if column_idx is None or value is None:
+                continue
+            value_row[column_idx] = value
+        self._timestamp_list.append(
+            row_dict[stats_collector.COLUMN_NAME_TIMESTAMP])
+        self._value_row_list.append(value_row)
+
+    def flush(self):
+        """
+        Write the buffered rows to the file as a chunk.
+        """
+        row_num = len(self._timestamp_list)
+        if row_num == 0:
+            return
+        payload = encode_chunk(
+            timestamp_array=np.array(self._timestamp_list),
+            value_array=np.vstack(self._value_row_list),
+            compression=self.compression)
+        self._file.write(_CHUNK_HEADER_STRUCT.pack(row_num, len(payload)))
+        self._file.write(payload)
+        self._file.flush()
+        self.row_num += row_num
+        self._timestamp_list = []
+        self._value_row_list = []
+
+    def close(self):
+        """
+        Write the buffered rows and close the file.
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+
+def load_recording(file_path):
+    """
+    Load the recording file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the recording file.
+
+    Returns
+    -------
+    meta_dict : dict
+        The meta of the recording, having the column_list,
+        panel_list, metric_interval_seconds_dict, start_timestamp and
+        compression keys.
+    sample_df : pandas.DataFrame
+        DataFrame having the timestamp column and the column of each
+        value, a row per sample.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a recording file.
+    """
+    import pandas as pd
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    header_length = len(MAGIC_BYTES) + _META_LENGTH_STRUCT.size
+    if data[:len(MAGIC_BYTES)] != MAGIC_BYTES \
+            or len(data) < header_length:
+        err_msg = 'Not a stats recording file: %s' % file_path
+        raise ValueError(err_msg)
+    meta_length, = _META_LENGTH_STRUCT.unpack_from(
+        data, len(MAGIC_BYTES))
+    meta_dict = json.loads(
+        data[header_length:header_length + meta_length].decode('utf-8'))
+    column_list = meta_dict['column_list']
+
+    timestamp_array_list = [np.zeros(0)]
+    value_array_list = [np.zeros((0, len(column_list)))]
+    offset = header_length + meta_length
+    while offset + _CHUNK_HEADER_STRUCT.size <= len(data):
+        row_num, payload_length = _CHUNK_HEADER_STRUCT.unpack_from(
+            data, offset)
+        offset += _CHUNK_HEADER_STRUCT.size
+        if offset + payload_length > len(data):
+            # The recorder was killed while writing the chunk.
+            break
+        timestamp_array, value_array = decode_chunk(
+            payload=data[offset:offset + payload_length], row_num=row_num,
+            column_num=len(column_list),
+            compression=meta_dict['compression'])
+        timestamp_array_list.append(timestamp_array)
+        value_array_list.append(value_array)
+        offset += payload_length
+
+    sample_df = pd.DataFrame(
+        np.vstack(value_array_list), columns=column_list)
+    sample_df.insert(
+        loc=0, column=stats_collector.COLUMN_NAME_TIMESTAMP,
+        value=np.concatenate(timestamp_array_list).round(3))
+    return meta_dict, sample_df
+
+
+def downsample_samples(sample_df, point_num=DEFAULT_REPLAY_POINT_NUM):
+    """
+    Downsample the samples into the buckets of the same length, in
+    the format of the rollup tiers of the history module.
+
+    Parameters
+    ----------
+    sample_df : pandas.DataFrame
+        DataFrame having the timestamp column and the column of each
+        value returned by the load_recording function.
+    point_num : int, default DEFAULT_REPLAY_POINT_NUM
+        The number of the buckets over the whole recording (e.g., the
+        width of the plot in pixels).
+
+    Returns
+    -------
+    rollup_df : pandas.DataFrame
+        DataFrame having the timestamp column (the start time of the
+        bucket), the mean of each column in the bucket and the min /
+        max columns (e.g., 'memory usage (MB) (min)'). Buckets with
+        no sample are excluded.
+    """
+    import pandas as pd
+    column_list = [
+        column_name for column_name in sample_df.columns
+        if column_name != stats_collector.COLUMN_NAME_TIMESTAMP]
+    min_column_list = [
+        history.MIN_COLUMN_NAME_FORMAT.format(column_name=column_name)
+        for column_name in column_list]
+    max_column_list = [
+        history.MAX_COLUMN_NAME_FORMAT.format(column_name=column_name)
+        for column_name in column_list]
+    rollup_column_list = [stats_collector.COLUMN_NAME_TIMESTAMP] \
+        + column_list + min_column_list + max_column_list
+    if len(sample_df) == 0:
+        return pd.DataFrame(columns=rollup_column_list)
+    timestamp_series = sample_df[stats_collector.COLUMN_NAME_TIMESTAMP]
+    start_timestamp = timestamp_series.min()
+    duration_seconds = timestamp_series.max() - start_timestamp
+    bucket_seconds = max(duration_seconds / point_num, 0.001)
+    bucket_idx_series = np.floor(
+        (timestamp_series - start_timestamp) / bucket_seconds).clip(
+            upper=point_num - 1)
+    grouped = sample_df[column_list].groupby(bucket_idx_series)
+    mean_df = grouped.mean()
+    min_df = grouped.min()
+    min_df.columns = min_column_list
+    max_df = grouped.max()
+    max_df.columns = max_column_list
+    rollup_df = pd.concat([mean_df, min_df, max_df], axis=1)
+    rollup_df.insert(
+        loc=0, column=stats_collector.COLUMN_NAME_TIMESTAMP,
+        value=np.round(
+            start_timestamp + rollup_df.index.values * bucket_seconds, 3))
+    return rollup_df.reset_index(drop=True)[rollup_column_list]
+
+
+def get_window_seconds(sample_df):
+    """
+    Get the time window of the plot of the whole recording.
+
+    Parameters
+    ----------
+    sample_df : pandas.DataFrame
+        DataFrame having the timestamp column.
+
+    Returns
+    -------
+    window_seconds : int
+        Seconds of the recording rounded up (at least 1).
+    """
+    if len(sample_df) == 0:
+        return 1
+    timestamp_series = sample_df[stats_collector.COLUMN_NAME_TIMESTAMP]
+    return max(
+        math.ceil(timestamp_series.max() - timestamp_series.min()), 1)
@@ -0,0 +1,196 @@
+"""
+Module of the scheduler that decides when each metric of the stats
+collector is sampled.
+
+Notes
+-----
+The run times are calculated from the monotonic clock as multiples of
+the interval from the time each job is added, so the interval does not
+drift with the sampling cost. If the sampling takes longer than the
+interval, the missed runs are skipped instead of being executed in
+a burst.
+"""
+
+import math
+import time
+
+
+class IntervalScheduler():
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Class that schedules jobs having their own intervals.
+
+        Parameters
+        ----------
+        clock : function, default time.monotonic
+            Function that returns the current time in seconds. It is
+            replaced in tests.
+        """
+        self.clock = clock
+        self.job_dict = {}
+
+    def add_job(self, name, interval_seconds):
+        """
+        Add a job. The first run of the job is due immediately.
+
+        Parameters
+        ----------
+        name : str
+            Name of the job.
+        interval_seconds : int or float
+            Run interval of the job in seconds.
+
+        Raises
+        ------
+        ValueError
+            If the interval is zero or less.
+        """
+        _validate_interval_seconds(interval_seconds=interval_seconds)
+        now = self.clock()
+        self.job_dict[name] = {
+            'interval_seconds': interval_seconds,
+            'base_time': now,
+            'next_time': now,
+        }
+
+    def remove_job(self, name):
+        """
+        Remove a job. Nothing happens if the job does not exist.
+
+        Parameters
+        ----------
+        name : str
+            Name of the job.
+        """
+        self.job_dict.pop(name, None)
+
+    def set_interval(self, name, interval_seconds):
+        """
+        Change the interval of a job. The next run is due immediately
+        and subsequent runs are based on the new interval.
+
+        Parameters
+        ----------
+        name : str
+            Name of the job.
+        interval_seconds : int or float
+            New run interval of the job in seconds.
+
+        Raises
+        ------
+        KeyError
+            If the job does not exist.
+        """
+        if name not in self.job_dict:
+            raise KeyError('The job does not exist: %s' % name)
+        self.add_job(name=name, interval_seconds=interval_seconds)
+
+    def get_job_names(self):
+        """
+        Get the names of the added jobs.
+
+        Returns
+        -------
+        job_name_list : list of str
+            A list of job names.
+        """
+        return list(self.job_dict.keys())
+
+    def pop_due_job_names(self):
+        """
+        Get the names of the jobs whose run time has come, and
+        advance their next run time.
+
+        Returns
+        -------
+        due_job_name_list : list of str
+            A list of names of the jobs to run now.
+        """
+        now = self.clock()
+        due_job_name_list = []
+        for name, job in self.job_dict.items():
+            if job['next_time'] > now:
+                continue
+            due_job_name_list.append(name)
+            job['next_time'] = _get_next_time(
+                base_time=job['base_time'],
+                interval_seconds=job['interval_seconds'],
+                now=now)
+        return due_job_name_list
+
+    def get_seconds_until_next(self):
+        """
+        Get the seconds until the next run time of any job.
+
+        Returns
+        -------
+        seconds : float
+            Seconds until the next run. 0 if a job is already due.
+            If no job exists, None is returned.
+        """
+        if len(self.job_dict) == 0:
+            return None
+        next_time = min(
+            job['next_time'] for job in self.job_dict.values())
+        seconds = max(next_time - self.clock(), 0)
+        return seconds
+
+    def sleep_until_next(self, sleep_func=time.sleep):
+        """
+        Sleep until the next run time of any job.
+
+        Parameters
+        ----------
+        sleep_func : function, default time.sleep
+            Function to sleep for the specified seconds.
+        """
+        seconds = self.get_seconds_until_next()
+        if not seconds:
+            return
+        sleep_func(seconds)
+
+
+def _get_next_time(base_time, interval_seconds, now):
+    """
+    Get the next run time of a job, which is the first multiple of the
+    interval from the base time after the current time.
+
+    Parameters
+    ----------
+    base_time : float
+        The time the job was added.
+    interval_seconds : int or float
+        Run interval of the job in seconds.
+    now : float
+        The current time.
+
+    Returns
+    -------
+    next_time : float
+        The next run time.
+    """
+    elapsed_num = math.floor((now - base_time) / interval_seconds)
+    next_time = base_time + (elapsed_num + 1) * interval_seconds
+    return next_time
+
+
+def _validate_interval_seconds(interval_seconds):
+    """
+    Check that the interval is a positive value.
+
+    Parameters
+    ----------
+    interval_seconds : int or float
+        The interval to be checked.
+
+    Raises
+    ------
+    ValueError
+        If the interval is zero or less.
+    """
+    if interval_seconds > 0:
+        return
+    err_msg = 'The interval must be greater than zero: %s' \
+        % interval_seconds
+    raise ValueError(err_msg)
@@ -0,0 +1,1114 @@
+"""
+Module of the host-wide collector daemon shared by the kernels. When
+many kernels run on one host, each display_plot call starts its own
+collector that scans the whole host; with the shared sampler, a single
+daemon samples the host metrics and publishes the rows to a ring
+buffer in shared memory, and each kernel only copies the new rows into
+its own plot log.
+
+Notes
+-----
+The daemon is started by the first kernel that subscribes, as follows.
+    $ python -m plot_playground.stats.shared_daemon \
+        --daemon_dir_path <dir> --metrics memory disk gpu
+The daemon holds an exclusive lock of the lock file of the daemon
+directory while it runs, so starting it is idempotent (a second daemon
+exits at once). Each kernel subscribes by a file of the subscriber
+directory named after its process id, and the daemon exits when no
+live subscriber has been left for idle_timeout_seconds.
+
+The ring buffer is made by multiprocessing.shared_memory in the
+daemon. The kernels map it from /dev/shm read-only instead of
+attaching it with SharedMemory, which always maps it writable and
+unlinks it when the kernel exits (by the resource tracker). The
+metrics are fixed when the daemon starts, so the metrics of the later
+kernels are ignored. Only the host-wide metrics can be sampled, as the
+daemon is not a child of any kernel (the GPU memory of the kernel is
+not sampled either).
+
+The daemon directory is in the shared temporary directory by default,
+so it is used only if it is owned by the current user and is not
+accessible by the others. The meta file is JSON, and the collectors
+are made again from the metric names by the kernels.
+"""
+
+import argparse
+import fcntl
+import json
+import math
+import mmap
+from multiprocessing import shared_memory
+import os
+import signal
+import stat
+import subprocess as sp
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+
+import numpy as np
+import psutil
+
+from plot_playground.stats import cell_markers
+from plot_playground.stats import collector as stats_collector
+from plot_playground.stats import collectors
+from plot_playground.stats import history
+from plot_playground.stats import thread_sampler
+
+DEFAULT_DAEMON_DIR_PATH = os.path.join(
+    tempfile.gettempdir(), 'plot_playground_stats_daemon_%d' % os.getuid())
+SHARED_METRIC_NAME_LIST = [
+    'memory', 'disk', 'gpu', 'cpu', 'pressure', 'overhead']
+KERNEL_METRIC_NAME_LIST = [
+    'proc_stats', 'cgroup', 'pss', 'process_tree', 'kernel_lag', 'heap']
+DAEMON_MODULE_NAME = 'plot_playground.stats.shared_daemon'
+LOCK_FILE_NAME = 'daemon.lock'
+DAEMON_META_FILE_NAME = 'daemon.json'
+DAEMON_LOG_FILE_NAME = 'daemon.log'
+DAEMON_DIR_MODE = 0o700
+SUBSCRIBER_DIR_NAME = 'subscribers'
+LOG_DIR_NAME = 'log'
+SHM_DIR_PATH = '/dev/shm'
+RING_NAME_FORMAT = 'plot_playground_stats_{uid}_{pid}'
+INTERVAL_SECONDS = 1
+DEFAULT_RING_SECONDS = 600
+DEFAULT_IDLE_TIMEOUT_SECONDS = 10
+SUBSCRIBER_CHECK_INTERVAL_SECONDS = 1
+CONNECT_TIMEOUT_SECONDS = 60
+STOP_TIMEOUT_SECONDS = 5
+_HEADER_ITEM_NUM = 4
+_HEADER_IDX_WRITE_COUNT = 0
+_HEADER_IDX_ROW_NUM = 1
+_HEADER_IDX_COLUMN_NUM = 2
+
+
+def main(args=None):
+    """
+    Entry point of the daemon process.
+
+    Parameters
+    ----------
+    args : list of str or None, default None
+        Command line arguments. If None, sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(
+        description='Host-wide collector daemon of the linux stats plot.')
+    parser.add_argument(
+        '--daemon_dir_path', type=str, default=DEFAULT_DAEMON_DIR_PATH,
+        help='Directory of the lock file, the meta file and the '
+             'subscribers of the daemon.')
+    parser.add_argument(
+        '--metrics', type=str, nargs='+', default=SHARED_METRIC_NAME_LIST,
+        help='Names of the metrics to collect.')
+    parser.add_argument(
+        '--metric_interval_seconds', type=str, nargs='*', default=[],
+        help='Sampling intervals of the metrics. e.g., memory=0.5 disk=10')
+    parser.add_argument(
+        '--ring_seconds', type=float, default=DEFAULT_RING_SECONDS,
+        help='Seconds of the samples kept in the ring buffer.')
+    parser.add_argument(
+        '--idle_timeout_seconds', type=float,
+        default=DEFAULT_IDLE_TIMEOUT_SECONDS,
+        help='Seconds to wait for a subscriber before exiting.')
+    parsed_args = parser.parse_args(args=args)
+    metric_interval_seconds = {}
+    for interval_str in parsed_args.metric_interval_seconds:
+        metric_name, interval_seconds = interval_str.split('=')
+        metric_interval_seconds[metric_name] = float(interval_seconds)
+    # The shared memory and the meta file are removed also when the
+    # daemon is terminated.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit())
+    run_daemon(
+        daemon_dir_path=parsed_args.daemon_dir_path,
+        metrics=parsed_args.metrics,
+        metric_interval_seconds=metric_interval_seconds,
+        ring_seconds=parsed_args.ring_seconds,
+        idle_timeout_seconds=parsed_args.idle_timeout_seconds)
+
+
+def make_shared_collector_list(metrics):
+    """
+    Make the list of collectors of the daemon. The GPU collector does
+    not sample the kernel memory, since the daemon process is not the
+    kernel of any plot.
+
+    Parameters
+    ----------
+    metrics : list of str
+        Names of the metrics to collect.
+
+    Returns
+    -------
+    collector_list : list of MetricCollector
+        A list of collectors.
+    """
+    metrics = [
+        collectors.GPUMemoryCollector(is_kernel_memory_enabled=False)
+        if metric == collectors.GPUMemoryCollector.name else metric
+        for metric in metrics]
+    return collectors.make_collector_list(metrics=metrics)
+
+
+def validate_collectors(collector_list):
+    """
+    Check that all collectors sample the host-wide metrics.
+
+    Parameters
+    ----------
+    collector_list : list of MetricCollector
+        A list of collectors.
+
+    Raises
+    ------
+    ValueError
+        If a collector of the metric of the kernel is included.
+    """
+    for collector in collector_list:
+        if collector.name not in KERNEL_METRIC_NAME_LIST:
+            continue
+        err_msg = 'The metric can not be sampled by the shared daemon: %s' \
+            % collector.name
+        raise ValueError(err_msg)
+
+
+def validate_daemon_dir(daemon_dir_path):
+    """
+    Check that the daemon directory can be trusted. The kernels read
+    the meta file and the ring buffer named in it, so a directory
+    prepared by another user must not be used.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+
+    Raises
+    ------
+    ValueError
+        - If the path is not a directory (e.g., a symbolic link).
+        - If the directory is not owned by the current user.
+        - If the directory is accessible by the other users.
+    """
+    stat_result = os.lstat(daemon_dir_path)
+    if not stat.S_ISDIR(stat_result.st_mode):
+        err_msg = 'The daemon directory is not a directory: %s' \
+            % daemon_dir_path
+        raise ValueError(err_msg)
+    if stat_result.st_uid != os.getuid():
+        err_msg = 'The daemon directory is owned by another user: %s' \
+            % daemon_dir_path
+        raise ValueError(err_msg)
+    if stat.S_IMODE(stat_result.st_mode) != DAEMON_DIR_MODE:
+        err_msg = 'The mode of the daemon directory is not %s: %s' % (
+            oct(DAEMON_DIR_MODE), daemon_dir_path)
+        raise ValueError(err_msg)
+
+
+def _make_daemon_dir(daemon_dir_path):
+    """
+    Make the daemon directory if it does not exist, and check it.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+
+    Raises
+    ------
+    ValueError
+        If the directory can not be trusted (see the
+        validate_daemon_dir function).
+    """
+    os.makedirs(daemon_dir_path, mode=DAEMON_DIR_MODE, exist_ok=True)
+    validate_daemon_dir(daemon_dir_path=daemon_dir_path)
+
+
+def validate_ring_name(ring_name):
+    """
+    Check that the name of the shared memory does not point outside
+    the shared memory directory.
+
+    Parameters
+    ----------
+    ring_name : str
+        The name of the shared memory.
+
+    Raises
+    ------
+    ValueError
+        If the name contains a path separator or is a relative path
+        of a directory.
+    """
+    if os.sep not in ring_name and ring_name not in ('', '.', '..'):
+        return
+    err_msg = 'Invalid name of the shared memory is specified: %s' \
+        % ring_name
+    raise ValueError(err_msg)
+
+
+def get_ring_name(pid=None):
+    """
+    Get the name of the shared memory of the ring buffer.
+
+    Parameters
+    ----------
+    pid : int or None, default None
+        ID of the daemon process. If None, the current process is
+        used.
+
+    Returns
+    -------
+    ring_name : str
+        The name of the shared memory.
+    """
+    if pid is None:
+        pid = os.getpid()
+    return RING_NAME_FORMAT.format(uid=os.getuid(), pid=pid)
+
+
+class SharedSampleRing():
+
+    def __init__(self, name, row_num=None, column_num=None, create=False):
+        """
+        Class of the ring buffer of the sample rows in shared memory.
+        The header has the number of the rows written so far, so the
+        readers can copy only the new rows, and the rows overwritten
+        while copying are detected from it.
+
+        Parameters
+        ----------
+        name : str
+            Name of the shared memory.
+        row_num : int or None, default None
+            Maximum number of rows. Required if create is True.
+        column_num : int or None, default None
+            Number of columns including the timestamp. Required if
+            create is True.
+        create : bool, default False
+            If True, the shared memory is made (by the daemon) and can
+            be written. Otherwise the existing one is mapped
+            read-only.
+        """
+        self.name = name
+        self._shared_memory = None
+        self._mmap = None
+        if create:
+            header_size = _HEADER_ITEM_NUM * 8
+            self._shared_memory = shared_memory.SharedMemory(
+                name=name, create=True,
+                size=header_size + row_num * column_num * 8)
+            buffer = self._shared_memory.buf
+        else:
+            fd = os.open(os.path.join(SHM_DIR_PATH, name), os.O_RDONLY)
+            try:
+                self._mmap = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            finally:
+                os.close(fd)
+            buffer = self._mmap
+        self.header_array = np.frombuffer(
+            buffer, dtype=np.int64, count=_HEADER_ITEM_NUM)
+        if create:
+            self.header_array[_HEADER_IDX_WRITE_COUNT] = 0
+            self.header_array[_HEADER_IDX_ROW_NUM] = row_num
+            self.header_array[_HEADER_IDX_COLUMN_NUM] = column_num
+        self.row_num = int(self.header_array[_HEADER_IDX_ROW_NUM])
+        self.column_num = int(self.header_array[_HEADER_IDX_COLUMN_NUM])
+        self.row_array = np.frombuffer(
+            buffer, dtype=np.float64, count=self.row_num * self.column_num,
+            offset=_HEADER_ITEM_NUM * 8).reshape(
+                self.row_num, self.column_num)
+
+    def get_write_count(self):
+        """
+        Get the number of the rows written so far.
+
+        Returns
+        -------
+        write_count : int
+            The number of the rows.
+        """
+        return int(self.header_array[_HEADER_IDX_WRITE_COUNT])
+
+    def write_row(self, value_array):
+        """
+        Write a row. The row is written before the count is updated,
+        so the readers do not copy a partially written row.
+
+        Parameters
+        ----------
+        value_array : numpy.ndarray
+            Values of the row (the timestamp first). Missing values
+            are NaN.
+        """
+        write_count = self.get_write_count()
+        self.row_array[write_count % self.row_num] = value_array
+        self.header_array[_HEADER_IDX_WRITE_COUNT] = write_count + 1
+
+    def read_rows(self, start_count):
+        """
+        Copy the rows written since the count.
+
+        Parameters
+        ----------
+        start_count : int
+            The write count of the first row to copy. The rows that
+            have already been overwritten are skipped, and so is the
+            oldest row of the full ring buffer, which may be being
+            overwritten while it is copied.
+
+        Returns
+        -------
+        write_count : int
+            The write count after the copied rows (the start_count of
+            the next call).
+        row_array : numpy.ndarray
+            2-dimensional array of the copied rows in the written
+            order.
+        """
+        write_count = self.get_write_count()
+        start_count = max(start_count, write_count - self.row_num)
+        row_array = self.row_array[
+            np.arange(start_count, write_count) % self.row_num]
+        # The row being written may have overwritten the oldest copied
+        # rows.
+        valid_start_count = self.get_write_count() - self.row_num + 1
+        if valid_start_count > start_count:
+            row_array = row_array[valid_start_count - start_count:]
+        return write_count, row_array
+
+    def close(self):
+        """
+        Release the mapping of the shared memory.
+        """
+        self.header_array = None
+        self.row_array = None
+        if self._shared_memory is not None:
+            self._shared_memory.close()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def unlink(self):
+        """
+        Remove the shared memory (only by the daemon that made it).
+        """
+        if self._shared_memory is not None:
+            self._shared_memory.unlink()
+
+
+def get_lock_file_path(daemon_dir_path):
+    """
+    Get the path of the lock file of the daemon.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+
+    Returns
+    -------
+    lock_file_path : str
+        The path of the file.
+    """
+    return os.path.join(daemon_dir_path, LOCK_FILE_NAME)
+
+
+def get_daemon_meta_file_path(daemon_dir_path):
+    """
+    Get the path of the meta file of the running daemon.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+
+    Returns
+    -------
+    daemon_meta_file_path : str
+        The path of the file.
+    """
+    return os.path.join(daemon_dir_path, DAEMON_META_FILE_NAME)
+
+
+def is_daemon_running(daemon_dir_path):
+    """
+    Get whether the daemon holds the lock of the daemon directory.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+
+    Returns
+    -------
+    is_running : bool
+        True if the daemon is running.
+    """
+    lock_file_path = get_lock_file_path(daemon_dir_path=daemon_dir_path)
+    if not os.path.exists(lock_file_path):
+        return False
+    with open(lock_file_path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return False
+
+
+def load_daemon_meta(daemon_dir_path):
+    """
+    Load the meta of the running daemon.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+
+    Returns
+    -------
+    daemon_meta_dict : dict or None
+        The meta having the pid, ring_name, column_list,
+        metric_name_list, metric_interval_seconds_dict and
+        start_timestamp keys. None if the daemon is not running or
+        has not made the ring buffer yet.
+
+    Raises
+    ------
+    ValueError
+        - If the directory can not be trusted (see the
+          validate_daemon_dir function).
+        - If the name of the ring buffer is invalid.
+    """
+    daemon_meta_file_path = get_daemon_meta_file_path(
+        daemon_dir_path=daemon_dir_path)
+    if not os.path.exists(daemon_meta_file_path):
+        return None
+    validate_daemon_dir(daemon_dir_path=daemon_dir_path)
+    if not is_daemon_running(daemon_dir_path=daemon_dir_path):
+        return None
+    try:
+        with open(daemon_meta_file_path, 'r') as f:
+            daemon_meta_dict = json.load(f)
+    except FileNotFoundError:
+        return None
+    validate_ring_name(ring_name=daemon_meta_dict['ring_name'])
+    # The meta of a daemon that has been killed may be left.
+    if not _is_process_alive(pid=daemon_meta_dict['pid']):
+        return None
+    return daemon_meta_dict
+
+
+def make_daemon_collector_list(daemon_meta_dict):
+    """
+    Make the collectors of the metrics sampled by the daemon, to get
+    the panels of the plot in the kernel.
+
+    Parameters
+    ----------
+    daemon_meta_dict : dict
+        The meta returned by the load_daemon_meta function.
+
+    Returns
+    -------
+    collector_list : list of MetricCollector
+        A list of the set up collectors.
+    """
+    collector_list = make_shared_collector_list(
+        metrics=daemon_meta_dict['metric_name_list'])
+    return collectors.setup_collectors(collector_list=collector_list)
+
+
+def _save_daemon_meta(daemon_dir_path, daemon_meta_dict):
+    """
+    Save the meta file of the daemon. The file is replaced atomically
+    so that the kernels do not read a partially written file.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+    daemon_meta_dict : dict
+        The meta of the daemon.
+    """
+    daemon_meta_file_path = get_daemon_meta_file_path(
+        daemon_dir_path=daemon_dir_path)
+    tmp_file_path = daemon_meta_file_path + '.tmp'
+    with open(tmp_file_path, 'w') as f:
+        json.dump(daemon_meta_dict, f)
+    os.replace(tmp_file_path, daemon_meta_file_path)
+
+
+def _is_process_alive(pid):
+    """
+    Get whether the process is running. A process that has exited but
+    has not been waited for by its parent (e.g., the daemon started by
+    the kernel) is not alive.
+
+    Parameters
+    ----------
+    pid : int
+        ID of the process.
+
+    Returns
+    -------
+    is_alive : bool
+        True if the process is running.
+    """
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+
+def _remove_stale_daemon_meta(daemon_dir_path):
+    """
+    Remove the meta file and the ring buffer left by the daemon that
+    has been killed. This is called while holding the lock.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+    """
+    daemon_meta_file_path = get_daemon_meta_file_path(
+        daemon_dir_path=daemon_dir_path)
+    if not os.path.exists(daemon_meta_file_path):
+        return
+    try:
+        with open(daemon_meta_file_path, 'r') as f:
+            ring_name = json.load(f)['ring_name']
+        validate_ring_name(ring_name=ring_name)
+        os.remove(os.path.join(SHM_DIR_PATH, ring_name))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    os.remove(daemon_meta_file_path)
+
+
+def subscribe(daemon_dir_path, pid=None):
+    """
+    Subscribe to the daemon. The daemon keeps running while it has a
+    subscription of a live process.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+    pid : int or None, default None
+        ID of the subscribing process. If None, the current process
+        is used.
+
+    Returns
+    -------
+    subscriber_file_path : str
+        The path of the file of the subscription, to unsubscribe.
+
+    Raises
+    ------
+    ValueError
+        If the directory can not be trusted (see the
+        validate_daemon_dir function).
+    """
+    if pid is None:
+        pid = os.getpid()
+    _make_daemon_dir(daemon_dir_path=daemon_dir_path)
+    subscriber_dir_path = os.path.join(daemon_dir_path, SUBSCRIBER_DIR_NAME)
+    os.makedirs(subscriber_dir_path, mode=DAEMON_DIR_MODE, exist_ok=True)
+    subscriber_file_path = os.path.join(
+        subscriber_dir_path, '%d_%s' % (pid, uuid.uuid4().hex[:8]))
+    with open(subscriber_file_path, 'w'):
+        pass
+    return subscriber_file_path
+
+
+def unsubscribe(subscriber_file_path):
+    """
+    Cancel the subscription.
+
+    Parameters
+    ----------
+    subscriber_file_path : str
+        The path returned by the subscribe function.
+    """
+    try:
+        os.remove(subscriber_file_path)
+    except FileNotFoundError:
+        pass
+
+
+def get_subscriber_pid_list(daemon_dir_path):
+    """
+    Get the processes subscribing to the daemon. The subscriptions of
+    the processes that have exited are removed.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+
+    Returns
+    -------
+    pid_list : list of int
+        IDs of the live subscribing processes (a process may be
+        included more than once).
+    """
+    subscriber_dir_path = os.path.join(daemon_dir_path, SUBSCRIBER_DIR_NAME)
+    if not os.path.isdir(subscriber_dir_path):
+        return []
+    pid_list = []
+    for file_name in os.listdir(subscriber_dir_path):
+        pid = int(file_name.split('_')[0])
+        if _is_process_alive(pid=pid):
+            pid_list.append(pid)
+            continue
+        unsubscribe(
+            subscriber_file_path=os.path.join(subscriber_dir_path, file_name))
+    return pid_list
+
+
+def start_daemon_process(
+        daemon_dir_path, metrics, metric_interval_seconds=None,
+        ring_seconds=DEFAULT_RING_SECONDS,
+        idle_timeout_seconds=DEFAULT_IDLE_TIMEOUT_SECONDS, env=None):
+    """
+    Start the daemon as a subprocess in its own session, so it is not
+    interrupted with the kernel. Its errors are written to the log
+    file of the daemon directory.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+    metrics : list of str
+        Names of the metrics to collect.
+    metric_interval_seconds : dict or None, default None
+        Sampling interval in seconds of each metric.
+    ring_seconds : int or float, default DEFAULT_RING_SECONDS
+        Seconds of the samples kept in the ring buffer.
+    idle_timeout_seconds : int or float, default 10
+        Seconds to wait for a subscriber before exiting.
+    env : dict or None, default None
+        The environment variables of the daemon. If None, the ones of
+        the current process are used.
+
+    Returns
+    -------
+    process : subprocess.Popen
+        The daemon process. It exits at once if another daemon is
+        running.
+
+    Raises
+    ------
+    ValueError
+        If the directory can not be trusted (see the
+        validate_daemon_dir function).
+    """
+    if metric_interval_seconds is None:
+        metric_interval_seconds = {}
+    args = [
+        sys.executable, '-m', DAEMON_MODULE_NAME,
+        '--daemon_dir_path', daemon_dir_path,
+        '--ring_seconds', str(ring_seconds),
+        '--idle_timeout_seconds', str(idle_timeout_seconds),
+        '--metrics'] + list(metrics)
+    if metric_interval_seconds:
+        args.append('--metric_interval_seconds')
+        args.extend(
+            '%s=%s' % (metric_name, interval_seconds)
+            for metric_name, interval_seconds
+            in metric_interval_seconds.items())
+    _make_daemon_dir(daemon_dir_path=daemon_dir_path)
+    with open(os.path.join(daemon_dir_path, DAEMON_LOG_FILE_NAME), 'a') \
+            as log_file:
+        process = sp.Popen(
+            args, env=env, stdin=sp.DEVNULL, stdout=sp.DEVNULL,
+            stderr=log_file, start_new_session=True)
+    return process
+
+
+def connect_daemon(
+        daemon_dir_path, metrics, metric_interval_seconds=None,
+        ring_seconds=DEFAULT_RING_SECONDS,
+        idle_timeout_seconds=DEFAULT_IDLE_TIMEOUT_SECONDS, env=None,
+        timeout=CONNECT_TIMEOUT_SECONDS):
+    """
+    Subscribe to the daemon, starting it if it is not running, and
+    wait until it has made the ring buffer.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+    metrics : list of str
+        Names of the metrics to collect if the daemon is started.
+    metric_interval_seconds : dict or None, default None
+        Sampling interval in seconds of each metric if the daemon is
+        started.
+    ring_seconds : int or float, default DEFAULT_RING_SECONDS
+        Seconds of the samples kept in the ring buffer if the daemon
+        is started.
+    idle_timeout_seconds : int or float, default 10
+        Seconds for which the daemon waits for a subscriber before
+        exiting.
+    env : dict or None, default None
+        The environment variables of the daemon if it is started.
+    timeout : int or float, default CONNECT_TIMEOUT_SECONDS
+        Seconds to wait for the daemon.
+
+    Returns
+    -------
+    daemon_meta_dict : dict or None
+        The meta returned by the load_daemon_meta function. None if
+        the daemon has not made the ring buffer in time (see the log
+        file of the daemon directory).
+    subscriber_file_path : str
+        The path of the file of the subscription.
+
+    Raises
+    ------
+    ValueError
+        If the directory can not be trusted (see the
+        validate_daemon_dir function).
+    """
+    # The subscription is made first so that the started daemon does
+    # not exit before the kernel attaches.
+    subscriber_file_path = subscribe(daemon_dir_path=daemon_dir_path)
+    process = None
+    start_time = time.time()
+    while True:
+        daemon_meta_dict = load_daemon_meta(daemon_dir_path=daemon_dir_path)
+        if daemon_meta_dict is not None \
+                or time.time() - start_time >= timeout:
+            return daemon_meta_dict, subscriber_file_path
+        # The running daemon may be exiting on the idle timeout before
+        # the subscription, so it is started again once the lock is
+        # released. The started daemon exits normally if it has lost
+        # the lock to another one, and is not started again if it has
+        # failed.
+        if (process is None or process.poll() == 0) \
+                and not is_daemon_running(daemon_dir_path=daemon_dir_path):
+            process = start_daemon_process(
+                daemon_dir_path=daemon_dir_path, metrics=metrics,
+                metric_interval_seconds=metric_interval_seconds,
+                ring_seconds=ring_seconds,
+                idle_timeout_seconds=idle_timeout_seconds, env=env)
+        time.sleep(0.1)
+
+
+def run_daemon(
+        daemon_dir_path, metrics, metric_interval_seconds=None,
+        ring_seconds=DEFAULT_RING_SECONDS,
+        idle_timeout_seconds=DEFAULT_IDLE_TIMEOUT_SECONDS):
+    """
+    Run the daemon until no subscriber is left. Nothing happens if
+    another daemon holds the lock.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+    metrics : list of str
+        Names of the metrics to collect.
+    metric_interval_seconds : dict or None, default None
+        Sampling interval in seconds of each metric. Unspecified
+        metrics use the default interval of each collector.
+    ring_seconds : int or float, default DEFAULT_RING_SECONDS
+        Seconds of the samples kept in the ring buffer.
+    idle_timeout_seconds : int or float, default 10
+        Seconds to wait for a subscriber before exiting.
+
+    Returns
+    -------
+    is_run : bool
+        False if another daemon is running.
+
+    Raises
+    ------
+    ValueError
+        - If a metric of the kernel is specified.
+        - If the directory can not be trusted (see the
+          validate_daemon_dir function).
+    """
+    collector_list = make_shared_collector_list(metrics=metrics)
+    validate_collectors(collector_list=collector_list)
+    _make_daemon_dir(daemon_dir_path=daemon_dir_path)
+    lock_file = open(
+        get_lock_file_path(daemon_dir_path=daemon_dir_path), 'a')
+    try:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        _remove_stale_daemon_meta(daemon_dir_path=daemon_dir_path)
+        # The collectors are set up here to make the columns of the
+        # ring buffer, and set up again by the collecting loop.
+        collector_list = collectors.setup_collectors(
+            collector_list=collector_list)
+        column_list = stats_collector.get_column_list(
+            collector_list=collector_list)
+        metric_interval_seconds_dict = stats_collector.\
+            get_metric_interval_seconds_dict(
+                collector_list=collector_list,
+                metric_interval_seconds=metric_interval_seconds)
+        ring = SharedSampleRing(
+            name=get_ring_name(),
+            row_num=stats_collector.get_max_row_num(
+                window_seconds=ring_seconds,
+                metric_interval_seconds_dict=metric_interval_seconds_dict),
+            column_num=len(column_list), create=True)
+        try:
+            _save_daemon_meta(
+                daemon_dir_path=daemon_dir_path,
+                daemon_meta_dict={
+                    'pid': os.getpid(),
+                    'ring_name': ring.name,
+                    'column_list': column_list,
+                    'metric_name_list': [
+                        collector.name for collector in collector_list],
+                    'metric_interval_seconds_dict':
+                        metric_interval_seconds_dict,
+                    'start_timestamp': round(time.time(), 3),
+                })
+            stats_collector.start_collecting(
+                interval_seconds=INTERVAL_SECONDS,
+                buffer_size=int(math.ceil(ring_seconds / INTERVAL_SECONDS)),
+                log_dir_path=os.path.join(daemon_dir_path, LOG_DIR_NAME),
+                parent_pid=None, sample_conn=_RingPublisher(
+                    ring=ring, column_list=column_list,
+                    daemon_dir_path=daemon_dir_path,
+                    idle_timeout_seconds=idle_timeout_seconds),
+                metric_interval_seconds=metric_interval_seconds_dict,
+                collector_list=collector_list)
+        finally:
+            os.remove(get_daemon_meta_file_path(
+                daemon_dir_path=daemon_dir_path))
+            ring.close()
+            ring.unlink()
+    finally:
+        # The lock is released by closing the file.
+        lock_file.close()
+    return True
+
+
+class _RingPublisher():
+
+    def __init__(
+            self, ring, column_list, daemon_dir_path, idle_timeout_seconds):
+        """
+        Class that receives the sample rows of the collecting loop in
+        place of the sample connection of the collector subprocess,
+        and writes them to the ring buffer. As it is called on every
+        sample, it also checks the subscribers and exits the daemon
+        when none has been left for idle_timeout_seconds.
+
+        Parameters
+        ----------
+        ring : SharedSampleRing
+            The ring buffer made by the daemon.
+        column_list : list of str
+            Columns of the ring buffer (the timestamp first).
+        daemon_dir_path : str
+            Directory of the daemon.
+        idle_timeout_seconds : int or float
+            Seconds to wait for a subscriber before exiting.
+        """
+        self.ring = ring
+        self.column_list = list(column_list)
+        self.daemon_dir_path = daemon_dir_path
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.last_check_time = time.monotonic()
+        self.last_subscribed_time = self.last_check_time
+
+    def send(self, row_dict):
+        """
+        Write the row to the ring buffer.
+
+        Parameters
+        ----------
+        row_dict : dict
+            The sample row. Columns not sampled are missing.
+        """
+        self.ring.write_row(value_array=np.array(
+            [row_dict.get(column_name) for column_name in self.column_list],
+            dtype=np.float64))
+        current_time = time.monotonic()
+        if current_time - self.last_check_time \
+                < SUBSCRIBER_CHECK_INTERVAL_SECONDS:
+            return
+        self.last_check_time = current_time
+        if get_subscriber_pid_list(daemon_dir_path=self.daemon_dir_path):
+            self.last_subscribed_time = current_time
+            return
+        if current_time - self.last_subscribed_time \
+                >= self.idle_timeout_seconds:
+            sys.exit()
+
+
+class SharedRingReader():
+
+    def __init__(
+            self, daemon_meta_dict, window_seconds, interval_seconds,
+            log_dir_path, on_rows=None):
+        """
+        Class of the thread of the kernel that copies the new rows of
+        the ring buffer of the daemon and saves the CSV log of the
+        plot. The ready_event is set when the log has been saved first
+        (or when the daemon has exited, with the error in error_str).
+
+        Parameters
+        ----------
+        daemon_meta_dict : dict
+            The meta returned by the load_daemon_meta function.
+        window_seconds : int or float
+            Seconds of the samples kept for the plot.
+        interval_seconds : int or float
+            Interval in seconds at which the rows are copied and the
+            log file is saved.
+        log_dir_path : str
+            Directory where the log is saved.
+        on_rows : function or None, default None
+            Function called with the list of the rows copied by each
+            read (e.g., to push the rows to the front end). It is not
+            called if no row has been copied.
+        """
+        self.daemon_pid = daemon_meta_dict['pid']
+        self.column_list = list(daemon_meta_dict['column_list'])
+        self.ring = SharedSampleRing(name=daemon_meta_dict['ring_name'])
+        self.interval_seconds = interval_seconds
+        self.log_dir_path = log_dir_path
+        self.on_rows = on_rows
+        self.tiered_history = history.TieredHistory(
+            column_list=self.column_list[1:],
+            row_num_per_second=stats_collector.get_row_num_per_second(
+                metric_interval_seconds_dict=daemon_meta_dict[
+                    'metric_interval_seconds_dict']),
+            tier_setting_list=thread_sampler.get_tier_setting_list(
+                window_seconds=window_seconds))
+        self.cell_marker_log = cell_markers.CellMarkerLog()
+        # The rows kept in the ring buffer are copied at the first
+        # read, so the plot starts with the recent samples.
+        self.read_count = 0
+        self.ready_event = threading.Event()
+        self.error_str = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start the reader thread.
+        """
+        os.makedirs(self.log_dir_path, exist_ok=True)
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def is_alive(self):
+        """
+        Get whether the reader thread is running.
+
+        Returns
+        -------
+        is_alive : bool
+            True if the thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def send_command(self, command_dict):
+        """
+        Send the command to the reader. Only the cell marker and the
+        stop commands can be applied in the kernel, as the sampling
+        is shared with the other kernels.
+
+        Parameters
+        ----------
+        command_dict : dict
+            The command. The command name is set to the command key.
+
+        Raises
+        ------
+        ValueError
+            If a command other than the cell marker and the stop
+            commands is specified.
+        """
+        command_name = command_dict['command']
+        if command_name == stats_collector.COMMAND_CELL_MARKER:
+            self.cell_marker_log.apply_marker(
+                marker_dict=command_dict['marker'])
+            return
+        if command_name == stats_collector.COMMAND_STOP:
+            self._stop_event.set()
+            return
+        err_msg = 'The command can not be applied to the shared daemon: %s' \
+            % command_name
+        raise ValueError(err_msg)
+
+    def stop(self, timeout=STOP_TIMEOUT_SECONDS):
+        """
+        Stop the reader thread and release the ring buffer.
+
+        Parameters
+        ----------
+        timeout : int or float, default STOP_TIMEOUT_SECONDS
+            Seconds to wait for the thread to exit.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def read(self):
+        """
+        Copy the new rows of the ring buffer to the history and save
+        the CSV logs.
+
+        Returns
+        -------
+        row_dict_list : list of dicts
+            The copied rows. Columns not sampled are missing.
+        """
+        self.read_count, row_array = self.ring.read_rows(
+            start_count=self.read_count)
+        row_dict_list = []
+        for value_array in row_array:
+            row_dict = {
+                column_name: value
+                for column_name, value in zip(
+                    self.column_list, value_array.tolist())
+                if not math.isnan(value)}
+            self.tiered_history.append(
+                timestamp=row_dict[stats_collector.COLUMN_NAME_TIMESTAMP],
+                row_dict=row_dict)
+            self.cell_marker_log.update_values(row_dict=row_dict)
+            row_dict_list.append(row_dict)
+        if self.on_rows is not None and row_dict_list:
+            self.on_rows(row_dict_list)
+        stats_collector.save_tier_csv(
+            tiered_history=self.tiered_history,
+            tier_name=history.TIER_NAME_RAW, log_dir_path=self.log_dir_path)
+        self.cell_marker_log.save_csv(log_dir_path=self.log_dir_path)
+        return row_dict_list
+
+    def _run(self):
+        """
+        Loop of the reader thread. The traceback of an error is set to
+        the error_str attribute.
+        """
+        try:
+            while True:
+                self.read()
+                self.ready_event.set()
+                if not _is_process_alive(pid=self.daemon_pid):
+                    self.error_str = 'The shared daemon has exited.'
+                    return
+                if self._stop_event.wait(timeout=self.interval_seconds):
+                    return
+        except Exception:
+            self.error_str = traceback.format_exc()
+            self.ready_event.set()
+        finally:
+            self.ring.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,391 @@
+"""
+Module of the sampler that runs as a daemon thread of the kernel,
+for the environments where child processes can not be spawned.
+
+Notes
+-----
+Only the collectors whose supports_thread_sampling attribute is True
+can be sampled (they read the kept open files of /proc with os.preadv,
+which releases the GIL). The samples are stored in the preallocated
+ring buffer of the raw history tier, and the wall time of each tick is
+recorded so that it can be checked against TICK_BUDGET_SECONDS. The
+ticks that save the CSV log are measured as well; only the new rows
+are appended to the log, and the log is rewritten with the rows of the
+window once the appended rows have exceeded the ring buffer (or the
+columns have changed). The ready_event is set when the first sample has been written (or when an
+error has occurred, with its traceback in error_str).
+"""
+
+import csv
+import io
+import math
+import os
+import queue
+import threading
+import time
+import traceback
+
+import numpy as np
+
+from plot_playground.stats import cell_markers
+from plot_playground.stats import collector as stats_collector
+from plot_playground.stats import history
+from plot_playground.stats import scheduler
+
+TICK_BUDGET_SECONDS = 0.0002
+TICK_COST_HISTORY_SIZE = 1000
+STOP_TIMEOUT_SECONDS = 5
+_JOB_NAME_SAVE_CSV = '_save_csv'
+
+
+def get_tier_setting_list(window_seconds):
+    """
+    Get the settings of the history tiers of the sampler thread. Only
+    the raw tier is kept, for the time window of the plot.
+
+    Parameters
+    ----------
+    window_seconds : int or float
+        Seconds of the time window of the plot.
+
+    Returns
+    -------
+    tier_setting_list : list of dicts
+        Settings of the tiers.
+    """
+    tier_setting_list = [{
+        'name': history.TIER_NAME_RAW,
+        'resolution_seconds': 0,
+        'retention_seconds': window_seconds,
+    }]
+    return tier_setting_list
+
+
+def validate_collectors(collector_list):
+    """
+    Check that all collectors can be sampled by the sampler thread.
+
+    Parameters
+    ----------
+    collector_list : list of MetricCollector
+        A list of collectors.
+
+    Raises
+    ------
+    ValueError
+        If a collector not supporting the thread sampling is included.
+    """
+    for collector in collector_list:
+        if collector.supports_thread_sampling:
+            continue
+        err_msg = 'The metric can not be sampled by the sampler thread: %s' \
+            % collector.name
+        raise ValueError(err_msg)
+
+
+class RawLogWriter():
+
+    def __init__(self, tiered_history, log_dir_path):
+        """
+        Class that saves the raw tier of the history as the CSV log
+        of the plot by appending the new rows.
+
+        Parameters
+        ----------
+        tiered_history : plot_playground.stats.history.TieredHistory
+            The history of the samples.
+        log_dir_path : str
+            Directory where the log is saved.
+        """
+        self.tiered_history = tiered_history
+        self.log_file_path = stats_collector.get_log_file_path(
+            log_dir_path=log_dir_path)
+        self.log_dir_path = log_dir_path
+        self.saved_column_list = None
+        self.last_timestamp = None
+        self.appended_row_num = 0
+
+    def save(self):
+        """
+        Append the rows sampled after the last save to the log. The
+        whole log is rewritten at the first save, when the columns
+        have changed, or when the appended rows have exceeded the
+        capacity of the ring buffer.
+        """
+        timestamp_array, value_array = self.tiered_history.get_tier_arrays(
+            tier_name=history.TIER_NAME_RAW,
+            start_timestamp=self.last_timestamp)
+        if self.last_timestamp is not None:
+            is_new_array = timestamp_array > self.last_timestamp
+            timestamp_array = timestamp_array[is_new_array]
+            value_array = value_array[is_new_array]
+        is_rewritten = (
+            self.saved_column_list != self.tiered_history.column_list
+            or self.appended_row_num + len(timestamp_array)
+            > self.tiered_history.raw_ring_buffer.capacity)
+        if is_rewritten:
+            stats_collector.save_tier_csv(
+                tiered_history=self.tiered_history,
+                tier_name=history.TIER_NAME_RAW,
+                log_dir_path=self.log_dir_path)
+            self.saved_column_list = list(self.tiered_history.column_list)
+            self.appended_row_num = 0
+            timestamp_array = self.tiered_history.get_tier_arrays(
+                tier_name=history.TIER_NAME_RAW)[0]
+        elif len(timestamp_array) > 0:
+            # The rows are written at once so that the browser does not
+            # read a partially written row.
+            string_io = io.StringIO()
+            writer = csv.writer(string_io)
+            for timestamp, value_row in zip(
+                    timestamp_array.round(3).tolist(),
+                    value_array.tolist()):
+                writer.writerow(
+                    [timestamp] + [
+                        '' if math.isnan(value) else value
+                        for value in value_row])
+            with open(self.log_file_path, 'a', newline='',
+                      encoding='utf-8') as f:
+                f.write(string_io.getvalue())
+            self.appended_row_num += len(timestamp_array)
+        if len(timestamp_array) > 0:
+            self.last_timestamp = float(timestamp_array[-1])
+
+
+class ThreadSampler():
+
+    def __init__(
+            self, collector_list, metric_interval_seconds_dict,
+            window_seconds, interval_seconds, log_dir_path,
+            on_sample=None):
+        """
+        Class that samples the metrics in a daemon thread of the
+        kernel and saves the CSV log of the plot.
+
+        Parameters
+        ----------
+        collector_list : list of MetricCollector
+            Collectors that have already been set up. All of them
+            must support the thread sampling.
+        metric_interval_seconds_dict : dict
+            A dictionary of the sampling interval of all metrics.
+        window_seconds : int or float
+            Seconds of the samples kept in the ring buffer.
+        interval_seconds : int or float
+            Interval in seconds at which the log file is saved.
+        log_dir_path : str
+            Directory where the log is saved.
+        on_sample : function or None, default None
+            Function called with each sample row (e.g., to push the
+            row to the front end). It is called after the tick cost
+            has been measured.
+
+        Raises
+        ------
+        ValueError
+            If a collector not supporting the thread sampling is
+            included.
+        """
+        validate_collectors(collector_list=collector_list)
+        self.collector_dict = {
+            collector.name: collector for collector in collector_list}
+        self.column_list = stats_collector.get_column_list(
+            collector_list=collector_list)
+        self.metric_interval_seconds_dict = dict(
+            metric_interval_seconds_dict)
+        self.log_dir_path = log_dir_path
+        self.on_sample = on_sample
+        self.tiered_history = history.TieredHistory(
+            column_list=self.column_list[1:],
+            row_num_per_second=stats_collector.get_row_num_per_second(
+                metric_interval_seconds_dict=metric_interval_seconds_dict),
+            tier_setting_list=get_tier_setting_list(
+                window_seconds=window_seconds))
+        self.interval_scheduler = scheduler.IntervalScheduler()
+        for metric_name, metric_interval in \
+                self.metric_interval_seconds_dict.items():
+            self.interval_scheduler.add_job(
+                name=metric_name, interval_seconds=metric_interval)
+        self.interval_scheduler.add_job(
+            name=_JOB_NAME_SAVE_CSV, interval_seconds=interval_seconds)
+        self.raw_log_writer = RawLogWriter(
+            tiered_history=self.tiered_history, log_dir_path=log_dir_path)
+        self.cell_marker_log = cell_markers.CellMarkerLog()
+        self.tick_seconds_array = np.zeros(TICK_COST_HISTORY_SIZE)
+        self.tick_num = 0
+        self.over_budget_num = 0
+        self.ready_event = threading.Event()
+        self.error_str = None
+        self._command_queue = queue.SimpleQueue()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start the sampler thread.
+        """
+        os.makedirs(self.log_dir_path, exist_ok=True)
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def is_alive(self):
+        """
+        Get whether the sampler thread is running.
+
+        Returns
+        -------
+        is_alive : bool
+            True if the thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def send_command(self, command_dict):
+        """
+        Send the command (same as the commands of the collector
+        process) to the sampler thread. The thread wakes up at once
+        to apply it.
+
+        Parameters
+        ----------
+        command_dict : dict
+            The command. The command name is set to the command key.
+        """
+        self._command_queue.put(command_dict)
+        self._wake_event.set()
+
+    def stop(self, timeout=STOP_TIMEOUT_SECONDS):
+        """
+        Stop the sampler thread and wait for it to exit.
+
+        Parameters
+        ----------
+        timeout : int or float, default STOP_TIMEOUT_SECONDS
+            Seconds to wait for the thread to exit.
+        """
+        self.send_command(command_dict={
+            'command': stats_collector.COMMAND_STOP})
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def get_tick_stats(self):
+        """
+        Get the statistics of the wall time of the recent ticks
+        (sampling and storing the row, and saving the log).
+
+        Returns
+        -------
+        tick_stats_dict : dict
+            A dictionary with the following keys. The times are None
+            if no tick has been measured.
+            - tick_num : The number of the measured ticks.
+            - p50_us : Median of the tick time in microseconds.
+            - p99_us : 99th percentile of the tick time in
+                microseconds.
+            - max_us : Maximum of the tick time in microseconds.
+            - over_budget_num : The number of the ticks that took
+                longer than TICK_BUDGET_SECONDS.
+        """
+        tick_stats_dict = {
+            'tick_num': self.tick_num,
+            'p50_us': None,
+            'p99_us': None,
+            'max_us': None,
+            'over_budget_num': self.over_budget_num,
+        }
+        tick_seconds_array = self.tick_seconds_array[
+            :min(self.tick_num, TICK_COST_HISTORY_SIZE)]
+        if len(tick_seconds_array) == 0:
+            return tick_stats_dict
+        p50, p99 = np.percentile(tick_seconds_array, [50, 99]) * 1e6
+        tick_stats_dict['p50_us'] = round(float(p50), 1)
+        tick_stats_dict['p99_us'] = round(float(p99), 1)
+        tick_stats_dict['max_us'] = round(
+            float(tick_seconds_array.max()) * 1e6, 1)
+        return tick_stats_dict
+
+    def tick(self, metric_name_list):
+        """
+        Sample the metrics and store the row in the ring buffer, and
+        save the CSV logs if the save job is due. The wall time is
+        recorded for the tick statistics, and the wall time and CPU
+        time are passed to the collectors (for the overhead metric).
+
+        Parameters
+        ----------
+        metric_name_list : list of str
+            Names of the due jobs. Names other than the metrics and
+            the save job are ignored.
+
+        Returns
+        -------
+        row_dict : dict or None
+            The sampled row. None if no value is sampled.
+        """
+        start_time = time.perf_counter()
+        start_cpu_time = time.thread_time()
+        row_dict = stats_collector.sample_metrics(
+            collector_dict=self.collector_dict,
+            metric_name_list=metric_name_list)
+        is_saved = _JOB_NAME_SAVE_CSV in metric_name_list
+        if row_dict is None and not is_saved:
+            return None
+        if row_dict is not None:
+            self.tiered_history.append(
+                timestamp=row_dict[stats_collector.COLUMN_NAME_TIMESTAMP],
+                row_dict=row_dict)
+            self.cell_marker_log.update_values(row_dict=row_dict)
+        if is_saved:
+            self.raw_log_writer.save()
+            self.cell_marker_log.save_csv(log_dir_path=self.log_dir_path)
+        tick_seconds = time.perf_counter() - start_time
+        stats_collector.record_tick(
+            collector_dict=self.collector_dict, wall_seconds=tick_seconds,
+            cpu_seconds=time.thread_time() - start_cpu_time)
+        self.tick_seconds_array[
+            self.tick_num % TICK_COST_HISTORY_SIZE] = tick_seconds
+        self.tick_num += 1
+        if tick_seconds > TICK_BUDGET_SECONDS:
+            self.over_budget_num += 1
+        return row_dict
+
+    def _run(self):
+        """
+        Loop of the sampler thread. The traceback of an error is set
+        to the error_str attribute.
+        """
+        try:
+            self._loop()
+        except Exception:
+            self.error_str = traceback.format_exc()
+            self.ready_event.set()
+        finally:
+            for collector in self.collector_dict.values():
+                collector.close()
+
+    def _loop(self):
+        """
+        Sample the metrics until the stop command arrives.
+        """
+        while True:
+            self._wake_event.clear()
+            self.interval_scheduler.sleep_until_next(
+                sleep_func=self._wake_event.wait)
+            while not self._command_queue.empty():
+                is_stopped = stats_collector.apply_command(
+                    command_dict=self._command_queue.get(),
+                    collector_dict=self.collector_dict,
+                    column_list=self.column_list,
+                    metric_interval_seconds_dict=self.
+                    metric_interval_seconds_dict,
+                    interval_scheduler=self.interval_scheduler,
+                    tiered_history=self.tiered_history, store=None,
+                    cell_marker_log=self.cell_marker_log)
+                if is_stopped:
+                    return
+            due_job_name_list = self.interval_scheduler.pop_due_job_names()
+            row_dict = self.tick(metric_name_list=due_job_name_list)
+            if row_dict is not None and self.on_sample is not None:
+                self.on_sample(row_dict)
+            if _JOB_NAME_SAVE_CSV in due_job_name_list:
+                self.ready_event.set()
@@ -0,0 +1,228 @@
+"""
+Module of the rolling linear trend of the stats samples, used to
+detect slow memory leaks before they end in an out of memory error.
+
+Notes
+-----
+The least squares line is updated with running sums of the samples in
+the window (the expired samples are subtracted), so each sample costs
+O(1) regardless of the window length.
+"""
+
+import collections
+
+DEFAULT_TREND_WINDOW_SECONDS = 10 * 60
+DEFAULT_ALERT_MINUTES_TO_LIMIT = 30
+GROWTH_RATE_COLUMN_NAME_FORMAT = '{column_name} (growth/min)'
+MINUTES_TO_LIMIT_COLUMN_NAME_FORMAT = '{column_name} (min to limit)'
+# The trend is reported after the window has been filled to this
+# ratio, to avoid alerts from the first few samples.
+MIN_WINDOW_FILL_RATIO = 0.25
+MIN_SAMPLE_NUM = 10
+# The running sums are recalculated from the samples in the window
+# (after shifting the origin) when the oldest sample is this number of
+# windows away from the origin, to bound the rounding errors.
+_REBASE_WINDOW_NUM = 100
+
+
+def get_growth_rate_column_name(column_name):
+    """
+    Get the name of the column of the growth rate per minute.
+
+    Parameters
+    ----------
+    column_name : str
+        Name of the sampled column.
+
+    Returns
+    -------
+    growth_rate_column_name : str
+        The column name. e.g., 'memory usage (MB) (growth/min)'
+    """
+    return GROWTH_RATE_COLUMN_NAME_FORMAT.format(column_name=column_name)
+
+
+def get_minutes_to_limit_column_name(column_name):
+    """
+    Get the name of the column of the projected minutes until the
+    value reaches the limit.
+
+    Parameters
+    ----------
+    column_name : str
+        Name of the sampled column.
+
+    Returns
+    -------
+    minutes_to_limit_column_name : str
+        The column name. e.g., 'memory usage (MB) (min to limit)'
+    """
+    return MINUTES_TO_LIMIT_COLUMN_NAME_FORMAT.format(
+        column_name=column_name)
+
+
+class RollingLinearTrend():
+
+    def __init__(self, column_name, window_seconds, limit=None):
+        """
+        Class that fits a line to the samples of the recent window
+        with running sums.
+
+        Parameters
+        ----------
+        column_name : str
+            Name of the sampled column.
+        window_seconds : int or float
+            Seconds of the window of the fitted samples.
+        limit : int, float or None, default None
+            The limit of the value (e.g., the memory limit in MB). If
+            None, the time to the limit is not projected.
+        """
+        self.column_name = column_name
+        self.window_seconds = window_seconds
+        self.limit = limit
+        self.sample_deque = collections.deque()
+        # The timestamps are shifted by the first timestamp so that
+        # the sums of the squares keep their precision.
+        self.origin_timestamp = None
+        self.sum_t = 0.0
+        self.sum_v = 0.0
+        self.sum_tt = 0.0
+        self.sum_tv = 0.0
+
+    def add(self, timestamp, value):
+        """
+        Add a sample, and remove the samples out of the window.
+
+        Parameters
+        ----------
+        timestamp : float
+            Timestamp of the sample in seconds.
+        value : int or float
+            The sampled value.
+        """
+        if self.origin_timestamp is None:
+            self.origin_timestamp = timestamp
+        t = timestamp - self.origin_timestamp
+        self.sample_deque.append((t, value))
+        self._add_to_sums(t=t, value=value, sign=1)
+        while t - self.sample_deque[0][0] > self.window_seconds:
+            expired_t, expired_value = self.sample_deque.popleft()
+            self._add_to_sums(t=expired_t, value=expired_value, sign=-1)
+        if self.sample_deque[0][0] > \
+                self.window_seconds * _REBASE_WINDOW_NUM:
+            self._rebase()
+
+    def _rebase(self):
+        """
+        Move the origin to the oldest sample in the window and
+        recalculate the running sums. This is O(window) but happens
+        only once per _REBASE_WINDOW_NUM windows.
+        """
+        shift = self.sample_deque[0][0]
+        self.origin_timestamp += shift
+        self.sample_deque = collections.deque(
+            (t - shift, value) for t, value in self.sample_deque)
+        self.sum_t = 0.0
+        self.sum_v = 0.0
+        self.sum_tt = 0.0
+        self.sum_tv = 0.0
+        for t, value in self.sample_deque:
+            self._add_to_sums(t=t, value=value, sign=1)
+
+    def _add_to_sums(self, t, value, sign):
+        """
+        Add the sample to (or subtract it from) the running sums.
+
+        Parameters
+        ----------
+        t : float
+            Shifted timestamp of the sample.
+        value : int or float
+            The sampled value.
+        sign : int
+            1 to add, -1 to subtract.
+        """
+        self.sum_t += sign * t
+        self.sum_v += sign * value
+        self.sum_tt += sign * t * t
+        self.sum_tv += sign * t * value
+
+    def is_ready(self):
+        """
+        Get whether enough samples have been added to report the
+        trend.
+
+        Returns
+        -------
+        is_ready : bool
+            True if the window has MIN_SAMPLE_NUM samples or more and
+            has been filled to MIN_WINDOW_FILL_RATIO.
+        """
+        if len(self.sample_deque) < MIN_SAMPLE_NUM:
+            return False
+        span_seconds = self.sample_deque[-1][0] - self.sample_deque[0][0]
+        return span_seconds >= self.window_seconds * MIN_WINDOW_FILL_RATIO
+
+    def get_slope(self):
+        """
+        Get the slope of the fitted line.
+
+        Returns
+        -------
+        slope : float or None
+            The increase of the value per second. None if the
+            timestamps of the samples are all the same.
+        """
+        n = len(self.sample_deque)
+        denominator = n * self.sum_tt - self.sum_t ** 2
+        if n < 2 or denominator <= 0:
+            return None
+        return (n * self.sum_tv - self.sum_t * self.sum_v) / denominator
+
+    def get_minutes_to_limit(self):
+        """
+        Get the projected minutes until the fitted line reaches the
+        limit.
+
+        Returns
+        -------
+        minutes_to_limit : float or None
+            The projected minutes (0 if the value is already over the
+            limit). None if the limit is not set or the value is not
+            increasing.
+        """
+        slope = self.get_slope()
+        if self.limit is None or slope is None or slope <= 0:
+            return None
+        n = len(self.sample_deque)
+        intercept = (self.sum_v - slope * self.sum_t) / n
+        fitted_value = intercept + slope * self.sample_deque[-1][0]
+        minutes_to_limit = max(self.limit - fitted_value, 0) / slope / 60
+        return minutes_to_limit
+
+    def get_value_dict(self):
+        """
+        Get the growth rate and the projected minutes to the limit.
+
+        Returns
+        -------
+        value_dict : dict
+            A dictionary that stores the growth rate column and the
+            minutes to limit column in key and the value (rounded to
+            2 decimal places) in value. The columns that can not be
+            calculated (or before the trend is ready) are omitted.
+        """
+        value_dict = {}
+        if not self.is_ready():
+            return value_dict
+        slope = self.get_slope()
+        if slope is None:
+            return value_dict
+        value_dict[get_growth_rate_column_name(
+            column_name=self.column_name)] = round(slope * 60, 2)
+        minutes_to_limit = self.get_minutes_to_limit()
+        if minutes_to_limit is not None:
+            value_dict[get_minutes_to_limit_column_name(
+                column_name=self.column_name)] = round(minutes_to_limit, 2)
+        return value_dict
@@ -3,10 +3,34 @@ Python Parameters
 -----------------
 {svg_id} : str
     SVG elemnt's ID.
-{gpu_num} : int
-    Number of GPUs.
-{csv_log_file_path} : str
-    CSV log file path.
+{panel_list} : list of dicts
+    Settings of the panels made from the collectors. Each dictionary
+    has title, column_list, unit, decimal_num, label_list, height,
+    quantile_list, trend_window_seconds and alert_minutes_to_limit
+    keys.
+{window_option_list} : list of dicts
+    Options of the time window selector. Each dictionary has label,
+    window_seconds, tier_name and csv_log_file_path keys.
+{window_seconds} : int or float
+    Seconds of the time window to plot initially.
+{raw_retention_seconds} : int or float
+    Seconds for which the raw samples are kept.
+{push_comm_target_name} : str
+    Target name of the Jupyter comm that pushes the samples. If an
+    empty string is specified, the CSV log file is polled instead.
+{cell_log_file_path} : str
+    Path of the CSV log file of the executed cells (or of the profiled
+    block and its events), drawn as the bands on all panels.
+{heap_log_file_path} : str
+    Path of the CSV log file of the allocation sites of the kernel
+    that grew most between the last two heap snapshots.
+{heap_site_num} : int
+    The number of the allocation sites listed under the panels. If
+    zero, the list is not displayed (the heap metric is not sampled).
+{is_static} : bool
+    Whether the logs are complete (e.g., a replay of the history or a
+    profile timeline). If true, the plot is drawn once without polling
+    the logs.
 {js_helper_func_get_b_box_width} : str
     A string of helper function to get the bounding box width of the
     target element.
@@ -15,30 +39,41 @@ Python Parameters
 const SVG_ID = "{svg_id}";
 const BASIC_MARGIN = 20;
 const PLOT_UNIT_WIDTH = 700;
-const PLOT_UNIT_HEIGHT = 200;
 const PLOT_X = 1 + BASIC_MARGIN;
-const GPU_NUM = {gpu_num};
-const LOG_FILE_PATH = "{csv_log_file_path}";
-const COLUMN_NAME_MEMORY_USAGE = "memory usage (MB)";
-const COLUMN_NAME_DISK_USAGE = "disk usage (GB)";
+const PANEL_LIST = {panel_list};
+const WINDOW_OPTION_LIST = {window_option_list};
+const WINDOW_SECONDS = {window_seconds};
+const RAW_RETENTION_SECONDS = {raw_retention_seconds};
+const TIER_NAME_RAW = "raw";
+const MIN_COLUMN_SUFFIX = " (min)";
+const MAX_COLUMN_SUFFIX = " (max)";
+const QUANTILE_TEXT_EMPTY_VALUE = "-";
+const GROWTH_RATE_COLUMN_SUFFIX = " (growth/min)";
+const MINUTES_TO_LIMIT_COLUMN_SUFFIX = " (min to limit)";
+const TREND_TEXT_EMPTY = "Trend: -";
+const ALERT_CLASS = "alert";
+const PUSH_COMM_TARGET_NAME = "{push_comm_target_name}";
+const CELL_LOG_FILE_PATH = "{cell_log_file_path}";
+const CELL_BAND_CLASS = "cell-band";
+const HEAP_LOG_FILE_PATH = "{heap_log_file_path}";
+const HEAP_SITE_NUM = {heap_site_num};
+const IS_STATIC = {is_static};
+const HEAP_TITLE_TEXT = "Growing allocation sites of the kernel";
+const HEAP_TITLE_TEXT_EMPTY = HEAP_TITLE_TEXT + ": waiting for the second snapshot";
+const COLUMN_NAME_TIMESTAMP = "timestamp";
 const INTERVAL_SECONDS = 2;
 const AXIS_TICKS = 5;
 const ANIMATION_DURATION = 200;
+const LINE_COLOR_LIST = [
+    "#6bb2f8", "#f8b16b", "#7fd67f", "#f87b8e", "#c39bf8", "#f8e16b"];
+const INFO_TEXT_X = PLOT_X + PLOT_UNIT_WIDTH - 2 - BASIC_MARGIN;
+const INFO_TEXT_LINE_HEIGHT = 21;
+const INFO_TEXT_CLASS = "info font";
+const INFO_TEXT_DOMINANT_BASELINE = "hanging";
+const CLIP_PATH_MARGIN_WIDTH = 2000;
 
 {js_helper_func_get_b_box_width}
 
-/**
- * Gets the column name of memory usage of the GPU.
- *
- * @param {int} gpuIndex: Index of target GPU (Starting
- * from zero).
- *
- * @return {String} GPU column name.
- */
-function getGPUColumnName(gpuIndex) {
-    return "gpu(" + gpuIndex + ") memory usage (MB)";
-}
-
 var windowFocused = true;
 window.onfocus = function() {
     windowFocused = true;
@@ -49,463 +84,911 @@ window.onblur = function() {
 
 var svg = d3.select("#{svg_id}");
 
-const MEMORY_USAGE_PLOT_Y = 1 + BASIC_MARGIN;
-var memoryUsagePlotBorderRect = svg.append("rect")
-    .attr("width", PLOT_UNIT_WIDTH - 2 - BASIC_MARGIN * 2)
-    .attr("height", PLOT_UNIT_HEIGHT - 2)
-    .classed("outer-border-rect", true)
-    .attr("x", PLOT_X)
-    .attr("y", 1 + BASIC_MARGIN);
-
-const DISK_USAGE_PLOT_Y = PLOT_UNIT_HEIGHT + BASIC_MARGIN * 2 + 1;
-var diskUsagePlotBorderRect = svg.append("rect")
-    .attr("width", PLOT_UNIT_WIDTH - 2 - BASIC_MARGIN * 2)
-    .attr("height", PLOT_UNIT_HEIGHT - 2)
-    .classed("outer-border-rect", true)
-    .attr("x", PLOT_X)
-    .attr("y", DISK_USAGE_PLOT_Y);
-
-var gpuMemoryUsagePlotYList = [];
-var gpuMemoryUsagePlotBorderRectList = [];
-for (var i = 0; i < GPU_NUM; i++) {
-    var gpuMemoryUsagePlotY = PLOT_UNIT_HEIGHT * (2 + i) + BASIC_MARGIN * (3 + i) + 1;
-    gpuMemoryUsagePlotYList.push(gpuMemoryUsagePlotY);
-    var gpuMemoryUsagePlotBorderRect = svg.append("rect")
+/**
+ * Get the rows in which the value of the target column is sampled.
+ * Since each metric is sampled at its own interval, the other rows
+ * have NaN value.
+ *
+ * @param {Array} dataset: Array of the converted rows.
+ * @param {String} columnName: Name of the target column.
+ *
+ * @return {Array} Array of the rows having the value.
+ */
+function filterSampledRows(dataset, columnName) {
+    return dataset.filter(function(d) {
+        return !isNaN(d[columnName]);
+    });
+}
+
+/**
+ * Format the value with the unit of the panel.
+ *
+ * @param {float} value: The value to format.
+ * @param {Object} panelSetting: The setting of the panel.
+ *
+ * @return {String} The formatted string.
+ */
+function formatValue(value, panelSetting) {
+    return parseFloat(value).toFixed(panelSetting.decimal_num) + panelSetting.unit;
+}
+
+/**
+ * Get the name of the column of the quantile estimate (same as the
+ * get_quantile_column_name function of the quantiles module).
+ *
+ * @param {String} columnName: Name of the sampled column.
+ * @param {float} quantile: The quantile (0 to 1).
+ *
+ * @return {String} The column name. e.g., "memory usage (MB) (p99)"
+ */
+function getQuantileColumnName(columnName, quantile) {
+    var percentile = Math.round(quantile * 1000) / 10;
+    return columnName + " (p" + percentile + ")";
+}
+
+/**
+ * Get the text of the quantile estimates of the column.
+ *
+ * @param {Object} panelSetting: The setting of the panel.
+ * @param {Array} valueList: The estimates of each quantile. Null
+ * if not estimated yet.
+ *
+ * @return {String} The text. e.g., "p50 / p95 / p99: 10 / 20 / 30MB"
+ */
+function getQuantileText(panelSetting, valueList) {
+    var labelList = panelSetting.quantile_list.map(function(quantile) {
+        return "p" + Math.round(quantile * 1000) / 10;
+    });
+    var valueText = QUANTILE_TEXT_EMPTY_VALUE;
+    if (valueList !== null) {
+        valueText = valueList.map(function(value) {
+            return parseFloat(value).toFixed(panelSetting.decimal_num);
+        }).join(" / ") + panelSetting.unit;
+    }
+    return labelList.join(" / ") + ": " + valueText;
+}
+
+/**
+ * Get the text of the trend of the column.
+ *
+ * @param {Object} panelSetting: The setting of the panel.
+ * @param {float} growthRate: The growth rate per minute.
+ * @param {float} minutesToLimit: The projected minutes to the limit.
+ * NaN if the value is not increasing or has no limit.
+ *
+ * @return {String} The text. e.g., "Trend: +1.50MB/min, 25 min to limit"
+ */
+function getTrendText(panelSetting, growthRate, minutesToLimit) {
+    var sign = growthRate > 0 ? "+" : "";
+    var text = "Trend: " + sign + parseFloat(growthRate).toFixed(2)
+        + panelSetting.unit + "/min";
+    if (!isNaN(minutesToLimit)) {
+        text += ", " + Math.round(minutesToLimit) + " min to limit";
+    }
+    return text;
+}
+
+/**
+ * Add the text of the information area of the panel.
+ *
+ * @param {float} y: Y coordinate of the text.
+ * @param {String} text: The text to display.
+ *
+ * @return {Object} The added text element.
+ */
+function appendInfoText(y, text) {
+    return svg.append("text")
+        .attr("x", INFO_TEXT_X)
+        .attr("y", y)
+        .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
+        .classed(INFO_TEXT_CLASS, true)
+        .text(text);
+}
+
+/**
+ * Add the elements of the panel (border, axis, lines, information
+ * texts and clip path) to the SVG.
+ *
+ * @param {Object} panelSetting: The setting of the panel.
+ * @param {int} panelIndex: Index of the panel (starting from zero).
+ * @param {float} plotY: Y coordinate of the top of the panel.
+ *
+ * @return {Object} An object that stores the elements of the panel.
+ */
+function createPanel(panelSetting, panelIndex, plotY) {
+    var borderRect = svg.append("rect")
         .attr("width", PLOT_UNIT_WIDTH - 2 - BASIC_MARGIN * 2)
-        .attr("height", PLOT_UNIT_HEIGHT - 2)
+        .attr("height", panelSetting.height - 2)
         .classed("outer-border-rect", true)
         .attr("x", PLOT_X)
-        .attr("y", gpuMemoryUsagePlotY);
-    gpuMemoryUsagePlotBorderRectList.push(
-        gpuMemoryUsagePlotBorderRect
-    );
+        .attr("y", plotY);
+
+    var yScale = d3.scaleLinear()
+        .range([
+            plotY + panelSetting.height - 1 - BASIC_MARGIN,
+            plotY + 1 + BASIC_MARGIN]);
+    var axis = d3.axisLeft()
+        .ticks(AXIS_TICKS);
+    var axisGroup = svg.append("g")
+        .classed("axis font", true);
+
+    // The bands of the cells are added first to be drawn behind the
+    // lines.
+    var cellBandGroup = svg.append("g");
+
+    var bandPathList = [];
+    var linePathList = [];
+    for (var i = 0; i < panelSetting.column_list.length; i++) {
+        bandPathList.push(
+            svg.append("path")
+                .classed("value-band", true)
+                .style("fill", LINE_COLOR_LIST[i % LINE_COLOR_LIST.length])
+        );
+        linePathList.push(
+            svg.append("path")
+                .classed("value-line", true)
+                .style("stroke", LINE_COLOR_LIST[i % LINE_COLOR_LIST.length])
+        );
+    }
+
+    var borderRectBBox = borderRect
+        .node()
+        .getBBox();
+    appendInfoText(borderRectBBox.y, panelSetting.title.toUpperCase());
+    var minText = appendInfoText(
+        borderRectBBox.y + INFO_TEXT_LINE_HEIGHT,
+        "Min: " + formatValue(0, panelSetting));
+    var maxText = appendInfoText(
+        borderRectBBox.y + INFO_TEXT_LINE_HEIGHT * 2,
+        "Max: " + formatValue(0, panelSetting));
+    var lastText = appendInfoText(
+        borderRectBBox.y + INFO_TEXT_LINE_HEIGHT * 3,
+        "Last: " + formatValue(0, panelSetting));
+    for (var i = 0; i < panelSetting.label_list.length; i++) {
+        appendInfoText(
+            borderRectBBox.y + INFO_TEXT_LINE_HEIGHT * (4 + i),
+            panelSetting.label_list[i])
+            .style("fill", LINE_COLOR_LIST[i % LINE_COLOR_LIST.length]);
+    }
+    var quantileTextList = [];
+    if (panelSetting.quantile_list.length > 0) {
+        for (var i = 0; i < panelSetting.column_list.length; i++) {
+            var quantileText = appendInfoText(
+                borderRectBBox.y + INFO_TEXT_LINE_HEIGHT * (
+                    4 + panelSetting.label_list.length + i),
+                getQuantileText(panelSetting, null));
+            if (panelSetting.column_list.length > 1) {
+                quantileText.style(
+                    "fill", LINE_COLOR_LIST[i % LINE_COLOR_LIST.length]);
+            }
+            quantileTextList.push(quantileText);
+        }
+    }
+    var trendTextList = [];
+    if (panelSetting.trend_window_seconds !== null) {
+        var trendLineIndex = 4 + panelSetting.label_list.length
+            + quantileTextList.length;
+        for (var i = 0; i < panelSetting.column_list.length; i++) {
+            var trendText = appendInfoText(
+                borderRectBBox.y + INFO_TEXT_LINE_HEIGHT * (trendLineIndex + i),
+                TREND_TEXT_EMPTY);
+            if (panelSetting.column_list.length > 1) {
+                trendText.style(
+                    "fill", LINE_COLOR_LIST[i % LINE_COLOR_LIST.length]);
+            }
+            trendTextList.push(trendText);
+        }
+    }
+
+    var clipPathId = "{svg_id}-clip-path-" + panelIndex;
+    svg.append("clipPath")
+        .attr("id", clipPathId)
+        .append("rect")
+        .attr("x", -CLIP_PATH_MARGIN_WIDTH / 2)
+        .attr("y", borderRectBBox.y + 1)
+        .attr("width", borderRectBBox.width + CLIP_PATH_MARGIN_WIDTH)
+        .attr("height", borderRectBBox.height - 2);
+    axisGroup
+        .style("clip-path", "url(#" + clipPathId + ")");
+    cellBandGroup
+        .style("clip-path", "url(#" + clipPathId + ")");
+
+    return {
+        setting: panelSetting,
+        borderRect: borderRect,
+        yScale: yScale,
+        axis: axis,
+        axisGroup: axisGroup,
+        cellBandGroup: cellBandGroup,
+        bandPathList: bandPathList,
+        linePathList: linePathList,
+        minText: minText,
+        maxText: maxText,
+        lastText: lastText,
+        quantileTextList: quantileTextList,
+        trendTextList: trendTextList
+    };
 }
 
-var rowConverter = function(d) {
-    var rowDict = {
-        memoryUsage: parseInt(d[COLUMN_NAME_MEMORY_USAGE]),
-        diskUsage: parseFloat(d[COLUMN_NAME_DISK_USAGE])
+var panelList = [];
+var panelY = BASIC_MARGIN + 1;
+for (var i = 0; i < PANEL_LIST.length; i++) {
+    panelList.push(createPanel(PANEL_LIST[i], i, panelY));
+    panelY += PANEL_LIST[i].height + BASIC_MARGIN;
+}
+
+/**
+ * Add the texts of the growing allocation sites under the panels.
+ *
+ * @param {float} y: Y coordinate of the top of the list.
+ *
+ * @return {Object} An object that stores the title text and the list
+ *     of the texts of the sites. Null if the list is not displayed.
+ */
+function createHeapSiteList(y) {
+    if (HEAP_SITE_NUM === 0) {
+        return null;
+    }
+    var titleText = svg.append("text")
+        .attr("x", PLOT_X)
+        .attr("y", y)
+        .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
+        .classed(INFO_TEXT_CLASS, true)
+        .text(HEAP_TITLE_TEXT_EMPTY);
+    var siteTextList = [];
+    for (var i = 0; i < HEAP_SITE_NUM; i++) {
+        var siteText = svg.append("text")
+            .attr("x", PLOT_X)
+            .attr("y", y + INFO_TEXT_LINE_HEIGHT * (i + 1))
+            .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
+            .classed(INFO_TEXT_CLASS, true)
+            .classed("heap-site", true);
+        siteTextList.push(siteText);
+    }
+    return {
+        titleText: titleText,
+        siteTextList: siteTextList
     };
-    for (var i = 0; i < GPU_NUM; i++) {
-        var gpuColumnName = getGPUColumnName(gpuIndex=i);
-        rowDict["gpuMemoryUsage" + i] = parseInt(
-            d[gpuColumnName]);
+}
+
+var heapSiteList = createHeapSiteList(panelY);
+
+var selectedWindowIndex = 0;
+for (var i = 0; i < WINDOW_OPTION_LIST.length; i++) {
+    if (WINDOW_OPTION_LIST[i].window_seconds === WINDOW_SECONDS) {
+        selectedWindowIndex = i;
+    }
+}
+
+/**
+ * Get the selected option of the time window selector.
+ *
+ * @return {Object} The selected option.
+ */
+function getSelectedWindowOption() {
+    return WINDOW_OPTION_LIST[selectedWindowIndex];
+}
+
+/**
+ * Get the text of the time window selector.
+ *
+ * @return {String} The text of the selector.
+ */
+function getWindowSelectorText() {
+    return "Window: " + getSelectedWindowOption().label + " (click to change)";
+}
+
+/**
+ * Add the time window selector to the bottom of the information
+ * area of the first panel. Clicking the text selects the next window
+ * (the previous one with the shift key).
+ */
+function createWindowSelector() {
+    var selectorY = PANEL_LIST[0].height + BASIC_MARGIN - 1 - INFO_TEXT_LINE_HEIGHT;
+    var selectorText = appendInfoText(selectorY, getWindowSelectorText())
+        .style("cursor", "pointer");
+    selectorText.on("click", function() {
+        var step = d3.event.shiftKey ? -1 : 1;
+        selectedWindowIndex = (
+            selectedWindowIndex + step + WINDOW_OPTION_LIST.length)
+            % WINDOW_OPTION_LIST.length;
+        selectorText.text(getWindowSelectorText());
+        if (isPushedDatasetUsed()) {
+            renderDataset(pushedDataset);
+            return;
+        }
+        update_plot_value();
+    });
+}
+
+createWindowSelector();
+
+var rowConverter = function(d) {
+    var rowDict = {};
+    rowDict[COLUMN_NAME_TIMESTAMP] = parseFloat(d[COLUMN_NAME_TIMESTAMP]);
+    for (var i = 0; i < PANEL_LIST.length; i++) {
+        var columnList = PANEL_LIST[i].column_list;
+        for (var j = 0; j < columnList.length; j++) {
+            var columnName = columnList[j];
+            rowDict[columnName] = parseFloat(d[columnName]);
+            var quantileList = PANEL_LIST[i].quantile_list;
+            for (var k = 0; k < quantileList.length; k++) {
+                var quantileColumnName = getQuantileColumnName(
+                    columnName, quantileList[k]);
+                rowDict[quantileColumnName] = parseFloat(d[quantileColumnName]);
+            }
+            if (PANEL_LIST[i].trend_window_seconds !== null) {
+                var trendColumnNameList = [
+                    columnName + GROWTH_RATE_COLUMN_SUFFIX,
+                    columnName + MINUTES_TO_LIMIT_COLUMN_SUFFIX];
+                for (var k = 0; k < trendColumnNameList.length; k++) {
+                    rowDict[trendColumnNameList[k]] = parseFloat(
+                        d[trendColumnNameList[k]]);
+                }
+            }
+            // The rollup tiers also have the min and max columns.
+            if (d[columnName + MIN_COLUMN_SUFFIX] === undefined) {
+                continue;
+            }
+            rowDict[columnName + MIN_COLUMN_SUFFIX] = parseFloat(
+                d[columnName + MIN_COLUMN_SUFFIX]);
+            rowDict[columnName + MAX_COLUMN_SUFFIX] = parseFloat(
+                d[columnName + MAX_COLUMN_SUFFIX]);
+        }
     }
     return rowDict;
 }
 
-var memoryUsageYScale = d3.scaleLinear()
-    .range([
-        MEMORY_USAGE_PLOT_Y + PLOT_UNIT_HEIGHT - 1 - BASIC_MARGIN,
-        MEMORY_USAGE_PLOT_Y + 1 + BASIC_MARGIN]);
-var memoryUsageAxis = d3.axisLeft()
-    .ticks(AXIS_TICKS);
-var memoryUsageAxisGroup = svg.append("g")
-    .classed("axis font", true);
-
-var diskUsageYScale = d3.scaleLinear()
-    .range([
-        DISK_USAGE_PLOT_Y + PLOT_UNIT_HEIGHT - 1 - BASIC_MARGIN,
-        DISK_USAGE_PLOT_Y + 1 + BASIC_MARGIN]);
-var diskUsageAxis = d3.axisLeft()
-    .ticks(AXIS_TICKS);
-var diskUsageAxisGroup = svg.append("g")
-    .classed("axis font", true);
-
-var gpuMemoryUsageYScaleList = [];
-var gpuMemoryUsageAxisList = [];
-var gpuMemoryUsageAxisGroupList = [];
-for (var i = 0; i < GPU_NUM; i++) {
-    gpuMemoryUsageYScaleList.push(
-        d3.scaleLinear()
-            .range([
-                gpuMemoryUsagePlotYList[i] + PLOT_UNIT_HEIGHT - 1 - BASIC_MARGIN,
-                gpuMemoryUsagePlotYList[i] + 1 + BASIC_MARGIN
-            ])
-    );
-    gpuMemoryUsageAxisList.push(
-        d3.axisLeft()
-            .ticks(AXIS_TICKS)
-    );
-    gpuMemoryUsageAxisGroupList.push(
-        svg.append("g")
-            .classed("axis font", true)
-    );
+/**
+ * Get the value of the column, or of its min / max column if the row
+ * is a rollup.
+ *
+ * @param {Object} d: The converted row.
+ * @param {String} columnName: Name of the target column.
+ * @param {String} suffix: MIN_COLUMN_SUFFIX or MAX_COLUMN_SUFFIX.
+ *
+ * @return {float} The value.
+ */
+function getRollupValue(d, columnName, suffix) {
+    var value = d[columnName + suffix];
+    if (value === undefined || isNaN(value)) {
+        return d[columnName];
+    }
+    return value;
 }
 
 var xScale = d3.scaleLinear();
+var cellDataset = [];
+
+var cellRowConverter = function(d) {
+    return {
+        execution_count: d.execution_count,
+        source_line: d.source_line,
+        start_timestamp: parseFloat(d.start_timestamp),
+        end_timestamp: parseFloat(d.end_timestamp),
+        duration_seconds: parseFloat(d.duration_seconds),
+        peak_rss_mb: parseFloat(d.peak_rss_mb),
+        gpu_memory_delta_mb: parseFloat(d.gpu_memory_delta_mb)
+    };
+}
 
-var memoryUsageLine = d3.line()
-    .x(function(d, i) {
-        return xScale(i);
-    })
-    .y(function(d, i) {
-        return memoryUsageYScale(d.memoryUsage);
-    });
-var memoryUsageLinePath = svg.append("path")
-    .classed("value-line", true);
-
-var diskUsageLine = d3.line()
-    .x(function(d, i) {
-        return xScale(i);
-    })
-    .y(function(d, i) {
-        return diskUsageYScale(d.diskUsage);
+/**
+ * Read the CSV of the executed cells. The bands are updated with the
+ * next rendering of the samples.
+ */
+function update_cell_value() {
+    if (CELL_LOG_FILE_PATH === "" || !windowFocused) {
+        return;
+    }
+    d3.csv(CELL_LOG_FILE_PATH, cellRowConverter, function(error, dataset) {
+        if (error || !dataset) {
+            // The log does not exist until the first cell has ended.
+            return;
+        }
+        cellDataset = dataset;
     });
-var diskUsageLinePath = svg.append("path")
-    .classed("value-line", true);
+}
 
-var gpuMemoryUsageLinePathList = [];
-for (var i = 0; i < GPU_NUM; i++) {
-    var gpuMemoryUsageLinePath = svg.append("path")
-        .classed("value-line", true);
-    gpuMemoryUsageLinePathList.push(gpuMemoryUsageLinePath);
+/**
+ * Get the text of the size in kilobytes with the suitable unit.
+ *
+ * @param {float} sizeKb: The size in kilobytes.
+ *
+ * @return {String} The text. e.g., "1.5MB"
+ */
+function formatSizeKb(sizeKb) {
+    if (Math.abs(sizeKb) >= 1024) {
+        return (sizeKb / 1024).toFixed(1) + "MB";
+    }
+    return sizeKb.toFixed(1) + "KB";
 }
 
-var memoryUsagePlotBorderRectBBox = memoryUsagePlotBorderRect
-    .node()
-    .getBBox();
-const INFO_TEXT_X = memoryUsagePlotBorderRectBBox.x + memoryUsagePlotBorderRectBBox.width + BASIC_MARGIN;
-const INFO_TEXT_LINE_HEIGHT = 21;
-const INFO_TEXT_CLASS = "info font";
-const INFO_TEXT_DOMINANT_BASELINE = "hanging";
-var memoryUsageTitle = svg.append("text")
-    .attr("x", INFO_TEXT_X)
-    .attr("y", memoryUsagePlotBorderRectBBox.y)
-    .text(COLUMN_NAME_MEMORY_USAGE.toUpperCase())
-    .attr("dominant-baseline", "hanging")
-    .classed(INFO_TEXT_CLASS, true);
-var memoryUsageMinText = svg.append("text")
-    .attr("x", INFO_TEXT_X)
-    .attr("y", memoryUsagePlotBorderRectBBox.y + INFO_TEXT_LINE_HEIGHT)
-    .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
-    .classed(INFO_TEXT_CLASS, true)
-    .text("Min: 0MB");
-var memoryUsageMaxText = svg.append("text")
-    .attr("x", INFO_TEXT_X)
-    .attr("y", memoryUsagePlotBorderRectBBox.y + INFO_TEXT_LINE_HEIGHT * 2)
-    .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
-    .classed(INFO_TEXT_CLASS, true)
-    .text("Max: 0MB");
-var memoryUsageLastText = svg.append("text")
-    .attr("x", INFO_TEXT_X)
-    .attr("y", memoryUsagePlotBorderRectBBox.y + INFO_TEXT_LINE_HEIGHT * 3)
-    .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
-    .classed(INFO_TEXT_CLASS, true)
-    .text("Last: 0MB");
-
-var diskUsagePlotBorderRectBBox = diskUsagePlotBorderRect
-    .node()
-    .getBBox();
-var diskUsageTitle = svg.append("text")
-    .attr("x", INFO_TEXT_X)
-    .attr("y", diskUsagePlotBorderRectBBox.y)
-    .text(COLUMN_NAME_DISK_USAGE.toUpperCase())
-    .attr("dominant-baseline", "hanging")
-    .classed(INFO_TEXT_CLASS, true);
-var diskUsageMinText = svg.append("text")
-    .attr("x", INFO_TEXT_X)
-    .attr("y", diskUsagePlotBorderRectBBox.y + INFO_TEXT_LINE_HEIGHT)
-    .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
-    .classed(INFO_TEXT_CLASS, true)
-    .text("Min: 0GB");
-var diskUsageMaxText = svg.append("text")
-    .attr("x", INFO_TEXT_X)
-    .attr("y", diskUsagePlotBorderRectBBox.y + INFO_TEXT_LINE_HEIGHT * 2)
-    .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
-    .classed(INFO_TEXT_CLASS, true)
-    .text("Max: 0GB");
-var diskUsageLastText = svg.append("text")
-    .attr("x", INFO_TEXT_X)
-    .attr("y", diskUsagePlotBorderRectBBox.y + INFO_TEXT_LINE_HEIGHT * 3)
-    .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
-    .classed(INFO_TEXT_CLASS, true)
-    .text("Last: 0GB");
-
-var gpuMemoryUsageTitleList = [];
-var gpuMemoryUsageMinTextList = [];
-var gpuMemoryUsageMaxTextList = [];
-var gpuMemoryUsageLastTextList = [];
-for (var i = 0; i < GPU_NUM; i++) {
-
-    var gpuMemoryUsagePlotBorderRectBBox = gpuMemoryUsagePlotBorderRectList[i]
-        .node()
-        .getBBox();
-    var gpuColumnName = getGPUColumnName(i).toUpperCase();
-    gpuMemoryUsageTitleList.push(
-        svg.append("text")
-            .attr("x", INFO_TEXT_X)
-            .attr("y", gpuMemoryUsagePlotBorderRectBBox.y)
-            .text(gpuColumnName)
-            .attr("dominant-baseline", "hanging")
-            .classed(INFO_TEXT_CLASS, true)
-    );
-    var gpuMemoryUsageMinText = svg.append("text")
-        .attr("x", INFO_TEXT_X)
-        .attr("y", gpuMemoryUsagePlotBorderRectBBox.y + INFO_TEXT_LINE_HEIGHT)
-        .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
-        .classed(INFO_TEXT_CLASS, true)
-        .text("Min: 0MB");
-    gpuMemoryUsageMinTextList.push(gpuMemoryUsageMinText);
+/**
+ * Get the text of the growing allocation site.
+ *
+ * @param {Object} site: The row of the heap log.
+ *
+ * @return {String} The text. e.g., "+1.5MB (+1200 blocks, 3.0MB) pandas/core/frame.py:123"
+ */
+function getHeapSiteText(site) {
+    return "+" + formatSizeKb(parseFloat(site.size_diff_kb))
+        + " (+" + site.count_diff + " blocks, "
+        + formatSizeKb(parseFloat(site.size_kb)) + ") " + site.site;
+}
 
-    var gpuMemoryUsageMaxText = svg.append("text")
-        .attr("x", INFO_TEXT_X)
-        .attr("y", gpuMemoryUsagePlotBorderRectBBox.y + INFO_TEXT_LINE_HEIGHT * 2)
-        .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
-        .classed(INFO_TEXT_CLASS, true)
-        .text("Max: 0MB");
-    gpuMemoryUsageMaxTextList.push(gpuMemoryUsageMaxText);
+/**
+ * Read the CSV of the growing allocation sites and update the list
+ * under the panels.
+ */
+function update_heap_value() {
+    if (heapSiteList === null || !windowFocused) {
+        return;
+    }
+    d3.csv(HEAP_LOG_FILE_PATH, function(error, dataset) {
+        if (error || !dataset) {
+            // The log does not exist until the second snapshot.
+            return;
+        }
+        var titleText = HEAP_TITLE_TEXT;
+        if (dataset.length > 0) {
+            var snapshotDate = new Date(parseFloat(dataset[0].timestamp) * 1000);
+            titleText += " (snapshot at " + snapshotDate.toLocaleTimeString() + ")";
+        } else {
+            titleText += ": no site grew";
+        }
+        heapSiteList.titleText.text(titleText);
+        for (var i = 0; i < heapSiteList.siteTextList.length; i++) {
+            var siteText = "";
+            if (i < dataset.length) {
+                siteText = getHeapSiteText(dataset[i]);
+            }
+            heapSiteList.siteTextList[i].text(siteText);
+        }
+    });
+}
 
-    var gpuMemoryUsageLastText = svg.append("text")
-        .attr("x", INFO_TEXT_X)
-        .attr("y", gpuMemoryUsagePlotBorderRectBBox.y + INFO_TEXT_LINE_HEIGHT * 3)
-        .attr("dominant-baseline", INFO_TEXT_DOMINANT_BASELINE)
-        .classed(INFO_TEXT_CLASS, true)
-        .text("Last: 0MB");
-    gpuMemoryUsageLastTextList.push(gpuMemoryUsageLastText);
+/**
+ * Get the tooltip text of the band of the cell (or of the profiled
+ * block and its events, which have no execution count).
+ *
+ * @param {Object} cell: The converted row of the cell.
+ *
+ * @return {String} The text. e.g., "[3] df = load() (1.25s, peak RSS 512MB)"
+ */
+function getCellBandText(cell) {
+    var text = cell.source_line;
+    if (cell.execution_count !== "") {
+        text = "[" + cell.execution_count + "] " + text;
+    }
+    if (isNaN(cell.end_timestamp)) {
+        return text + " (running)";
+    }
+    var detailList = [];
+    if (!isNaN(cell.duration_seconds)) {
+        detailList.push(cell.duration_seconds.toFixed(2) + "s");
+    }
+    if (!isNaN(cell.peak_rss_mb)) {
+        detailList.push("peak RSS " + cell.peak_rss_mb + "MB");
+    }
+    if (!isNaN(cell.gpu_memory_delta_mb)) {
+        var sign = cell.gpu_memory_delta_mb > 0 ? "+" : "";
+        detailList.push("GPU " + sign + cell.gpu_memory_delta_mb + "MB");
+    }
+    if (detailList.length === 0) {
+        return text;
+    }
+    return text + " (" + detailList.join(", ") + ")";
 }
 
-const CLIP_PATH_MARGIN_WIDTH = 2000;
-svg.append("clipPath")
-    .attr("id", "{svg_id}-memory-usage-clip-path")
-    .append("rect")
-    .attr("x", -CLIP_PATH_MARGIN_WIDTH / 2)
-    .attr("y", memoryUsagePlotBorderRectBBox.y + 1)
-    .attr("width", memoryUsagePlotBorderRectBBox.width + CLIP_PATH_MARGIN_WIDTH)
-    .attr("height", memoryUsagePlotBorderRectBBox.height - 2);
-memoryUsageAxisGroup
-    .style("clip-path", "url(#{svg_id}-memory-usage-clip-path)");
-
-svg.append("clipPath")
-    .attr("id", "{svg_id}-disk-usage-clip-path")
-    .append("rect")
-    .attr("x", -CLIP_PATH_MARGIN_WIDTH / 2)
-    .attr("y", diskUsagePlotBorderRectBBox.y + 1)
-    .attr("width", diskUsagePlotBorderRectBBox.width + CLIP_PATH_MARGIN_WIDTH)
-    .attr("height", memoryUsagePlotBorderRectBBox.height - 2);
-diskUsageAxisGroup
-    .style("clip-path", "url(#{svg_id}-disk-usage-clip-path)");
-
-for (var i = 0; i < GPU_NUM; i++) {
-    gpuMemoryUsagePlotBorderRectBBox = gpuMemoryUsagePlotBorderRectList[i]
-        .node()
-        .getBBox();
-    svg.append("clipPath")
-        .attr("id", "{svg_id}-gpu-memory-usage-clip-path-" + i)
+/**
+ * Update the bands of the cells executed in the time window of the
+ * panel. The running cell is extended to the last sample.
+ *
+ * @param {Object} panel: The object of the panel.
+ * @param {float} lastTimestamp: Timestamp of the last sample.
+ */
+function updateCellBands(panel, lastTimestamp) {
+    var domain = xScale.domain();
+    var cellList = cellDataset.filter(function(cell) {
+        var endTimestamp = isNaN(cell.end_timestamp) ? lastTimestamp : cell.end_timestamp;
+        return endTimestamp >= domain[0] && cell.start_timestamp <= domain[1];
+    });
+    var getX = function(cell) {
+        return xScale(Math.max(cell.start_timestamp, domain[0]));
+    };
+    var getWidth = function(cell) {
+        var endTimestamp = isNaN(cell.end_timestamp) ? lastTimestamp : cell.end_timestamp;
+        return Math.max(xScale(Math.min(endTimestamp, domain[1])) - getX(cell), 1);
+    };
+    var borderRectBBox = panel.borderRect.node().getBBox();
+    var bands = panel.cellBandGroup
+        .selectAll("." + CELL_BAND_CLASS)
+        .data(cellList, function(cell) {
+            return cell.execution_count + "-" + cell.start_timestamp + "-" + cell.source_line;
+        });
+    bands.exit().remove();
+    var enteredBands = bands.enter()
         .append("rect")
-        .attr("x", -CLIP_PATH_MARGIN_WIDTH / 2)
-        .attr("y", gpuMemoryUsagePlotBorderRectBBox.y + 1)
-        .attr("width", gpuMemoryUsagePlotBorderRectBBox.width + CLIP_PATH_MARGIN_WIDTH)
-        .attr("height", gpuMemoryUsagePlotBorderRectBBox.height - 2);
-    gpuMemoryUsageAxisGroupList[i].style(
-        "clip-path", "url(#{svg_id}-gpu-memory-usage-clip-path-" + i + ")");
+        .classed(CELL_BAND_CLASS, true)
+        .attr("y", borderRectBBox.y + 1)
+        .attr("height", borderRectBBox.height - 2);
+    enteredBands.append("title");
+    enteredBands.merge(bands)
+        .attr("x", getX)
+        .attr("width", getWidth)
+        .select("title")
+        .text(getCellBandText);
+}
+
+/**
+ * Make the line generator of the target column.
+ *
+ * @param {Object} panel: The object of the panel.
+ * @param {String} columnName: Name of the target column.
+ *
+ * @return {Object} The line generator.
+ */
+function makeLine(panel, columnName) {
+    return d3.line()
+        .x(function(d) {
+            return xScale(d[COLUMN_NAME_TIMESTAMP]);
+        })
+        .y(function(d) {
+            return panel.yScale(d[columnName]);
+        });
+}
+
+/**
+ * Make the area generator of the min / max band of the target column.
+ *
+ * @param {Object} panel: The object of the panel.
+ * @param {String} columnName: Name of the target column.
+ *
+ * @return {Object} The area generator.
+ */
+function makeBand(panel, columnName) {
+    return d3.area()
+        .x(function(d) {
+            return xScale(d[COLUMN_NAME_TIMESTAMP]);
+        })
+        .y0(function(d) {
+            return panel.yScale(getRollupValue(d, columnName, MIN_COLUMN_SUFFIX));
+        })
+        .y1(function(d) {
+            return panel.yScale(getRollupValue(d, columnName, MAX_COLUMN_SUFFIX));
+        });
 }
 
 var isInitialUpdate = true;
 
 /**
- * Read the CSV and update the value of the plot.
+ * Get whether the pushed samples are used for the selected window.
+ * The pushed samples are raw, so the rollup tiers are always read
+ * from their CSV logs.
+ *
+ * @return {boolean} True if the pushed samples are used.
+ */
+function isPushedDatasetUsed() {
+    return pushComm !== null
+        && getSelectedWindowOption().tier_name === TIER_NAME_RAW;
+}
+
+/**
+ * Read the CSV of the selected window and update the value of
+ * the plot.
  */
 function update_plot_value() {
-    if (!windowFocused) {
+    if (!windowFocused || isPushedDatasetUsed()) {
         return;
     }
 
-    d3.csv(LOG_FILE_PATH, rowConverter, function(error, dataset) {
+    var windowOption = getSelectedWindowOption();
+    d3.csv(windowOption.csv_log_file_path, rowConverter, function(error, dataset) {
+        if (windowOption !== getSelectedWindowOption()) {
+            return;
+        }
+        // The next tick of the interval reads the log again (e.g., the
+        // collector has not written its first rows yet).
         if (error) {
             console.log(error);
-            setTimeout(update_plot_value, 100);
             return;
         }
         if (!dataset || dataset.length === 0) {
-            setTimeout(update_plot_value, 100);
             return;
         }
-        if ($("#{svg_id}").length === 0) {
-            if (timer) {
-                clearInterval(timer);
-                timer = null;
-                return
-            }
-        }
-        var memoryUsageMax = d3.max(dataset, function(d) {
-            return d.memoryUsage;
-        });
-        memoryUsageYScale.domain([0, memoryUsageMax]);
-        memoryUsageAxis.scale(memoryUsageYScale);
-        if (isInitialUpdate) {
-            memoryUsageAxisGroup.call(memoryUsageAxis);
-        }else {
-            memoryUsageAxisGroup
-                .transition()
-                .duration(ANIMATION_DURATION)
-                .call(memoryUsageAxis);
-        }
-        var bBoxWidth = getBBoxWidth(memoryUsageAxisGroup);
-        var memoryUsageAxisTransform = "translate(" + (bBoxWidth + BASIC_MARGIN * 2 + 1) + ", 0)";
-        if (isInitialUpdate) {
-            memoryUsageAxisGroup
-                .attr("transform", memoryUsageAxisTransform);
-        }else {
-            setTimeout(function() {
-                bBoxWidth = getBBoxWidth(memoryUsageAxisGroup);
-                var memoryUsageAxisTransform = "translate(" + (bBoxWidth + BASIC_MARGIN * 2 + 1) + ", 0)";
-                memoryUsageAxisGroup
-                    .transition()
-                    .duration(ANIMATION_DURATION)
-                    .attr("transform", memoryUsageAxisTransform);
-            }, ANIMATION_DURATION + 10);
-        }
+        renderDataset(dataset);
+    });
+}
 
-        var diskUsageMax = d3.max(dataset, function(d) {
-            return d.diskUsage;
-        });
-        diskUsageYScale.domain([0, diskUsageMax]);
-        diskUsageAxis.scale(diskUsageYScale);
-        if (isInitialUpdate) {
-            diskUsageAxisGroup.call(diskUsageAxis);
-        }else {
-            diskUsageAxisGroup
-                .transition()
-                .duration(ANIMATION_DURATION)
-                .call(diskUsageAxis);
+/**
+ * Update the axis of the panel, and move the axis according to its
+ * width.
+ *
+ * @param {Object} panel: The object of the panel.
+ */
+function updatePanelAxis(panel) {
+    panel.axis.scale(panel.yScale);
+    if (isInitialUpdate) {
+        panel.axisGroup.call(panel.axis);
+        var bBoxWidth = getBBoxWidth(panel.axisGroup);
+        panel.axisGroup
+            .attr("transform", "translate(" + (bBoxWidth + BASIC_MARGIN * 2 + 1) + ", 0)");
+        return;
+    }
+    panel.axisGroup
+        .transition()
+        .duration(ANIMATION_DURATION)
+        .call(panel.axis);
+    setTimeout(function() {
+        var bBoxWidth = getBBoxWidth(panel.axisGroup);
+        panel.axisGroup
+            .transition()
+            .duration(ANIMATION_DURATION)
+            .attr("transform", "translate(" + (bBoxWidth + BASIC_MARGIN * 2 + 1) + ", 0)");
+    }, ANIMATION_DURATION + 10);
+}
+
+/**
+ * Update the text of the quantile estimates of the column with the
+ * last sampled row.
+ *
+ * @param {Object} panel: The object of the panel.
+ * @param {int} columnIndex: Index of the column in the panel.
+ * @param {Object} lastRow: The last converted row of the column.
+ */
+function updateQuantileText(panel, columnIndex, lastRow) {
+    if (panel.quantileTextList.length === 0) {
+        return;
+    }
+    var columnName = panel.setting.column_list[columnIndex];
+    var valueList = panel.setting.quantile_list.map(function(quantile) {
+        return lastRow[getQuantileColumnName(columnName, quantile)];
+    });
+    var isEstimated = valueList.every(function(value) {
+        return value !== undefined && !isNaN(value);
+    });
+    if (!isEstimated) {
+        return;
+    }
+    panel.quantileTextList[columnIndex].text(
+        getQuantileText(panel.setting, valueList));
+}
+
+/**
+ * Update the text of the trend of the column with the last sampled
+ * row.
+ *
+ * @param {Object} panel: The object of the panel.
+ * @param {int} columnIndex: Index of the column in the panel.
+ * @param {Object} lastRow: The last converted row of the column.
+ */
+function updateTrendText(panel, columnIndex, lastRow) {
+    if (panel.trendTextList.length === 0) {
+        return;
+    }
+    var columnName = panel.setting.column_list[columnIndex];
+    var growthRate = lastRow[columnName + GROWTH_RATE_COLUMN_SUFFIX];
+    var trendText = panel.trendTextList[columnIndex];
+    if (growthRate === undefined || isNaN(growthRate)) {
+        trendText.text(TREND_TEXT_EMPTY);
+        return;
+    }
+    trendText.text(getTrendText(
+        panel.setting, growthRate,
+        lastRow[columnName + MINUTES_TO_LIMIT_COLUMN_SUFFIX]));
+}
+
+/**
+ * Highlight the panel if the projected minutes to the limit of a
+ * column are under the alert threshold of the panel.
+ *
+ * @param {Object} panel: The object of the panel.
+ * @param {Array} columnDatasetList: Array of the sampled rows of
+ * each column of the panel.
+ */
+function updatePanelAlert(panel, columnDatasetList) {
+    var alertMinutes = panel.setting.alert_minutes_to_limit;
+    if (panel.setting.trend_window_seconds === null || alertMinutes === null) {
+        return;
+    }
+    var isAlerted = false;
+    for (var i = 0; i < columnDatasetList.length; i++) {
+        var columnDataset = columnDatasetList[i];
+        if (columnDataset.length === 0) {
+            continue;
         }
-        bBoxWidth = getBBoxWidth(diskUsageAxisGroup);
-        var diskUsageAxisTransform = "translate(" + (bBoxWidth + BASIC_MARGIN * 2 + 1) + ", 0)";
-        if (isInitialUpdate) {
-            diskUsageAxisGroup
-                .attr("transform", diskUsageAxisTransform);
-        }else {
-            setTimeout(function() {
-                bBoxWidth = getBBoxWidth(diskUsageAxisGroup);
-                var diskUsageAxisTransform = "translate(" + (bBoxWidth + BASIC_MARGIN * 2 + 1) + ", 0)";
-                diskUsageAxisGroup
-                    .transition()
-                    .duration(ANIMATION_DURATION)
-                    .attr("transform", diskUsageAxisTransform);
-            }, ANIMATION_DURATION + 10);
+        var minutesToLimit = columnDataset[columnDataset.length - 1][
+            panel.setting.column_list[i] + MINUTES_TO_LIMIT_COLUMN_SUFFIX];
+        if (minutesToLimit < alertMinutes) {
+            isAlerted = true;
         }
+    }
+    panel.borderRect.classed(ALERT_CLASS, isAlerted);
+    for (var i = 0; i < panel.trendTextList.length; i++) {
+        panel.trendTextList[i].classed(ALERT_CLASS, isAlerted);
+    }
+}
 
-        for (var i = 0; i < GPU_NUM; i++) {
-            var gpuMemoryUsageMax = d3.max(dataset, function(d) {
-                return d["gpuMemoryUsage" + i];
-            });
-            gpuMemoryUsageYScaleList[i].domain(
-                [0, gpuMemoryUsageMax]);
-            gpuMemoryUsageAxisList[i].scale(
-                gpuMemoryUsageYScaleList[i])
-            if (isInitialUpdate) {
-                gpuMemoryUsageAxisGroupList[i].call(
-                    gpuMemoryUsageAxisList[i]);
-            }else {
-                gpuMemoryUsageAxisGroupList[i]
-                    .transition()
-                    .duration(ANIMATION_DURATION)
-                    .call(gpuMemoryUsageAxisList[i]);
-            }
-            if (isInitialUpdate) {
-                bBoxWidth = getBBoxWidth(gpuMemoryUsageAxisGroupList[i]);
-                gpuMemoryUsageAxisGroupList[i]
-                    .attr("transform", "translate(" + (bBoxWidth + BASIC_MARGIN * 2 + 1) + ", 0)");
-            }else {
-                setTimeout(function() {
-                    for (var i = 0; i < GPU_NUM; i++) {
-                        bBoxWidth = getBBoxWidth(gpuMemoryUsageAxisGroupList[i]);
-                        gpuMemoryUsageAxisGroupList[i]
-                            .transition()
-                            .duration(ANIMATION_DURATION)
-                            .attr("transform", "translate(" + (bBoxWidth + BASIC_MARGIN * 2 + 1) + ", 0)");
-                    }
-                }, ANIMATION_DURATION + 10);
-            }
+/**
+ * Update the lines and the information texts of the panel.
+ *
+ * @param {Object} panel: The object of the panel.
+ * @param {Array} columnDatasetList: Array of the sampled rows of
+ * each column of the panel.
+ */
+function updatePanelValue(panel, columnDatasetList) {
+    var columnList = panel.setting.column_list;
+    var minValueList = [];
+    var maxValueList = [];
+    var lastValueList = [];
+    var isRollup = getSelectedWindowOption().tier_name !== TIER_NAME_RAW;
+    for (var i = 0; i < columnList.length; i++) {
+        var columnName = columnList[i];
+        var columnDataset = columnDatasetList[i];
+        panel.linePathList[i]
+            .datum(columnDataset)
+            .transition()
+            .attr("d", makeLine(panel, columnName));
+        panel.bandPathList[i]
+            .datum(isRollup ? columnDataset : [])
+            .transition()
+            .attr("d", makeBand(panel, columnName));
+        if (columnDataset.length === 0) {
+            continue;
         }
+        minValueList.push(d3.min(columnDataset, function(d) {
+            return getRollupValue(d, columnName, MIN_COLUMN_SUFFIX);
+        }));
+        maxValueList.push(d3.max(columnDataset, function(d) {
+            return getRollupValue(d, columnName, MAX_COLUMN_SUFFIX);
+        }));
+        var lastRow = columnDataset[columnDataset.length - 1];
+        lastValueList.push(lastRow[columnName]);
+        updateQuantileText(panel, i, lastRow);
+        updateTrendText(panel, i, lastRow);
+    }
+    updatePanelAlert(panel, columnDatasetList);
+    if (lastValueList.length === 0) {
+        return;
+    }
+    panel.minText.text("Min: " + formatValue(d3.min(minValueList), panel.setting));
+    panel.maxText.text("Max: " + formatValue(d3.max(maxValueList), panel.setting));
+    var lastTextList = lastValueList.map(function(value) {
+        return formatValue(value, panel.setting);
+    });
+    if (lastTextList.length > panel.setting.label_list.length
+            && lastTextList.length > 1) {
+        panel.lastText.text(
+            "Last max: " + formatValue(d3.max(lastValueList), panel.setting));
+        return;
+    }
+    panel.lastText.text("Last: " + lastTextList.join(" / "));
+}
 
-        setTimeout(function() {
-            if (!dataset || dataset.length === 0) {
-                return;
-            }
-            var axisBBoxWidthList = [
-                getBBoxWidth(memoryUsageAxisGroup),
-                getBBoxWidth(diskUsageAxisGroup)
-            ];
-            for (var i = 0; i < GPU_NUM; i++) {
-                axisBBoxWidthList.push(
-                    getBBoxWidth(gpuMemoryUsageAxisGroupList[i])
-                );
-            }
+/**
+ * Update the value of the plot with the rows of the selected window
+ * of the dataset.
+ *
+ * @param {Array} dataset: Array of the rows converted by the
+ * rowConverter function.
+ */
+function renderDataset(dataset) {
+    if (!dataset || dataset.length === 0) {
+        return;
+    }
+    var windowSeconds = getSelectedWindowOption().window_seconds;
+    var lastTimestamp = dataset[dataset.length - 1][COLUMN_NAME_TIMESTAMP];
+    dataset = dataset.filter(function(d) {
+        return d[COLUMN_NAME_TIMESTAMP] >= lastTimestamp - windowSeconds;
+    });
+    var panelColumnDatasetList = [];
+    for (var i = 0; i < panelList.length; i++) {
+        var panel = panelList[i];
+        var columnDatasetList = panel.setting.column_list.map(function(columnName) {
+            return filterSampledRows(dataset, columnName);
+        });
+        panelColumnDatasetList.push(columnDatasetList);
+        var valueMax = d3.max(columnDatasetList, function(columnDataset, j) {
+            var columnName = panel.setting.column_list[j];
+            return d3.max(columnDataset, function(d) {
+                return getRollupValue(d, columnName, MAX_COLUMN_SUFFIX);
+            });
+        });
+        panel.yScale.domain([0, valueMax]);
+        updatePanelAxis(panel);
+    }
 
-            var datasetLen = dataset.length;
-            xScale.domain([0, datasetLen - 1])
-                .range([
-                    d3.max(axisBBoxWidthList) + PLOT_X + BASIC_MARGIN * 2,
-                    PLOT_UNIT_WIDTH - 1 - BASIC_MARGIN * 2]);
-
-            memoryUsageLinePath
-                .datum(dataset)
-                .transition()
-                .attr("d", memoryUsageLine);
-            diskUsageLinePath
-                .datum(dataset)
-                .transition()
-                .attr("d", diskUsageLine);
-            for (var i = 0; i < GPU_NUM; i++) {
-                var gpuMemoryUsageLine = d3.line()
-                    .x(function(d, i) {
-                        return xScale(i);
-                    })
-                    .y(function(d) {
-                        var gpuValue = d["gpuMemoryUsage" + i];
-                        return gpuMemoryUsageYScaleList[i](gpuValue);
-                    });
-                gpuMemoryUsageLinePathList[i]
-                    .datum(dataset)
-                    .transition()
-                    .attr("d", gpuMemoryUsageLine);
-            }
+    setTimeout(function() {
+        var axisBBoxWidthList = panelList.map(function(panel) {
+            return getBBoxWidth(panel.axisGroup);
+        });
+        xScale.domain([lastTimestamp - windowSeconds, lastTimestamp])
+            .range([
+                d3.max(axisBBoxWidthList) + PLOT_X + BASIC_MARGIN * 2,
+                PLOT_UNIT_WIDTH - 1 - BASIC_MARGIN * 2]);
+        for (var i = 0; i < panelList.length; i++) {
+            updateCellBands(panelList[i], lastTimestamp);
+            updatePanelValue(panelList[i], panelColumnDatasetList[i]);
+        }
+    }, ANIMATION_DURATION + 10);
 
-            var memoryUsageMin = parseInt(d3.min(dataset, function(d) {
-                return d.memoryUsage;
-            }));
-            memoryUsageMinText.text("Min: " + memoryUsageMin + "MB");
-            memoryUsageMaxText.text("Max: " + parseInt(memoryUsageMax) + "MB");
-            var memoryUsageLast = parseInt(
-                dataset[dataset.length - 1].memoryUsage);
-            memoryUsageLastText.text("Last: " + memoryUsageLast + "MB");
-
-            var diskUsageMin = parseFloat(d3.min(dataset, function(d) {
-                return d.diskUsage;
-            })).toFixed(2);
-            diskUsageMinText.text("Min: " + diskUsageMin + "GB");
-            diskUsageMaxText.text(
-                "Max: " + parseFloat(diskUsageMax).toFixed(2) + "GB");
-            var diskUsageLast = parseFloat(
-                dataset[dataset.length - 1].diskUsage).toFixed(2);
-            diskUsageLastText.text("Last: " + diskUsageLast + "GB");
-
-            for (var i = 0; i < GPU_NUM; i++) {
-                var gpuMemoryUsageMin = parseInt(d3.min(dataset, function(d) {
-                    return d["gpuMemoryUsage" + i];
-                }));
-                gpuMemoryUsageMinTextList[i].text(
-                    "Min: " + gpuMemoryUsageMin + "MB");
-                gpuMemoryUsageMax = parseInt(d3.max(dataset, function(d) {
-                    return d["gpuMemoryUsage" + i];
-                }));
-                gpuMemoryUsageMaxTextList[i].text(
-                    "Max: " + gpuMemoryUsageMax + "MB");
-                var gpuMemoryUsageLast = parseInt(
-                    dataset[dataset.length - 1]["gpuMemoryUsage" + i]);
-                gpuMemoryUsageLastTextList[i].text(
-                    "Last: " + gpuMemoryUsageLast + "MB");
-            }
+    isInitialUpdate = false;
+}
 
-        }, ANIMATION_DURATION + 10);
+var pushedDataset = [];
 
-        isInitialUpdate = false;
+/**
+ * Open the Jupyter comm to receive the pushed samples from the kernel.
+ *
+ * @return {Object} The opened comm. If the comm can not be used,
+ * null will be returned.
+ */
+function openPushComm() {
+    if (PUSH_COMM_TARGET_NAME === "") {
+        return null;
+    }
+    if (typeof Jupyter === "undefined" || !Jupyter.notebook
+            || !Jupyter.notebook.kernel) {
+        return null;
+    }
+    var comm;
+    try {
+        comm = Jupyter.notebook.kernel.comm_manager.new_comm(
+            PUSH_COMM_TARGET_NAME, {});
+    }catch (error) {
+        console.log(error);
+        return null;
+    }
+    var onVisibilityChange = function() {
+        comm.send({visible: !document.hidden});
+    };
+    comm.on_msg(function(msg) {
+        if ($("#{svg_id}").length === 0) {
+            document.removeEventListener(
+                "visibilitychange", onVisibilityChange);
+            comm.close();
+            return;
+        }
+        var data = msg.content.data;
+        if (data.reset) {
+            pushedDataset = [];
+        }
+        for (var i = 0; i < data.rows.length; i++) {
+            pushedDataset.push(rowConverter(data.rows[i]));
+        }
+        if (pushedDataset.length > 0) {
+            var oldestTimestamp = pushedDataset[pushedDataset.length - 1][COLUMN_NAME_TIMESTAMP] - RAW_RETENTION_SECONDS;
+            pushedDataset = pushedDataset.filter(function(d) {
+                return d[COLUMN_NAME_TIMESTAMP] >= oldestTimestamp;
+            });
+        }
+        if (document.hidden || !isPushedDatasetUsed()) {
+            return;
+        }
+        renderDataset(pushedDataset);
     });
+    document.addEventListener("visibilitychange", onVisibilityChange);
+    return comm;
 }
 
+var timer = null;
+var pushComm = openPushComm();
+update_cell_value();
+update_heap_value();
 update_plot_value();
-var timer = setInterval(
-    update_plot_value,
-    INTERVAL_SECONDS * 1000);
+if (!IS_STATIC) {
+    timer = setInterval(
+        function() {
+            // The output has been cleared. This is checked here since
+            // the log is not read while the pushed samples are used.
+            if ($("#{svg_id}").length === 0) {
+                clearInterval(timer);
+                timer = null;
+                return;
+            }
+            update_cell_value();
+            update_heap_value();
+            update_plot_value();
+        },
+        INTERVAL_SECONDS * 1000);
+}
@@ -0,0 +1,163 @@
+"""
+Module of the helpers shared by the tests of the stats package.
+"""
+
+import os
+import subprocess as sp
+import sys
+import time
+from urllib.request import urlopen
+
+from plot_playground.stats import agent
+from plot_playground.stats import collectors
+from plot_playground.stats import openmetrics
+from plot_playground.stats import shared_daemon
+
+AGENT_TIMEOUT_SECONDS = 30
+DAEMON_EXIT_TIMEOUT_SECONDS = 10
+SCRAPE_TIMEOUT_SECONDS = 10
+
+
+def make_collector_list():
+    """
+    Make the list of collectors for testing (memory and disk usage).
+
+    Returns
+    -------
+    collector_list : list of MetricCollector
+        A list of collectors.
+    """
+    collector_list = collectors.make_collector_list(
+        metrics=['memory', 'disk'])
+    return collector_list
+
+
+def write_proc_file(proc_root, relative_path, file_str):
+    """
+    Write the file of a fake proc file system.
+
+    Parameters
+    ----------
+    proc_root : str
+        Root directory of the fake proc file system.
+    relative_path : str
+        Path of the file under the proc_root.
+    file_str : str
+        Content of the file.
+    """
+    file_path = os.path.join(proc_root, relative_path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as f:
+        f.write(file_str)
+
+
+def start_agent(
+        shared_dir_path, host_name, interval_seconds=0.2, metrics_port=None):
+    """
+    Start the agent of the host as a subprocess (memory and disk
+    usage).
+
+    Parameters
+    ----------
+    shared_dir_path : str
+        Shared directory of the agents.
+    host_name : str
+        Name of the host.
+    interval_seconds : int or float, default 0.2
+        Interval in seconds at which the log file is saved.
+    metrics_port : int or None, default None
+        Port of the OpenMetrics endpoint. If None, the endpoint is not
+        served.
+
+    Returns
+    -------
+    process : subprocess.Popen
+        The process of the agent.
+    """
+    args = [
+        sys.executable, '-m', 'plot_playground.stats.agent',
+        '--shared_dir_path', shared_dir_path, '--host_name', host_name,
+        '--metrics', 'memory', 'disk',
+        '--interval_seconds', str(interval_seconds)]
+    if metrics_port is not None:
+        args.extend(['--metrics_port', str(metrics_port)])
+    process = sp.Popen(args)
+    return process
+
+
+def wait_for_agent_meta(host_dir_path, timeout=AGENT_TIMEOUT_SECONDS):
+    """
+    Wait until the agent has saved the meta file.
+
+    Parameters
+    ----------
+    host_dir_path : str
+        The directory of the host.
+    timeout : int or float, default AGENT_TIMEOUT_SECONDS
+        Seconds to wait.
+
+    Returns
+    -------
+    is_saved : bool
+        True if the meta file has been saved.
+    """
+    agent_meta_file_path = agent.get_agent_meta_file_path(
+        host_dir_path=host_dir_path)
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        if os.path.exists(agent_meta_file_path):
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def wait_for_daemon_exit(
+        daemon_dir_path, timeout=DAEMON_EXIT_TIMEOUT_SECONDS):
+    """
+    Wait until the shared daemon has released the lock.
+
+    Parameters
+    ----------
+    daemon_dir_path : str
+        Directory of the daemon.
+    timeout : int or float, default DAEMON_EXIT_TIMEOUT_SECONDS
+        Seconds to wait.
+
+    Returns
+    -------
+    is_exited : bool
+        True if the daemon has exited.
+    """
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        if not shared_daemon.is_daemon_running(
+                daemon_dir_path=daemon_dir_path):
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def scrape(port, path=openmetrics.METRICS_PATH):
+    """
+    Scrape the OpenMetrics endpoint over the local host.
+
+    Parameters
+    ----------
+    port : int
+        Port of the endpoint.
+    path : str, default METRICS_PATH
+        Path of the request.
+
+    Returns
+    -------
+    content_type : str
+        The Content-Type header of the response.
+    body_str : str
+        The body of the response.
+    """
+    with urlopen(
+            'http://%s:%d%s' % (openmetrics.DEFAULT_HOST, port, path),
+            timeout=SCRAPE_TIMEOUT_SECONDS) as response:
+        return (
+            response.headers['Content-Type'],
+            response.read().decode('utf-8'))
@@ -4,365 +4,850 @@ Test Command
 $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot
 """
 
+import json
 import os
-from collections import deque
 import multiprocessing as mp
+import signal
 import time
 import shutil
+import subprocess as sp
 import sys
+import tracemalloc
 
 from nose.tools import assert_equal, assert_true, assert_false, \
-    assert_greater, assert_not_equal
+    assert_greater, assert_less, assert_raises
+import numpy as np
 import pandas as pd
+import psutil
+from IPython.core import events
 from IPython.display import display, HTML
 
 from plot_playground.stats import linux_stats_plot
+from plot_playground.stats import aggregator
+from plot_playground.stats import cell_markers
+from plot_playground.stats import collector
+from plot_playground.stats import collectors
+from plot_playground.stats import history
+from plot_playground.stats import recording
+from plot_playground.stats import shared_daemon
+from plot_playground.stats import thread_sampler
 from plot_playground.common import jupyter_helper
 from plot_playground.common import selenium_helper
 from plot_playground.common import img_helper
 from plot_playground.common import d3_helper
 from plot_playground.common import settings
+from plot_playground.tests import stats_helper
 
 TMP_TEST_LOG_DIR = './log_plotplayground_stats/test/'
 
 
-def test__get_log_file_path():
+class _FakeShell():
+
+    def __init__(self):
+        """
+        Class of the IPython shell for testing, having the execution
+        count and the event manager of IPython.
+        """
+        self.execution_count = 5
+        self.events = events.EventManager(
+            shell=self, available_events=events.available_events)
+
+
+def test__get_panel_list():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_log_file_path --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_panel_list --skip_jupyter 1
     """
-    log_file_path = linux_stats_plot._get_log_file_path(
-        log_dir_path='./log/')
-    assert_true(log_file_path.startswith('./log/'))
-    assert_true(log_file_path.endswith('.csv'))
+    panel_list = linux_stats_plot._get_panel_list(
+        collector_list=stats_helper.make_collector_list())
+    assert_equal(len(panel_list), 2)
+    assert_equal(
+        panel_list[0]['column_list'], [collectors.COLUMN_NAME_MEMORY_USAGE])
+    assert_equal(
+        panel_list[1]['column_list'], [collectors.COLUMN_NAME_DISK_USAGE])
 
 
-def test__exec_gpustat_command():
+def test__get_svg_height():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__exec_gpustat_command --skip_jupyter 1
-
-    Notes
-    -----
-    Since this function depends on the OS and GPU, most of the functions
-    are tested manually in each environment.
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_svg_height --skip_jupyter 1
     """
-    pre_bool = linux_stats_plot.is_gpu_stats_disabled
-    linux_stats_plot.is_gpu_stats_disabled = True
-    command_result = linux_stats_plot._exec_gpustat_command()
-    assert_equal(command_result, '')
+    panel_list = [
+        collectors.make_panel(title='a', column_list=['a'], unit=''),
+        collectors.make_panel(title='b', column_list=['b'], unit=''),
+        collectors.make_panel(title='c', column_list=['c'], unit=''),
+    ]
+    svg_height = linux_stats_plot._get_svg_height(panel_list=panel_list)
+    assert_equal(svg_height, 680)
+
+    panel_list.append(collectors.make_panel(
+        title='d', column_list=['d'], unit='',
+        height=collectors.SMALL_PANEL_HEIGHT))
+    svg_height = linux_stats_plot._get_svg_height(panel_list=panel_list)
+    assert_equal(svg_height, 680 + collectors.SMALL_PANEL_HEIGHT + 20)
 
-    linux_stats_plot.is_gpu_stats_disabled = pre_bool
+    svg_height = linux_stats_plot._get_svg_height(
+        panel_list=panel_list, heap_site_num=4)
+    assert_equal(
+        svg_height, 680 + collectors.SMALL_PANEL_HEIGHT + 20 + 21 * 5 + 20)
 
 
-def test__get_gpu_num():
+def test__get_window_label():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_gpu_num --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_window_label --skip_jupyter 1
     """
-    pre_func = linux_stats_plot._exec_gpustat_command
-
-    def test_func_1():
-        return ''
-
-    linux_stats_plot._exec_gpustat_command = test_func_1
-    gpu_num = linux_stats_plot._get_gpu_num()
-    assert_equal(gpu_num, 0)
-
-    def test_func_2():
-        return 'Error on querying NVIDIA devices. Use --debug flag for details'
-
-    linux_stats_plot._exec_gpustat_command = test_func_2
-    gpu_num = linux_stats_plot._get_gpu_num()
-    assert_equal(gpu_num, 0)
-
-    def test_func_3():
-        return "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n"
+    assert_equal(linux_stats_plot._get_window_label(window_seconds=30), '30s')
+    assert_equal(linux_stats_plot._get_window_label(window_seconds=90), '90s')
+    assert_equal(
+        linux_stats_plot._get_window_label(window_seconds=600), '10min')
+    assert_equal(
+        linux_stats_plot._get_window_label(window_seconds=10800), '3h')
+    assert_equal(
+        linux_stats_plot._get_window_label(window_seconds=86400), '1d')
 
-    linux_stats_plot._exec_gpustat_command = test_func_3
-    gpu_num = linux_stats_plot._get_gpu_num()
-    assert_equal(gpu_num, 1)
 
-    def test_func_4():
-        return "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n[1] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n"
+def test__get_window_option_list():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_window_option_list --skip_jupyter 1
+    """
+    window_option_list = linux_stats_plot._get_window_option_list(
+        window_seconds=120,
+        tier_setting_list=history.DEFAULT_TIER_SETTING_LIST,
+        log_dir_path='./log/')
+    assert_equal(
+        len(window_option_list),
+        len(linux_stats_plot.WINDOW_SECONDS_LIST) + 1)
+    assert_equal(window_option_list[0]['window_seconds'], 120)
+    assert_equal(window_option_list[0]['label'], '2min')
+    tier_name_list = [
+        window_option['tier_name'] for window_option in window_option_list]
+    assert_equal(
+        tier_name_list, ['raw', 'raw', 'raw', '10s', '10s', '1min', '1min'])
+    assert_equal(
+        window_option_list[-1]['csv_log_file_path'],
+        collector.get_log_file_path(
+            log_dir_path='./log/', tier_name='1min'))
+
+    # Only the windows kept by the sampler thread are selectable.
+    window_option_list = linux_stats_plot._get_window_option_list(
+        window_seconds=120,
+        tier_setting_list=thread_sampler.get_tier_setting_list(
+            window_seconds=120),
+        log_dir_path='./log/')
+    assert_equal(
+        [window_option['window_seconds']
+         for window_option in window_option_list], [120])
 
-    linux_stats_plot._exec_gpustat_command = test_func_4
-    gpu_num = linux_stats_plot._get_gpu_num()
-    assert_equal(gpu_num, 2)
 
-    linux_stats_plot._exec_gpustat_command = pre_func
+def _start_test_session(log_dir_path, metric_interval_seconds=None):
+    """
+    Start the collector process and make the session for testing
+    without displaying the plot.
 
+    Parameters
+    ----------
+    log_dir_path : str
+        Directory where the log is saved.
+    metric_interval_seconds : dict or None, default None
+        Sampling interval of each metric sent to the collector.
 
-def test__get_memory_usage():
+    Returns
+    -------
+    stats_session : plot_playground.stats.linux_stats_plot.StatsSession
+        The session of the started collector.
+    """
+    collector_list = stats_helper.make_collector_list()
+    metric_interval_seconds_dict = collector.\
+        get_metric_interval_seconds_dict(
+            collector_list=collector_list, metric_interval_seconds=None)
+    process, command_conn, status_conn, _ = \
+        linux_stats_plot._start_collector_process(
+            collector_kwargs={
+                'interval_seconds': 1,
+                'buffer_size': 10,
+                'log_dir_path': log_dir_path,
+                'parent_pid': os.getpid(),
+                'collector_list': collector_list,
+                'metric_interval_seconds': metric_interval_seconds,
+                'history_db_path': collector.get_history_db_path(
+                    log_dir_path=log_dir_path),
+            },
+            push_updates=False)
+    stats_session = linux_stats_plot.StatsSession(
+        process=process, command_conn=command_conn, forwarder=None,
+        collector_list=collector_list,
+        metric_interval_seconds_dict=metric_interval_seconds_dict,
+        log_dir_path=log_dir_path, window_seconds=10,
+        tier_setting_list=collector.get_tier_setting_list(
+            window_seconds=10),
+        status_conn=status_conn)
+    return stats_session
+
+
+def test_stats_session():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_memory_usage --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_stats_session --skip_jupyter 1
     """
-    memory_usage = linux_stats_plot._get_memory_usage()
-    assert_true(isinstance(memory_usage, int))
-    assert_greater(memory_usage, 0)
+    log_dir_path = TMP_TEST_LOG_DIR
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    stats_session = _start_test_session(log_dir_path=log_dir_path)
+    assert_true(stats_session.is_running())
+    assert_true(stats_session.wait_until_ready(timeout=30))
+    assert_true(os.path.exists(collector.get_log_file_path(
+        log_dir_path=log_dir_path)))
+    assert_equal(stats_session.get_error(), None)
+
+    assert_raises(ValueError, stats_session.set_interval, 'gpu', 1)
+    assert_raises(ValueError, stats_session.set_interval, 'memory', 0)
+    stats_session.set_interval(metric_name='disk', interval_seconds=0.5)
+    assert_equal(stats_session.metric_interval_seconds_dict['disk'], 0.5)
+
+    assert_raises(ValueError, stats_session.add_metric, 'memory')
+    is_added = stats_session.add_metric(metric='cpu', interval_seconds=0.5)
+    assert_true(is_added)
+    assert_equal(
+        [metric_collector.name for metric_collector
+         in stats_session.collector_list],
+        ['memory', 'disk', 'cpu'])
+
+    shell = _FakeShell()
+    assert_true(stats_session.track_cells(shell=shell))
+    shell.events.trigger('pre_run_cell', None)
+    shell.events.trigger('post_run_cell', None)
+    time.sleep(3)
+    cell_df = stats_session.get_cell_summary()
+    assert_equal(len(cell_df), 1)
+    assert_equal(cell_df['execution_count'].iloc[0], 5)
+    assert_greater(cell_df['peak_rss_mb'].iloc[0], 0)
+
+    stats_session.stop()
+    assert_equal(stats_session.cell_tracker, None)
+    # The callbacks have been unregistered.
+    shell.events.trigger('pre_run_cell', None)
+    assert_false(stats_session.is_running())
+    assert_equal(stats_session.process.returncode, 0)
+    stats_session.stop()
+    assert_raises(
+        Exception, stats_session.set_interval, 'memory', 1)
+
+    df = pd.read_csv(collector.get_log_file_path(
+        log_dir_path=log_dir_path))
+    assert_true(
+        collectors.COLUMN_NAME_CPU_UTILIZATION_FORMAT.format(cpu_idx=0)
+        in df.columns)
+    assert_greater(df[collectors.COLUMN_NAME_DISK_USAGE].notnull().sum(), 2)
+    history_df = linux_stats_plot.load_history(
+        metrics=['cpu'], log_dir_path=log_dir_path)
+    assert_greater(len(history_df), 0)
+    shutil.rmtree(log_dir_path, ignore_errors=True)
 
 
-def test__get_disk_usage():
+def test_stats_session_startup_error():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_disk_usage --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_stats_session_startup_error --skip_jupyter 1
     """
-    disk_usage_gb = linux_stats_plot._get_disk_usage()
-    assert_true(isinstance(disk_usage_gb, float))
-    assert_greater(disk_usage_gb, 0)
+    log_dir_path = TMP_TEST_LOG_DIR
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    stats_session = _start_test_session(
+        log_dir_path=log_dir_path,
+        metric_interval_seconds={'unknown': 1})
+    start_time = time.time()
+    is_ready = stats_session.wait_until_ready(timeout=30)
+    assert_false(is_ready)
+    assert_less(time.time() - start_time, 20)
+    assert_true('Unknown metric name' in stats_session.error_str)
+    assert_true('Unknown metric name' in stats_session.get_error())
+    stats_session.stop()
+    shutil.rmtree(log_dir_path, ignore_errors=True)
 
 
-def test__get_gpustat_line_str_by_gpu_idx():
+def test_thread_stats_session():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_gpustat_line_str_by_gpu_idx --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_thread_stats_session --skip_jupyter 1
     """
-    pre_func = linux_stats_plot._exec_gpustat_command
+    log_dir_path = TMP_TEST_LOG_DIR
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    collector_list = collectors.setup_collectors(
+        collector_list=collectors.make_collector_list(
+            metrics=linux_stats_plot.THREAD_METRIC_NAME_LIST))
+    stats_session = linux_stats_plot._start_thread_session(
+        collector_list=collector_list,
+        metric_interval_seconds_dict={'proc_stats': 0.1, 'overhead': 0.5},
+        window_seconds=10, log_dir_path=log_dir_path, svg_id='test',
+        comm_manager=None)
+    assert_true(isinstance(
+        stats_session, linux_stats_plot.ThreadStatsSession))
+    assert_true(stats_session.is_running())
+    assert_true(stats_session.wait_until_ready(timeout=10))
+    assert_equal(stats_session.get_error(), None)
+    assert_raises(ValueError, stats_session.add_metric, 'disk')
+    stats_session.set_interval(metric_name='proc_stats', interval_seconds=0.05)
+    time.sleep(1.5)
+
+    tick_stats_dict = stats_session.get_tick_stats()
+    assert_greater(tick_stats_dict['tick_num'], 10)
+    stats_session.stop()
+    assert_false(stats_session.is_running())
+    assert_raises(
+        Exception, stats_session.set_interval, 'proc_stats', 1)
+
+    df = pd.read_csv(collector.get_log_file_path(
+        log_dir_path=log_dir_path))
+    assert_greater(
+        df[collectors.COLUMN_NAME_KERNEL_RSS].notnull().sum(), 10)
+    assert_greater(
+        df[collectors.COLUMN_NAME_COLLECTOR_TICK_WALL_TIME].notnull().sum(),
+        0)
+    assert_false(os.path.exists(
+        collector.get_history_db_path(log_dir_path=log_dir_path)))
+    shutil.rmtree(log_dir_path, ignore_errors=True)
 
-    def test_func():
-        return "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n[1] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n"
 
-    linux_stats_plot._exec_gpustat_command = test_func
-    target_line_str = linux_stats_plot._get_gpustat_line_str_by_gpu_idx(
-        gpu_idx=1
-    )
+def test_shared_stats_session():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_shared_stats_session --skip_jupyter 1
+    """
+    daemon_dir_path = os.path.join(TMP_TEST_LOG_DIR, 'daemon')
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    assert_raises(
+        ValueError, linux_stats_plot._start_session, buffer_size=10,
+        log_dir_path=TMP_TEST_LOG_DIR, svg_id='test', comm_manager=None,
+        metric_interval_seconds=None, metrics=['memory', 'kernel_lag'],
+        persist_history=False, history_retention_seconds=60,
+        sampler=linux_stats_plot.SAMPLER_SHARED)
+
+    # The sessions of two kernels read the samples of one daemon.
+    stats_session_list = [
+        linux_stats_plot._start_shared_session(
+            metric_interval_seconds_dict={'memory': 0.1, 'disk': 5},
+            window_seconds=60,
+            log_dir_path=os.path.join(TMP_TEST_LOG_DIR, 'kernel_%d' % i),
+            svg_id='test', comm_manager=None,
+            daemon_dir_path=daemon_dir_path)
+        for i in range(2)]
+    daemon_meta_dict = shared_daemon.load_daemon_meta(
+        daemon_dir_path=daemon_dir_path)
+    try:
+        assert_equal(
+            len(shared_daemon.get_subscriber_pid_list(
+                daemon_dir_path=daemon_dir_path)), 2)
+        for stats_session in stats_session_list:
+            assert_true(isinstance(
+                stats_session, linux_stats_plot.SharedStatsSession))
+            assert_true(stats_session.wait_until_ready(timeout=10))
+            assert_true(stats_session.is_running())
+            assert_equal(
+                [collector_.name
+                 for collector_ in stats_session.collector_list],
+                ['memory', 'disk'])
+        assert_raises(
+            Exception, stats_session_list[0].add_metric, 'cpu')
+        assert_raises(
+            ValueError, stats_session_list[0].set_interval, 'memory', 1)
+        stats_session_list[0]._send_cell_marker(marker_dict={
+            'marker': cell_markers.CELL_MARKER_START,
+            'execution_count': 1, 'source_line': 'train()',
+            'timestamp': time.time()})
+        time.sleep(1.5)
+        for stats_session in stats_session_list:
+            df = pd.read_csv(collector.get_log_file_path(
+                log_dir_path=stats_session.log_dir_path))
+            assert_greater(
+                df[collectors.COLUMN_NAME_MEMORY_USAGE].notnull().sum(), 5)
+        cell_df = stats_session_list[0].get_cell_summary()
+        assert_equal(cell_df['source_line'].tolist(), ['train()'])
+        plot_meta = stats_session_list[1].display(svg_id='test_shared')
+        assert_equal(
+            plot_meta.js_param['window_option_list'][0]['csv_log_file_path'],
+            collector.get_log_file_path(
+                log_dir_path=stats_session_list[1].log_dir_path))
+    finally:
+        for stats_session in stats_session_list:
+            stats_session.stop()
+    assert_false(stats_session_list[0].is_running())
     assert_equal(
-        target_line_str,
-        "[1] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |"
-    )
-
-    linux_stats_plot._exec_gpustat_command = pre_func
+        shared_daemon.get_subscriber_pid_list(
+            daemon_dir_path=daemon_dir_path), [])
+    os.kill(daemon_meta_dict['pid'], signal.SIGTERM)
+    assert_true(stats_helper.wait_for_daemon_exit(
+        daemon_dir_path=daemon_dir_path))
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
 
 
-def test__get_gpu_memory_usage():
+def test_kernel_lag_session():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_gpu_memory_usage --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_kernel_lag_session --skip_jupyter 1
     """
-    pre_func = linux_stats_plot._exec_gpustat_command
-
-    def test_func():
-        return "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |    110 / 11441 MB |\n[1] Tesla K80        | 31'C,   0 % |   250 / 11441 MB |\n"
-
-    linux_stats_plot._exec_gpustat_command = test_func
-    gpu_memory_usage_mb = linux_stats_plot._get_gpu_memory_usage(
-        gpu_idx=0
-    )
-    assert_equal(gpu_memory_usage_mb, 110)
-    gpu_memory_usage_mb = linux_stats_plot._get_gpu_memory_usage(
-        gpu_idx=1
-    )
-    assert_equal(gpu_memory_usage_mb, 250)
-
-    linux_stats_plot._exec_gpustat_command = pre_func
-
-
-def test__save_csv():
+    log_dir_path = TMP_TEST_LOG_DIR
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    for sampler in (
+            linux_stats_plot.SAMPLER_THREAD,
+            linux_stats_plot.SAMPLER_PROCESS):
+        stats_session = linux_stats_plot._start_session(
+            buffer_size=10, log_dir_path=log_dir_path, svg_id='test',
+            comm_manager=None, metric_interval_seconds={'kernel_lag': 0.2},
+            metrics=['kernel_lag'], persist_history=False,
+            history_retention_seconds=60, sampler=sampler)
+        assert_true(stats_session.lag_probe.is_alive())
+        assert_true(stats_session.wait_until_ready(timeout=30))
+        time.sleep(2)
+        lag_probe = stats_session.lag_probe
+        stats_session.stop()
+        assert_false(lag_probe.is_alive())
+        assert_equal(stats_session.lag_probe, None)
+
+        df = pd.read_csv(collector.get_log_file_path(
+            log_dir_path=log_dir_path))
+        assert_greater(
+            df[collectors.COLUMN_NAME_KERNEL_LAG_P99].notnull().sum(), 2)
+        lag_df = df.dropna(subset=[collectors.COLUMN_NAME_KERNEL_LAG_P99])
+        assert_true(
+            (lag_df[collectors.COLUMN_NAME_KERNEL_LAG_P99]
+             >= lag_df[collectors.COLUMN_NAME_KERNEL_LAG_P50]).all())
+        shutil.rmtree(log_dir_path, ignore_errors=True)
+
+
+def test_heap_session():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__save_csv --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_heap_session --skip_jupyter 1
     """
     log_dir_path = TMP_TEST_LOG_DIR
-    os.makedirs(log_dir_path, exist_ok=True)
-    log_file_path = linux_stats_plot._get_log_file_path(
-        log_dir_path=log_dir_path)
-    if os.path.exists(log_file_path):
-        os.remove(log_file_path)
-    memory_usage_deque = deque([1, 2, 3], maxlen=3)
-    disk_usage_deque = deque([4, 5, 6], maxlen=3)
-    gpu_memory_usage_deque_list = [
-        deque([5, 6, 7], maxlen=3),
-        deque([8, 9, 10], maxlen=3),
-    ]
-    linux_stats_plot._save_csv(
-        memory_usage_deque=memory_usage_deque,
-        disk_usage_deque=disk_usage_deque,
-        gpu_memory_usage_deque_list=gpu_memory_usage_deque_list,
-        log_file_path=log_file_path)
-    assert_true(
-        os.path.exists(log_file_path)
-    )
-    df = pd.read_csv(log_file_path)
-    assert_equal(len(df), 3)
-    assert_equal(
-        df[linux_stats_plot._COLUMN_NAME_MEMORY_USAGE].tolist(),
-        [1, 2, 3]
-    )
-    assert_equal(
-        df[linux_stats_plot._COLUMN_NAME_DISK_USAGE].tolist(),
-        [4, 5, 6]
-    )
-    gpu_column_name_1 = linux_stats_plot.\
-        _COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT.format(gpu_idx=0)
-    assert_equal(
-        df[gpu_column_name_1].tolist(),
-        [5, 6, 7]
-    )
-    gpu_column_name_2 = linux_stats_plot.\
-        _COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT.format(gpu_idx=1)
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    for sampler in (
+            linux_stats_plot.SAMPLER_THREAD,
+            linux_stats_plot.SAMPLER_PROCESS):
+        stats_session = linux_stats_plot._start_session(
+            buffer_size=10, log_dir_path=log_dir_path, svg_id='test',
+            comm_manager=None, metric_interval_seconds={'heap': 0.2},
+            metrics=[collectors.HeapSnapshotCollector(
+                snapshot_interval_seconds=0.3, top_num=3)],
+            persist_history=False, history_retention_seconds=60,
+            sampler=sampler)
+        assert_true(tracemalloc.is_tracing())
+        assert_true(stats_session.wait_until_ready(timeout=30))
+        assert_equal(len(stats_session.get_heap_growth()), 0)
+        growing_list = []
+        for _ in range(20):
+            growing_list.append(bytearray(100 * 1024))
+            time.sleep(0.1)
+        heap_snapshotter = stats_session.heap_snapshotter
+        heap_df = stats_session.get_heap_growth()
+        stats_session.stop()
+        assert_false(heap_snapshotter.is_alive())
+        assert_equal(stats_session.heap_snapshotter, None)
+        assert_false(tracemalloc.is_tracing())
+
+        assert_true(0 < len(heap_df) <= 3)
+        assert_true(
+            heap_df['site'].str.contains('test_linux_stats_plot.py').any())
+        df = pd.read_csv(collector.get_log_file_path(
+            log_dir_path=log_dir_path))
+        assert_greater(
+            df[collectors.COLUMN_NAME_HEAP_SNAPSHOT_TIME].notnull().sum(), 2)
+        # About 2MB is allocated while tracing.
+        assert_greater(df[collectors.COLUMN_NAME_PYTHON_HEAP_TRACED].max(), 1)
+        shutil.rmtree(log_dir_path, ignore_errors=True)
+
+
+def test_get_gpu_processes():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_get_gpu_processes --skip_jupyter 1
+    """
+    # The process started like a Jupyter kernel with the connection
+    # file.
+    kernel_process = sp.Popen([
+        sys.executable, '-c', 'import time; time.sleep(30)', '-f',
+        '/tmp/jupyter/kernel-0f1e2d3c-aaaa.json'])
+    try:
+        # The command line of the process is empty until it has
+        # executed the interpreter.
+        start_time = time.time()
+        while '-f' not in psutil.Process(kernel_process.pid).cmdline() \
+                and time.time() - start_time < 10:
+            time.sleep(0.05)
+        assert_equal(
+            linux_stats_plot._get_kernel_id(pid=kernel_process.pid),
+            '0f1e2d3c-aaaa')
+        assert_equal(linux_stats_plot._get_kernel_id(pid=os.getpid()), '')
+        command_result = (
+            'gpu-host-1  Tue Mar  5 10:12:45 2019\n'
+            "[0] GeForce GTX 1080 Ti | 67'C,  98 %,  231 / 250 W |  "
+            '3000 / 11178 MB | alice:python/{kernel_pid}(500M) '
+            'alice:python/{pid}(2500M) root:init/1(10M)\n'.format(
+                kernel_pid=kernel_process.pid, pid=os.getpid()))
+        df = linux_stats_plot.get_gpu_processes(
+            command_result=command_result)
+    finally:
+        kernel_process.kill()
+        kernel_process.wait()
+    assert_equal(list(df.columns), linux_stats_plot.GPU_PROCESS_COLUMN_LIST)
+    assert_equal(df['pid'].tolist(), [os.getpid(), kernel_process.pid, 1])
+    assert_equal(df['memory_mb'].tolist(), [2500, 500, 10])
+    assert_equal(df['kernel_id'].tolist(), ['', '0f1e2d3c-aaaa', ''])
+    # The fake kernel is a child of this process.
+    assert_equal(df['is_current_kernel'].tolist(), [True, True, False])
+
+    df = linux_stats_plot.get_gpu_processes(command_result='')
+    assert_equal(len(df), 0)
+    assert_equal(list(df.columns), linux_stats_plot.GPU_PROCESS_COLUMN_LIST)
+
+
+def test_add_metric_process_tree_memory():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_add_metric_process_tree_memory --skip_jupyter 1
+    """
+    log_dir_path = TMP_TEST_LOG_DIR
+    proc_root = os.path.abspath(os.path.join(TMP_TEST_LOG_DIR, 'proc'))
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    stats_session = _start_test_session(log_dir_path=log_dir_path)
+    try:
+        assert_true(stats_session.wait_until_ready(timeout=30))
+        # The fake kernel 100 has the collector process, which has a
+        # child (e.g., the gpustat command).
+        stats_helper.write_proc_file(
+            proc_root=proc_root, relative_path='meminfo',
+            file_str='MemTotal:        8192000 kB\n')
+        collector_pid = stats_session.process.pid
+        for pid, ppid in (
+                (100, 1), (collector_pid, 100), (101, collector_pid)):
+            stats_helper.write_proc_file(
+                proc_root=proc_root, relative_path='%d/stat' % pid,
+                file_str='%d (python) S %d 1 1 0 -1\n' % (pid, ppid))
+            stats_helper.write_proc_file(
+                proc_root=proc_root, relative_path='%d/smaps_rollup' % pid,
+                file_str='Rss: 2048 kB\nPss: 1024 kB\n')
+        # The collector is set up in the kernel, and set up again in
+        # the collector process.
+        assert_true(stats_session.add_metric(
+            metric=collectors.ProcessTreeMemoryCollector(
+                pid=100, proc_root=proc_root, cgroup_root=None),
+            interval_seconds=0.2))
+        time.sleep(2)
+    finally:
+        stats_session.stop()
+    df = pd.read_csv(collector.get_log_file_path(log_dir_path=log_dir_path))
+    process_num_series = df[
+        collectors.COLUMN_NAME_PROCESS_TREE_PROCESS_NUM].dropna()
+    assert_greater(len(process_num_series), 0)
+    assert_equal(process_num_series.unique().tolist(), [1])
     assert_equal(
-        df[gpu_column_name_2].tolist(),
-        [8, 9, 10]
-    )
-
-    if os.path.exists(log_file_path):
-        os.remove(log_file_path)
+        df[collectors.COLUMN_NAME_PROCESS_TREE_RSS].dropna().unique().tolist(),
+        [2])
+    shutil.rmtree(log_dir_path, ignore_errors=True)
 
 
-def test__start_plot_data_updating():
+def test_add_metric_process_tree():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__start_plot_data_updating --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_add_metric_process_tree --skip_jupyter 1
     """
     log_dir_path = TMP_TEST_LOG_DIR
-    os.makedirs(log_dir_path, exist_ok=True)
-    log_file_path = linux_stats_plot._get_log_file_path(
-        log_dir_path=log_dir_path)
-    if os.path.exists(log_file_path):
-        os.remove(log_file_path)
-    parent_pid = os.getpid()
-
-    pre_disabled_val = linux_stats_plot.is_gpu_stats_disabled
-    linux_stats_plot.is_gpu_stats_disabled = False
-    process = mp.Process(
-        target=linux_stats_plot._start_plot_data_updating,
-        kwargs={
-            'interval_seconds': 1,
-            'buffer_size': 2,
-            'log_dir_path': log_dir_path,
-            'parent_pid': parent_pid,
-        })
-    process.deamon = True
-    process.start()
-    time.sleep(25)
-    process.terminate()
-    df = pd.read_csv(log_file_path)
-    assert_equal(len(df), 2)
-    is_in = linux_stats_plot._COLUMN_NAME_MEMORY_USAGE in df.columns
-    assert_true(is_in)
-    is_in = linux_stats_plot._COLUMN_NAME_DISK_USAGE in df.columns
-    assert_true(is_in)
-
-    linux_stats_plot.is_gpu_stats_disabled = pre_disabled_val
+    proc_root = os.path.abspath(os.path.join(TMP_TEST_LOG_DIR, 'proc'))
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    stats_session = _start_test_session(log_dir_path=log_dir_path)
+    try:
+        assert_true(stats_session.wait_until_ready(timeout=30))
+        # The fake kernel 100 has a worker and the collector process,
+        # which has a child (e.g., the gpustat command).
+        collector_pid = stats_session.process.pid
+        for pid, ppid, process_name, thread_num in (
+                (100, 1, 'python', 8), (101, 100, 'pt_worker', 2),
+                (collector_pid, 100, 'python', 3),
+                (102, collector_pid, 'gpustat', 1)):
+            stats_helper.write_proc_file(
+                proc_root=proc_root, relative_path='%d/stat' % pid,
+                file_str='%d (%s) S %d 1 1 0 -1 0 0 0 0 0 0 0 0 0 20 0 '
+                '%d 0 100 1000000 300 0\n' % (
+                    pid, process_name, ppid, thread_num))
+            stats_helper.write_proc_file(
+                proc_root=proc_root, relative_path='%d/status' % pid,
+                file_str='Name:\t%s\n' % process_name)
+        assert_true(stats_session.add_metric(
+            metric=collectors.ProcessTreeCollector(
+                pid=100, process_name_list=['python'], proc_root=proc_root),
+            interval_seconds=0.2))
+        time.sleep(2)
+    finally:
+        stats_session.stop()
+    df = pd.read_csv(collector.get_log_file_path(log_dir_path=log_dir_path))
+    for process_name, thread_num in (('python', 8), ('other', 2)):
+        thread_num_series = df[
+            collectors.COLUMN_NAME_PROCESS_THREADS_FORMAT.format(
+                process_name=process_name)].dropna()
+        assert_greater(len(thread_num_series), 0)
+        assert_equal(thread_num_series.unique().tolist(), [thread_num])
     shutil.rmtree(log_dir_path, ignore_errors=True)
 
 
-def test__exit_if_parent_process_has_died():
+def test_display_multi_node_plot():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__exit_if_parent_process_has_died --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_display_multi_node_plot --skip_jupyter 1
     """
-    parent_pid = os.getpid()
-    kwargs = {'parent_pid': parent_pid}
-    process = mp.Process(
-        target=linux_stats_plot._exit_if_parent_process_has_died,
-        kwargs=kwargs
-    )
-    process.start()
-    assert_true(process.is_alive())
-    process.terminate()
-
-    kwargs['parent_pid'] = -1
-    process = mp.Process(
-        target=linux_stats_plot._exit_if_parent_process_has_died,
-        kwargs=kwargs
-    )
-    process.start()
-    time.sleep(10)
-    assert_false(process.is_alive())
+    shared_dir_path = os.path.join(TMP_TEST_LOG_DIR, 'shared')
+    log_dir_path = os.path.join(TMP_TEST_LOG_DIR, 'multi_node')
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    assert_raises(
+        ValueError, linux_stats_plot.display_multi_node_plot,
+        shared_dir_path, timeout=0)
+
+    process_list = [
+        stats_helper.start_agent(
+            shared_dir_path=shared_dir_path, host_name=host_name)
+        for host_name in ['node-1', 'node-2']]
+    try:
+        multi_node_aggregator = linux_stats_plot.display_multi_node_plot(
+            shared_dir_path=shared_dir_path, window_seconds=60,
+            log_dir_path=log_dir_path, svg_id='test_multi_node', host_num=2,
+            merge_interval_seconds=0.2)
+        assert_equal(
+            multi_node_aggregator.host_name_list, ['node-1', 'node-2'])
+        assert_true(multi_node_aggregator.is_alive())
+        js_param = multi_node_aggregator.plot_meta.js_param
+        assert_equal(
+            js_param['window_option_list'][0]['csv_log_file_path'],
+            multi_node_aggregator.get_log_file_path())
+        memory_panel = js_param['panel_list'][0]
+        assert_equal(
+            memory_panel['column_list'],
+            ['[node-1] %s' % collectors.COLUMN_NAME_MEMORY_USAGE,
+             '[node-2] %s' % collectors.COLUMN_NAME_MEMORY_USAGE])
+        assert_equal(memory_panel['label_list'], ['node-1', 'node-2'])
+        # The rendered plot has no cell log, so the path is not polled
+        # (an empty path fetches the notebook page itself).
+        js_template_str = multi_node_aggregator.plot_meta.js_template_str
+        assert_true('const CELL_LOG_FILE_PATH = "";' in js_template_str)
+        assert_true(
+            'if (CELL_LOG_FILE_PATH === "" || !windowFocused) {\n'
+            '        return;' in js_template_str.replace('\r\n', '\n'))
+        time.sleep(1)
+        merged_df = pd.read_csv(multi_node_aggregator.get_log_file_path())
+        for column_name in memory_panel['column_list']:
+            assert_greater(merged_df[column_name].notnull().sum(), 2)
+
+        # The aggregator of the previous call is stopped.
+        per_host_aggregator = linux_stats_plot.display_multi_node_plot(
+            shared_dir_path=shared_dir_path,
+            layout=aggregator.LAYOUT_PER_HOST, log_dir_path=log_dir_path)
+        assert_false(multi_node_aggregator.is_alive())
+        assert_equal(
+            per_host_aggregator.plot_meta.js_param['panel_list'][0]['title'],
+            '[node-1] %s' % collectors.COLUMN_NAME_MEMORY_USAGE)
+        per_host_aggregator.stop()
+    finally:
+        linux_stats_plot._current_aggregator = None
+        for process in process_list:
+            process.terminate()
+            process.wait(timeout=10)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_display_replay():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_display_replay --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    file_path = os.path.join(TMP_TEST_LOG_DIR, 'run.stats')
+    log_dir_path = os.path.join(TMP_TEST_LOG_DIR, 'replay')
+    recording.record(
+        out_file_path=file_path, interval_seconds=0.05, metrics=['memory'],
+        duration_seconds=1, flush_interval_seconds=0.3)
+    plot_meta = linux_stats_plot.display_replay(
+        file_path=file_path, svg_id='test_replay', point_num=5,
+        log_dir_path=log_dir_path)
+    js_param = plot_meta.js_param
+    assert_equal(
+        [panel_dict['title'] for panel_dict in js_param['panel_list']],
+        [collectors.COLUMN_NAME_MEMORY_USAGE])
+    _, sample_df = recording.load_recording(file_path=file_path)
+    assert_equal(
+        js_param['window_seconds'],
+        recording.get_window_seconds(sample_df=sample_df))
+    window_option_dict = js_param['window_option_list'][0]
+    assert_equal(
+        window_option_dict['tier_name'], linux_stats_plot.TIER_NAME_REPLAY)
+    # The recording does not change, so the CSV is read only once.
+    assert_equal(js_param['is_static'], 'true')
+    assert_true('const IS_STATIC = true;' in plot_meta.js_template_str)
+    rollup_df = pd.read_csv(window_option_dict['csv_log_file_path'])
+    assert_true(len(rollup_df) <= 5)
+    assert_true(
+        history.MIN_COLUMN_NAME_FORMAT.format(
+            column_name=collectors.COLUMN_NAME_MEMORY_USAGE)
+        in rollup_df.columns)
+    assert_true(rollup_df['timestamp'].is_monotonic_increasing)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
 
 
-def test__fill_deque_by_initial_value():
+def test__start_collector_process():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__fill_deque_by_initial_value --skip_jupyter 1
-    """
-    buffer_size = 3
-    deque_obj = deque([100], maxlen=buffer_size)
-    deque_obj = linux_stats_plot._fill_deque_by_initial_value(
-        deque_obj=deque_obj,
-        initial_value=200,
-        buffer_size=buffer_size)
-    assert_equal(len(deque_obj), 1)
-
-    deque_obj = deque([], maxlen=buffer_size)
-    deque_obj = linux_stats_plot._fill_deque_by_initial_value(
-        deque_obj=deque_obj,
-        initial_value=200,
-        buffer_size=buffer_size
-    )
-    assert_equal(len(deque_obj), 3)
-    for value in deque_obj:
-        assert_equal(value, 200)
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__start_collector_process --skip_jupyter 1
+    """
+    log_dir_path = TMP_TEST_LOG_DIR
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    process, command_conn, _, sample_conn = \
+        linux_stats_plot._start_collector_process(
+            collector_kwargs={
+                'interval_seconds': 1,
+                'buffer_size': 10,
+                'log_dir_path': log_dir_path,
+                'parent_pid': os.getpid(),
+                'collector_list': stats_helper.make_collector_list(),
+            },
+            push_updates=True)
+    assert_true(sample_conn.poll(10))
+    row_dict = sample_conn.recv()
+    assert_true(collectors.COLUMN_NAME_MEMORY_USAGE in row_dict)
+
+    # The collector is not a fork of this process.
+    cmdline_list = psutil.Process(process.pid).cmdline()
+    assert_true(linux_stats_plot.COLLECTOR_MODULE_NAME in cmdline_list)
+    command_conn.send({'command': collector.COMMAND_STOP})
+    assert_equal(process.wait(timeout=10), 0)
+    shutil.rmtree(log_dir_path, ignore_errors=True)
 
 
-def _error_func():
+def _measure_collector_startup(start_func):
     """
-    A function to generate an error and to confirm that error contents
-    are added to the file.
+    Start the collector and measure the seconds until the first log
+    is saved and the RSS of the collector process at that time.
+
+    Parameters
+    ----------
+    start_func : function
+        Function to start the collector. It receives the log directory
+        path and returns the pid and the function to stop it.
+
+    Returns
+    -------
+    startup_seconds : float
+        Seconds until the first log is saved.
+    rss_mb : float
+        RSS of the collector process in MB.
     """
-    linux_stats_plot._set_error_setting(
-        log_dir_path=TMP_TEST_LOG_DIR, save_error_to_file=True)
-    raise Exception('error test.')
+    log_dir_path = TMP_TEST_LOG_DIR
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    log_file_path = collector.get_log_file_path(log_dir_path=log_dir_path)
+    start_time = time.time()
+    pid, stop_func = start_func(log_dir_path)
+    while not os.path.exists(log_file_path):
+        time.sleep(0.01)
+        assert_less(time.time() - start_time, 30)
+    startup_seconds = time.time() - start_time
+    rss_mb = psutil.Process(pid).memory_info().rss / 1024 / 1024
+    stop_func()
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    return startup_seconds, rss_mb
 
 
-def test__set_error_setting():
+def test_collector_process_startup_and_rss():
     """
+    Compare the startup time and the RSS of the collector subprocess
+    with those of the collector forked from the kernel holding a
+    large array.
+
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__set_error_setting --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_collector_process_startup_and_rss --skip_jupyter 1
     """
-    linux_stats_plot._set_error_setting(
-        log_dir_path=TMP_TEST_LOG_DIR,
-        save_error_to_file=False)
-    is_in = 'nose' in str(sys.stderr)
-    assert_true(is_in)
-
-    process = mp.Process(target=_error_func)
-    process.start()
-    process.join()
-
-    error_log_path = os.path.join(
-        TMP_TEST_LOG_DIR, linux_stats_plot.ERR_FILE_NAME)
-    with open(error_log_path, 'r') as f:
-        error_log = f.read()
-        assert_not_equal(error_log, '')
-
-    sys.stderr = sys.__stderr__
+    # Simulate the kernel holding a large dataset (512MB).
+    large_arr = np.ones(64 * 1024 * 1024)
+    collector_kwargs = {
+        'interval_seconds': 1,
+        'buffer_size': 10,
+        'parent_pid': os.getpid(),
+        'collector_list': stats_helper.make_collector_list(),
+    }
+
+    def start_subprocess(log_dir_path):
+        process, command_conn, _, _ = \
+            linux_stats_plot._start_collector_process(
+                collector_kwargs=dict(
+                    collector_kwargs, log_dir_path=log_dir_path),
+                push_updates=False)
+
+        def stop_func():
+            command_conn.send({'command': collector.COMMAND_STOP})
+            process.wait(timeout=10)
+        return process.pid, stop_func
+
+    def start_fork(log_dir_path):
+        process = mp.get_context('fork').Process(
+            target=collector.start_collecting,
+            kwargs=dict(collector_kwargs, log_dir_path=log_dir_path))
+        process.daemon = True
+        process.start()
+
+        def stop_func():
+            process.terminate()
+            process.join(timeout=10)
+        return process.pid, stop_func
+
+    subprocess_seconds, subprocess_rss_mb = _measure_collector_startup(
+        start_func=start_subprocess)
+    fork_seconds, fork_rss_mb = _measure_collector_startup(
+        start_func=start_fork)
+    print(
+        'subprocess: %.2fs, %.1fMB / fork: %.2fs, %.1fMB'
+        % (subprocess_seconds, subprocess_rss_mb, fork_seconds,
+           fork_rss_mb))
+    assert_less(subprocess_rss_mb, fork_rss_mb)
+    assert_less(subprocess_rss_mb, large_arr.nbytes / 1024 / 1024)
+    assert_less(subprocess_seconds, 10)
+
+
+def test__get_collector_env():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__get_collector_env --skip_jupyter 1
+    """
+    env = linux_stats_plot._get_collector_env()
+    python_path_list = env['PYTHONPATH'].split(os.pathsep)
+    package_dir_path = os.path.join(python_path_list[0], 'plot_playground')
+    assert_true(os.path.isdir(package_dir_path))
 
 
-def test__print_error_if_exists():
+def test__print_collector_error():
     """
     Test Command
     ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__print_error_if_exists --skip_jupyter 1
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__print_collector_error --skip_jupyter 1
     """
-    error_log_path = os.path.join(
-        TMP_TEST_LOG_DIR, linux_stats_plot.ERR_FILE_NAME)
-    if os.path.exists(error_log_path):
-        os.remove(error_log_path)
     tmp_stdout_path = os.path.join(TMP_TEST_LOG_DIR, 'tmp.log')
     if os.path.exists(tmp_stdout_path):
         os.remove(tmp_stdout_path)
     os.makedirs(TMP_TEST_LOG_DIR, exist_ok=True)
     sys.stdout = open(tmp_stdout_path, 'w')
-
-    with open(error_log_path, 'w') as f:
-        f.write('test error message')
-    linux_stats_plot._print_error_if_exists(
-        log_dir_path=TMP_TEST_LOG_DIR)
+    linux_stats_plot._print_collector_error(error_str='test error message')
     sys.stdout.close()
     sys.stdout = sys.__stdout__
     with open(tmp_stdout_path, 'r') as f:
@@ -374,6 +859,107 @@ def test__print_error_if_exists():
         os.remove(tmp_stdout_path)
 
 
+def test_profile():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test_profile --skip_jupyter 1
+    """
+    log_dir_path = TMP_TEST_LOG_DIR
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+    assert_raises(ValueError, linux_stats_plot.profile, 'test', sampler='x')
+    assert_false(linux_stats_plot.mark(label='not profiled'))
+
+    # A collector is started for the block and stopped at the end.
+    with linux_stats_plot.profile(
+            label='epoch 1', burst_interval_seconds=0.2,
+            metrics=['memory', 'disk'],
+            log_dir_path=log_dir_path) as resource_profile:
+        assert_true(resource_profile.stats_session.is_running())
+        assert_equal(
+            resource_profile.stats_session.metric_interval_seconds_dict,
+            {'memory': 0.2, 'disk': 0.2})
+        time.sleep(1)
+        assert_true(linux_stats_plot.mark(label='checkpoint saved'))
+        time.sleep(1)
+    assert_false(resource_profile.stats_session.is_running())
+    assert_equal(linux_stats_plot._active_profile_list, [])
+    timeline = resource_profile.timeline
+    assert_equal(timeline.label, 'epoch 1')
+    assert_greater(timeline.duration_seconds, 1.9)
+    sample_df = timeline.sample_df
+    assert_greater(
+        sample_df[collectors.COLUMN_NAME_DISK_USAGE].notnull().sum(), 5)
+    assert_true(
+        (sample_df[collector.COLUMN_NAME_TIMESTAMP]
+         >= timeline.start_timestamp).all())
+    event_df = timeline.get_event_df()
+    assert_equal(
+        event_df['label'].tolist(),
+        ['start: epoch 1', 'checkpoint saved', 'end: epoch 1'])
+    assert_greater(event_df['elapsed_seconds'].iloc[1], 0.9)
+
+    plot_meta = timeline.display(svg_id='test_profile')
+    assert_greater(
+        plot_meta.js_param['window_seconds'], timeline.duration_seconds - 1)
+    # The finished profile is not polled.
+    assert_equal(plot_meta.js_param['is_static'], 'true')
+    cell_df = pd.read_csv(plot_meta.js_param['cell_log_file_path'])
+    assert_equal(
+        cell_df['source_line'].tolist(), ['epoch 1', 'checkpoint saved'])
+    export_file_path = os.path.join(log_dir_path, 'timeline.json')
+    timeline.export(file_path=export_file_path)
+    with open(export_file_path, 'r') as f:
+        timeline_dict = json.load(f)
+    assert_equal(timeline_dict['label'], 'epoch 1')
+    assert_equal(len(timeline_dict['samples']['data']), len(sample_df))
+
+    # The nested block uses the collector of the outer block, which
+    # is stopped only at the end of the outer block.
+    with linux_stats_plot.profile(
+            label='epoch 2', metrics=['memory'],
+            log_dir_path=log_dir_path) as outer_profile:
+        with linux_stats_plot.profile(
+                label='step 1', metrics=['disk'],
+                log_dir_path=os.path.join(log_dir_path, 'inner')) \
+                as inner_profile:
+            assert_equal(
+                inner_profile.stats_session, outer_profile.stats_session)
+            assert_false(inner_profile.is_session_started)
+            time.sleep(0.5)
+        assert_true(outer_profile.stats_session.is_running())
+    assert_false(outer_profile.stats_session.is_running())
+    assert_false(os.path.exists(os.path.join(log_dir_path, 'inner')))
+
+    # The running collector is used, and the intervals are restored.
+    collector_list = collectors.setup_collectors(
+        collector_list=collectors.make_collector_list(
+            metrics=['proc_stats']))
+    stats_session = linux_stats_plot._start_thread_session(
+        collector_list=collector_list,
+        metric_interval_seconds_dict={'proc_stats': 1},
+        window_seconds=60, log_dir_path=log_dir_path, svg_id='test',
+        comm_manager=None)
+    stats_session.wait_until_ready(timeout=10)
+    linux_stats_plot._current_session = stats_session
+    try:
+        with linux_stats_plot.profile(
+                label='epoch 2',
+                burst_interval_seconds=0.1) as resource_profile:
+            assert_equal(resource_profile.stats_session, stats_session)
+            time.sleep(1)
+        assert_true(stats_session.is_running())
+        assert_equal(
+            stats_session.metric_interval_seconds_dict, {'proc_stats': 1})
+        assert_greater(
+            resource_profile.timeline.sample_df[
+                collectors.COLUMN_NAME_KERNEL_RSS].notnull().sum(), 5)
+    finally:
+        stats_session.stop()
+        linux_stats_plot._current_session = None
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+
+
 def test_display_plot():
     """
     Test Command
@@ -415,10 +1001,18 @@ display_test_plot()
     assert_greater(similarity, 0.8)
     selenium_helper.exit_webdriver()
 
-    plot_meta = display_test_plot()
+    stats_session = display_test_plot()
     assert_true(
-        isinstance(plot_meta, d3_helper.PlotMeta)
+        isinstance(stats_session, linux_stats_plot.StatsSession)
     )
+    assert_true(
+        isinstance(stats_session.plot_meta, d3_helper.PlotMeta)
+    )
+    assert_equal(linux_stats_plot.get_current_session(), stats_session)
+    plot_meta = stats_session.display()
+    assert_true(isinstance(plot_meta, d3_helper.PlotMeta))
+    stats_session.stop()
+    assert_false(stats_session.is_running())
 
     jupyter_helper.empty_test_ipynb_code_cell()
 
@@ -429,41 +1023,10 @@ def display_test_plot():
 
     Returns
     -------
-    plot_meta : plot_playground.common.d3_helper.PlotMeta
-        An object that stores the metadata of the plot.
+    stats_session : plot_playground.stats.linux_stats_plot.StatsSession
+        An object to control the running collector.
     """
-    linux_stats_plot._is_displayed = False
-    plot_meta = linux_stats_plot.display_plot(
+    stats_session = linux_stats_plot.display_plot(
         log_dir_path=TMP_TEST_LOG_DIR,
         svg_id=settings.TEST_SVG_ELEM_ID)
-    return plot_meta
-
-
-def test__update_gpu_disabled_bool():
-    """
-    Test Command
-    ------------
-    $ python run_tests.py --module_name plot_playground.tests.test_linux_stats_plot:test__update_gpu_disabled_bool --skip_jupyter 1
-    """
-    pre_bool = linux_stats_plot.is_gpu_stats_disabled
-    pre_func = linux_stats_plot._exec_gpustat_command
-
-    linux_stats_plot.is_gpu_stats_disabled = False
-
-    def raise_error():
-        raise Exception()
-
-    linux_stats_plot._exec_gpustat_command = raise_error
-    linux_stats_plot._update_gpu_disabled_bool()
-    assert_true(linux_stats_plot.is_gpu_stats_disabled)
-
-    def pass_func():
-        pass
-
-    linux_stats_plot._exec_gpustat_command = pass_func
-    linux_stats_plot.is_gpu_stats_disabled = False
-    linux_stats_plot._update_gpu_disabled_bool()
-    assert_false(linux_stats_plot.is_gpu_stats_disabled)
-
-    linux_stats_plot.is_gpu_stats_disabled = pre_bool
-    linux_stats_plot._exec_gpustat_command = pre_func
+    return stats_session
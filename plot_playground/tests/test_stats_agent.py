@@ -0,0 +1,147 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_agent --skip_jupyter 1
+"""
+
+import json
+import os
+import shutil
+import time
+
+from nose.tools import assert_equal, assert_true, assert_greater, \
+    assert_raises
+import pandas as pd
+
+from plot_playground.stats import agent
+from plot_playground.stats import collector
+from plot_playground.stats import collectors
+from plot_playground.stats import openmetrics
+from plot_playground.tests import stats_helper
+
+TMP_TEST_SHARED_DIR = './log_plotplayground_stats/test_agent/'
+
+
+def test_get_host_dir_path():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_agent:test_get_host_dir_path --skip_jupyter 1
+    """
+    host_dir_path = agent.get_host_dir_path(
+        shared_dir_path='/mnt/stats', host_name='node-1')
+    assert_equal(host_dir_path, '/mnt/stats/node-1')
+    for host_name in ['', '..', 'node/1']:
+        assert_raises(
+            ValueError, agent.get_host_dir_path, '/mnt/stats', host_name)
+
+
+def test__agent_meta_writer():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_agent:test__agent_meta_writer --skip_jupyter 1
+    """
+    host_dir_path = os.path.join(TMP_TEST_SHARED_DIR, 'node-1')
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+    os.makedirs(host_dir_path)
+    meta_writer = agent._AgentMetaWriter(
+        host_dir_path=host_dir_path, host_name='node-1',
+        interval_seconds=0.5, buffer_size=100)
+    agent_meta_file_path = agent.get_agent_meta_file_path(
+        host_dir_path=host_dir_path)
+    meta_writer.send({'status': collector.STATUS_ERROR, 'error': 'test'})
+    assert_true(not os.path.exists(agent_meta_file_path))
+
+    collector_list = collectors.setup_collectors(
+        collector_list=collectors.make_collector_list(
+            metrics=['memory', 'disk']))
+    meta_writer.send({
+        'status': collector.STATUS_READY,
+        'collector_list': collector_list,
+        'metric_interval_seconds_dict': {'memory': 1, 'disk': 1},
+    })
+    with open(agent_meta_file_path, encoding='utf-8') as f:
+        agent_meta_dict = json.load(f)
+    assert_equal(agent_meta_dict['host_name'], 'node-1')
+    assert_equal(agent_meta_dict['pid'], os.getpid())
+    assert_equal(agent_meta_dict['interval_seconds'], 0.5)
+    assert_equal(agent_meta_dict['buffer_size'], 100)
+    assert_equal(agent_meta_dict['metrics_port'], None)
+    assert_equal(
+        agent_meta_dict['metric_interval_seconds_dict'],
+        {'memory': 1, 'disk': 1})
+    assert_equal(
+        [panel_dict['title'] for panel_dict in agent_meta_dict['panel_list']],
+        [panel_dict['title'] for collector_ in collector_list
+         for panel_dict in collector_.get_panel_list()])
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+
+
+def test_agent_process():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_agent:test_agent_process --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+    process = stats_helper.start_agent(
+        shared_dir_path=TMP_TEST_SHARED_DIR, host_name='node-1')
+    host_dir_path = agent.get_host_dir_path(
+        shared_dir_path=TMP_TEST_SHARED_DIR, host_name='node-1')
+    try:
+        assert_true(stats_helper.wait_for_agent_meta(host_dir_path=host_dir_path))
+        # The agent keeps running without the parent check.
+        time.sleep(1.5)
+        assert_equal(process.poll(), None)
+        df = pd.read_csv(collector.get_log_file_path(
+            log_dir_path=host_dir_path))
+        assert_greater(
+            df[collectors.COLUMN_NAME_MEMORY_USAGE].notnull().sum(), 3)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    # The agent exits normally on SIGTERM.
+    assert_equal(process.returncode, 0)
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+
+
+def test_agent_metrics_endpoint():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_agent:test_agent_metrics_endpoint --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+    process = stats_helper.start_agent(
+        shared_dir_path=TMP_TEST_SHARED_DIR, host_name='node-1',
+        metrics_port=0)
+    host_dir_path = agent.get_host_dir_path(
+        shared_dir_path=TMP_TEST_SHARED_DIR, host_name='node-1')
+    try:
+        assert_true(stats_helper.wait_for_agent_meta(host_dir_path=host_dir_path))
+        with open(agent.get_agent_meta_file_path(
+                host_dir_path=host_dir_path), encoding='utf-8') as f:
+            metrics_port = json.load(f)['metrics_port']
+        assert_greater(metrics_port, 0)
+        content_type, body_str = stats_helper.scrape(
+            port=metrics_port)
+        assert_equal(content_type, openmetrics.CONTENT_TYPE)
+        metric_name = openmetrics.get_metric_name(
+            column_name=collectors.COLUMN_NAME_MEMORY_USAGE)
+        assert_true('# TYPE %s gauge\n' % metric_name in body_str)
+        assert_true(
+            '%s%s{quantile="0.99"} ' % (
+                metric_name, openmetrics.SESSION_SUMMARY_SUFFIX)
+            in body_str)
+        assert_true(body_str.endswith('# EOF\n'))
+
+        # The latest sample is served without sampling again.
+        time.sleep(0.5)
+        _, next_body_str = stats_helper.scrape(port=metrics_port)
+        assert_true(next_body_str != body_str)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    assert_equal(process.returncode, 0)
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
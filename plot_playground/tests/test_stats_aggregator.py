@@ -0,0 +1,250 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_aggregator --skip_jupyter 1
+"""
+
+import os
+import shutil
+import time
+
+from nose.tools import assert_equal, assert_true, assert_greater, \
+    assert_raises
+import numpy as np
+import pandas as pd
+
+from plot_playground.stats import agent
+from plot_playground.stats import aggregator
+from plot_playground.stats import collector
+from plot_playground.stats import collectors
+from plot_playground.tests import stats_helper
+
+TMP_TEST_SHARED_DIR = './log_plotplayground_stats/test_aggregator/'
+TMP_TEST_LOG_DIR = './log_plotplayground_stats/test_aggregator_merged/'
+
+
+def _make_test_agent_meta(host_name, panel_list):
+    """
+    Make the meta of the agent of the host for testing.
+
+    Parameters
+    ----------
+    host_name : str
+        Name of the host.
+    panel_list : list of dicts
+        Settings of the panels of the host.
+
+    Returns
+    -------
+    agent_meta_dict : dict
+        The meta of the agent.
+    """
+    return {
+        'host_name': host_name,
+        'pid': 1,
+        'start_timestamp': 100.0,
+        'interval_seconds': 1,
+        'buffer_size': 300,
+        'panel_list': panel_list,
+        'metric_interval_seconds_dict': {'memory': 1},
+    }
+
+
+def test_make_multi_node_panel_list():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_aggregator:test_make_multi_node_panel_list --skip_jupyter 1
+    """
+    memory_panel = collectors.make_panel(
+        title='memory', column_list=['memory usage (MB)'], unit='MB',
+        quantile_list=[0.5])
+    gpu_panel = collectors.make_panel(
+        title='gpu', column_list=['gpu(0) memory (MB)', 'gpu(1) memory (MB)'],
+        unit='MB', label_list=['gpu(0)'])
+    agent_meta_list = [
+        _make_test_agent_meta(
+            host_name='node-1', panel_list=[memory_panel, gpu_panel]),
+        _make_test_agent_meta(host_name='node-2', panel_list=[memory_panel]),
+    ]
+    assert_raises(
+        ValueError, aggregator.make_multi_node_panel_list, agent_meta_list,
+        'grid')
+
+    panel_list = aggregator.make_multi_node_panel_list(
+        agent_meta_list=agent_meta_list, layout=aggregator.LAYOUT_OVERLAY)
+    assert_equal([panel['title'] for panel in panel_list], ['memory', 'gpu'])
+    assert_equal(
+        panel_list[0]['column_list'],
+        ['[node-1] memory usage (MB)', '[node-2] memory usage (MB)'])
+    assert_equal(panel_list[0]['label_list'], ['node-1', 'node-2'])
+    assert_equal(panel_list[0]['quantile_list'], [0.5])
+    assert_equal(
+        panel_list[1]['label_list'],
+        ['node-1 gpu(0)', 'node-1 gpu(1) memory (MB)'])
+
+    panel_list = aggregator.make_multi_node_panel_list(
+        agent_meta_list=agent_meta_list, layout=aggregator.LAYOUT_PER_HOST)
+    assert_equal(
+        [panel['title'] for panel in panel_list],
+        ['[node-1] memory', '[node-1] gpu', '[node-2] memory'])
+    assert_equal(
+        panel_list[1]['column_list'],
+        ['[node-1] gpu(0) memory (MB)', '[node-1] gpu(1) memory (MB)'])
+    assert_equal(panel_list[1]['height'], gpu_panel['height'])
+
+
+def test_merge_host_samples():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_aggregator:test_merge_host_samples --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+    merged_df = aggregator.merge_host_samples(
+        shared_dir_path=TMP_TEST_SHARED_DIR, host_name_list=['node-1'])
+    assert_equal(list(merged_df.columns), ['timestamp'])
+    assert_equal(len(merged_df), 0)
+
+    host_df_dict = {
+        'node-1': pd.DataFrame({
+            'timestamp': [100.0, 101.0, 102.0],
+            'memory usage (MB)': [10, 11, 12],
+        }),
+        'node-2': pd.DataFrame({
+            'timestamp': [100.5, 101.0, 103.0],
+            'memory usage (MB)': [20, 21, 23],
+        }),
+    }
+    for host_name, host_df in host_df_dict.items():
+        host_dir_path = agent.get_host_dir_path(
+            shared_dir_path=TMP_TEST_SHARED_DIR, host_name=host_name)
+        os.makedirs(host_dir_path)
+        host_df.to_csv(
+            collector.get_log_file_path(log_dir_path=host_dir_path),
+            index=False)
+
+    merged_df = aggregator.merge_host_samples(
+        shared_dir_path=TMP_TEST_SHARED_DIR,
+        host_name_list=['node-1', 'node-2', 'node-3'])
+    assert_equal(
+        list(merged_df.columns),
+        ['timestamp', '[node-1] memory usage (MB)',
+         '[node-2] memory usage (MB)'])
+    assert_equal(
+        merged_df['timestamp'].tolist(), [100.0, 100.5, 101.0, 102.0, 103.0])
+    np.testing.assert_array_equal(
+        merged_df['[node-1] memory usage (MB)'].values,
+        [10, np.nan, 11, 12, np.nan])
+    np.testing.assert_array_equal(
+        merged_df['[node-2] memory usage (MB)'].values,
+        [np.nan, 20, 21, np.nan, 23])
+
+    merged_df = aggregator.merge_host_samples(
+        shared_dir_path=TMP_TEST_SHARED_DIR,
+        host_name_list=['node-1', 'node-2'], window_seconds=2)
+    assert_equal(merged_df['timestamp'].tolist(), [101.0, 102.0, 103.0])
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+
+
+def test_multi_node_aggregator():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_aggregator:test_multi_node_aggregator --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    host_name_list = ['node-1', 'node-2', 'node-3']
+    process_list = [
+        stats_helper.start_agent(
+            shared_dir_path=TMP_TEST_SHARED_DIR, host_name=host_name)
+        for host_name in host_name_list]
+    multi_node_aggregator = None
+    try:
+        for host_name in host_name_list:
+            assert_true(stats_helper.wait_for_agent_meta(
+                host_dir_path=agent.get_host_dir_path(
+                    shared_dir_path=TMP_TEST_SHARED_DIR,
+                    host_name=host_name)))
+        agent_meta_list = aggregator.load_agent_meta_list(
+            shared_dir_path=TMP_TEST_SHARED_DIR)
+        assert_equal(
+            [agent_meta_dict['host_name']
+             for agent_meta_dict in agent_meta_list],
+            host_name_list)
+        assert_equal(
+            sorted(agent_meta_dict['pid']
+                   for agent_meta_dict in agent_meta_list),
+            sorted(process.pid for process in process_list))
+
+        multi_node_aggregator = aggregator.MultiNodeAggregator(
+            shared_dir_path=TMP_TEST_SHARED_DIR,
+            host_name_list=host_name_list, log_dir_path=TMP_TEST_LOG_DIR,
+            window_seconds=60, merge_interval_seconds=0.2)
+        multi_node_aggregator.start()
+        assert_true(multi_node_aggregator.is_alive())
+        time.sleep(1.5)
+        merged_df = pd.read_csv(multi_node_aggregator.get_log_file_path())
+        assert_true(merged_df['timestamp'].is_monotonic_increasing)
+        for host_name in host_name_list:
+            column_name = aggregator.get_host_column_name(
+                host_name=host_name,
+                column_name=collectors.COLUMN_NAME_MEMORY_USAGE)
+            assert_greater(merged_df[column_name].notnull().sum(), 3)
+
+        # The columns of the overlaid panels are in the merged log.
+        panel_list = aggregator.make_multi_node_panel_list(
+            agent_meta_list=agent_meta_list)
+        for panel_dict in panel_list:
+            for column_name in panel_dict['column_list']:
+                assert_true(column_name in merged_df.columns)
+    finally:
+        if multi_node_aggregator is not None:
+            multi_node_aggregator.stop()
+        for process in process_list:
+            process.terminate()
+            process.wait(timeout=10)
+    assert_true(not multi_node_aggregator.is_alive())
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_multi_node_aggregator_error():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_aggregator:test_multi_node_aggregator_error --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    host_dir_path = agent.get_host_dir_path(
+        shared_dir_path=TMP_TEST_SHARED_DIR, host_name='node-1')
+    os.makedirs(host_dir_path)
+    log_file_path = collector.get_log_file_path(log_dir_path=host_dir_path)
+    host_df = pd.DataFrame({
+        'timestamp': [100.0, 101.0],
+        'memory usage (MB)': [10, 11],
+    })
+    host_df.to_csv(log_file_path, index=False)
+    multi_node_aggregator = aggregator.MultiNodeAggregator(
+        shared_dir_path=TMP_TEST_SHARED_DIR, host_name_list=['node-1'],
+        log_dir_path=TMP_TEST_LOG_DIR, window_seconds=60,
+        merge_interval_seconds=0.1)
+    multi_node_aggregator.start()
+    try:
+        # The thread keeps merging after an error of a merge.
+        with open(log_file_path, 'w'):
+            pass
+        time.sleep(0.5)
+        assert_true(multi_node_aggregator.is_alive())
+        assert_true('EmptyDataError' in multi_node_aggregator.error_str)
+
+        host_df.to_csv(log_file_path, index=False)
+        time.sleep(0.5)
+        assert_true(multi_node_aggregator.is_alive())
+        assert_equal(multi_node_aggregator.error_str, None)
+    finally:
+        multi_node_aggregator.stop()
+    shutil.rmtree(TMP_TEST_SHARED_DIR, ignore_errors=True)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
@@ -0,0 +1,110 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_benchmark --skip_jupyter 1
+"""
+
+import os
+import shutil
+
+from nose.tools import assert_equal, assert_true, assert_false, \
+    assert_greater
+
+import psutil
+
+from plot_playground.stats import benchmark
+from plot_playground.stats import collectors
+
+TMP_TEST_PROC_DIR = './log_plotplayground_stats/test_benchmark_proc/'
+
+
+def test_FakeGPUStat():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_benchmark:test_FakeGPUStat --skip_jupyter 1
+    """
+    command_result = benchmark.FakeGPUStat(gpu_num=0)()
+    assert_equal(collectors._get_gpu_num(command_result=command_result), 0)
+
+    command_result = benchmark.FakeGPUStat(gpu_num=3)()
+    assert_equal(collectors._get_gpu_num(command_result=command_result), 3)
+    gpu_memory_usage_mb = collectors._get_gpu_memory_usage(
+        gpu_idx=2, command_result=command_result)
+    assert_equal(gpu_memory_usage_mb, benchmark.FAKE_GPU_MEMORY_USED_MB)
+
+
+def test_make_fake_proc_tree():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_benchmark:test_make_fake_proc_tree --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+    benchmark.make_fake_proc_tree(proc_root=TMP_TEST_PROC_DIR, process_num=5)
+    assert_true(os.path.exists(os.path.join(TMP_TEST_PROC_DIR, '5/stat')))
+    assert_false(os.path.exists(os.path.join(TMP_TEST_PROC_DIR, '6')))
+
+    collector_list = collectors.setup_collectors(
+        collector_list=benchmark.make_benchmark_collector_list(
+            proc_root=TMP_TEST_PROC_DIR, gpu_num=2))
+    collector_dict = {
+        collector.name: collector for collector in collector_list}
+    assert_equal(collector_dict['cpu'].cpu_num, benchmark.FAKE_CPU_NUM)
+    assert_equal(collector_dict['gpu'].gpu_num, 2)
+    value_dict = collector_dict['gpu'].collect()
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_GPU_KERNEL_MEMORY_FORMAT.format(
+            gpu_idx=1)],
+        benchmark.FAKE_GPU_MEMORY_USED_MB)
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_GPU_POWER_FORMAT.format(
+            gpu_idx=1)], 58)
+    collector_dict['proc_stats'].page_size = 4096
+    value_dict = collector_dict['proc_stats'].collect()
+    assert_equal(value_dict[collectors.COLUMN_NAME_SYSTEM_MEMORY_USED], 4000)
+    assert_equal(value_dict[collectors.COLUMN_NAME_KERNEL_RSS], 10)
+
+    # The memory metric reads the fake processes through psutil.
+    pre_procfs_path = psutil.PROCFS_PATH
+    with benchmark.use_fake_procfs(proc_root=TMP_TEST_PROC_DIR):
+        value_dict = collector_dict['memory'].collect()
+    assert_equal(psutil.PROCFS_PATH, pre_procfs_path)
+    expected_memory_usage = int(
+        5 * benchmark.FAKE_PROCESS_RSS_PAGES * os.sysconf('SC_PAGE_SIZE')
+        / 1048576)
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_MEMORY_USAGE],
+        expected_memory_usage)
+
+    for collector in collector_list:
+        collector.close()
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test_run_benchmark():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_benchmark:test_run_benchmark --skip_jupyter 1
+    """
+    result_list = benchmark.run_benchmark(
+        process_num_list=[2, 20], gpu_num_list=[0, 2], tick_num=3)
+    metric_name_list = [
+        result_dict['metric_name'] for result_dict in result_list]
+    # The GPU metric is measured only when the fake GPUs exist.
+    assert_equal(metric_name_list.count('gpu'), 2)
+    assert_equal(metric_name_list.count('memory'), 4)
+    assert_equal(
+        sorted(set(metric_name_list)),
+        sorted(collectors.COLLECTOR_CLASS_DICT.keys()))
+    for result_dict in result_list:
+        assert_greater(result_dict['p50_us'], 0)
+        assert_true(
+            result_dict['p50_us'] <= result_dict['p99_us']
+            <= result_dict['max_us'])
+
+    table_str = benchmark.format_result_table(result_list=result_list)
+    line_list = table_str.split('\n')
+    assert_equal(len(line_list), len(result_list) + 1)
+    assert_true('p99_us' in line_list[0])
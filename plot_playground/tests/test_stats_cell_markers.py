@@ -0,0 +1,216 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_cell_markers --skip_jupyter 1
+"""
+
+import os
+import shutil
+
+from IPython.core import events
+from nose.tools import assert_equal, assert_true, assert_false, \
+    assert_raises
+import numpy as np
+
+from plot_playground.stats import cell_markers
+
+TMP_TEST_LOG_DIR = './log_plotplayground_stats/test_cell_markers/'
+
+_STATUS_STR = """Name:\tpython
+VmPeak:\t  900000 kB
+VmHWM:\t  {peak_rss_kb} kB
+VmRSS:\t  {rss_kb} kB
+Threads:\t4
+"""
+
+
+class _FakeShell():
+
+    def __init__(self):
+        """
+        Class of the IPython shell for testing, having the execution
+        count and the event manager of IPython.
+        """
+        self.execution_count = 1
+        self.events = events.EventManager(
+            shell=self, available_events=events.available_events)
+
+
+class _FakeExecutionInfo():
+
+    def __init__(self, raw_cell):
+        """
+        Class of the information of the executed cell for testing.
+
+        Parameters
+        ----------
+        raw_cell : str
+            Source of the cell.
+        """
+        self.raw_cell = raw_cell
+
+
+def _write_status(rss_kb, peak_rss_kb):
+    """
+    Write the fake /proc/self/status for testing.
+
+    Parameters
+    ----------
+    rss_kb : int
+        VmRSS in kilobytes.
+    peak_rss_kb : int
+        VmHWM in kilobytes.
+
+    Returns
+    -------
+    proc_root : str
+        Root directory of the fake proc file system.
+    """
+    proc_root = os.path.join(TMP_TEST_LOG_DIR, 'proc')
+    os.makedirs(os.path.join(proc_root, 'self'), exist_ok=True)
+    with open(os.path.join(proc_root, 'self/status'), 'w') as f:
+        f.write(_STATUS_STR.format(rss_kb=rss_kb, peak_rss_kb=peak_rss_kb))
+    return proc_root
+
+
+def test_get_first_source_line():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cell_markers:test_get_first_source_line --skip_jupyter 1
+    """
+    source_line = cell_markers.get_first_source_line(
+        source='\n  \n  df = load()\nprint(df)')
+    assert_equal(source_line, 'df = load()')
+    assert_equal(cell_markers.get_first_source_line(source=''), '')
+    source_line = cell_markers.get_first_source_line(source='a' * 100)
+    assert_equal(len(source_line), cell_markers.SOURCE_LINE_MAX_LENGTH)
+    assert_true(source_line.endswith('...'))
+
+
+def test__read_rss_kb():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cell_markers:test__read_rss_kb --skip_jupyter 1
+    """
+    proc_root = _write_status(rss_kb=1024, peak_rss_kb=4096)
+    rss_kb, peak_rss_kb = cell_markers._read_rss_kb(proc_root=proc_root)
+    assert_equal(rss_kb, 1024)
+    assert_equal(peak_rss_kb, 4096)
+
+    rss_kb, peak_rss_kb = cell_markers._read_rss_kb(proc_root='/proc')
+    assert_true(0 < rss_kb <= peak_rss_kb)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_cell_marker_log():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cell_markers:test_cell_marker_log --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    os.makedirs(TMP_TEST_LOG_DIR)
+    cell_marker_log = cell_markers.CellMarkerLog(max_cell_num=2)
+
+    # The end marker of the cell started before the collector.
+    cell_marker_log.apply_marker(marker_dict={
+        'marker': cell_markers.CELL_MARKER_END, 'execution_count': 1,
+        'timestamp': 5.0, 'duration_seconds': 1.0, 'peak_rss_mb': 100})
+    assert_equal(len(cell_marker_log.cell_deque), 0)
+    cell_marker_log.save_csv(log_dir_path=TMP_TEST_LOG_DIR)
+    assert_false(os.path.exists(cell_markers.get_cell_log_file_path(
+        log_dir_path=TMP_TEST_LOG_DIR)))
+
+    cell_marker_log.update_values(row_dict={
+        'timestamp': 9.0, 'gpu(0) memory usage (MB)': 100,
+        'gpu(1) memory usage (MB)': 200, 'memory usage (MB)': 1000})
+    for execution_count, start_timestamp in ((2, 10.0), (3, 20.0)):
+        cell_marker_log.apply_marker(marker_dict={
+            'marker': cell_markers.CELL_MARKER_START,
+            'execution_count': execution_count,
+            'source_line': 'train(model, "a, b")',
+            'timestamp': start_timestamp})
+        cell_marker_log.update_values(row_dict={
+            'gpu(0) memory usage (MB)': 400})
+        cell_marker_log.apply_marker(marker_dict={
+            'marker': cell_markers.CELL_MARKER_END,
+            'execution_count': execution_count,
+            'timestamp': start_timestamp + 2.5, 'duration_seconds': 2.5,
+            'peak_rss_mb': 1200})
+    assert_equal(cell_marker_log.cell_deque[0]['gpu_memory_delta_mb'], 300)
+    assert_equal(cell_marker_log.cell_deque[1]['gpu_memory_delta_mb'], 0)
+
+    # The running cell has no end.
+    cell_marker_log.apply_marker(marker_dict={
+        'marker': cell_markers.CELL_MARKER_START, 'execution_count': 4,
+        'source_line': '', 'timestamp': 30.0})
+    assert_raises(
+        ValueError, cell_marker_log.apply_marker,
+        {'marker': 'unknown'})
+    cell_marker_log.save_csv(log_dir_path=TMP_TEST_LOG_DIR)
+    assert_false(cell_marker_log.is_changed)
+
+    df = cell_markers.load_cell_summary(log_dir_path=TMP_TEST_LOG_DIR)
+    assert_equal(list(df.columns), cell_markers.CELL_COLUMN_LIST)
+    assert_equal(df['execution_count'].tolist(), [3, 4])
+    assert_equal(df['source_line'].tolist(), ['train(model, "a, b")', ''])
+    assert_equal(df['duration_seconds'].iloc[0], 2.5)
+    assert_equal(df['peak_rss_mb'].iloc[0], 1200)
+    assert_true(np.isnan(df['end_timestamp'].iloc[1]))
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+    df = cell_markers.load_cell_summary(log_dir_path=TMP_TEST_LOG_DIR)
+    assert_equal(len(df), 0)
+    assert_equal(list(df.columns), cell_markers.CELL_COLUMN_LIST)
+
+
+def test_cell_tracker():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cell_markers:test_cell_tracker --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    proc_root = _write_status(rss_kb=1024 * 100, peak_rss_kb=1024 * 500)
+    marker_dict_list = []
+    cell_tracker = cell_markers.CellTracker(
+        send_marker=marker_dict_list.append, proc_root=proc_root)
+    shell = _FakeShell()
+    cell_tracker.register(shell=shell)
+
+    # The end of the cell in which the tracker has been registered.
+    shell.events.trigger('post_run_cell', None)
+    assert_equal(marker_dict_list, [])
+
+    shell.execution_count = 7
+    shell.events.trigger(
+        'pre_run_cell', _FakeExecutionInfo(raw_cell='# load\nx = 1\n'))
+    # The peak of the process is not raised in the cell, so the
+    # larger RSS of the start and the end is used.
+    _write_status(rss_kb=1024 * 300, peak_rss_kb=1024 * 500)
+    shell.events.trigger('post_run_cell', None)
+    assert_equal(len(marker_dict_list), 2)
+    start_marker_dict, end_marker_dict = marker_dict_list
+    assert_equal(start_marker_dict['marker'], cell_markers.CELL_MARKER_START)
+    assert_equal(start_marker_dict['execution_count'], 7)
+    assert_equal(start_marker_dict['source_line'], '# load')
+    assert_equal(end_marker_dict['marker'], cell_markers.CELL_MARKER_END)
+    assert_equal(end_marker_dict['execution_count'], 7)
+    assert_true(end_marker_dict['duration_seconds'] >= 0)
+    assert_true(
+        end_marker_dict['timestamp'] >= start_marker_dict['timestamp'])
+    assert_equal(end_marker_dict['peak_rss_mb'], 300)
+
+    # The cell raises the peak of the process.
+    shell.events.trigger('pre_run_cell', _FakeExecutionInfo(raw_cell=''))
+    _write_status(rss_kb=1024 * 300, peak_rss_kb=1024 * 800)
+    shell.events.trigger('post_run_cell', None)
+    assert_equal(marker_dict_list[-1]['peak_rss_mb'], 800)
+
+    cell_tracker.unregister()
+    cell_tracker.unregister()
+    shell.events.trigger('pre_run_cell', _FakeExecutionInfo(raw_cell=''))
+    assert_equal(len(marker_dict_list), 4)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
@@ -0,0 +1,281 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_cgroup --skip_jupyter 1
+"""
+
+import os
+import shutil
+
+from nose.tools import assert_equal, assert_true
+
+from plot_playground.stats import cgroup
+
+TMP_TEST_CGROUP_DIR = './log_plotplayground_stats/test_cgroup/'
+
+_CPU_STAT_V2_STR = """usage_usec 5000000
+user_usec 4000000
+system_usec 1000000
+nr_periods 200
+nr_throttled 10
+throttled_usec 300000
+"""
+
+_CPU_STAT_V1_STR = """nr_periods 200
+nr_throttled 10
+throttled_time 300000000
+"""
+
+
+def _write_cgroup_file(relative_path, file_str):
+    """
+    Write the file of the fake cgroup file system for testing.
+
+    Parameters
+    ----------
+    relative_path : str
+        Path of the file under TMP_TEST_CGROUP_DIR.
+    file_str : str
+        Content of the file.
+    """
+    file_path = os.path.join(TMP_TEST_CGROUP_DIR, relative_path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as f:
+        f.write(file_str)
+
+
+def _make_v2_tree():
+    """
+    Make the fake cgroup v2 file system, in which the kernel belongs
+    to the /kernel.slice cgroup.
+
+    Returns
+    -------
+    cgroup_root : str
+        Root directory of the fake cgroup file system.
+    proc_cgroup_path : str
+        Path of the fake /proc/self/cgroup.
+    """
+    shutil.rmtree(TMP_TEST_CGROUP_DIR, ignore_errors=True)
+    _write_cgroup_file(
+        relative_path='sys/cgroup.controllers', file_str='cpu memory\n')
+    _write_cgroup_file(
+        relative_path='sys/kernel.slice/memory.current',
+        file_str='%d\n' % (512 * 1048576))
+    _write_cgroup_file(
+        relative_path='sys/kernel.slice/memory.max',
+        file_str='%d\n' % (2048 * 1048576))
+    _write_cgroup_file(
+        relative_path='sys/kernel.slice/cpu.max', file_str='150000 100000\n')
+    _write_cgroup_file(
+        relative_path='sys/kernel.slice/cpu.stat', file_str=_CPU_STAT_V2_STR)
+    _write_cgroup_file(
+        relative_path='proc/cgroup', file_str='0::/kernel.slice\n')
+    return (
+        os.path.join(TMP_TEST_CGROUP_DIR, 'sys'),
+        os.path.join(TMP_TEST_CGROUP_DIR, 'proc/cgroup'))
+
+
+def _make_v1_tree():
+    """
+    Make the fake cgroup v1 file system, in which the kernel belongs
+    to the /docker/abc cgroup of the memory controller and the root
+    cgroup of the cpu and cpuacct controllers.
+
+    Returns
+    -------
+    cgroup_root : str
+        Root directory of the fake cgroup file system.
+    proc_cgroup_path : str
+        Path of the fake /proc/self/cgroup.
+    """
+    shutil.rmtree(TMP_TEST_CGROUP_DIR, ignore_errors=True)
+    _write_cgroup_file(
+        relative_path='sys/memory/docker/abc/memory.usage_in_bytes',
+        file_str='%d\n' % (512 * 1048576))
+    _write_cgroup_file(
+        relative_path='sys/memory/docker/abc/memory.limit_in_bytes',
+        file_str='9223372036854771712\n')
+    _write_cgroup_file(
+        relative_path='sys/cpu/cpu.cfs_quota_us', file_str='50000\n')
+    _write_cgroup_file(
+        relative_path='sys/cpu/cpu.cfs_period_us', file_str='100000\n')
+    _write_cgroup_file(
+        relative_path='sys/cpu/cpu.stat', file_str=_CPU_STAT_V1_STR)
+    _write_cgroup_file(
+        relative_path='sys/cpuacct/cpuacct.usage', file_str='5000000000\n')
+    _write_cgroup_file(
+        relative_path='proc/cgroup',
+        file_str='4:memory:/docker/abc\n2:cpu,cpuacct:/\n0::/\n')
+    return (
+        os.path.join(TMP_TEST_CGROUP_DIR, 'sys'),
+        os.path.join(TMP_TEST_CGROUP_DIR, 'proc/cgroup'))
+
+
+def test__parse_proc_cgroup():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cgroup:test__parse_proc_cgroup --skip_jupyter 1
+    """
+    controller_path_dict = cgroup._parse_proc_cgroup(
+        proc_cgroup_str='4:memory:/docker/abc\n2:cpu,cpuacct:/\n0::/\n')
+    assert_equal(controller_path_dict, {
+        'memory': '/docker/abc', 'cpu': '/', 'cpuacct': '/', '': '/'})
+    assert_equal(cgroup._parse_proc_cgroup(proc_cgroup_str=''), {})
+
+
+def test_detect_cgroup():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cgroup:test_detect_cgroup --skip_jupyter 1
+    """
+    cgroup_root, proc_cgroup_path = _make_v2_tree()
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=cgroup_root, proc_cgroup_path=proc_cgroup_path)
+    dir_path = os.path.join(cgroup_root, 'kernel.slice')
+    assert_equal(cgroup_dict, {
+        'version': cgroup.CGROUP_VERSION_2,
+        'memory_dir_path': dir_path,
+        'cpu_dir_path': dir_path,
+        'cpuacct_dir_path': dir_path,
+    })
+    assert_equal(
+        cgroup.get_file_path(cgroup_dict=cgroup_dict, file_key='cpu_stat'),
+        os.path.join(dir_path, 'cpu.stat'))
+
+    # The root cgroup of the host has no memory.current.
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=cgroup_root, proc_cgroup_path='./not_exists')
+    assert_equal(cgroup_dict, None)
+
+    cgroup_root, proc_cgroup_path = _make_v1_tree()
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=cgroup_root, proc_cgroup_path=proc_cgroup_path)
+    assert_equal(cgroup_dict, {
+        'version': cgroup.CGROUP_VERSION_1,
+        'memory_dir_path': os.path.join(cgroup_root, 'memory/docker/abc'),
+        'cpu_dir_path': os.path.join(cgroup_root, 'cpu'),
+        'cpuacct_dir_path': os.path.join(cgroup_root, 'cpuacct'),
+    })
+    assert_equal(
+        cgroup.get_file_path(cgroup_dict=cgroup_dict, file_key='cpu_usage'),
+        os.path.join(cgroup_root, 'cpuacct/cpuacct.usage'))
+
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=os.path.join(TMP_TEST_CGROUP_DIR, 'not_exists'),
+        proc_cgroup_path=proc_cgroup_path)
+    assert_equal(cgroup_dict, None)
+    shutil.rmtree(TMP_TEST_CGROUP_DIR, ignore_errors=True)
+
+
+def test_get_pressure_file_path():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cgroup:test_get_pressure_file_path --skip_jupyter 1
+    """
+    cgroup_root, proc_cgroup_path = _make_v2_tree()
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=cgroup_root, proc_cgroup_path=proc_cgroup_path)
+    assert_equal(
+        cgroup.get_pressure_file_path(
+            cgroup_dict=cgroup_dict, resource_name='memory'),
+        os.path.join(cgroup_root, 'kernel.slice/memory.pressure'))
+
+    cgroup_root, proc_cgroup_path = _make_v1_tree()
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=cgroup_root, proc_cgroup_path=proc_cgroup_path)
+    assert_equal(
+        cgroup.get_pressure_file_path(
+            cgroup_dict=cgroup_dict, resource_name='memory'),
+        None)
+    shutil.rmtree(TMP_TEST_CGROUP_DIR, ignore_errors=True)
+
+
+def test_read_memory_limit_bytes():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cgroup:test_read_memory_limit_bytes --skip_jupyter 1
+    """
+    cgroup_root, proc_cgroup_path = _make_v2_tree()
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=cgroup_root, proc_cgroup_path=proc_cgroup_path)
+    assert_equal(
+        cgroup.read_memory_limit_bytes(cgroup_dict=cgroup_dict),
+        2048 * 1048576)
+    _write_cgroup_file(
+        relative_path='sys/kernel.slice/memory.max', file_str='max\n')
+    assert_equal(cgroup.read_memory_limit_bytes(cgroup_dict=cgroup_dict), None)
+
+    # cgroup v1 reports a huge value if the memory is not limited.
+    cgroup_root, proc_cgroup_path = _make_v1_tree()
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=cgroup_root, proc_cgroup_path=proc_cgroup_path)
+    assert_equal(cgroup.read_memory_limit_bytes(cgroup_dict=cgroup_dict), None)
+    shutil.rmtree(TMP_TEST_CGROUP_DIR, ignore_errors=True)
+
+
+def test__parse_cpu_max():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cgroup:test__parse_cpu_max --skip_jupyter 1
+    """
+    assert_equal(cgroup._parse_cpu_max(cpu_max_str='150000 100000'), 1.5)
+    assert_equal(cgroup._parse_cpu_max(cpu_max_str='max 100000'), None)
+    assert_equal(cgroup._parse_cpu_max(cpu_max_str=None), None)
+
+
+def test_read_cpu_limit_cores():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cgroup:test_read_cpu_limit_cores --skip_jupyter 1
+    """
+    cgroup_root, proc_cgroup_path = _make_v2_tree()
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=cgroup_root, proc_cgroup_path=proc_cgroup_path)
+    assert_equal(cgroup.read_cpu_limit_cores(cgroup_dict=cgroup_dict), 1.5)
+
+    cgroup_root, proc_cgroup_path = _make_v1_tree()
+    cgroup_dict = cgroup.detect_cgroup(
+        cgroup_root=cgroup_root, proc_cgroup_path=proc_cgroup_path)
+    assert_equal(cgroup.read_cpu_limit_cores(cgroup_dict=cgroup_dict), 0.5)
+    _write_cgroup_file(
+        relative_path='sys/cpu/cpu.cfs_quota_us', file_str='-1\n')
+    assert_equal(cgroup.read_cpu_limit_cores(cgroup_dict=cgroup_dict), None)
+    shutil.rmtree(TMP_TEST_CGROUP_DIR, ignore_errors=True)
+
+
+def test_parse_cpu_stat():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_cgroup:test_parse_cpu_stat --skip_jupyter 1
+    """
+    expected_dict = {
+        'usage_seconds': 5.0,
+        'period_num': 200,
+        'throttled_num': 10,
+        'throttled_seconds': 0.3,
+    }
+    cpu_stat_dict = cgroup.parse_cpu_stat(
+        version=cgroup.CGROUP_VERSION_2,
+        cpu_stat_bytes=memoryview(_CPU_STAT_V2_STR.encode()))
+    assert_equal(cpu_stat_dict, expected_dict)
+
+    cpu_stat_dict = cgroup.parse_cpu_stat(
+        version=cgroup.CGROUP_VERSION_1,
+        cpu_stat_bytes=_CPU_STAT_V1_STR.encode(),
+        cpu_usage_bytes=b'5000000000\n')
+    assert_equal(cpu_stat_dict, expected_dict)
+
+    # Without the cpu controller enabled, only the usage is reported.
+    cpu_stat_dict = cgroup.parse_cpu_stat(
+        version=cgroup.CGROUP_VERSION_2,
+        cpu_stat_bytes=b'usage_usec 1000\nuser_usec 1000\n')
+    assert_equal(cpu_stat_dict, {'usage_seconds': 0.001})
+    assert_true('period_num' not in cpu_stat_dict)
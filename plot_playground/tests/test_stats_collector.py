@@ -0,0 +1,662 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_collector --skip_jupyter 1
+"""
+
+import os
+import multiprocessing as mp
+import time
+import shutil
+import subprocess as sp
+import sys
+
+from multiprocessing.connection import Connection
+
+from nose.tools import assert_equal, assert_true, assert_false, \
+    assert_greater, assert_not_equal, assert_raises
+import numpy as np
+import pandas as pd
+
+from plot_playground.stats import cell_markers
+from plot_playground.stats import collector
+from plot_playground.stats import collectors
+from plot_playground.stats import history
+from plot_playground.stats import history_store
+from plot_playground.stats import scheduler
+from plot_playground.tests import stats_helper
+
+TMP_TEST_LOG_DIR = './log_plotplayground_stats/test_collector/'
+
+
+def test_get_log_file_path():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_get_log_file_path --skip_jupyter 1
+    """
+    log_file_path = collector.get_log_file_path(
+        log_dir_path='./log/')
+    assert_true(log_file_path.startswith('./log/'))
+    assert_true(log_file_path.endswith('.csv'))
+
+    tier_log_file_path = collector.get_log_file_path(
+        log_dir_path='./log/', tier_name='10s')
+    assert_true(tier_log_file_path.endswith('_10s.csv'))
+    assert_not_equal(tier_log_file_path, log_file_path)
+
+
+def test_get_column_list():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_get_column_list --skip_jupyter 1
+    """
+    column_list = collector.get_column_list(
+        collector_list=stats_helper.make_collector_list())
+    assert_equal(
+        column_list,
+        [
+            collector.COLUMN_NAME_TIMESTAMP,
+            collectors.COLUMN_NAME_MEMORY_USAGE,
+            'memory usage (MB) (p50)',
+            'memory usage (MB) (p95)',
+            'memory usage (MB) (p99)',
+            'memory usage (MB) (growth/min)',
+            'memory usage (MB) (min to limit)',
+            collectors.COLUMN_NAME_DISK_USAGE,
+        ])
+
+
+def test__save_csv():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test__save_csv --skip_jupyter 1
+    """
+    log_dir_path = TMP_TEST_LOG_DIR
+    os.makedirs(log_dir_path, exist_ok=True)
+    log_file_path = collector.get_log_file_path(
+        log_dir_path=log_dir_path)
+    if os.path.exists(log_file_path):
+        os.remove(log_file_path)
+    gpu_column_name = collectors.COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT.format(
+        gpu_idx=0)
+    collector._save_csv(
+        timestamp_array=np.array([100.0, 100.25]),
+        value_array=np.array([
+            [1, 4, 5],
+            [2, np.nan, np.nan],
+        ]),
+        column_list=[
+            collectors.COLUMN_NAME_MEMORY_USAGE,
+            collectors.COLUMN_NAME_DISK_USAGE,
+            gpu_column_name,
+        ],
+        log_file_path=log_file_path)
+    assert_true(
+        os.path.exists(log_file_path)
+    )
+    df = pd.read_csv(log_file_path)
+    assert_equal(len(df), 2)
+    assert_equal(
+        df[collector.COLUMN_NAME_TIMESTAMP].tolist(),
+        [100.0, 100.25]
+    )
+    assert_equal(
+        df[collectors.COLUMN_NAME_MEMORY_USAGE].tolist(),
+        [1, 2]
+    )
+    assert_equal(df[collectors.COLUMN_NAME_DISK_USAGE][0], 4)
+    assert_true(pd.isnull(df[collectors.COLUMN_NAME_DISK_USAGE][1]))
+    assert_equal(df[gpu_column_name][0], 5)
+    assert_true(pd.isnull(df[gpu_column_name][1]))
+    assert_equal(
+        df.columns.tolist()[0], collector.COLUMN_NAME_TIMESTAMP)
+
+    if os.path.exists(log_file_path):
+        os.remove(log_file_path)
+
+
+def test__send_sample_row():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test__send_sample_row --skip_jupyter 1
+    """
+    row_dict = {collectors.COLUMN_NAME_MEMORY_USAGE: 2}
+    sample_conn = collector._send_sample_row(
+        sample_conn=None, row_dict=row_dict)
+    assert_equal(sample_conn, None)
+
+    receive_conn, send_conn = mp.Pipe(duplex=False)
+    sample_conn = collector._send_sample_row(
+        sample_conn=send_conn, row_dict=row_dict)
+    assert_equal(sample_conn, send_conn)
+    assert_equal(receive_conn.recv(), row_dict)
+
+    receive_conn.close()
+    sample_conn = collector._send_sample_row(
+        sample_conn=send_conn, row_dict=row_dict)
+    assert_equal(sample_conn, None)
+
+
+def test_get_max_row_num():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_get_max_row_num --skip_jupyter 1
+    """
+    max_row_num = collector.get_max_row_num(
+        window_seconds=300,
+        metric_interval_seconds_dict={'memory': 0.25, 'disk': 5})
+    assert_equal(max_row_num, 1261)
+
+
+def test_get_row_num_per_second():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_get_row_num_per_second --skip_jupyter 1
+    """
+    row_num_per_second = collector.get_row_num_per_second(
+        metric_interval_seconds_dict={'memory': 0.25, 'disk': 5})
+    assert_equal(row_num_per_second, 4.2)
+
+
+def test_get_tier_setting_list():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_get_tier_setting_list --skip_jupyter 1
+    """
+    tier_setting_list = collector.get_tier_setting_list(
+        window_seconds=300)
+    assert_equal(tier_setting_list, history.DEFAULT_TIER_SETTING_LIST)
+
+    tier_setting_list = collector.get_tier_setting_list(
+        window_seconds=1200)
+    assert_equal(tier_setting_list[0]['retention_seconds'], 1200)
+    assert_equal(
+        history.DEFAULT_TIER_SETTING_LIST[0]['retention_seconds'], 600)
+
+
+def test_get_metric_interval_seconds_dict():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_get_metric_interval_seconds_dict --skip_jupyter 1
+    """
+    collector_list = stats_helper.make_collector_list()
+    metric_interval_seconds_dict = collector.\
+        get_metric_interval_seconds_dict(
+            collector_list=collector_list, metric_interval_seconds=None)
+    assert_equal(
+        metric_interval_seconds_dict,
+        {
+            'memory': collectors.MemoryCollector.default_interval_seconds,
+            'disk': collectors.DiskUsageCollector.default_interval_seconds,
+        })
+
+    metric_interval_seconds_dict = collector.\
+        get_metric_interval_seconds_dict(
+            collector_list=collector_list,
+            metric_interval_seconds={'disk': 10, 'gpu': 2})
+    assert_equal(metric_interval_seconds_dict['disk'], 10)
+    assert_false('gpu' in metric_interval_seconds_dict)
+
+    assert_raises(
+        ValueError,
+        collector.get_metric_interval_seconds_dict,
+        collector_list, {'unknown': 1})
+
+
+def test_sample_metrics():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_sample_metrics --skip_jupyter 1
+    """
+    collector_dict = {
+        collector.name: collector
+        for collector in stats_helper.make_collector_list()}
+    row_dict = collector.sample_metrics(
+        collector_dict=collector_dict,
+        metric_name_list=[collector._JOB_NAME_SAVE_CSV])
+    assert_equal(row_dict, None)
+
+    row_dict = collector.sample_metrics(
+        collector_dict=collector_dict,
+        metric_name_list=['memory', collector._JOB_NAME_SAVE_CSV])
+    assert_equal(
+        sorted(row_dict.keys()),
+        sorted([
+            collector.COLUMN_NAME_TIMESTAMP,
+            collectors.COLUMN_NAME_MEMORY_USAGE,
+            'memory usage (MB) (p50)',
+            'memory usage (MB) (p95)',
+            'memory usage (MB) (p99)']))
+    assert_greater(row_dict[collector.COLUMN_NAME_TIMESTAMP], 0)
+    # Only a value has been added, so all quantiles are the value.
+    assert_equal(
+        row_dict['memory usage (MB) (p99)'],
+        row_dict[collectors.COLUMN_NAME_MEMORY_USAGE])
+
+    row_dict = collector.sample_metrics(
+        collector_dict=collector_dict,
+        metric_name_list=['memory', 'disk'])
+    assert_true(collectors.COLUMN_NAME_DISK_USAGE in row_dict)
+
+
+def test_record_tick():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_record_tick --skip_jupyter 1
+    """
+    overhead_collector = collectors.OverheadCollector()
+    collector_dict = {
+        'memory': collectors.MemoryCollector(),
+        'overhead': overhead_collector,
+    }
+    collector.record_tick(
+        collector_dict=collector_dict, wall_seconds=0.003,
+        cpu_seconds=0.002)
+    value_dict = overhead_collector.collect()
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_COLLECTOR_TICK_WALL_TIME], 3.0)
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_COLLECTOR_TICK_CPU_TIME], 2.0)
+    assert_greater(value_dict[collectors.COLUMN_NAME_COLLECTOR_RSS], 0)
+    overhead_collector.close()
+
+
+def test__make_history_store():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test__make_history_store --skip_jupyter 1
+    """
+    log_dir_path = TMP_TEST_LOG_DIR
+    os.makedirs(log_dir_path, exist_ok=True)
+    history_db_path = collector.get_history_db_path(
+        log_dir_path=log_dir_path)
+    assert_true(history_db_path.startswith(log_dir_path))
+    store = collector._make_history_store(
+        history_db_path=history_db_path, history_retention_seconds=60,
+        collector_list=stats_helper.make_collector_list())
+    assert_equal(store.retention_seconds, 60)
+    assert_equal(
+        sorted(store.column_id_dict.keys()),
+        sorted([
+            collectors.COLUMN_NAME_MEMORY_USAGE,
+            'memory usage (MB) (p50)',
+            'memory usage (MB) (p95)',
+            'memory usage (MB) (p99)',
+            'memory usage (MB) (growth/min)',
+            'memory usage (MB) (min to limit)',
+            collectors.COLUMN_NAME_DISK_USAGE]))
+    store.add_row(
+        timestamp=100,
+        row_dict={collectors.COLUMN_NAME_DISK_USAGE: 10})
+    store.close()
+    df = history_store.load_history(
+        db_path=history_db_path, metrics=['disk'])
+    assert_equal(df[collectors.COLUMN_NAME_DISK_USAGE].tolist(), [10])
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+
+
+def test_save_tier_csv():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_save_tier_csv --skip_jupyter 1
+    """
+    log_dir_path = TMP_TEST_LOG_DIR
+    os.makedirs(log_dir_path, exist_ok=True)
+    tiered_history = history.TieredHistory(
+        column_list=[collectors.COLUMN_NAME_MEMORY_USAGE],
+        row_num_per_second=1)
+    for timestamp in [100, 101, 110]:
+        tiered_history.append(
+            timestamp=timestamp,
+            row_dict={collectors.COLUMN_NAME_MEMORY_USAGE: timestamp})
+
+    collector.save_tier_csv(
+        tiered_history=tiered_history, tier_name='raw',
+        log_dir_path=log_dir_path)
+    df = pd.read_csv(collector.get_log_file_path(
+        log_dir_path=log_dir_path))
+    assert_equal(
+        df[collectors.COLUMN_NAME_MEMORY_USAGE].tolist(), [100, 101, 110])
+
+    collector.save_tier_csv(
+        tiered_history=tiered_history, tier_name='10s',
+        log_dir_path=log_dir_path)
+    df = pd.read_csv(collector.get_log_file_path(
+        log_dir_path=log_dir_path, tier_name='10s'))
+    assert_equal(
+        df.columns.tolist(),
+        [collector.COLUMN_NAME_TIMESTAMP]
+        + tiered_history.get_rollup_column_list())
+    assert_equal(df[collector.COLUMN_NAME_TIMESTAMP].tolist(), [100])
+    assert_equal(
+        df[collectors.COLUMN_NAME_MEMORY_USAGE].tolist(), [100.5])
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+
+
+def test_start_collecting():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_start_collecting --skip_jupyter 1
+    """
+    log_dir_path = TMP_TEST_LOG_DIR
+    os.makedirs(log_dir_path, exist_ok=True)
+    log_file_path = collector.get_log_file_path(
+        log_dir_path=log_dir_path)
+    if os.path.exists(log_file_path):
+        os.remove(log_file_path)
+    # The stale log of the 1min tier left by the previous kernel.
+    tier_log_file_path = collector.get_log_file_path(
+        log_dir_path=log_dir_path, tier_name='1min')
+    with open(tier_log_file_path, 'w') as f:
+        f.write('timestamp,stale column\n100,1\n')
+    parent_pid = os.getpid()
+
+    pre_disabled_val = collectors.is_gpu_stats_disabled
+    collectors.is_gpu_stats_disabled = False
+    status_receive_conn, status_conn = mp.Pipe(duplex=False)
+    process = mp.Process(
+        target=collector.start_collecting,
+        kwargs={
+            'interval_seconds': 1,
+            'buffer_size': 2,
+            'log_dir_path': log_dir_path,
+            'parent_pid': parent_pid,
+            'metric_interval_seconds': {'memory': 0.5, 'disk': 1},
+            'collector_list': collectors.make_collector_list(
+                metrics=['memory', 'disk']),
+            'history_db_path': collector.get_history_db_path(
+                log_dir_path=log_dir_path),
+            'status_conn': status_conn,
+        })
+    process.daemon = True
+    process.start()
+
+    # The ready status is sent when the first sample has been written.
+    assert_true(status_receive_conn.poll(10))
+    status_dict = status_receive_conn.recv()
+    assert_equal(status_dict['status'], collector.STATUS_READY)
+    assert_true(os.path.exists(log_file_path))
+    # No bucket of the 1min tier has been stored yet, so its log has
+    # only the header.
+    tier_df = pd.read_csv(tier_log_file_path)
+    assert_equal(len(tier_df), 0)
+    is_in = collectors.COLUMN_NAME_MEMORY_USAGE in tier_df.columns
+    assert_true(is_in)
+    is_in = 'stale column' in tier_df.columns
+    assert_false(is_in)
+    assert_equal(
+        [metric_collector.name for metric_collector
+         in status_dict['collector_list']],
+        ['memory', 'disk'])
+    assert_equal(
+        status_dict['metric_interval_seconds_dict'],
+        {'memory': 0.5, 'disk': 1})
+    time.sleep(5)
+    process.terminate()
+    history_df = history_store.load_history(
+        db_path=collector.get_history_db_path(log_dir_path=log_dir_path),
+        metrics=['memory'])
+    assert_greater(len(history_df), 0)
+    assert_equal(
+        history_df.columns.tolist(),
+        [collector.COLUMN_NAME_TIMESTAMP,
+         collectors.COLUMN_NAME_MEMORY_USAGE,
+         'memory usage (MB) (p50)',
+         'memory usage (MB) (p95)',
+         'memory usage (MB) (p99)'])
+    df = pd.read_csv(log_file_path)
+    is_in = collector.COLUMN_NAME_TIMESTAMP in df.columns
+    assert_true(is_in)
+    is_in = collectors.COLUMN_NAME_MEMORY_USAGE in df.columns
+    assert_true(is_in)
+    is_in = collectors.COLUMN_NAME_DISK_USAGE in df.columns
+    assert_true(is_in)
+    timestamp_list = df[collector.COLUMN_NAME_TIMESTAMP].tolist()
+    assert_true(timestamp_list[-1] - timestamp_list[0] <= 5)
+    memory_usage_num = df[collectors.COLUMN_NAME_MEMORY_USAGE]\
+        .notnull().sum()
+    disk_usage_num = df[collectors.COLUMN_NAME_DISK_USAGE]\
+        .notnull().sum()
+    assert_greater(memory_usage_num, disk_usage_num)
+
+    collectors.is_gpu_stats_disabled = pre_disabled_val
+    shutil.rmtree(log_dir_path, ignore_errors=True)
+
+
+def test__receive_commands():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test__receive_commands --skip_jupyter 1
+    """
+    command_dict_list = collector._receive_commands(
+        command_conn=None)
+    assert_equal(command_dict_list, [])
+
+    receive_conn, send_conn = mp.Pipe(duplex=False)
+    command_dict_list = collector._receive_commands(
+        command_conn=receive_conn)
+    assert_equal(command_dict_list, [])
+    send_conn.send({'command': 'a'})
+    send_conn.send({'command': 'b'})
+    time.sleep(0.1)
+    command_dict_list = collector._receive_commands(
+        command_conn=receive_conn)
+    assert_equal(command_dict_list, [{'command': 'a'}, {'command': 'b'}])
+
+    send_conn.close()
+    command_dict_list = collector._receive_commands(
+        command_conn=receive_conn)
+    assert_equal(
+        command_dict_list, [{'command': collector.COMMAND_STOP}])
+
+
+def test_apply_command():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_apply_command --skip_jupyter 1
+    """
+    memory_collector = collectors.MemoryCollector()
+    collector_dict = {memory_collector.name: memory_collector}
+    column_list = collector.get_column_list(
+        collector_list=[memory_collector])
+    metric_interval_seconds_dict = {memory_collector.name: 1}
+    interval_scheduler = scheduler.IntervalScheduler()
+    interval_scheduler.add_job(
+        name=memory_collector.name, interval_seconds=1)
+    tiered_history = history.TieredHistory(
+        column_list=column_list[1:], row_num_per_second=1)
+    kwargs = {
+        'collector_dict': collector_dict,
+        'column_list': column_list,
+        'metric_interval_seconds_dict': metric_interval_seconds_dict,
+        'interval_scheduler': interval_scheduler,
+        'tiered_history': tiered_history,
+        'store': None,
+    }
+
+    is_stopped = collector.apply_command(
+        command_dict={
+            'command': collector.COMMAND_SET_INTERVAL,
+            'metric_name': memory_collector.name, 'interval_seconds': 0.5},
+        **kwargs)
+    assert_false(is_stopped)
+    assert_equal(
+        interval_scheduler.job_dict[memory_collector.name][
+            'interval_seconds'],
+        0.5)
+    assert_equal(tiered_history.raw_ring_buffer.capacity, 1201)
+
+    disk_collector = collectors.DiskUsageCollector()
+    is_stopped = collector.apply_command(
+        command_dict={
+            'command': collector.COMMAND_ADD_METRIC,
+            'collector': disk_collector, 'interval_seconds': 5},
+        **kwargs)
+    assert_false(is_stopped)
+    assert_equal(collector_dict[disk_collector.name], disk_collector)
+    assert_equal(column_list[-1], collectors.COLUMN_NAME_DISK_USAGE)
+    assert_equal(tiered_history.column_list, column_list[1:])
+    assert_true(disk_collector.name in interval_scheduler.get_job_names())
+
+    # The cell marker is ignored without the log of the cells.
+    marker_dict = {
+        'marker': cell_markers.CELL_MARKER_START, 'execution_count': 1,
+        'source_line': 'x = 1', 'timestamp': 10.0}
+    is_stopped = collector.apply_command(
+        command_dict={
+            'command': collector.COMMAND_CELL_MARKER, 'marker': marker_dict},
+        **kwargs)
+    assert_false(is_stopped)
+    cell_marker_log = cell_markers.CellMarkerLog()
+    is_stopped = collector.apply_command(
+        command_dict={
+            'command': collector.COMMAND_CELL_MARKER, 'marker': marker_dict},
+        cell_marker_log=cell_marker_log, **kwargs)
+    assert_false(is_stopped)
+    assert_equal(len(cell_marker_log.cell_deque), 1)
+
+    # The overshoots are ignored if the kernel_lag metric is not
+    # sampled.
+    command_dict = {
+        'command': collector.COMMAND_RECORD_LAG,
+        'lag_seconds_list': [0.001, 0.002]}
+    assert_false(collector.apply_command(command_dict=command_dict, **kwargs))
+    lag_collector = collectors.KernelLagCollector()
+    collector_dict[lag_collector.name] = lag_collector
+    assert_false(collector.apply_command(command_dict=command_dict, **kwargs))
+    assert_equal(lag_collector.lag_seconds_list, [0.001, 0.002])
+
+    command_dict = {
+        'command': collector.COMMAND_RECORD_HEAP,
+        'heap': {
+            'traced_mb': 10.5, 'tracemalloc_mb': 1.25,
+            'snapshot_seconds': 0.02}}
+    assert_false(collector.apply_command(command_dict=command_dict, **kwargs))
+    heap_collector = collectors.HeapSnapshotCollector()
+    collector_dict[heap_collector.name] = heap_collector
+    assert_false(collector.apply_command(command_dict=command_dict, **kwargs))
+    assert_equal(heap_collector.heap_dict['traced_mb'], 10.5)
+
+    is_stopped = collector.apply_command(
+        command_dict={'command': collector.COMMAND_STOP},
+        **kwargs)
+    assert_true(is_stopped)
+    assert_raises(
+        ValueError, collector.apply_command,
+        {'command': 'unknown'}, **kwargs)
+
+
+def test__exit_if_parent_process_has_died():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test__exit_if_parent_process_has_died --skip_jupyter 1
+    """
+    parent_pid = os.getpid()
+    kwargs = {'parent_pid': parent_pid}
+    process = mp.Process(
+        target=collector._exit_if_parent_process_has_died,
+        kwargs=kwargs
+    )
+    process.start()
+    assert_true(process.is_alive())
+    process.terminate()
+
+    kwargs['parent_pid'] = -1
+    process = mp.Process(
+        target=collector._exit_if_parent_process_has_died,
+        kwargs=kwargs
+    )
+    process.start()
+    time.sleep(10)
+    assert_false(process.is_alive())
+
+
+def test_send_status():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_send_status --skip_jupyter 1
+    """
+    is_sent = collector.send_status(
+        status_conn=None, status_dict={'status': collector.STATUS_READY})
+    assert_false(is_sent)
+
+    receive_conn, send_conn = mp.Pipe(duplex=False)
+    is_sent = collector.send_status(
+        status_conn=send_conn, status_dict={'status': collector.STATUS_READY})
+    assert_true(is_sent)
+    assert_equal(receive_conn.recv(), {'status': collector.STATUS_READY})
+
+    receive_conn.close()
+    is_sent = collector.send_status(
+        status_conn=send_conn, status_dict={'status': collector.STATUS_READY})
+    assert_false(is_sent)
+
+
+def test_main():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_main --skip_jupyter 1
+    """
+    command_read_fd, command_write_fd = os.pipe()
+    status_read_fd, status_write_fd = os.pipe()
+    command_conn = Connection(command_write_fd, readable=False)
+    status_conn = Connection(status_read_fd, writable=False)
+
+    # The startup error is sent through the status connection.
+    command_conn.send({
+        'command': collector.COMMAND_START,
+        'kwargs': {
+            'interval_seconds': 1,
+            'buffer_size': 2,
+            'log_dir_path': TMP_TEST_LOG_DIR,
+            'parent_pid': os.getpid(),
+            'metric_interval_seconds': {'unknown': 1},
+        },
+    })
+    assert_raises(
+        ValueError, collector.main,
+        ['--command_fd', str(command_read_fd),
+         '--status_fd', str(status_write_fd)])
+    status_dict = status_conn.recv()
+    assert_equal(status_dict['status'], collector.STATUS_ERROR)
+    assert_true('Unknown metric name' in status_dict['error'])
+    command_conn.close()
+    status_conn.close()
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_collector_module_imports():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collector:test_collector_module_imports --skip_jupyter 1
+    """
+    source_code = \
+        'import sys; import plot_playground.stats.collector; ' \
+        'print(",".join(sorted(sys.modules.keys())))'
+    completed_process = sp.run(
+        [sys.executable, '-c', source_code], stdout=sp.PIPE,
+        check=True, universal_newlines=True)
+    module_name_list = completed_process.stdout.strip().split('\n')[-1]\
+        .split(',')
+    for module_name in ['pandas', 'IPython', 'plot_playground.common.d3_helper']:
+        assert_false(module_name in module_name_list)
+
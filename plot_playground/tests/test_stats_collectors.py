@@ -0,0 +1,1599 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_collectors --skip_jupyter 1
+"""
+
+import os
+import pickle
+import shutil
+import threading
+
+from nose.tools import assert_equal, assert_true, assert_false, \
+    assert_greater, assert_raises, assert_almost_equal
+import psutil
+
+from plot_playground.stats import collectors
+from plot_playground.stats import quantiles
+from plot_playground.stats import trend
+from plot_playground.tests import stats_helper
+
+TMP_TEST_PROC_DIR = './log_plotplayground_stats/test_proc/'
+
+_PROC_STAT_STR_1 = """cpu  300 0 100 600 0 0 0 0 0 0
+cpu0 100 0 50 300 0 0 0 0 0 0
+cpu1 200 0 50 300 0 0 0 0 0 0
+intr 60198 0 0 0
+ctxt 135453
+"""
+
+_PROC_STAT_STR_2 = """cpu  500 0 100 800 0 0 0 0 0 0
+cpu0 150 0 50 350 0 0 0 0 0 0
+cpu1 350 0 50 400 0 0 0 0 0 0
+intr 60198 0 0 0
+ctxt 135453
+"""
+
+_DISKSTATS_STR_1 = """   7       0 loop0 10 0 20 0 10 0 20 0 0 0 0 0 0 0 0 0 0
+ 253       0 vda 100 0 2048 0 50 0 4096 0 0 0 0 0 0 0 0 0 0
+ 253       1 vda1 100 0 2048 0 50 0 4096 0 0 0 0 0 0 0 0 0 0
+"""
+
+_DISKSTATS_STR_2 = """   7       0 loop0 90 0 900 0 90 0 900 0 0 0 0 0 0 0 0 0 0
+ 253       0 vda 300 0 4096 0 150 0 8192 0 0 0 0 0 0 0 0 0 0
+ 253       1 vda1 300 0 4096 0 150 0 8192 0 0 0 0 0 0 0 0 0 0
+"""
+
+_NET_DEV_STR_1 = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: 1048576     940    0    0    0     0          0         0  1048576     940    0    0    0     0       0          0
+  eth0: 1048576    6922    0    0    0     0          0         0   2097152    2475    0    0    0     0       0          0
+"""
+
+_NET_DEV_STR_2 = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: 9437184     940    0    0    0     0          0         0  9437184     940    0    0    0     0       0          0
+  eth0: 3145728    6922    0    0    0     0          0         0   3145728    2475    0    0    0     0       0          0
+"""
+
+_MEMINFO_STR = """MemTotal:        8192000 kB
+MemFree:         1024000 kB
+MemAvailable:    6144000 kB
+Buffers:          102400 kB
+"""
+
+_PID_STAT_STR_FORMAT = '1234 (python (kernel)) S 1 1 1 0 -1 0 0 0 0 0 ' \
+    '{utime} {stime} 0 0 20 0 4 0 100 1000000 {rss} 0\n'
+
+
+class _TestClock():
+
+    def __init__(self):
+        """
+        A clock class for testing whose time is advanced manually.
+        """
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _write_proc_file(relative_path, file_str):
+    """
+    Write the file of the fake proc file system for testing.
+
+    Parameters
+    ----------
+    relative_path : str
+        Path of the file under TMP_TEST_PROC_DIR.
+    file_str : str
+        Content of the file.
+    """
+    stats_helper.write_proc_file(
+        proc_root=TMP_TEST_PROC_DIR, relative_path=relative_path,
+        file_str=file_str)
+
+
+def test__exec_gpustat_command():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__exec_gpustat_command --skip_jupyter 1
+
+    Notes
+    -----
+    Since this function depends on the OS and GPU, most of the functions
+    are tested manually in each environment.
+    """
+    pre_bool = collectors.is_gpu_stats_disabled
+    collectors.is_gpu_stats_disabled = True
+    command_result = collectors._exec_gpustat_command()
+    assert_equal(command_result, '')
+
+    collectors.is_gpu_stats_disabled = pre_bool
+
+
+
+def test__get_gpu_num():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__get_gpu_num --skip_jupyter 1
+    """
+    pre_func = collectors._exec_gpustat_command
+
+    def test_func_1():
+        return ''
+
+    collectors._exec_gpustat_command = test_func_1
+    gpu_num = collectors._get_gpu_num()
+    assert_equal(gpu_num, 0)
+
+    def test_func_2():
+        return 'Error on querying NVIDIA devices. Use --debug flag for details'
+
+    collectors._exec_gpustat_command = test_func_2
+    gpu_num = collectors._get_gpu_num()
+    assert_equal(gpu_num, 0)
+
+    def test_func_3():
+        return "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n"
+
+    collectors._exec_gpustat_command = test_func_3
+    gpu_num = collectors._get_gpu_num()
+    assert_equal(gpu_num, 1)
+
+    def test_func_4():
+        return "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n[1] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n"
+
+    collectors._exec_gpustat_command = test_func_4
+    gpu_num = collectors._get_gpu_num()
+    assert_equal(gpu_num, 2)
+    gpu_num = collectors._get_gpu_num(command_result=test_func_3())
+    assert_equal(gpu_num, 1)
+
+    collectors._exec_gpustat_command = pre_func
+
+
+
+def test__get_memory_usage():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__get_memory_usage --skip_jupyter 1
+    """
+    memory_usage = collectors._get_memory_usage()
+    assert_true(isinstance(memory_usage, int))
+    assert_greater(memory_usage, 0)
+
+
+
+def test__get_disk_usage():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__get_disk_usage --skip_jupyter 1
+    """
+    disk_usage_gb = collectors._get_disk_usage()
+    assert_true(isinstance(disk_usage_gb, float))
+    assert_greater(disk_usage_gb, 0)
+
+
+
+def test__get_gpustat_line_str_by_gpu_idx():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__get_gpustat_line_str_by_gpu_idx --skip_jupyter 1
+    """
+    pre_func = collectors._exec_gpustat_command
+
+    def test_func():
+        return "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n[1] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |\n"
+
+    collectors._exec_gpustat_command = test_func
+    target_line_str = collectors._get_gpustat_line_str_by_gpu_idx(
+        gpu_idx=1
+    )
+    assert_equal(
+        target_line_str,
+        "[1] Tesla K80        | 31'C,   0 % |     0 / 11441 MB |"
+    )
+
+    collectors._exec_gpustat_command = pre_func
+
+
+
+def test__get_gpu_memory_usage():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__get_gpu_memory_usage --skip_jupyter 1
+    """
+    pre_func = collectors._exec_gpustat_command
+
+    def test_func():
+        return "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |    110 / 11441 MB |\n[1] Tesla K80        | 31'C,   0 % |   250 / 11441 MB |\n"
+
+    gpu_memory_usage_mb = collectors._get_gpu_memory_usage(
+        gpu_idx=1, command_result=test_func()
+    )
+    assert_equal(gpu_memory_usage_mb, 250)
+
+    collectors._exec_gpustat_command = test_func
+    gpu_memory_usage_mb = collectors._get_gpu_memory_usage(
+        gpu_idx=0
+    )
+    assert_equal(gpu_memory_usage_mb, 110)
+    gpu_memory_usage_mb = collectors._get_gpu_memory_usage(
+        gpu_idx=1
+    )
+    assert_equal(gpu_memory_usage_mb, 250)
+
+    collectors._exec_gpustat_command = pre_func
+
+
+
+def test__update_gpu_disabled_bool():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__update_gpu_disabled_bool --skip_jupyter 1
+    """
+    pre_bool = collectors.is_gpu_stats_disabled
+    pre_func = collectors._exec_gpustat_command
+
+    collectors.is_gpu_stats_disabled = False
+
+    def raise_error():
+        raise Exception()
+
+    collectors._exec_gpustat_command = raise_error
+    collectors._update_gpu_disabled_bool()
+    assert_true(collectors.is_gpu_stats_disabled)
+
+    def pass_func():
+        pass
+
+    collectors._exec_gpustat_command = pass_func
+    collectors.is_gpu_stats_disabled = False
+    collectors._update_gpu_disabled_bool()
+    assert_false(collectors.is_gpu_stats_disabled)
+
+    def return_func():
+        return 'result'
+
+    collectors._exec_gpustat_command = return_func
+    command_result = collectors._update_gpu_disabled_bool()
+    assert_equal(command_result, 'result')
+
+    collectors.is_gpu_stats_disabled = pre_bool
+    collectors._exec_gpustat_command = pre_func
+
+
+def test_make_panel():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_make_panel --skip_jupyter 1
+    """
+    panel_dict = collectors.make_panel(
+        title='test', column_list=['a', 'b'], unit='MB')
+    assert_equal(
+        panel_dict,
+        {
+            'title': 'test',
+            'column_list': ['a', 'b'],
+            'unit': 'MB',
+            'decimal_num': 0,
+            'label_list': [],
+            'height': collectors.PANEL_HEIGHT,
+            'quantile_list': [],
+            'trend_window_seconds': None,
+            'alert_minutes_to_limit': None,
+        })
+
+    # The height fits the information texts.
+    panel_dict = collectors.make_panel(
+        title='test', column_list=['a', 'b'], unit='MB',
+        label_list=['a', 'b'], quantile_list=[0.5, 0.99],
+        trend_window_seconds=600)
+    assert_equal(
+        panel_dict['height'], 11 * collectors.INFO_TEXT_LINE_HEIGHT)
+    panel_dict = collectors.make_panel(
+        title='test', column_list=['a', 'b'], unit='MB',
+        label_list=['a', 'b'], quantile_list=[0.5, 0.99],
+        trend_window_seconds=600, height=100)
+    assert_equal(panel_dict['height'], 100)
+
+
+def test_RateCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_RateCollector --skip_jupyter 1
+    """
+    counter_dict_list = [{'a': 10}, {'a': 30}, {'a': 5}, {'a': 15}]
+
+    class TestRateCollector(collectors.RateCollector):
+
+        def read_counters(self):
+            return counter_dict_list.pop(0)
+
+    test_clock = _TestClock()
+    rate_collector = TestRateCollector(clock=test_clock)
+    assert_equal(rate_collector.collect(), {})
+    test_clock.now = 2.0
+    assert_equal(rate_collector.collect(), {'a': 10})
+
+    # The counter has been reset.
+    test_clock.now = 3.0
+    assert_equal(rate_collector.collect(), {})
+    test_clock.now = 4.0
+    assert_equal(rate_collector.collect(), {'a': 10})
+
+
+def test__parse_proc_stat_cpu_times():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_proc_stat_cpu_times --skip_jupyter 1
+    """
+    cpu_time_dict = collectors._parse_proc_stat_cpu_times(
+        proc_stat_str=_PROC_STAT_STR_1)
+    assert_equal(cpu_time_dict, {0: (150, 450), 1: (250, 550)})
+
+
+def test_CPUCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_CPUCollector --skip_jupyter 1
+    """
+    _write_proc_file(relative_path='stat', file_str=_PROC_STAT_STR_1)
+    test_clock = _TestClock()
+    cpu_collector = collectors.CPUCollector(
+        proc_root=TMP_TEST_PROC_DIR, clock=test_clock)
+    cpu_collector.setup()
+    assert_equal(cpu_collector.cpu_num, 2)
+    panel_list = cpu_collector.get_panel_list()
+    assert_equal(len(panel_list), 1)
+    assert_equal(len(cpu_collector.get_column_list()), 2)
+    assert_equal(cpu_collector.collect(), {})
+
+    _write_proc_file(relative_path='stat', file_str=_PROC_STAT_STR_2)
+    test_clock.now = 1.0
+    value_dict = cpu_collector.collect()
+    column_name_0 = collectors.COLUMN_NAME_CPU_UTILIZATION_FORMAT.format(
+        cpu_idx=0)
+    column_name_1 = collectors.COLUMN_NAME_CPU_UTILIZATION_FORMAT.format(
+        cpu_idx=1)
+    assert_equal(value_dict[column_name_0], 50.0)
+    assert_equal(value_dict[column_name_1], 60.0)
+
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test_ProcFileReader():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_ProcFileReader --skip_jupyter 1
+    """
+    _write_proc_file(relative_path='meminfo', file_str='abc')
+    reader = collectors.ProcFileReader(
+        file_path=os.path.join(TMP_TEST_PROC_DIR, 'meminfo'), buffer_size=4)
+    assert_equal(bytes(reader.read()), b'abc')
+
+    # The kept open file is read again from the beginning, and the
+    # buffer grows when the content does not fit.
+    _write_proc_file(relative_path='meminfo', file_str='abcdefghij')
+    assert_equal(bytes(reader.read()), b'abcdefghij')
+    assert_equal(len(reader.buffer), 16)
+    reader.close()
+    assert_equal(reader.fd, None)
+    reader.close()
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test__parse_meminfo_used_kb():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_meminfo_used_kb --skip_jupyter 1
+    """
+    used_memory_kb = collectors._parse_meminfo_used_kb(
+        meminfo_bytes=_MEMINFO_STR.encode())
+    assert_equal(used_memory_kb, 2048000)
+
+
+def test__parse_proc_stat_total_cpu_times():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_proc_stat_total_cpu_times --skip_jupyter 1
+    """
+    cpu_times = collectors._parse_proc_stat_total_cpu_times(
+        proc_stat_bytes=memoryview(_PROC_STAT_STR_1.encode()))
+    assert_equal(cpu_times, (400, 1000))
+
+
+def test__parse_proc_pid_stat():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_proc_pid_stat --skip_jupyter 1
+    """
+    process_time, rss_pages = collectors._parse_proc_pid_stat(
+        pid_stat_bytes=_PID_STAT_STR_FORMAT.format(
+            utime=100, stime=50, rss=300).encode())
+    assert_equal(process_time, 150)
+    assert_equal(rss_pages, 300)
+
+    process_time, rss_pages = collectors._parse_proc_pid_stat(
+        pid_stat_bytes=open('/proc/self/stat', 'rb').read())
+    assert_greater(rss_pages, 0)
+
+
+def test_ProcStatsCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_ProcStatsCollector --skip_jupyter 1
+    """
+    _write_proc_file(relative_path='meminfo', file_str=_MEMINFO_STR)
+    _write_proc_file(relative_path='stat', file_str=_PROC_STAT_STR_1)
+    _write_proc_file(
+        relative_path='1234/stat',
+        file_str=_PID_STAT_STR_FORMAT.format(utime=100, stime=50, rss=25600))
+    test_clock = _TestClock()
+    proc_stats_collector = collectors.ProcStatsCollector(
+        pid=1234, proc_root=TMP_TEST_PROC_DIR, clock=test_clock)
+    proc_stats_collector.clock_ticks_per_second = 100
+    proc_stats_collector.page_size = 4096
+    assert_true(proc_stats_collector.supports_thread_sampling)
+    # The memory columns also have the columns of the quantiles and
+    # the trends.
+    assert_equal(len(proc_stats_collector.get_column_list()), 14)
+    value_dict = proc_stats_collector.collect()
+    assert_equal(value_dict, {
+        collectors.COLUMN_NAME_SYSTEM_MEMORY_USED: 2000,
+        collectors.COLUMN_NAME_KERNEL_RSS: 100,
+    })
+
+    _write_proc_file(relative_path='stat', file_str=_PROC_STAT_STR_2)
+    _write_proc_file(
+        relative_path='1234/stat',
+        file_str=_PID_STAT_STR_FORMAT.format(utime=150, stime=100, rss=25600))
+    test_clock.now = 1.0
+    value_dict = proc_stats_collector.collect()
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_SYSTEM_CPU_UTILIZATION], 50.0)
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_KERNEL_CPU_UTILIZATION], 100.0)
+
+    # The opened files are not pickled.
+    copied_collector = pickle.loads(pickle.dumps(proc_stats_collector))
+    assert_equal(copied_collector.reader_dict, None)
+    proc_stats_collector.close()
+    assert_equal(proc_stats_collector.reader_dict, None)
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test__parse_proc_diskstats():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_proc_diskstats --skip_jupyter 1
+    """
+    diskstats_dict = collectors._parse_proc_diskstats(
+        diskstats_str=_DISKSTATS_STR_1)
+    assert_equal(sorted(diskstats_dict.keys()), ['loop0', 'vda', 'vda1'])
+    assert_equal(
+        diskstats_dict['vda'],
+        {
+            'read_count': 100,
+            'read_sectors': 2048,
+            'write_count': 50,
+            'write_sectors': 4096,
+        })
+
+
+def test__get_whole_disk_name_list():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__get_whole_disk_name_list --skip_jupyter 1
+    """
+    sys_block_dir = os.path.join(TMP_TEST_PROC_DIR, 'block')
+    whole_disk_name_list = collectors._get_whole_disk_name_list(
+        device_name_list=['loop0', 'ram0', 'vda', 'vda1'],
+        sys_block_dir=sys_block_dir)
+    assert_equal(whole_disk_name_list, ['vda', 'vda1'])
+
+    os.makedirs(os.path.join(sys_block_dir, 'vda'), exist_ok=True)
+    whole_disk_name_list = collectors._get_whole_disk_name_list(
+        device_name_list=['loop0', 'ram0', 'vda', 'vda1'],
+        sys_block_dir=sys_block_dir)
+    assert_equal(whole_disk_name_list, ['vda'])
+
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test_DiskIOCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_DiskIOCollector --skip_jupyter 1
+    """
+    _write_proc_file(relative_path='diskstats', file_str=_DISKSTATS_STR_1)
+    sys_block_dir = os.path.join(TMP_TEST_PROC_DIR, 'block')
+    os.makedirs(os.path.join(sys_block_dir, 'vda'), exist_ok=True)
+    test_clock = _TestClock()
+    disk_io_collector = collectors.DiskIOCollector(
+        proc_root=TMP_TEST_PROC_DIR, sys_block_dir=sys_block_dir,
+        clock=test_clock)
+    disk_io_collector.setup()
+    assert_equal(disk_io_collector.device_name_list, ['vda'])
+    assert_equal(len(disk_io_collector.get_panel_list()), 2)
+    assert_equal(disk_io_collector.collect(), {})
+
+    _write_proc_file(relative_path='diskstats', file_str=_DISKSTATS_STR_2)
+    test_clock.now = 2.0
+    value_dict = disk_io_collector.collect()
+    assert_almost_equal(
+        value_dict[collectors.COLUMN_NAME_DISK_READ_THROUGHPUT], 0.5)
+    assert_almost_equal(
+        value_dict[collectors.COLUMN_NAME_DISK_WRITE_THROUGHPUT], 1.0)
+    assert_almost_equal(
+        value_dict[collectors.COLUMN_NAME_DISK_READ_IOPS], 100)
+    assert_almost_equal(
+        value_dict[collectors.COLUMN_NAME_DISK_WRITE_IOPS], 50)
+
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test__parse_proc_net_dev():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_proc_net_dev --skip_jupyter 1
+    """
+    net_dev_dict = collectors._parse_proc_net_dev(
+        net_dev_str=_NET_DEV_STR_1)
+    assert_equal(
+        net_dev_dict,
+        {
+            'lo': {'receive_bytes': 1048576, 'send_bytes': 1048576},
+            'eth0': {'receive_bytes': 1048576, 'send_bytes': 2097152},
+        })
+
+
+def test_NetworkCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_NetworkCollector --skip_jupyter 1
+    """
+    _write_proc_file(relative_path='net/dev', file_str=_NET_DEV_STR_1)
+    test_clock = _TestClock()
+    network_collector = collectors.NetworkCollector(
+        proc_root=TMP_TEST_PROC_DIR, clock=test_clock)
+    network_collector.setup()
+    assert_equal(network_collector.collect(), {})
+
+    _write_proc_file(relative_path='net/dev', file_str=_NET_DEV_STR_2)
+    test_clock.now = 2.0
+    value_dict = network_collector.collect()
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_NETWORK_RECEIVE_THROUGHPUT], 1.0)
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_NETWORK_SEND_THROUGHPUT], 0.5)
+
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+# The results of the gpustat command recorded on the hosts, with the
+# options of the GPUSTAT_COMMAND_LIST and without them (the power and
+# the processes are not shown).
+_GPUSTAT_STR = """gpu-host-1  Tue Mar  5 10:12:45 2019
+[0] GeForce GTX 1080 Ti | 67'C,  98 %,  231 / 250 W |  9021 / 11178 MB | alice:python/23418(8511M) bob:python3/24001(499M)
+[1] GeForce GTX 1080 Ti | 35'C,   0 %,   11 / 250 W |     0 / 11178 MB |
+"""
+_GPUSTAT_DEFAULT_STR = """28cb5cca2ca4  Wed Feb 20 07:04:22 2019
+[0] Tesla K80        | 31'C,   0 % |    110 / 11441 MB | root(100M)
+"""
+
+
+def test__parse_gpustat_line():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_gpustat_line --skip_jupyter 1
+    """
+    gpu_dict = collectors._parse_gpustat_line(
+        line_str=_GPUSTAT_STR.split('\n')[1])
+    assert_equal(gpu_dict, {
+        'temperature_c': 67,
+        'utilization_percent': 98,
+        'power_draw_w': 231,
+        'power_limit_w': 250,
+        'memory_used_mb': 9021,
+        'memory_total_mb': 11178,
+        'process_list': [
+            {'username': 'alice', 'command': 'python', 'pid': 23418,
+             'memory_mb': 8511},
+            {'username': 'bob', 'command': 'python3', 'pid': 24001,
+             'memory_mb': 499},
+        ],
+    })
+    gpu_dict = collectors._parse_gpustat_line(
+        line_str=_GPUSTAT_STR.split('\n')[2])
+    assert_equal(gpu_dict['power_draw_w'], 11)
+    assert_equal(gpu_dict['process_list'], [])
+
+    gpu_dict = collectors._parse_gpustat_line(
+        line_str=_GPUSTAT_DEFAULT_STR.split('\n')[1])
+    assert_equal(gpu_dict['temperature_c'], 31)
+    assert_equal(gpu_dict['utilization_percent'], 0)
+    assert_equal(gpu_dict['power_draw_w'], None)
+    assert_equal(gpu_dict['memory_used_mb'], 110)
+    assert_equal(gpu_dict['memory_total_mb'], 11441)
+    assert_equal(gpu_dict['process_list'], [])
+
+    # The temperature of some GPUs is not available.
+    gpu_dict = collectors._parse_gpustat_line(
+        line_str="[0] Tesla M60 | ??'C,  12 %,   ?? / 300 W |  512 / 8129 MB |")
+    assert_equal(gpu_dict['temperature_c'], None)
+    assert_equal(gpu_dict['utilization_percent'], 12)
+    assert_equal(gpu_dict['power_draw_w'], None)
+    assert_equal(gpu_dict['memory_used_mb'], 512)
+
+
+def test_get_gpu_process_list():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_get_gpu_process_list --skip_jupyter 1
+    """
+    gpu_process_list = collectors.get_gpu_process_list(
+        command_result=_GPUSTAT_STR)
+    assert_equal(len(gpu_process_list), 2)
+    assert_equal(gpu_process_list[1], {
+        'gpu_idx': 0, 'username': 'bob', 'command': 'python3',
+        'pid': 24001, 'memory_mb': 499})
+    gpu_process_list = collectors.get_gpu_process_list(
+        command_result='Error on querying NVIDIA devices. '
+        'Use --debug flag for details')
+    assert_equal(gpu_process_list, [])
+
+
+def test_GPUMemoryCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_GPUMemoryCollector --skip_jupyter 1
+    """
+    pre_bool = collectors.is_gpu_stats_disabled
+    pre_func = collectors._exec_gpustat_command
+    executed_count_list = []
+
+    def test_func():
+        executed_count_list.append(1)
+        return "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |    110 / 11441 MB |\n[1] Tesla K80        | 31'C,   0 % |   250 / 11441 MB |\n"
+
+    collectors._exec_gpustat_command = test_func
+    gpu_memory_collector = collectors.GPUMemoryCollector()
+    gpu_memory_collector.setup()
+    assert_equal(gpu_memory_collector.gpu_num, 2)
+    assert_equal(len(executed_count_list), 1)
+    # The memory, the utilization and the temperature of each GPU.
+    assert_false(gpu_memory_collector.is_power_available)
+    assert_equal(len(gpu_memory_collector.get_panel_list()), 6)
+    executed_count_list.clear()
+    value_dict = gpu_memory_collector.collect()
+    column_name = collectors.COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT.format(
+        gpu_idx=1)
+    assert_equal(value_dict[column_name], 250)
+    assert_equal(len(executed_count_list), 1)
+
+    collectors._exec_gpustat_command = pre_func
+    collectors.is_gpu_stats_disabled = pre_bool
+
+    # A fake backend is used instead of the gpustat command.
+    gpu_memory_collector = collectors.GPUMemoryCollector(
+        gpustat_func=test_func)
+    gpu_memory_collector.setup()
+    assert_equal(gpu_memory_collector.gpu_num, 2)
+    value_dict = gpu_memory_collector.collect()
+    assert_equal(value_dict[column_name], 250)
+
+    # The recorded result with the power and the processes. The
+    # process 23418 is a child of the kernel.
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+    _write_fake_process(pid=23000, ppid=1)
+    _write_fake_process(pid=23418, ppid=23000)
+    _write_fake_process(pid=24001, ppid=1)
+    gpu_memory_collector = collectors.GPUMemoryCollector(
+        gpustat_func=lambda: _GPUSTAT_STR, pid=23000,
+        proc_root=TMP_TEST_PROC_DIR)
+    gpu_memory_collector.setup()
+    assert_true(gpu_memory_collector.is_power_available)
+    panel_list = gpu_memory_collector.get_panel_list()
+    assert_equal(
+        [panel_dict['title'] for panel_dict in panel_list[:4]],
+        ['gpu(0) memory usage (MB)', 'gpu(0) utilization (%)',
+         'gpu(0) temperature (C)', 'gpu(0) power (W)'])
+    assert_equal(panel_list[0]['label_list'], ['used', 'kernel'])
+    assert_equal(panel_list[3]['unit'], 'W')
+    assert_equal(len(panel_list), 8)
+    assert_equal(
+        gpu_memory_collector.get_limit_dict()[
+            'gpu(1) kernel memory (MB)'], 11178)
+    value_dict = gpu_memory_collector.collect()
+    assert_equal(value_dict, {
+        'gpu(0) memory usage (MB)': 9021,
+        'gpu(0) kernel memory (MB)': 8511,
+        'gpu(0) utilization (%)': 98,
+        'gpu(0) temperature (C)': 67,
+        'gpu(0) power (W)': 231,
+        'gpu(1) memory usage (MB)': 0,
+        'gpu(1) kernel memory (MB)': 0,
+        'gpu(1) utilization (%)': 0,
+        'gpu(1) temperature (C)': 35,
+        'gpu(1) power (W)': 11,
+    })
+
+    # The kernel memory is not sampled (e.g., by the shared daemon).
+    gpu_memory_collector = collectors.GPUMemoryCollector(
+        gpustat_func=lambda: _GPUSTAT_STR, pid=23000,
+        proc_root=TMP_TEST_PROC_DIR, is_kernel_memory_enabled=False)
+    gpu_memory_collector.setup()
+    panel_list = gpu_memory_collector.get_panel_list()
+    assert_equal(
+        panel_list[0]['column_list'], ['gpu(0) memory usage (MB)'])
+    assert_equal(panel_list[0]['label_list'], [])
+    is_in = 'gpu(1) kernel memory (MB)' in \
+        gpu_memory_collector.get_limit_dict()
+    assert_false(is_in)
+    value_dict = gpu_memory_collector.collect()
+    is_in = 'gpu(0) kernel memory (MB)' in value_dict
+    assert_false(is_in)
+    assert_equal(value_dict['gpu(0) memory usage (MB)'], 9021)
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test_OverheadCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_OverheadCollector --skip_jupyter 1
+    """
+    _write_proc_file(
+        relative_path='self/statm', file_str='5120 2560 300 5 0 100 0\n')
+    overhead_collector = collectors.OverheadCollector(
+        proc_root=TMP_TEST_PROC_DIR)
+    overhead_collector.page_size = 4096
+    assert_true(overhead_collector.supports_thread_sampling)
+    panel_list = overhead_collector.get_panel_list()
+    assert_equal(len(panel_list), 2)
+    assert_equal(panel_list[0]['height'], collectors.SMALL_PANEL_HEIGHT)
+
+    # The tick times are not returned before the first tick.
+    value_dict = overhead_collector.collect()
+    assert_equal(value_dict, {collectors.COLUMN_NAME_COLLECTOR_RSS: 10})
+
+    overhead_collector.record_tick(wall_seconds=0.002, cpu_seconds=0.001)
+    overhead_collector.record_tick(wall_seconds=0.001, cpu_seconds=0.0015)
+    value_dict = overhead_collector.collect()
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_COLLECTOR_TICK_WALL_TIME], 2.0)
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_COLLECTOR_TICK_CPU_TIME], 1.5)
+    value_dict = overhead_collector.collect()
+    assert_false(
+        collectors.COLUMN_NAME_COLLECTOR_TICK_WALL_TIME in value_dict)
+
+    copied_collector = pickle.loads(pickle.dumps(overhead_collector))
+    assert_equal(copied_collector.reader, None)
+    overhead_collector.close()
+    assert_equal(overhead_collector.reader, None)
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test_update_quantiles():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_update_quantiles --skip_jupyter 1
+    """
+    memory_collector = collectors.MemoryCollector()
+    p99_column_name = quantiles.get_quantile_column_name(
+        column_name=collectors.COLUMN_NAME_MEMORY_USAGE, quantile=0.99)
+    assert_true(p99_column_name in memory_collector.get_column_list())
+    for value in range(1, 1001):
+        quantile_value_dict = memory_collector.update_quantiles(
+            value_dict={collectors.COLUMN_NAME_MEMORY_USAGE: value})
+    assert_equal(len(quantile_value_dict), 3)
+    assert_almost_equal(quantile_value_dict[p99_column_name], 990, delta=5)
+
+    # Columns of the panels without the quantile_list are ignored.
+    disk_usage_collector = collectors.DiskUsageCollector()
+    quantile_value_dict = disk_usage_collector.update_quantiles(
+        value_dict={collectors.COLUMN_NAME_DISK_USAGE: 10})
+    assert_equal(quantile_value_dict, {})
+    assert_equal(
+        disk_usage_collector.get_column_list(),
+        [collectors.COLUMN_NAME_DISK_USAGE])
+
+
+def test__parse_meminfo_total_kb():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_meminfo_total_kb --skip_jupyter 1
+    """
+    total_memory_kb = collectors._parse_meminfo_total_kb(
+        meminfo_bytes=_MEMINFO_STR.encode())
+    assert_equal(total_memory_kb, 8192000)
+
+
+def test_get_memory_limit_mb():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_get_memory_limit_mb --skip_jupyter 1
+    """
+    _write_proc_file(relative_path='meminfo', file_str=_MEMINFO_STR)
+    cgroup_root = os.path.join(TMP_TEST_PROC_DIR, 'cgroup')
+    os.makedirs(cgroup_root, exist_ok=True)
+    memory_limit_mb = collectors.get_memory_limit_mb(
+        proc_root=TMP_TEST_PROC_DIR, cgroup_root=cgroup_root)
+    assert_equal(memory_limit_mb, 8000)
+
+    # cgroup v1 (a huge value means no limit).
+    _write_proc_file(
+        relative_path='cgroup/memory/memory.usage_in_bytes',
+        file_str='%d\n' % 1048576)
+    _write_proc_file(
+        relative_path='cgroup/memory/memory.limit_in_bytes',
+        file_str='9223372036854771712\n')
+    memory_limit_mb = collectors.get_memory_limit_mb(
+        proc_root=TMP_TEST_PROC_DIR, cgroup_root=cgroup_root)
+    assert_equal(memory_limit_mb, 8000)
+    _write_proc_file(
+        relative_path='cgroup/memory/memory.limit_in_bytes',
+        file_str='%d\n' % (2048 * 1048576))
+    memory_limit_mb = collectors.get_memory_limit_mb(
+        proc_root=TMP_TEST_PROC_DIR, cgroup_root=cgroup_root)
+    assert_equal(memory_limit_mb, 2048)
+    shutil.rmtree(cgroup_root, ignore_errors=True)
+
+    # cgroup v2.
+    _write_proc_file(
+        relative_path='cgroup/cgroup.controllers', file_str='memory\n')
+    _write_proc_file(
+        relative_path='cgroup/memory.current', file_str='%d\n' % 1048576)
+    _write_proc_file(relative_path='cgroup/memory.max', file_str='max\n')
+    memory_limit_mb = collectors.get_memory_limit_mb(
+        proc_root=TMP_TEST_PROC_DIR, cgroup_root=cgroup_root)
+    assert_equal(memory_limit_mb, 8000)
+    _write_proc_file(
+        relative_path='cgroup/memory.max', file_str='%d\n' % 1073741824)
+    memory_limit_mb = collectors.get_memory_limit_mb(
+        proc_root=TMP_TEST_PROC_DIR, cgroup_root=cgroup_root)
+    assert_equal(memory_limit_mb, 1024)
+    memory_limit_mb = collectors.get_memory_limit_mb(
+        proc_root=TMP_TEST_PROC_DIR, cgroup_root=None)
+    assert_equal(memory_limit_mb, 8000)
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test_CgroupCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_CgroupCollector --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+    cgroup_root = os.path.join(TMP_TEST_PROC_DIR, 'cgroup')
+    cgroup_collector = collectors.CgroupCollector(
+        cgroup_root=cgroup_root, proc_root=TMP_TEST_PROC_DIR)
+    cgroup_collector.setup()
+    assert_equal(cgroup_collector.get_panel_list(), [])
+    assert_equal(cgroup_collector.collect(), {})
+
+    _write_proc_file(relative_path='meminfo', file_str=_MEMINFO_STR)
+    _write_proc_file(
+        relative_path='cgroup/cgroup.controllers', file_str='cpu memory\n')
+    _write_proc_file(
+        relative_path='cgroup/memory.current',
+        file_str='%d\n' % (512 * 1048576))
+    _write_proc_file(
+        relative_path='cgroup/memory.max', file_str='%d\n' % (2048 * 1048576))
+    _write_proc_file(
+        relative_path='cgroup/cpu.max', file_str='200000 100000\n')
+    _write_proc_file(
+        relative_path='cgroup/cpu.stat',
+        file_str='usage_usec 1000000\nnr_periods 100\nnr_throttled 0\n'
+        'throttled_usec 0\n')
+    test_clock = _TestClock()
+    cgroup_collector = collectors.CgroupCollector(
+        cgroup_root=cgroup_root, proc_root=TMP_TEST_PROC_DIR,
+        clock=test_clock)
+    cgroup_collector.setup()
+    panel_list = cgroup_collector.get_panel_list()
+    assert_equal(panel_list[0]['title'], 'cgroup memory (% of 2048MB limit)')
+    assert_equal(panel_list[1]['title'], 'cgroup cpu (% of 2 cores limit)')
+    assert_equal(
+        cgroup_collector.get_limit_dict(),
+        {collectors.COLUMN_NAME_CGROUP_MEMORY_USED: 100})
+    assert_equal(cgroup_collector.collect(), {
+        collectors.COLUMN_NAME_CGROUP_MEMORY_USED: 25.0})
+
+    # 1.5 CPU seconds in 1 second with the limit of 2 cores.
+    _write_proc_file(
+        relative_path='cgroup/cpu.stat',
+        file_str='usage_usec 2500000\nnr_periods 110\nnr_throttled 4\n'
+        'throttled_usec 50000\n')
+    test_clock.now = 1.0
+    value_dict = cgroup_collector.collect()
+    assert_equal(value_dict, {
+        collectors.COLUMN_NAME_CGROUP_MEMORY_USED: 25.0,
+        collectors.COLUMN_NAME_CGROUP_CPU_USED: 75.0,
+        collectors.COLUMN_NAME_CGROUP_CPU_THROTTLED: 40.0,
+    })
+    pickled_collector = pickle.loads(pickle.dumps(cgroup_collector))
+    assert_equal(pickled_collector.reader_dict, None)
+    cgroup_collector.close()
+    assert_equal(cgroup_collector.reader_dict, None)
+
+    # Without the limits, the physical memory and the CPU cores of
+    # the host are used.
+    _write_proc_file(relative_path='cgroup/memory.max', file_str='max\n')
+    _write_proc_file(
+        relative_path='cgroup/cpu.max', file_str='max 100000\n')
+    cgroup_collector = collectors.CgroupCollector(
+        cgroup_root=cgroup_root, proc_root=TMP_TEST_PROC_DIR)
+    cgroup_collector.setup()
+    panel_list = cgroup_collector.get_panel_list()
+    assert_equal(panel_list[0]['title'], 'cgroup memory (% of 8000MB host)')
+    assert_equal(cgroup_collector.cpu_limit_cores, os.cpu_count())
+    assert_equal(cgroup_collector.collect(), {
+        collectors.COLUMN_NAME_CGROUP_MEMORY_USED: 6.4})
+    cgroup_collector.close()
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test__parse_proc_pid_stat_ppid():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_proc_pid_stat_ppid --skip_jupyter 1
+    """
+    ppid = collectors._parse_proc_pid_stat_ppid(
+        pid_stat_bytes=_PID_STAT_STR_FORMAT.format(
+            utime=100, stime=50, rss=300).encode())
+    assert_equal(ppid, 1)
+    ppid = collectors._parse_proc_pid_stat_ppid(
+        pid_stat_bytes=open('/proc/self/stat', 'rb').read())
+    assert_equal(ppid, os.getppid())
+
+
+_SMAPS_ROLLUP_STR = """55b634d4a000-7ffec8b77000 ---p 00000000 00:00 0 [rollup]
+Rss:                1300 kB
+Pss:                 411 kB
+Pss_Anon:            104 kB
+Shared_Clean:       1140 kB
+Shared_Dirty:          0 kB
+Private_Clean:        56 kB
+Private_Dirty:       104 kB
+SwapPss:               0 kB
+"""
+
+
+def test__parse_smaps_kb():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_smaps_kb --skip_jupyter 1
+    """
+    smaps_kb_dict = collectors._parse_smaps_kb(
+        smaps_bytes=_SMAPS_ROLLUP_STR.encode())
+    assert_equal(smaps_kb_dict, {'rss': 1300, 'pss': 411, 'uss': 160})
+
+    # The values of the mappings of smaps are summed up.
+    smaps_kb_dict = collectors._parse_smaps_kb(
+        smaps_bytes=(_SMAPS_ROLLUP_STR * 2).encode())
+    assert_equal(smaps_kb_dict, {'rss': 2600, 'pss': 822, 'uss': 320})
+
+
+def _write_fake_process(pid, ppid, smaps_str=_SMAPS_ROLLUP_STR):
+    """
+    Write the stat and the smaps_rollup of a process of the fake proc
+    file system for testing.
+
+    Parameters
+    ----------
+    pid : int
+        ID of the process.
+    ppid : int
+        ID of the parent process.
+    smaps_str : str, default _SMAPS_ROLLUP_STR
+        Content of the smaps_rollup.
+    """
+    _write_proc_file(
+        relative_path='%d/stat' % pid,
+        file_str='%d (worker %d) S %d 1 1 0 -1\n' % (pid, pid, ppid))
+    _write_proc_file(
+        relative_path='%d/smaps_rollup' % pid, file_str=smaps_str)
+
+
+def test_DescendantPidTracker():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_DescendantPidTracker --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+    _write_fake_process(pid=100, ppid=1)
+    _write_fake_process(pid=101, ppid=100)
+    _write_fake_process(pid=200, ppid=1)
+    _write_proc_file(relative_path='meminfo', file_str=_MEMINFO_STR)
+    pid_tracker = collectors.DescendantPidTracker(
+        root_pid=100, proc_root=TMP_TEST_PROC_DIR)
+    assert_equal(pid_tracker.refresh(), {100, 101})
+
+    # Only the stat of the new processes is read: a known process
+    # whose stat is broken keeps the cached parent.
+    _write_fake_process(pid=102, ppid=101)
+    _write_proc_file(relative_path='200/stat', file_str='broken')
+    assert_equal(pid_tracker.refresh(), {100, 101, 102})
+    assert_equal(pid_tracker.ppid_dict[200], 1)
+
+    shutil.rmtree(os.path.join(TMP_TEST_PROC_DIR, '101'))
+    assert_equal(pid_tracker.refresh(), {100})
+    assert_false(101 in pid_tracker.ppid_dict)
+
+    # The excluded process and its descendants are not included, but
+    # the root process is.
+    _write_fake_process(pid=101, ppid=100)
+    _write_fake_process(pid=103, ppid=100)
+    _write_fake_process(pid=200, ppid=1)
+    pid_tracker = collectors.DescendantPidTracker(
+        root_pid=100, proc_root=TMP_TEST_PROC_DIR, excluded_pid=101)
+    assert_equal(pid_tracker.refresh(), {100, 103})
+    pid_tracker = collectors.DescendantPidTracker(
+        root_pid=100, proc_root=TMP_TEST_PROC_DIR, excluded_pid=100)
+    assert_equal(pid_tracker.refresh(), {100, 101, 102, 103})
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test_ProcessTreeMemoryCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_ProcessTreeMemoryCollector --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+    _write_proc_file(relative_path='meminfo', file_str=_MEMINFO_STR)
+    _write_fake_process(pid=100, ppid=1)
+    _write_fake_process(
+        pid=101, ppid=100, smaps_str='Rss: 2048 kB\nPss: 1024 kB\n'
+        'Private_Clean: 0 kB\nPrivate_Dirty: 512 kB\n')
+    _write_fake_process(pid=200, ppid=1)
+    process_tree_collector = collectors.ProcessTreeMemoryCollector(
+        pid=100, proc_root=TMP_TEST_PROC_DIR, cgroup_root=None)
+    process_tree_collector.setup()
+    assert_equal(process_tree_collector.smaps_file_name, 'smaps_rollup')
+    assert_equal(len(process_tree_collector.get_panel_list()), 2)
+    value_dict = process_tree_collector.collect()
+    assert_equal(value_dict, {
+        collectors.COLUMN_NAME_PROCESS_TREE_PSS: 1,
+        collectors.COLUMN_NAME_PROCESS_TREE_USS: 0,
+        collectors.COLUMN_NAME_PROCESS_TREE_RSS: 3,
+        collectors.COLUMN_NAME_PROCESS_TREE_PROCESS_NUM: 2,
+    })
+    assert_equal(
+        process_tree_collector.get_limit_dict()[
+            collectors.COLUMN_NAME_PROCESS_TREE_PSS], 8000)
+
+    # The collector process started by the kernel and its children are
+    # not counted.
+    _write_fake_process(
+        pid=os.getpid(), ppid=100, smaps_str='Rss: 4096 kB\nPss: 4096 kB\n')
+    _write_fake_process(
+        pid=300, ppid=os.getpid(), smaps_str='Rss: 4096 kB\nPss: 4096 kB\n')
+    process_tree_collector.setup()
+    value_dict = process_tree_collector.collect()
+    assert_false(os.getpid() in process_tree_collector.pid_tracker.pid_set)
+    assert_equal(
+        value_dict[collectors.COLUMN_NAME_PROCESS_TREE_PROCESS_NUM], 2)
+    assert_equal(value_dict[collectors.COLUMN_NAME_PROCESS_TREE_RSS], 3)
+
+    process_tree_collector = collectors.ProcessTreeMemoryCollector()
+    process_tree_collector.setup()
+    value_dict = process_tree_collector.collect()
+    assert_greater(value_dict[collectors.COLUMN_NAME_PROCESS_TREE_PSS], 0)
+    assert_true(
+        value_dict[collectors.COLUMN_NAME_PROCESS_TREE_PSS]
+        <= value_dict[collectors.COLUMN_NAME_PROCESS_TREE_RSS])
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test__parse_proc_pid_stat_process_tree():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_proc_pid_stat_process_tree --skip_jupyter 1
+    """
+    process_name, process_time, thread_num = \
+        collectors._parse_proc_pid_stat_process_tree(
+            pid_stat_bytes=_PID_STAT_STR_FORMAT.format(
+                utime=100, stime=50, rss=300).encode())
+    assert_equal(process_name, 'python (kernel)')
+    assert_equal(process_time, 150)
+    assert_equal(thread_num, 4)
+
+    process_name, _, thread_num = \
+        collectors._parse_proc_pid_stat_process_tree(
+            pid_stat_bytes=open('/proc/self/stat', 'rb').read())
+    assert_equal(process_name, psutil.Process().name()[:15])
+    assert_equal(thread_num, threading.active_count())
+
+
+_PID_STATUS_STR = """Name:\tpython
+State:\tS (sleeping)
+Threads:\t4
+voluntary_ctxt_switches:\t1500
+nonvoluntary_ctxt_switches:\t20
+"""
+
+
+def test__parse_proc_pid_status_ctxt_switches():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_proc_pid_status_ctxt_switches --skip_jupyter 1
+    """
+    voluntary_ctxt_switches, nonvoluntary_ctxt_switches = \
+        collectors._parse_proc_pid_status_ctxt_switches(
+            pid_status_bytes=_PID_STATUS_STR.encode())
+    assert_equal(voluntary_ctxt_switches, 1500)
+    assert_equal(nonvoluntary_ctxt_switches, 20)
+
+    voluntary_ctxt_switches, nonvoluntary_ctxt_switches = \
+        collectors._parse_proc_pid_status_ctxt_switches(
+            pid_status_bytes=b'Name:\tpython\n')
+    assert_equal(voluntary_ctxt_switches, 0)
+    assert_equal(nonvoluntary_ctxt_switches, 0)
+
+
+def _write_fake_tree_process(
+        pid, ppid, process_name, process_time, thread_num, fd_num,
+        ctxt_switches):
+    """
+    Write the stat, the status and the file descriptors of a process
+    of the fake proc file system for testing.
+
+    Parameters
+    ----------
+    pid : int
+        ID of the process.
+    ppid : int
+        ID of the parent process.
+    process_name : str
+        Command name of the process.
+    process_time : int
+        The user time of the process in clock ticks.
+    thread_num : int
+        The number of the threads.
+    fd_num : int
+        The number of the file descriptors.
+    ctxt_switches : int
+        The number of the voluntary context switches. The involuntary
+        ones are a tenth of it.
+    """
+    _write_proc_file(
+        relative_path='%d/stat' % pid,
+        file_str='%d (%s) S %d 1 1 0 -1 0 0 0 0 0 %d 0 0 0 20 0 %d 0 100 '
+        '1000000 300 0\n' % (pid, process_name, ppid, process_time,
+                             thread_num))
+    _write_proc_file(
+        relative_path='%d/status' % pid,
+        file_str='Name:\t%s\nvoluntary_ctxt_switches:\t%d\n'
+        'nonvoluntary_ctxt_switches:\t%d\n' % (
+            process_name, ctxt_switches, ctxt_switches // 10))
+    shutil.rmtree(
+        os.path.join(TMP_TEST_PROC_DIR, str(pid), 'fd'), ignore_errors=True)
+    for fd in range(fd_num):
+        _write_proc_file(relative_path='%d/fd/%d' % (pid, fd), file_str='')
+
+
+def test_ProcessTreeCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_ProcessTreeCollector --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+    clock_ticks_per_second = os.sysconf('SC_CLK_TCK')
+    _write_fake_tree_process(
+        pid=100, ppid=1, process_name='python', process_time=0,
+        thread_num=8, fd_num=5, ctxt_switches=100)
+    for pid in (101, 102):
+        _write_fake_tree_process(
+            pid=pid, ppid=100, process_name='pt_worker', process_time=0,
+            thread_num=2, fd_num=3, ctxt_switches=100)
+    _write_fake_tree_process(
+        pid=200, ppid=1, process_name='sshd', process_time=0,
+        thread_num=1, fd_num=1, ctxt_switches=0)
+    clock = _TestClock()
+    tree_collector = collectors.ProcessTreeCollector(
+        pid=100, max_process_name_num=1, proc_root=TMP_TEST_PROC_DIR,
+        clock=clock)
+    tree_collector.setup()
+    tree_collector.cpu_num = 4
+    assert_equal(tree_collector.process_name_list, ['python'])
+    column_list = tree_collector.get_column_list()
+    assert_true('process(python) threads' in column_list)
+    assert_true('process(other) fds' in column_list)
+    assert_false('process(sshd) fds' in column_list)
+
+    # The CPU time and the context switches are not sampled at the
+    # first sampling.
+    value_dict = tree_collector.collect()
+    assert_equal(value_dict, {
+        'process(python) threads': 8,
+        'process(other) threads': 4,
+        'process(python) fds': 5,
+        'process(other) fds': 6,
+        collectors.COLUMN_NAME_PROCESS_TREE_THREADS_PER_CPU: 3.0,
+    })
+
+    # The worker 102 exits and the worker 103 is started.
+    clock.now = 2.0
+    _write_fake_tree_process(
+        pid=100, ppid=1, process_name='python',
+        process_time=clock_ticks_per_second, thread_num=8, fd_num=6,
+        ctxt_switches=300)
+    _write_fake_tree_process(
+        pid=101, ppid=100, process_name='pt_worker',
+        process_time=clock_ticks_per_second * 3, thread_num=2, fd_num=3,
+        ctxt_switches=500)
+    shutil.rmtree(os.path.join(TMP_TEST_PROC_DIR, '102'))
+    _write_fake_tree_process(
+        pid=103, ppid=100, process_name='pt_worker',
+        process_time=clock_ticks_per_second * 10, thread_num=2, fd_num=3,
+        ctxt_switches=1000)
+    value_dict = tree_collector.collect()
+    assert_equal(value_dict, {
+        'process(python) threads': 8,
+        'process(other) threads': 4,
+        'process(python) fds': 6,
+        'process(other) fds': 6,
+        collectors.COLUMN_NAME_PROCESS_TREE_THREADS_PER_CPU: 3.0,
+        'process(python) cpu (%)': 50.0,
+        'process(other) cpu (%)': 150.0,
+        collectors.COLUMN_NAME_PROCESS_TREE_VOLUNTARY_CTXT_SWITCHES: 300.0,
+        collectors.COLUMN_NAME_PROCESS_TREE_INVOLUNTARY_CTXT_SWITCHES: 30.0,
+    })
+
+    # The specified names are used instead of the names of the tree.
+    tree_collector = collectors.ProcessTreeCollector(
+        pid=100, process_name_list=['pt_worker', 'other'],
+        proc_root=TMP_TEST_PROC_DIR)
+    tree_collector.setup()
+    assert_equal(
+        tree_collector.get_panel_list()[0]['label_list'],
+        ['pt_worker', 'other'])
+    value_dict = tree_collector.collect()
+    assert_equal(value_dict['process(pt_worker) threads'], 4)
+    assert_equal(value_dict['process(other) threads'], 8)
+
+    # The collector process started by the kernel and its children are
+    # not counted.
+    _write_fake_tree_process(
+        pid=os.getpid(), ppid=100, process_name='python', process_time=0,
+        thread_num=3, fd_num=10, ctxt_switches=0)
+    _write_fake_tree_process(
+        pid=300, ppid=os.getpid(), process_name='gpustat', process_time=0,
+        thread_num=1, fd_num=3, ctxt_switches=0)
+    tree_collector.setup()
+    value_dict = tree_collector.collect()
+    assert_false(os.getpid() in tree_collector.pid_tracker.pid_set)
+    assert_equal(value_dict['process(pt_worker) threads'], 4)
+    assert_equal(value_dict['process(other) threads'], 8)
+    assert_equal(value_dict['process(other) fds'], 6)
+
+    tree_collector = collectors.ProcessTreeCollector()
+    tree_collector.setup()
+    value_dict = tree_collector.collect()
+    process_name = psutil.Process().name()[:15]
+    assert_greater(value_dict['process(%s) threads' % process_name], 0)
+    assert_greater(value_dict['process(%s) fds' % process_name], 2)
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+_PRESSURE_STR = """some avg10=3.49 avg60=2.43 avg300=2.18 total=70239596
+full avg10=1.25 avg60=0.50 avg300=0.00 total=5403767
+"""
+
+
+def test__parse_pressure_avg10():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__parse_pressure_avg10 --skip_jupyter 1
+    """
+    avg10_dict = collectors._parse_pressure_avg10(
+        pressure_bytes=memoryview(_PRESSURE_STR.encode()))
+    assert_equal(avg10_dict, {'some': 3.49, 'full': 1.25})
+
+    # The cpu file has no full line before Linux 5.13.
+    avg10_dict = collectors._parse_pressure_avg10(
+        pressure_bytes=_PRESSURE_STR.split('\n')[0].encode())
+    assert_equal(avg10_dict, {'some': 3.49})
+
+
+def test_PressureCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_PressureCollector --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+    os.makedirs(TMP_TEST_PROC_DIR)
+    cgroup_root = os.path.join(TMP_TEST_PROC_DIR, 'cgroup')
+    pressure_collector = collectors.PressureCollector(
+        proc_root=TMP_TEST_PROC_DIR, cgroup_root=cgroup_root)
+    pressure_collector.setup()
+    assert_equal(pressure_collector.get_panel_list(), [])
+    assert_equal(pressure_collector.collect(), {})
+
+    _write_proc_file(relative_path='pressure/cpu', file_str=_PRESSURE_STR)
+    _write_proc_file(relative_path='pressure/memory', file_str=_PRESSURE_STR)
+    _write_proc_file(
+        relative_path='cgroup/cgroup.controllers', file_str='memory\n')
+    _write_proc_file(relative_path='cgroup/memory.current', file_str='1\n')
+    _write_proc_file(
+        relative_path='cgroup/memory.pressure',
+        file_str=_PRESSURE_STR.replace('3.49', '9.99'))
+    pressure_collector = collectors.PressureCollector(
+        proc_root=TMP_TEST_PROC_DIR, cgroup_root=cgroup_root)
+    pressure_collector.setup()
+    panel_list = pressure_collector.get_panel_list()
+    assert_equal(
+        [panel_dict['title'] for panel_dict in panel_list],
+        ['cpu pressure avg10 (%)', 'memory pressure avg10 (%)'])
+    value_dict = pressure_collector.collect()
+    assert_equal(value_dict, {
+        'cpu pressure some (%)': 3.49,
+        'cpu pressure full (%)': 1.25,
+        'memory pressure some (%)': 9.99,
+        'memory pressure full (%)': 1.25,
+    })
+    assert_equal(
+        sorted(value_dict), sorted(pressure_collector.get_column_list()))
+    pickled_collector = pickle.loads(pickle.dumps(pressure_collector))
+    assert_equal(pickled_collector.reader_dict, None)
+    pressure_collector.close()
+    assert_equal(pressure_collector.reader_dict, None)
+    shutil.rmtree(TMP_TEST_PROC_DIR, ignore_errors=True)
+
+
+def test__get_percentile():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__get_percentile --skip_jupyter 1
+    """
+    sorted_value_list = list(range(1, 101))
+    assert_equal(collectors._get_percentile(
+        sorted_value_list=sorted_value_list, percentile=50), 50)
+    assert_equal(collectors._get_percentile(
+        sorted_value_list=sorted_value_list, percentile=99), 99)
+    assert_equal(collectors._get_percentile(
+        sorted_value_list=sorted_value_list, percentile=0), 1)
+    assert_equal(collectors._get_percentile(
+        sorted_value_list=[0.5], percentile=99), 0.5)
+
+
+def test_KernelLagCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_KernelLagCollector --skip_jupyter 1
+    """
+    lag_collector = collectors.KernelLagCollector(probe_interval_seconds=0.02)
+    assert_true(lag_collector.supports_thread_sampling)
+    assert_equal(lag_collector.probe_interval_seconds, 0.02)
+    assert_equal(
+        lag_collector.get_column_list(),
+        [collectors.COLUMN_NAME_KERNEL_LAG_P50,
+         collectors.COLUMN_NAME_KERNEL_LAG_P99])
+
+    # Nothing is sampled before the overshoots are received.
+    assert_equal(lag_collector.collect(), {})
+    lag_collector.record_lag(lag_seconds_list=[0.0001] * 98)
+    lag_collector.record_lag(lag_seconds_list=[0.05, 0.2])
+    value_dict = lag_collector.collect()
+    assert_equal(value_dict, {
+        collectors.COLUMN_NAME_KERNEL_LAG_P50: 0.1,
+        collectors.COLUMN_NAME_KERNEL_LAG_P99: 50.0,
+    })
+    assert_equal(lag_collector.collect(), {})
+
+
+def test_HeapSnapshotCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_HeapSnapshotCollector --skip_jupyter 1
+    """
+    heap_collector = collectors.HeapSnapshotCollector(
+        snapshot_interval_seconds=30, frame_num=3, top_num=5)
+    assert_true(heap_collector.supports_thread_sampling)
+    assert_equal(heap_collector.snapshot_interval_seconds, 30)
+    assert_equal(heap_collector.frame_num, 3)
+    assert_equal(heap_collector.top_num, 5)
+    assert_equal(
+        heap_collector.get_column_list(),
+        [collectors.COLUMN_NAME_PYTHON_HEAP_TRACED,
+         collectors.COLUMN_NAME_TRACEMALLOC_MEMORY,
+         collectors.COLUMN_NAME_HEAP_SNAPSHOT_TIME])
+
+    # Nothing is sampled before the snapshot is taken.
+    assert_equal(heap_collector.collect(), {})
+    heap_collector.record_heap(heap_dict={
+        'traced_mb': 10.5, 'tracemalloc_mb': 1.25,
+        'snapshot_seconds': 0.0123456})
+    assert_equal(heap_collector.collect(), {
+        collectors.COLUMN_NAME_PYTHON_HEAP_TRACED: 10.5,
+        collectors.COLUMN_NAME_TRACEMALLOC_MEMORY: 1.25,
+        collectors.COLUMN_NAME_HEAP_SNAPSHOT_TIME: 12.346,
+    })
+    assert_equal(heap_collector.collect(), {})
+
+
+def test__get_gpu_memory_total():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test__get_gpu_memory_total --skip_jupyter 1
+    """
+    command_result = "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |    110 / 11441 MB |\n[1] Tesla K80        | 31'C,   0 % |   250 / 8000 MB |\n"
+    gpu_memory_total_mb = collectors._get_gpu_memory_total(
+        gpu_idx=1, command_result=command_result)
+    assert_equal(gpu_memory_total_mb, 8000)
+
+
+def test_update_trends():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_update_trends --skip_jupyter 1
+    """
+    def test_func():
+        return "28cb5cca2ca4  Wed Feb 20 07:04:22 2019\n[0] Tesla K80        | 31'C,   0 % |    110 / 1000 MB |\n"
+
+    gpu_memory_collector = collectors.GPUMemoryCollector(
+        gpustat_func=test_func, trend_window_seconds=60)
+    gpu_memory_collector.setup()
+    column_name = collectors.COLUMN_NAME_GPU_MEMORY_USAGE_FORMAT.format(
+        gpu_idx=0)
+    assert_equal(gpu_memory_collector.get_limit_dict(), {
+        column_name: 1000,
+        collectors.COLUMN_NAME_GPU_KERNEL_MEMORY_FORMAT.format(
+            gpu_idx=0): 1000})
+    panel_dict = gpu_memory_collector.get_panel_list()[0]
+    assert_equal(panel_dict['trend_window_seconds'], 60)
+    assert_equal(panel_dict['alert_minutes_to_limit'], 30)
+    # Growth of 10MB per minute from 100MB.
+    for i in range(60):
+        trend_value_dict = gpu_memory_collector.update_trends(
+            timestamp=i, value_dict={column_name: 100 + i / 6})
+    assert_almost_equal(
+        trend_value_dict[trend.get_growth_rate_column_name(
+            column_name=column_name)], 10)
+    assert_almost_equal(
+        trend_value_dict[trend.get_minutes_to_limit_column_name(
+            column_name=column_name)], (1000 - 100 - 59 / 6) / 10,
+        places=1)
+
+    # The trend is not calculated if the window is None.
+    memory_collector = collectors.MemoryCollector(trend_window_seconds=None)
+    trend_value_dict = memory_collector.update_trends(
+        timestamp=0, value_dict={collectors.COLUMN_NAME_MEMORY_USAGE: 100})
+    assert_equal(trend_value_dict, {})
+    assert_equal(len(memory_collector.get_column_list()), 4)
+
+
+def test_MemoryCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_MemoryCollector --skip_jupyter 1
+    """
+    memory_collector = collectors.MemoryCollector()
+    assert_equal(
+        memory_collector.get_column_list(),
+        [
+            collectors.COLUMN_NAME_MEMORY_USAGE,
+            'memory usage (MB) (p50)',
+            'memory usage (MB) (p95)',
+            'memory usage (MB) (p99)',
+            'memory usage (MB) (growth/min)',
+            'memory usage (MB) (min to limit)',
+        ])
+    value_dict = memory_collector.collect()
+    assert_greater(value_dict[collectors.COLUMN_NAME_MEMORY_USAGE], 0)
+
+
+def test_DiskUsageCollector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_DiskUsageCollector --skip_jupyter 1
+    """
+    disk_usage_collector = collectors.DiskUsageCollector(path='./')
+    value_dict = disk_usage_collector.collect()
+    assert_greater(value_dict[collectors.COLUMN_NAME_DISK_USAGE], 0)
+
+
+def test_register_collector():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_register_collector --skip_jupyter 1
+    """
+    class TestCollector(collectors.MetricCollector):
+        name = 'test_metric'
+
+    collectors.register_collector(collector_class=TestCollector)
+    assert_true('test_metric' in collectors.COLLECTOR_CLASS_DICT)
+    collectors.COLLECTOR_CLASS_DICT.pop('test_metric')
+
+    class EmptyNameCollector(collectors.MetricCollector):
+        pass
+
+    assert_raises(
+        ValueError, collectors.register_collector, EmptyNameCollector)
+
+
+def test_make_collector_list():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_make_collector_list --skip_jupyter 1
+    """
+    disk_usage_collector = collectors.DiskUsageCollector(path='./')
+    collector_list = collectors.make_collector_list(
+        metrics=['memory', disk_usage_collector, 'cpu'])
+    assert_equal(len(collector_list), 3)
+    assert_true(
+        isinstance(collector_list[0], collectors.MemoryCollector))
+    assert_equal(collector_list[1], disk_usage_collector)
+    assert_true(isinstance(collector_list[2], collectors.CPUCollector))
+
+    assert_raises(
+        ValueError, collectors.make_collector_list, ['unknown'])
+    assert_raises(
+        ValueError, collectors.make_collector_list, ['memory', 'memory'])
+
+
+def test_setup_collectors():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_collectors:test_setup_collectors --skip_jupyter 1
+    """
+    pre_bool = collectors.is_gpu_stats_disabled
+    collectors.is_gpu_stats_disabled = True
+    collector_list = collectors.setup_collectors(
+        collector_list=collectors.make_collector_list(
+            metrics=['memory', 'gpu']))
+    assert_equal(len(collector_list), 1)
+    assert_equal(collector_list[0].name, 'memory')
+
+    collectors.is_gpu_stats_disabled = pre_bool
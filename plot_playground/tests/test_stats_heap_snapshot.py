@@ -0,0 +1,151 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_heap_snapshot --skip_jupyter 1
+"""
+
+import os
+import shutil
+import time
+import tracemalloc
+
+from nose.tools import assert_equal, assert_true, assert_false
+
+from plot_playground.stats import heap_snapshot
+
+TMP_TEST_LOG_DIR = './log_plotplayground_stats/test_heap_snapshot/'
+
+
+class _FakeFrame():
+
+    def __init__(self, filename, lineno):
+        """
+        Class of the frame of the trace for testing.
+
+        Parameters
+        ----------
+        filename : str
+            Path of the file.
+        lineno : int
+            The line number.
+        """
+        self.filename = filename
+        self.lineno = lineno
+
+
+def _allocate(size):
+    """
+    Allocate the bytes at the line of this function for testing.
+
+    Parameters
+    ----------
+    size : int
+        Bytes to allocate.
+
+    Returns
+    -------
+    allocated : bytearray
+        The allocated bytes.
+    """
+    return bytearray(size)
+
+
+def test__format_frame():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_heap_snapshot:test__format_frame --skip_jupyter 1
+    """
+    frame_str = heap_snapshot._format_frame(frame=_FakeFrame(
+        filename='/usr/lib/python3/site-packages/pandas/core/frame.py',
+        lineno=123))
+    assert_equal(frame_str, 'core/frame.py:123')
+    frame_str = heap_snapshot._format_frame(frame=_FakeFrame(
+        filename='<stdin>', lineno=1))
+    assert_equal(frame_str, '<stdin>:1')
+
+
+def test_get_growth_list():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_heap_snapshot:test_get_growth_list --skip_jupyter 1
+    """
+    for frame_num in (1, 3):
+        tracemalloc.start(frame_num)
+        previous_snapshot = tracemalloc.take_snapshot()
+        allocated_list = [_allocate(size=1024 * 1024) for _ in range(3)]
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        growth_list = heap_snapshot.get_growth_list(
+            snapshot=snapshot, previous_snapshot=previous_snapshot,
+            frame_num=frame_num, top_num=2)
+        assert_true(0 < len(growth_list) <= 2)
+        growth_dict = growth_list[0]
+        site_list = growth_dict['site'].split(' <- ')
+        assert_equal(len(site_list), frame_num)
+        assert_true(site_list[0].startswith(
+            'tests/test_stats_heap_snapshot.py:'))
+        assert_true(growth_dict['size_diff_kb'] >= 3 * 1024)
+        assert_true(growth_dict['count_diff'] >= 3)
+        assert_true(growth_dict['size_kb'] >= growth_dict['size_diff_kb'])
+        del allocated_list
+
+
+def test_heap_snapshotter():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_heap_snapshot:test_heap_snapshotter --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    heap_dict_list = []
+    heap_snapshotter = heap_snapshot.HeapSnapshotter(
+        send_heap=heap_dict_list.append, log_dir_path=TMP_TEST_LOG_DIR,
+        snapshot_interval_seconds=60, frame_num=1, top_num=3)
+    heap_snapshotter.start()
+    assert_true(heap_snapshotter.is_alive())
+    assert_true(tracemalloc.is_tracing())
+
+    # The first snapshot has nothing to compare with.
+    assert_equal(heap_snapshotter.take_snapshot(), None)
+    assert_equal(len(heap_snapshot.load_heap_growth(
+        log_dir_path=TMP_TEST_LOG_DIR)), 0)
+    allocated = _allocate(size=2 * 1024 * 1024)
+    growth_list = heap_snapshotter.take_snapshot()
+    assert_true(len(growth_list) <= 3)
+    assert_true(growth_list[0]['site'].startswith(
+        'tests/test_stats_heap_snapshot.py:'))
+    assert_equal(len(heap_dict_list), 2)
+    heap_dict = heap_dict_list[-1]
+    assert_true(heap_dict['traced_mb'] >= 2)
+    assert_true(heap_dict['tracemalloc_mb'] > 0)
+    assert_true(heap_dict['snapshot_seconds'] > 0)
+
+    df = heap_snapshot.load_heap_growth(log_dir_path=TMP_TEST_LOG_DIR)
+    assert_equal(list(df.columns), heap_snapshot.HEAP_COLUMN_LIST)
+    assert_equal(df['site'].tolist(), [
+        growth_dict['site'] for growth_dict in growth_list])
+    assert_true(abs(df['timestamp'].iloc[0] - time.time()) < 60)
+    assert_false(os.path.exists(heap_snapshot.get_heap_log_file_path(
+        log_dir_path=TMP_TEST_LOG_DIR) + '.tmp'))
+
+    heap_snapshotter.stop()
+    assert_false(heap_snapshotter.is_alive())
+    assert_false(tracemalloc.is_tracing())
+    assert_equal(heap_snapshotter.take_snapshot(), None)
+    del allocated
+
+    # tracemalloc started by the user is not stopped.
+    tracemalloc.start(2)
+    heap_snapshotter = heap_snapshot.HeapSnapshotter(
+        send_heap=heap_dict_list.append, log_dir_path=TMP_TEST_LOG_DIR,
+        snapshot_interval_seconds=0.1, frame_num=1, top_num=3)
+    heap_snapshotter.start()
+    assert_equal(heap_snapshotter.frame_num, 2)
+    time.sleep(0.5)
+    heap_snapshotter.stop()
+    assert_true(tracemalloc.is_tracing())
+    tracemalloc.stop()
+    assert_true(len(heap_dict_list) > 3)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
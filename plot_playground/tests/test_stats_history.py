@@ -0,0 +1,190 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_history --skip_jupyter 1
+"""
+
+from nose.tools import assert_equal, assert_true, assert_raises
+import numpy as np
+
+from plot_playground.stats import history
+
+TEST_TIER_SETTING_LIST = [
+    {'name': 'raw', 'resolution_seconds': 0, 'retention_seconds': 3},
+    {'name': '2s', 'resolution_seconds': 2, 'retention_seconds': 4},
+]
+
+
+def test_ring_buffer():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_history:test_ring_buffer --skip_jupyter 1
+    """
+    ring_buffer = history.RingBuffer(capacity=3, column_num=2)
+    assert_equal(ring_buffer.get_last_timestamp(), None)
+    timestamp_array, value_array = ring_buffer.get_arrays()
+    assert_equal(len(timestamp_array), 0)
+    assert_equal(value_array.shape, (0, 2))
+
+    for timestamp in [100, 101]:
+        ring_buffer.append(
+            timestamp=timestamp,
+            value_array=np.array([timestamp, timestamp * 2]))
+    timestamp_array, value_array = ring_buffer.get_arrays()
+    assert_equal(timestamp_array.tolist(), [100, 101])
+    assert_equal(value_array[:, 1].tolist(), [200, 202])
+
+    # The oldest rows are overwritten without growing the arrays.
+    for timestamp in [102, 103, 104]:
+        ring_buffer.append(
+            timestamp=timestamp,
+            value_array=np.array([timestamp, timestamp * 2]))
+    timestamp_array, value_array = ring_buffer.get_arrays()
+    assert_equal(timestamp_array.tolist(), [102, 103, 104])
+    assert_equal(value_array[:, 0].tolist(), [102, 103, 104])
+    assert_equal(ring_buffer.timestamp_array.shape, (3,))
+    assert_equal(ring_buffer.get_last_timestamp(), 104)
+
+    timestamp_array, value_array = ring_buffer.get_arrays(
+        start_timestamp=103)
+    assert_equal(timestamp_array.tolist(), [103, 104])
+    assert_equal(value_array.shape, (2, 2))
+
+
+def test_rollup_tier():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_history:test_rollup_tier --skip_jupyter 1
+    """
+    rollup_tier = history.RollupTier(
+        name='10s', resolution_seconds=10, capacity=2, column_num=2)
+    is_stored = rollup_tier.add(
+        timestamp=100, value_array=np.array([1, np.nan]))
+    assert_equal(is_stored, False)
+    rollup_tier.add(timestamp=105, value_array=np.array([3, np.nan]))
+    rollup_tier.add(timestamp=109.9, value_array=np.array([8, np.nan]))
+    timestamp_array, _ = rollup_tier.ring_buffer.get_arrays()
+    assert_equal(len(timestamp_array), 0)
+
+    is_stored = rollup_tier.add(
+        timestamp=112, value_array=np.array([2, 5]))
+    assert_equal(is_stored, True)
+    timestamp_array, value_array = rollup_tier.ring_buffer.get_arrays()
+    assert_equal(timestamp_array.tolist(), [100])
+    # mean, min and max of each column.
+    assert_equal(value_array[0, [0, 2, 4]].tolist(), [4, 1, 8])
+    assert_true(np.isnan(value_array[0, [1, 3, 5]]).all())
+
+    rollup_tier.flush()
+    timestamp_array, value_array = rollup_tier.ring_buffer.get_arrays()
+    assert_equal(timestamp_array.tolist(), [100, 110])
+    assert_equal(value_array[1].tolist(), [2, 5, 2, 5, 2, 5])
+    rollup_tier.flush()
+    timestamp_array, _ = rollup_tier.ring_buffer.get_arrays()
+    assert_equal(len(timestamp_array), 2)
+
+
+def test_tiered_history():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_history:test_tiered_history --skip_jupyter 1
+    """
+    tiered_history = history.TieredHistory(
+        column_list=['a', 'b'], row_num_per_second=1,
+        tier_setting_list=TEST_TIER_SETTING_LIST)
+    assert_equal(tiered_history.get_tier_names(), ['raw', '2s'])
+    assert_equal(
+        tiered_history.get_rollup_column_list(),
+        ['a', 'b', 'a (min)', 'b (min)', 'a (max)', 'b (max)'])
+    assert_equal(tiered_history.raw_ring_buffer.capacity, 4)
+
+    stored_tier_name_list_list = []
+    for timestamp in range(100, 110):
+        stored_tier_name_list = tiered_history.append(
+            timestamp=timestamp,
+            row_dict={'a': timestamp, 'unknown': 1})
+        stored_tier_name_list_list.append(stored_tier_name_list)
+    assert_equal(stored_tier_name_list_list[0], [])
+    assert_equal(stored_tier_name_list_list[2], ['2s'])
+
+    # The raw tier keeps only the latest rows.
+    timestamp_array, value_array = tiered_history.get_tier_arrays(
+        tier_name='raw')
+    assert_equal(timestamp_array.tolist(), [106, 107, 108, 109])
+    assert_equal(value_array[:, 0].tolist(), [106, 107, 108, 109])
+    assert_true(np.isnan(value_array[:, 1]).all())
+
+    timestamp_array, value_array = tiered_history.get_tier_arrays(
+        tier_name='2s')
+    assert_equal(timestamp_array.tolist(), [104, 106])
+    assert_equal(value_array[:, 0].tolist(), [104.5, 106.5])
+
+    timestamp_array, _ = tiered_history.get_tier_arrays(
+        tier_name='raw', start_timestamp=108)
+    assert_equal(timestamp_array.tolist(), [108, 109])
+    assert_raises(
+        ValueError, tiered_history.get_tier_arrays, 'unknown')
+
+
+def test_update_columns():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_history:test_update_columns --skip_jupyter 1
+    """
+    tiered_history = history.TieredHistory(
+        column_list=['a', 'b'], row_num_per_second=1,
+        tier_setting_list=TEST_TIER_SETTING_LIST)
+    for timestamp in [100, 101, 102]:
+        tiered_history.append(
+            timestamp=timestamp, row_dict={'a': timestamp, 'b': 1})
+    tiered_history.update_columns(
+        column_list=['c', 'a', 'b'], row_num_per_second=2)
+    assert_equal(tiered_history.column_list, ['c', 'a', 'b'])
+    assert_equal(tiered_history.raw_ring_buffer.capacity, 7)
+    tiered_history.append(timestamp=103, row_dict={'a': 103, 'c': 5})
+
+    timestamp_array, value_array = tiered_history.get_tier_arrays(
+        tier_name='raw')
+    assert_equal(timestamp_array.tolist(), [100, 101, 102, 103])
+    assert_equal(value_array[:, 1].tolist(), [100, 101, 102, 103])
+    assert_equal(value_array[:, 2].tolist()[:3], [1, 1, 1])
+    assert_true(np.isnan(value_array[:3, 0]).all())
+    assert_equal(value_array[3, 0], 5)
+
+    # The values of the current bucket are kept for the rollup.
+    tiered_history.append(timestamp=104, row_dict={'a': 104})
+    timestamp_array, value_array = tiered_history.get_tier_arrays(
+        tier_name='2s')
+    assert_equal(timestamp_array.tolist(), [100, 102])
+    assert_equal(value_array[:, 1].tolist(), [100.5, 102.5])
+    assert_equal(value_array[1, 0], 5)
+    assert_equal(value_array[1, [4, 7]].tolist(), [102, 103])
+    assert_equal(value_array[0, [2, 5, 8]].tolist(), [1, 1, 1])
+
+
+def test_select_tier_name():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_history:test_select_tier_name --skip_jupyter 1
+    """
+    tier_name = history.select_tier_name(
+        tier_setting_list=history.DEFAULT_TIER_SETTING_LIST,
+        window_seconds=600)
+    assert_equal(tier_name, 'raw')
+    tier_name = history.select_tier_name(
+        tier_setting_list=history.DEFAULT_TIER_SETTING_LIST,
+        window_seconds=3600)
+    assert_equal(tier_name, '10s')
+    tier_name = history.select_tier_name(
+        tier_setting_list=history.DEFAULT_TIER_SETTING_LIST,
+        window_seconds=24 * 60 * 60)
+    assert_equal(tier_name, '1min')
+    tier_name = history.select_tier_name(
+        tier_setting_list=history.DEFAULT_TIER_SETTING_LIST,
+        window_seconds=30 * 24 * 60 * 60)
+    assert_equal(tier_name, '1min')
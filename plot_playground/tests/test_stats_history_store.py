@@ -0,0 +1,139 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_history_store --skip_jupyter 1
+"""
+
+import datetime
+import os
+import shutil
+
+from nose.tools import assert_equal, assert_true, assert_raises
+import pandas as pd
+
+from plot_playground.stats import history_store
+
+TMP_TEST_LOG_DIR = './log_plotplayground_stats/test_history_store/'
+TEST_DB_PATH = os.path.join(TMP_TEST_LOG_DIR, 'test.sqlite3')
+
+
+def _make_store(clock=None):
+    """
+    Make a store of an empty database for testing.
+
+    Parameters
+    ----------
+    clock : function or None, default None
+        Clock function of the store. If None, time.time is used.
+
+    Returns
+    -------
+    store : SQLiteHistoryStore
+        The created store.
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    os.makedirs(TMP_TEST_LOG_DIR, exist_ok=True)
+    kwargs = {}
+    if clock is not None:
+        kwargs['clock'] = clock
+    store = history_store.SQLiteHistoryStore(
+        db_path=TEST_DB_PATH, retention_seconds=100, **kwargs)
+    store.register_columns(
+        column_metric_dict={'a (MB)': 'a', 'b (MB)': 'b', 'b2 (MB)': 'b'})
+    return store
+
+
+def test_sqlite_history_store():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_history_store:test_sqlite_history_store --skip_jupyter 1
+    """
+    store = _make_store(clock=lambda: 1150)
+    store.add_row(
+        timestamp=1000, row_dict={'a (MB)': 1, 'timestamp': 1000})
+    store.add_row(
+        timestamp=1100, row_dict={'a (MB)': 2, 'b (MB)': 3})
+    assert_equal(len(store.pending_record_list), 3)
+    df = history_store.load_history(db_path=TEST_DB_PATH)
+    assert_equal(len(df), 0)
+
+    record_num = store.flush()
+    assert_equal(record_num, 3)
+    assert_equal(store.flush(), 0)
+    df = history_store.load_history(db_path=TEST_DB_PATH)
+    assert_equal(df['timestamp'].tolist(), [1000, 1100])
+    assert_equal(df['a (MB)'].tolist(), [1, 2])
+
+    record_num = store.delete_expired()
+    assert_equal(record_num, 1)
+    df = history_store.load_history(db_path=TEST_DB_PATH)
+    assert_equal(df['timestamp'].tolist(), [1100])
+
+    # The pending rows are saved when the store is closed, and the
+    # registered columns are kept for the next session.
+    store.add_row(timestamp=1101, row_dict={'b2 (MB)': 4})
+    store.close()
+    store = history_store.SQLiteHistoryStore(db_path=TEST_DB_PATH)
+    assert_equal(len(store.column_id_dict), 3)
+    store.close()
+    df = history_store.load_history(db_path=TEST_DB_PATH)
+    assert_equal(df.columns.tolist(), ['timestamp', 'a (MB)', 'b (MB)', 'b2 (MB)'])
+    assert_equal(df['timestamp'].tolist(), [1100, 1101])
+    assert_true(pd.isnull(df['b2 (MB)'][0]))
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_load_history():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_history_store:test_load_history --skip_jupyter 1
+    """
+    assert_raises(
+        FileNotFoundError, history_store.load_history,
+        os.path.join(TMP_TEST_LOG_DIR, 'not_exists.sqlite3'))
+
+    store = _make_store()
+    for timestamp in [1000, 1001, 1002, 1003]:
+        store.add_row(
+            timestamp=timestamp,
+            row_dict={'a (MB)': timestamp, 'b (MB)': timestamp * 2,
+                      'b2 (MB)': timestamp * 3})
+    store.close()
+
+    df = history_store.load_history(
+        db_path=TEST_DB_PATH, start=1001, end=1002)
+    assert_equal(df['timestamp'].tolist(), [1001, 1002])
+
+    df = history_store.load_history(db_path=TEST_DB_PATH, metrics=['b'])
+    assert_equal(df.columns.tolist(), ['timestamp', 'b (MB)', 'b2 (MB)'])
+    df = history_store.load_history(
+        db_path=TEST_DB_PATH, metrics=['a', 'b2 (MB)'])
+    assert_equal(df.columns.tolist(), ['timestamp', 'a (MB)', 'b2 (MB)'])
+    assert_equal(df['b2 (MB)'].tolist(), [3000, 3003, 3006, 3009])
+
+    start = datetime.datetime.fromtimestamp(1002)
+    df = history_store.load_history(db_path=TEST_DB_PATH, start=start)
+    assert_equal(df['timestamp'].tolist(), [1002, 1003])
+    df = history_store.load_history(
+        db_path=TEST_DB_PATH, end=str(datetime.datetime.fromtimestamp(1000)))
+    assert_equal(df['timestamp'].tolist(), [1000])
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test__to_timestamp():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_history_store:test__to_timestamp --skip_jupyter 1
+    """
+    assert_equal(history_store._to_timestamp(value=None), None)
+    assert_equal(history_store._to_timestamp(value=100), 100.0)
+    datetime_value = datetime.datetime(2019, 3, 1, 12, 0, 0)
+    assert_equal(
+        history_store._to_timestamp(value=datetime_value),
+        datetime_value.timestamp())
+    assert_equal(
+        history_store._to_timestamp(value='2019-03-01 12:00:00'),
+        datetime_value.timestamp())
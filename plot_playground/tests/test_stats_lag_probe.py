@@ -0,0 +1,65 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_lag_probe --skip_jupyter 1
+"""
+
+import threading
+import time
+
+from nose.tools import assert_equal, assert_true, assert_false, \
+    assert_greater
+
+from plot_playground.stats import lag_probe
+
+
+def _hold_gil(stop_event):
+    """
+    Run pure Python code until the event is set, to make the other
+    threads wait for the GIL.
+
+    Parameters
+    ----------
+    stop_event : threading.Event
+        The event to stop.
+    """
+    value = 0
+    while not stop_event.is_set():
+        for i in range(10000):
+            value += i
+
+
+def test_lag_probe():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_lag_probe:test_lag_probe --skip_jupyter 1
+    """
+    lag_seconds_list_list = []
+    probe = lag_probe.LagProbe(
+        send_lag=lag_seconds_list_list.append, probe_interval_seconds=0.01,
+        report_interval_seconds=0.1)
+    probe.start()
+    assert_true(probe.is_alive())
+    time.sleep(0.5)
+    assert_greater(len(lag_seconds_list_list), 2)
+    lag_seconds_list = sum(lag_seconds_list_list, [])
+    assert_greater(len(lag_seconds_list), 20)
+    assert_true(all(lag_seconds >= 0 for lag_seconds in lag_seconds_list))
+
+    # The probe waits for the GIL held by the other thread.
+    lag_seconds_list_list.clear()
+    stop_event = threading.Event()
+    thread = threading.Thread(target=_hold_gil, args=(stop_event,))
+    thread.start()
+    time.sleep(0.5)
+    stop_event.set()
+    thread.join()
+    lag_seconds_list = sum(lag_seconds_list_list, [])
+    assert_greater(max(lag_seconds_list), 0.001)
+
+    probe.stop()
+    assert_false(probe.is_alive())
+    report_num = len(lag_seconds_list_list)
+    time.sleep(0.2)
+    assert_equal(len(lag_seconds_list_list), report_num)
@@ -0,0 +1,156 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_openmetrics --skip_jupyter 1
+"""
+
+import threading
+from urllib.error import HTTPError
+
+from nose.tools import assert_equal, assert_true, assert_raises
+import numpy as np
+
+from plot_playground.stats import history
+from plot_playground.stats import openmetrics
+from plot_playground.tests import stats_helper
+
+def test_get_metric_name():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_openmetrics:test_get_metric_name --skip_jupyter 1
+    """
+    assert_equal(
+        openmetrics.get_metric_name(column_name='memory usage (MB)'),
+        'plot_playground_memory_usage_mb')
+    assert_equal(
+        openmetrics.get_metric_name(
+            column_name='memory usage (MB) (growth/min)'),
+        'plot_playground_memory_usage_mb_growth_min')
+    assert_equal(
+        openmetrics.get_metric_name(column_name='cgroup memory used (%)'),
+        'plot_playground_cgroup_memory_used_percent')
+    assert_equal(
+        openmetrics.get_metric_name(column_name='gpu(0) memory (MB)'),
+        'plot_playground_gpu_0_memory_mb')
+
+
+def test_get_latest_samples():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_openmetrics:test_get_latest_samples --skip_jupyter 1
+    """
+    latest_sample_dict = openmetrics.get_latest_samples(
+        column_list=['a', 'b', 'c'],
+        timestamp_array=np.array([100.0, 101.0, 102.0]),
+        value_array=np.array([
+            [1.0, 10.0, np.nan],
+            [2.0, np.nan, np.nan],
+            [np.nan, np.nan, np.nan],
+        ]))
+    assert_equal(latest_sample_dict, {'a': (101.0, 2.0), 'b': (100.0, 10.0)})
+    assert_equal(
+        openmetrics.get_latest_samples(
+            column_list=['a'], timestamp_array=np.zeros(0),
+            value_array=np.zeros((0, 1))),
+        {})
+
+
+def test_format_openmetrics():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_openmetrics:test_format_openmetrics --skip_jupyter 1
+    """
+    column_list = [
+        'memory usage (MB)', 'memory usage (MB) (p50)',
+        'memory usage (MB) (p99.9)', 'memory usage (MB) (min to limit)',
+        'disk usage (GB)']
+    openmetrics_str = openmetrics.format_openmetrics(
+        column_list=column_list,
+        timestamp_array=np.array([100.0, 100.25]),
+        value_array=np.array([
+            [1024.0, 1000.0, 1100.5, np.inf, 50.0],
+            [1030.5, 1010.0, 1100.5, np.inf, np.nan],
+        ]))
+    assert_equal(openmetrics_str.split('\n'), [
+        '# TYPE plot_playground_memory_usage_mb gauge',
+        '# HELP plot_playground_memory_usage_mb memory usage (MB)',
+        'plot_playground_memory_usage_mb 1030.5 100.250',
+        '# TYPE plot_playground_memory_usage_mb_session summary',
+        '# HELP plot_playground_memory_usage_mb_session Quantiles of '
+        'memory usage (MB) over the session of the collector.',
+        'plot_playground_memory_usage_mb_session{quantile="0.5"} '
+        '1010.0 100.250',
+        'plot_playground_memory_usage_mb_session{quantile="0.999"} '
+        '1100.5 100.250',
+        '# TYPE plot_playground_memory_usage_mb_min_to_limit gauge',
+        '# HELP plot_playground_memory_usage_mb_min_to_limit '
+        'memory usage (MB) (min to limit)',
+        'plot_playground_memory_usage_mb_min_to_limit +Inf 100.250',
+        '# TYPE plot_playground_disk_usage_gb gauge',
+        '# HELP plot_playground_disk_usage_gb disk usage (GB)',
+        'plot_playground_disk_usage_gb 50.0 100.000',
+        '# EOF',
+        '',
+    ])
+
+    assert_equal(
+        openmetrics.format_openmetrics(
+            column_list=['memory usage (MB)'], timestamp_array=np.zeros(0),
+            value_array=np.zeros((0, 1))),
+        '# EOF\n')
+
+
+def test_openmetrics_server():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_openmetrics:test_openmetrics_server --skip_jupyter 1
+    """
+    tiered_history = history.TieredHistory(
+        column_list=['memory usage (MB)', 'memory usage (MB) (p99)'],
+        row_num_per_second=1)
+    history_lock = threading.Lock()
+    server = openmetrics.OpenMetricsServer(
+        tiered_history=tiered_history, history_lock=history_lock)
+    server.start()
+    try:
+        assert_true(server.port > 0)
+        content_type, body_str = stats_helper.scrape(port=server.port)
+        assert_equal(content_type, openmetrics.CONTENT_TYPE)
+        assert_equal(body_str, '# EOF\n')
+
+        with history_lock:
+            tiered_history.append(timestamp=100.0, row_dict={
+                'memory usage (MB)': 512.0,
+                'memory usage (MB) (p99)': 600.0,
+            })
+        _, body_str = stats_helper.scrape(port=server.port)
+        assert_true(
+            'plot_playground_memory_usage_mb 512.0 100.000\n' in body_str)
+        assert_true(
+            'plot_playground_memory_usage_mb_session{quantile="0.99"} '
+            '600.0 100.000\n' in body_str)
+
+        # The added columns are served after the update of the columns.
+        with history_lock:
+            tiered_history.update_columns(
+                column_list=[
+                    'memory usage (MB)', 'memory usage (MB) (p99)',
+                    'disk usage (GB)'],
+                row_num_per_second=2)
+            tiered_history.append(
+                timestamp=101.0, row_dict={'disk usage (GB)': 20.0})
+        _, body_str = stats_helper.scrape(port=server.port, path='/metrics?x=1')
+        assert_true('plot_playground_disk_usage_gb 20.0 101.000\n' in body_str)
+        assert_true(
+            'plot_playground_memory_usage_mb 512.0 100.000\n' in body_str)
+
+        with assert_raises(HTTPError) as context:
+            stats_helper.scrape(port=server.port, path='/')
+        assert_equal(context.exception.code, 404)
+    finally:
+        server.stop()
+    assert_raises(OSError, stats_helper.scrape, server.port)
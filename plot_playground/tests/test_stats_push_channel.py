@@ -0,0 +1,173 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_push_channel --skip_jupyter 1
+"""
+
+import multiprocessing as mp
+
+from nose.tools import assert_equal, assert_true, assert_false, \
+    assert_raises
+
+from plot_playground.stats import push_channel
+
+
+class _TestComm():
+
+    def __init__(self, comm_id):
+        """
+        A comm class for testing that stores the sent messages.
+
+        Parameters
+        ----------
+        comm_id : str
+            ID of the comm.
+        """
+        self.comm_id = comm_id
+        self.sent_data_list = []
+        self.on_msg_callback = None
+        self.on_close_callback = None
+        self.is_closed = False
+
+    def send(self, data):
+        self.sent_data_list.append(data)
+
+    def on_msg(self, callback):
+        self.on_msg_callback = callback
+
+    def on_close(self, callback):
+        self.on_close_callback = callback
+
+    def close(self):
+        self.is_closed = True
+
+
+def _make_forwarder(buffer_size=3):
+    """
+    Make a forwarder for testing.
+
+    Parameters
+    ----------
+    buffer_size : int, default 3
+        Buffer size of the forwarder.
+
+    Returns
+    -------
+    forwarder : SamplePushForwarder
+        The created forwarder.
+    send_conn : multiprocessing.connection.Connection
+        The connection to send the rows to the forwarder.
+    """
+    receive_conn, send_conn = mp.Pipe(duplex=False)
+    forwarder = push_channel.SamplePushForwarder(
+        sample_conn=receive_conn, svg_id='test_svg',
+        buffer_size=buffer_size)
+    return forwarder, send_conn
+
+
+def test_get_comm_target_name():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_push_channel:test_get_comm_target_name --skip_jupyter 1
+    """
+    target_name = push_channel.get_comm_target_name(svg_id='test_svg')
+    assert_equal(target_name, 'plot_playground_linux_stats_test_svg')
+
+
+def test_get_kernel_comm_manager():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_push_channel:test_get_kernel_comm_manager --skip_jupyter 1
+    """
+    comm_manager = push_channel.get_kernel_comm_manager()
+    assert_equal(comm_manager, None)
+
+
+def test_receive_rows():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_push_channel:test_receive_rows --skip_jupyter 1
+    """
+    forwarder, send_conn = _make_forwarder()
+    row_list = forwarder.receive_rows(timeout=0.01)
+    assert_equal(row_list, [])
+
+    send_conn.send({'a': 1})
+    send_conn.send({'a': 2})
+    row_list = forwarder.receive_rows(timeout=1)
+    assert_equal(row_list, [{'a': 1}, {'a': 2}])
+
+    send_conn.close()
+    assert_raises(EOFError, forwarder.receive_rows, 1)
+
+
+def test_open_comm():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_push_channel:test_open_comm --skip_jupyter 1
+    """
+    forwarder, _ = _make_forwarder(buffer_size=2)
+    forwarder.add_rows(row_list=[{'a': 1}, {'a': 2}, {'a': 3}])
+    comm = _TestComm(comm_id='comm_1')
+    forwarder.open_comm(comm=comm, open_msg={})
+    assert_equal(
+        comm.sent_data_list,
+        [{'rows': [{'a': 2}, {'a': 3}], 'reset': True}])
+    assert_true('comm_1' in forwarder.comm_state_dict)
+
+    comm.on_close_callback({})
+    assert_false('comm_1' in forwarder.comm_state_dict)
+
+
+def test_flush():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_push_channel:test_flush --skip_jupyter 1
+    """
+    forwarder, _ = _make_forwarder(buffer_size=2)
+    comm = _TestComm(comm_id='comm_1')
+    forwarder.open_comm(comm=comm, open_msg={})
+    comm.sent_data_list = []
+
+    forwarder.add_rows(row_list=[{'a': 1}])
+    forwarder.flush()
+    assert_equal(
+        comm.sent_data_list, [{'rows': [{'a': 1}], 'reset': False}])
+    forwarder.flush()
+    assert_equal(len(comm.sent_data_list), 1)
+
+    # Rows are coalesced while the tab is hidden.
+    comm.sent_data_list = []
+    comm.on_msg_callback({'content': {'data': {'visible': False}}})
+    forwarder.add_rows(row_list=[{'a': 2}])
+    forwarder.add_rows(row_list=[{'a': 3}])
+    forwarder.add_rows(row_list=[{'a': 4}])
+    forwarder.flush()
+    assert_equal(comm.sent_data_list, [])
+    comm.on_msg_callback({'content': {'data': {'visible': True}}})
+    assert_equal(
+        comm.sent_data_list,
+        [{'rows': [{'a': 3}, {'a': 4}], 'reset': False}])
+
+
+def test_stop():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_push_channel:test_stop --skip_jupyter 1
+    """
+    forwarder, send_conn = _make_forwarder()
+    comm = _TestComm(comm_id='comm_1')
+    forwarder.open_comm(comm=comm, open_msg={})
+    forwarder.start()
+    send_conn.send({'a': 1})
+    forwarder.stop()
+    forwarder._thread.join(timeout=3)
+    assert_false(forwarder._thread.is_alive())
+    assert_true(comm.is_closed)
+    assert_equal(forwarder.comm_state_dict, {})
@@ -0,0 +1,66 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_quantiles --skip_jupyter 1
+"""
+
+from nose.tools import assert_equal, assert_almost_equal
+import numpy as np
+
+from plot_playground.stats import quantiles
+
+
+def test_get_quantile_column_name():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_quantiles:test_get_quantile_column_name --skip_jupyter 1
+    """
+    quantile_column_name = quantiles.get_quantile_column_name(
+        column_name='memory usage (MB)', quantile=0.99)
+    assert_equal(quantile_column_name, 'memory usage (MB) (p99)')
+    quantile_column_name = quantiles.get_quantile_column_name(
+        column_name='memory usage (MB)', quantile=0.999)
+    assert_equal(quantile_column_name, 'memory usage (MB) (p99.9)')
+
+
+def test_P2Quantile():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_quantiles:test_P2Quantile --skip_jupyter 1
+    """
+    estimator = quantiles.P2Quantile(quantile=0.5)
+    assert_equal(estimator.get_value(), None)
+    for value in [5, 1, 3]:
+        estimator.add(value)
+    assert_equal(estimator.get_value(), 3)
+
+    random_state = np.random.RandomState(0)
+    value_array = random_state.normal(loc=1000, scale=100, size=10000)
+    for quantile in quantiles.DEFAULT_QUANTILE_LIST:
+        estimator = quantiles.P2Quantile(quantile=quantile)
+        for value in value_array:
+            estimator.add(float(value))
+        # Only five markers are kept.
+        assert_equal(len(estimator.height_list), 5)
+        assert_almost_equal(
+            estimator.get_value(),
+            np.percentile(value_array, quantile * 100), delta=5)
+
+
+def test_QuantileSketch():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_quantiles:test_QuantileSketch --skip_jupyter 1
+    """
+    quantile_sketch = quantiles.QuantileSketch(column_name='a')
+    assert_equal(quantile_sketch.get_value_dict(), {})
+    for value in range(1, 1001):
+        quantile_sketch.add(value)
+    value_dict = quantile_sketch.get_value_dict()
+    assert_equal(sorted(value_dict.keys()), ['a (p50)', 'a (p95)', 'a (p99)'])
+    assert_almost_equal(value_dict['a (p50)'], 500, delta=5)
+    assert_almost_equal(value_dict['a (p95)'], 950, delta=5)
+    assert_almost_equal(value_dict['a (p99)'], 990, delta=5)
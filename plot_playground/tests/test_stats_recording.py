@@ -0,0 +1,209 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_recording --skip_jupyter 1
+"""
+
+import os
+import shutil
+import subprocess as sp
+import sys
+
+from nose.tools import assert_equal, assert_true, assert_greater, \
+    assert_less, assert_raises
+import numpy as np
+import pandas as pd
+
+from plot_playground.stats import collectors
+from plot_playground.stats import recording
+
+TMP_TEST_LOG_DIR = './log_plotplayground_stats/test_recording/'
+RECORD_TIMEOUT_SECONDS = 60
+
+
+def _write_test_recording(file_path, timestamp_array, value_array,
+                          column_list, chunk_row_num):
+    """
+    Write the rows to a recording file for testing.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the recording file.
+    timestamp_array : numpy.ndarray
+        Timestamps of the rows.
+    value_array : numpy.ndarray
+        2-dimensional array of the values of the rows.
+    column_list : list of str
+        Names of the value columns.
+    chunk_row_num : int
+        The number of the rows of each chunk.
+    """
+    writer = recording.RecordingWriter(
+        file_path=file_path, column_list=column_list, panel_list=[],
+        metric_interval_seconds_dict={'memory': 1})
+    for i, (timestamp, value_row) in enumerate(
+            zip(timestamp_array, value_array)):
+        row_dict = {
+            column_name: value
+            for column_name, value in zip(column_list, value_row)
+            if not np.isnan(value)}
+        row_dict['timestamp'] = timestamp
+        writer.add_row(row_dict=row_dict)
+        if (i + 1) % chunk_row_num == 0:
+            writer.flush()
+    writer.close()
+
+
+def test_encode_chunk():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_recording:test_encode_chunk --skip_jupyter 1
+    """
+    timestamp_array = np.array([1600000000.0, 1600000000.5, 1600000001.25])
+    value_array = np.array([
+        [1024.5, np.nan, -3.0],
+        [1024.5, 0.0, np.inf],
+        [1030.125, np.nan, 1e-10],
+    ])
+    for compression in [recording.COMPRESSION_ZLIB,
+                        recording.get_compression()]:
+        payload = recording.encode_chunk(
+            timestamp_array=timestamp_array, value_array=value_array,
+            compression=compression)
+        decoded_timestamp_array, decoded_value_array = \
+            recording.decode_chunk(
+                payload=payload, row_num=3, column_num=3,
+                compression=compression)
+        np.testing.assert_array_equal(
+            decoded_timestamp_array, timestamp_array)
+        np.testing.assert_array_equal(decoded_value_array, value_array)
+
+    if recording.zstandard is None:
+        assert_raises(
+            ValueError, recording.decode_chunk, b'', 0, 1,
+            recording.COMPRESSION_ZSTD)
+
+
+def test_load_recording():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_recording:test_load_recording --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    file_path = os.path.join(TMP_TEST_LOG_DIR, 'test.stats')
+    column_list = ['memory usage (MB)', 'disk usage (GB)']
+    timestamp_array = 1600000000 + np.arange(10) * 0.5
+    value_array = np.column_stack([
+        np.arange(10) * 1.5,
+        np.where(np.arange(10) % 5 == 0, 100.0, np.nan)])
+    _write_test_recording(
+        file_path=file_path, timestamp_array=timestamp_array,
+        value_array=value_array, column_list=column_list, chunk_row_num=4)
+
+    meta_dict, sample_df = recording.load_recording(file_path=file_path)
+    assert_equal(meta_dict['column_list'], column_list)
+    assert_equal(meta_dict['metric_interval_seconds_dict'], {'memory': 1})
+    assert_equal(list(sample_df.columns), ['timestamp'] + column_list)
+    np.testing.assert_array_equal(sample_df['timestamp'], timestamp_array)
+    np.testing.assert_array_equal(sample_df[column_list].values, value_array)
+
+    # The chunk partially written when the recorder was killed is
+    # ignored.
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    with open(file_path, 'wb') as f:
+        f.write(data[:-3])
+    _, sample_df = recording.load_recording(file_path=file_path)
+    assert_equal(len(sample_df), 8)
+
+    with open(file_path, 'wb') as f:
+        f.write(b'timestamp,memory usage (MB)\n')
+    assert_raises(ValueError, recording.load_recording, file_path)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_recording_size():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_recording:test_recording_size --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    file_path = os.path.join(TMP_TEST_LOG_DIR, 'test.stats')
+    row_num = 7200
+    column_list = ['memory usage (MB)', 'disk usage (GB)', 'cpu (%)']
+    timestamp_array = 1600000000 + np.arange(row_num) * 0.5
+    value_array = np.column_stack([
+        np.round(2048 + np.cumsum(np.random.randint(-1, 2, row_num)), 1),
+        np.where(np.arange(row_num) % 10 == 0, 120.5, np.nan),
+        np.random.randint(0, 100, row_num).astype(np.float64)])
+    _write_test_recording(
+        file_path=file_path, timestamp_array=timestamp_array,
+        value_array=value_array, column_list=column_list,
+        chunk_row_num=120)
+    csv_file_path = os.path.join(TMP_TEST_LOG_DIR, 'test.csv')
+    sample_df = pd.DataFrame(value_array, columns=column_list)
+    sample_df.insert(loc=0, column='timestamp', value=timestamp_array)
+    sample_df.to_csv(csv_file_path, index=False)
+    assert_less(
+        os.path.getsize(file_path), os.path.getsize(csv_file_path) / 5)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_downsample_samples():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_recording:test_downsample_samples --skip_jupyter 1
+    """
+    sample_df = pd.DataFrame({
+        'timestamp': [100.0, 101.0, 102.0, 103.0, 104.0],
+        'memory usage (MB)': [1.0, 5.0, 2.0, np.nan, 4.0],
+    })
+    rollup_df = recording.downsample_samples(
+        sample_df=sample_df, point_num=2)
+    assert_equal(
+        list(rollup_df.columns),
+        ['timestamp', 'memory usage (MB)', 'memory usage (MB) (min)',
+         'memory usage (MB) (max)'])
+    assert_equal(rollup_df['timestamp'].tolist(), [100.0, 102.0])
+    assert_equal(rollup_df['memory usage (MB)'].tolist(), [3.0, 3.0])
+    assert_equal(rollup_df['memory usage (MB) (min)'].tolist(), [1.0, 2.0])
+    assert_equal(rollup_df['memory usage (MB) (max)'].tolist(), [5.0, 4.0])
+    assert_equal(recording.get_window_seconds(sample_df=sample_df), 4)
+
+    rollup_df = recording.downsample_samples(
+        sample_df=sample_df.iloc[:0], point_num=2)
+    assert_equal(len(rollup_df), 0)
+    assert_equal(len(rollup_df.columns), 4)
+
+
+def test_record_command():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_recording:test_record_command --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    file_path = os.path.join(TMP_TEST_LOG_DIR, 'run.stats')
+    process = sp.run([
+        sys.executable, '-m', 'plot_playground.stats', 'record',
+        '--out', file_path, '--interval', '0.1',
+        '--metrics', 'memory', 'disk', '--duration', '1.5'],
+        timeout=RECORD_TIMEOUT_SECONDS)
+    assert_equal(process.returncode, 0)
+    meta_dict, sample_df = recording.load_recording(file_path=file_path)
+    assert_equal(
+        [panel_dict['title'] for panel_dict in meta_dict['panel_list']],
+        [collectors.COLUMN_NAME_MEMORY_USAGE,
+         collectors.COLUMN_NAME_DISK_USAGE])
+    assert_equal(
+        meta_dict['metric_interval_seconds_dict'],
+        {'memory': 0.1, 'disk': 0.1})
+    assert_greater(
+        sample_df[collectors.COLUMN_NAME_MEMORY_USAGE].notnull().sum(), 8)
+    assert_true(sample_df['timestamp'].is_monotonic_increasing)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
@@ -0,0 +1,128 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_scheduler --skip_jupyter 1
+"""
+
+from nose.tools import assert_equal, assert_raises, assert_almost_equal
+
+from plot_playground.stats import scheduler
+
+
+class _TestClock():
+
+    def __init__(self):
+        """
+        A clock class for testing whose time is advanced manually.
+        """
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_add_job():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_scheduler:test_add_job --skip_jupyter 1
+    """
+    test_clock = _TestClock()
+    interval_scheduler = scheduler.IntervalScheduler(clock=test_clock)
+    interval_scheduler.add_job(name='memory', interval_seconds=0.25)
+    assert_equal(interval_scheduler.get_job_names(), ['memory'])
+    assert_raises(
+        ValueError, interval_scheduler.add_job, 'disk', 0)
+
+
+def test_pop_due_job_names():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_scheduler:test_pop_due_job_names --skip_jupyter 1
+    """
+    test_clock = _TestClock()
+    interval_scheduler = scheduler.IntervalScheduler(clock=test_clock)
+    interval_scheduler.add_job(name='memory', interval_seconds=0.25)
+    interval_scheduler.add_job(name='gpu', interval_seconds=1)
+    interval_scheduler.add_job(name='disk', interval_seconds=5)
+    assert_equal(
+        interval_scheduler.pop_due_job_names(), ['memory', 'gpu', 'disk'])
+    assert_equal(interval_scheduler.pop_due_job_names(), [])
+
+    test_clock.now = 0.26
+    assert_equal(interval_scheduler.pop_due_job_names(), ['memory'])
+
+    # The next run time is not shifted by the delay of the previous run.
+    test_clock.now = 0.5
+    assert_equal(interval_scheduler.pop_due_job_names(), ['memory'])
+
+    # Missed runs are skipped instead of being executed in a burst.
+    test_clock.now = 1.9
+    assert_equal(interval_scheduler.pop_due_job_names(), ['memory', 'gpu'])
+    assert_equal(interval_scheduler.pop_due_job_names(), [])
+    test_clock.now = 2.0
+    assert_equal(interval_scheduler.pop_due_job_names(), ['memory', 'gpu'])
+
+    test_clock.now = 5.0
+    assert_equal(
+        interval_scheduler.pop_due_job_names(), ['memory', 'gpu', 'disk'])
+
+
+def test_get_seconds_until_next():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_scheduler:test_get_seconds_until_next --skip_jupyter 1
+    """
+    test_clock = _TestClock()
+    interval_scheduler = scheduler.IntervalScheduler(clock=test_clock)
+    assert_equal(interval_scheduler.get_seconds_until_next(), None)
+
+    interval_scheduler.add_job(name='memory', interval_seconds=0.25)
+    interval_scheduler.add_job(name='gpu', interval_seconds=1)
+    assert_equal(interval_scheduler.get_seconds_until_next(), 0)
+    interval_scheduler.pop_due_job_names()
+    test_clock.now = 0.1
+    assert_almost_equal(interval_scheduler.get_seconds_until_next(), 0.15)
+
+
+def test_sleep_until_next():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_scheduler:test_sleep_until_next --skip_jupyter 1
+    """
+    test_clock = _TestClock()
+    interval_scheduler = scheduler.IntervalScheduler(clock=test_clock)
+    interval_scheduler.add_job(name='memory', interval_seconds=0.25)
+    slept_seconds_list = []
+    interval_scheduler.sleep_until_next(
+        sleep_func=slept_seconds_list.append)
+    assert_equal(slept_seconds_list, [])
+
+    interval_scheduler.pop_due_job_names()
+    interval_scheduler.sleep_until_next(
+        sleep_func=slept_seconds_list.append)
+    assert_equal(slept_seconds_list, [0.25])
+
+
+def test_set_interval():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_scheduler:test_set_interval --skip_jupyter 1
+    """
+    test_clock = _TestClock()
+    interval_scheduler = scheduler.IntervalScheduler(clock=test_clock)
+    interval_scheduler.add_job(name='memory', interval_seconds=1)
+    interval_scheduler.pop_due_job_names()
+    test_clock.now = 0.3
+    interval_scheduler.set_interval(name='memory', interval_seconds=0.5)
+    assert_equal(interval_scheduler.pop_due_job_names(), ['memory'])
+    test_clock.now = 0.8
+    assert_equal(interval_scheduler.pop_due_job_names(), ['memory'])
+    assert_raises(KeyError, interval_scheduler.set_interval, 'disk', 1)
+
+    interval_scheduler.remove_job(name='memory')
+    assert_equal(interval_scheduler.get_job_names(), [])
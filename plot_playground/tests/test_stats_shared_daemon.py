@@ -0,0 +1,298 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_shared_daemon --skip_jupyter 1
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import subprocess as sp
+import sys
+import threading
+import time
+
+from nose.tools import assert_equal, assert_true, assert_false, \
+    assert_greater, assert_raises, assert_not_equal
+import numpy as np
+import pandas as pd
+
+from plot_playground.stats import collector
+from plot_playground.stats import collectors
+from plot_playground.stats import shared_daemon
+from plot_playground.tests import stats_helper
+
+TMP_TEST_DAEMON_DIR = './log_plotplayground_stats/test_shared_daemon/'
+TMP_TEST_LOG_DIR = './log_plotplayground_stats/test_shared_daemon_log/'
+
+
+def test_make_shared_collector_list():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_shared_daemon:test_make_shared_collector_list --skip_jupyter 1
+    """
+    collector_list = shared_daemon.make_shared_collector_list(
+        metrics=['memory', 'gpu'])
+    assert_equal(
+        [metric_collector.name for metric_collector in collector_list],
+        ['memory', 'gpu'])
+    # The daemon is not the kernel of any plot.
+    assert_false(collector_list[1].is_kernel_memory_enabled)
+
+
+def test_validate_collectors():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_shared_daemon:test_validate_collectors --skip_jupyter 1
+    """
+    shared_daemon.validate_collectors(
+        collector_list=collectors.make_collector_list(
+            metrics=shared_daemon.SHARED_METRIC_NAME_LIST))
+    for metric_name in shared_daemon.KERNEL_METRIC_NAME_LIST:
+        assert_raises(
+            ValueError, shared_daemon.validate_collectors,
+            collectors.make_collector_list(metrics=['memory', metric_name]))
+
+
+def test_validate_daemon_dir():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_shared_daemon:test_validate_daemon_dir --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_DAEMON_DIR, ignore_errors=True)
+    subscriber_file_path = shared_daemon.subscribe(
+        daemon_dir_path=TMP_TEST_DAEMON_DIR)
+    shared_daemon.validate_daemon_dir(daemon_dir_path=TMP_TEST_DAEMON_DIR)
+    shared_daemon.unsubscribe(subscriber_file_path=subscriber_file_path)
+
+    # The directory accessible by the other users is not used.
+    os.chmod(TMP_TEST_DAEMON_DIR, 0o755)
+    assert_raises(
+        ValueError, shared_daemon.subscribe, TMP_TEST_DAEMON_DIR)
+    assert_raises(
+        ValueError, shared_daemon.run_daemon, TMP_TEST_DAEMON_DIR,
+        ['memory'])
+    os.chmod(TMP_TEST_DAEMON_DIR, 0o700)
+
+    # Nor is a symbolic link to the directory.
+    link_dir_path = TMP_TEST_DAEMON_DIR.rstrip('/') + '_link'
+    if os.path.lexists(link_dir_path):
+        os.remove(link_dir_path)
+    os.symlink(os.path.abspath(TMP_TEST_DAEMON_DIR), link_dir_path)
+    try:
+        assert_raises(
+            ValueError, shared_daemon.validate_daemon_dir, link_dir_path)
+    finally:
+        os.remove(link_dir_path)
+    shutil.rmtree(TMP_TEST_DAEMON_DIR, ignore_errors=True)
+
+
+def test_validate_ring_name():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_shared_daemon:test_validate_ring_name --skip_jupyter 1
+    """
+    shared_daemon.validate_ring_name(ring_name=shared_daemon.get_ring_name())
+    for ring_name in ['', '.', '..', '../..', '/tmp/x', 'a/b']:
+        assert_raises(ValueError, shared_daemon.validate_ring_name, ring_name)
+
+    # The file named by the meta left in the directory is not removed
+    # unless it is a shared memory.
+    shutil.rmtree(TMP_TEST_DAEMON_DIR, ignore_errors=True)
+    os.makedirs(TMP_TEST_DAEMON_DIR, mode=0o700)
+    victim_file_path = os.path.abspath(
+        os.path.join(TMP_TEST_DAEMON_DIR, 'victim.txt'))
+    with open(victim_file_path, 'w'):
+        pass
+    daemon_meta_file_path = shared_daemon.get_daemon_meta_file_path(
+        daemon_dir_path=TMP_TEST_DAEMON_DIR)
+    with open(daemon_meta_file_path, 'w') as f:
+        json.dump({'pid': os.getpid(), 'ring_name': victim_file_path}, f)
+    shared_daemon._remove_stale_daemon_meta(
+        daemon_dir_path=TMP_TEST_DAEMON_DIR)
+    assert_true(os.path.exists(victim_file_path))
+    assert_false(os.path.exists(daemon_meta_file_path))
+    shutil.rmtree(TMP_TEST_DAEMON_DIR, ignore_errors=True)
+
+
+def test_shared_sample_ring():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_shared_daemon:test_shared_sample_ring --skip_jupyter 1
+    """
+    ring = shared_daemon.SharedSampleRing(
+        name=shared_daemon.get_ring_name() + '_test', row_num=4,
+        column_num=2, create=True)
+    try:
+        reader_ring = shared_daemon.SharedSampleRing(name=ring.name)
+        assert_equal(reader_ring.row_num, 4)
+        assert_equal(reader_ring.column_num, 2)
+        write_count, row_array = reader_ring.read_rows(start_count=0)
+        assert_equal(write_count, 0)
+        assert_equal(row_array.shape, (0, 2))
+
+        for i in range(3):
+            ring.write_row(value_array=np.array([100.0 + i, i]))
+        write_count, row_array = reader_ring.read_rows(start_count=0)
+        assert_equal(write_count, 3)
+        np.testing.assert_array_equal(row_array[:, 0], [100, 101, 102])
+        ring.write_row(value_array=np.array([103.0, np.nan]))
+        write_count, row_array = reader_ring.read_rows(start_count=3)
+        assert_equal(write_count, 4)
+        np.testing.assert_array_equal(row_array, [[103, np.nan]])
+
+        # The overwritten rows are skipped, and the oldest row of the
+        # full ring buffer may be being overwritten.
+        for i in range(4, 10):
+            ring.write_row(value_array=np.array([100.0 + i, i]))
+        write_count, row_array = reader_ring.read_rows(start_count=4)
+        assert_equal(write_count, 10)
+        np.testing.assert_array_equal(row_array[:, 0], [107, 108, 109])
+
+        # The kernels can not write to the ring buffer.
+        assert_raises(
+            ValueError, reader_ring.row_array.__setitem__, 0, 1.0)
+        reader_ring.close()
+    finally:
+        ring.close()
+        ring.unlink()
+    assert_false(os.path.exists(
+        os.path.join(shared_daemon.SHM_DIR_PATH, ring.name)))
+
+
+def test_subscribe():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_shared_daemon:test_subscribe --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_DAEMON_DIR, ignore_errors=True)
+    assert_equal(
+        shared_daemon.get_subscriber_pid_list(
+            daemon_dir_path=TMP_TEST_DAEMON_DIR), [])
+    subscriber_file_path = shared_daemon.subscribe(
+        daemon_dir_path=TMP_TEST_DAEMON_DIR)
+    exited_process = sp.Popen([sys.executable, '-c', 'pass'])
+    exited_process.wait()
+    exited_file_path = shared_daemon.subscribe(
+        daemon_dir_path=TMP_TEST_DAEMON_DIR, pid=exited_process.pid)
+    assert_equal(
+        shared_daemon.get_subscriber_pid_list(
+            daemon_dir_path=TMP_TEST_DAEMON_DIR), [os.getpid()])
+    # The subscription of the process that has exited is removed.
+    assert_false(os.path.exists(exited_file_path))
+    shared_daemon.unsubscribe(subscriber_file_path=subscriber_file_path)
+    shared_daemon.unsubscribe(subscriber_file_path=subscriber_file_path)
+    assert_equal(
+        shared_daemon.get_subscriber_pid_list(
+            daemon_dir_path=TMP_TEST_DAEMON_DIR), [])
+    assert_false(shared_daemon.is_daemon_running(
+        daemon_dir_path=TMP_TEST_DAEMON_DIR))
+    shutil.rmtree(TMP_TEST_DAEMON_DIR, ignore_errors=True)
+
+
+def test_shared_daemon():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_shared_daemon:test_shared_daemon --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_DAEMON_DIR, ignore_errors=True)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    assert_equal(
+        shared_daemon.load_daemon_meta(daemon_dir_path=TMP_TEST_DAEMON_DIR),
+        None)
+    daemon_meta_dict, subscriber_file_path = shared_daemon.connect_daemon(
+        daemon_dir_path=TMP_TEST_DAEMON_DIR, metrics=['memory', 'disk'],
+        metric_interval_seconds={'memory': 0.1}, idle_timeout_seconds=1,
+        timeout=30)
+    reader = None
+    try:
+        assert_not_equal(daemon_meta_dict, None)
+        assert_true(shared_daemon.is_daemon_running(
+            daemon_dir_path=TMP_TEST_DAEMON_DIR))
+        assert_equal(daemon_meta_dict['metric_name_list'], ['memory', 'disk'])
+        assert_equal(
+            [collector_.name
+             for collector_ in shared_daemon.make_daemon_collector_list(
+                 daemon_meta_dict=daemon_meta_dict)],
+            ['memory', 'disk'])
+        assert_equal(
+            daemon_meta_dict['metric_interval_seconds_dict'],
+            {'memory': 0.1, 'disk': 5})
+
+        # Starting the daemon again is idempotent.
+        process = shared_daemon.start_daemon_process(
+            daemon_dir_path=TMP_TEST_DAEMON_DIR, metrics=['cpu'])
+        assert_equal(process.wait(timeout=30), 0)
+        second_meta_dict, second_file_path = shared_daemon.connect_daemon(
+            daemon_dir_path=TMP_TEST_DAEMON_DIR, metrics=['cpu'])
+        assert_equal(second_meta_dict['pid'], daemon_meta_dict['pid'])
+        assert_equal(
+            second_meta_dict['column_list'], daemon_meta_dict['column_list'])
+        shared_daemon.unsubscribe(subscriber_file_path=second_file_path)
+
+        reader = shared_daemon.SharedRingReader(
+            daemon_meta_dict=daemon_meta_dict, window_seconds=60,
+            interval_seconds=0.2, log_dir_path=TMP_TEST_LOG_DIR)
+        reader.start()
+        assert_true(reader.ready_event.wait(timeout=10))
+        time.sleep(1)
+        assert_raises(
+            ValueError, reader.send_command,
+            {'command': collector.COMMAND_SET_INTERVAL,
+             'metric_name': 'memory', 'interval_seconds': 1})
+        df = pd.read_csv(collector.get_log_file_path(
+            log_dir_path=TMP_TEST_LOG_DIR))
+        assert_greater(
+            df[collectors.COLUMN_NAME_MEMORY_USAGE].notnull().sum(), 5)
+        assert_true(df['timestamp'].is_monotonic_increasing)
+    finally:
+        if reader is not None:
+            reader.stop()
+        shared_daemon.unsubscribe(subscriber_file_path=subscriber_file_path)
+
+    # The daemon exits when no subscriber is left.
+    assert_true(stats_helper.wait_for_daemon_exit(daemon_dir_path=TMP_TEST_DAEMON_DIR))
+    assert_false(os.path.exists(shared_daemon.get_daemon_meta_file_path(
+        daemon_dir_path=TMP_TEST_DAEMON_DIR)))
+    assert_false(os.path.exists(os.path.join(
+        shared_daemon.SHM_DIR_PATH, daemon_meta_dict['ring_name'])))
+    shutil.rmtree(TMP_TEST_DAEMON_DIR, ignore_errors=True)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_connect_exiting_daemon():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_shared_daemon:test_connect_exiting_daemon --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_DAEMON_DIR, ignore_errors=True)
+    os.makedirs(TMP_TEST_DAEMON_DIR, mode=0o700)
+    # The lock is held as by the daemon exiting on the idle timeout,
+    # and is released after the subscription.
+    lock_file = open(shared_daemon.get_lock_file_path(
+        daemon_dir_path=TMP_TEST_DAEMON_DIR), 'a')
+    fcntl.flock(lock_file, fcntl.LOCK_EX)
+    timer = threading.Timer(interval=1, function=lock_file.close)
+    timer.start()
+    daemon_meta_dict, subscriber_file_path = shared_daemon.connect_daemon(
+        daemon_dir_path=TMP_TEST_DAEMON_DIR, metrics=['memory'],
+        idle_timeout_seconds=1, timeout=30)
+    try:
+        timer.join()
+        assert_not_equal(daemon_meta_dict, None)
+        assert_not_equal(daemon_meta_dict['pid'], os.getpid())
+        assert_true(shared_daemon.is_daemon_running(
+            daemon_dir_path=TMP_TEST_DAEMON_DIR))
+    finally:
+        shared_daemon.unsubscribe(subscriber_file_path=subscriber_file_path)
+    assert_true(stats_helper.wait_for_daemon_exit(daemon_dir_path=TMP_TEST_DAEMON_DIR))
+    shutil.rmtree(TMP_TEST_DAEMON_DIR, ignore_errors=True)
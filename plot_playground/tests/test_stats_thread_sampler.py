@@ -0,0 +1,260 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_thread_sampler --skip_jupyter 1
+"""
+
+import os
+import shutil
+import time
+
+from nose.tools import assert_equal, assert_true, assert_false, \
+    assert_greater, assert_less, assert_raises
+import pandas as pd
+
+from plot_playground.stats import collector
+from plot_playground.stats import collectors
+from plot_playground.stats import history
+from plot_playground.stats import thread_sampler
+
+TMP_TEST_LOG_DIR = './log_plotplayground_stats/test_thread_sampler/'
+
+
+class _ErrorCollector(collectors.MetricCollector):
+
+    name = 'error'
+    supports_thread_sampling = True
+
+    def get_panel_list(self):
+        return [
+            collectors.make_panel(
+                title='error', column_list=['error'], unit='')]
+
+    def collect(self):
+        raise ValueError('Error for testing.')
+
+
+def _make_test_sampler(collector_list=None):
+    """
+    Make the sampler of the proc_stats metric for testing.
+
+    Parameters
+    ----------
+    collector_list : list of MetricCollector or None, default None
+        Collectors to sample. If None, the ProcStatsCollector is used.
+
+    Returns
+    -------
+    sampler : plot_playground.stats.thread_sampler.ThreadSampler
+        The created sampler (not started).
+    """
+    if collector_list is None:
+        collector_list = collectors.setup_collectors(
+            collector_list=[collectors.ProcStatsCollector()])
+    sampler = thread_sampler.ThreadSampler(
+        collector_list=collector_list,
+        metric_interval_seconds_dict={
+            metric_collector.name: 0.05 for metric_collector
+            in collector_list},
+        window_seconds=10, interval_seconds=0.5,
+        log_dir_path=TMP_TEST_LOG_DIR)
+    return sampler
+
+
+def test_get_tier_setting_list():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_thread_sampler:test_get_tier_setting_list --skip_jupyter 1
+    """
+    tier_setting_list = thread_sampler.get_tier_setting_list(
+        window_seconds=300)
+    assert_equal(len(tier_setting_list), 1)
+    assert_equal(tier_setting_list[0]['name'], 'raw')
+    assert_equal(tier_setting_list[0]['retention_seconds'], 300)
+
+
+def test_validate_collectors():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_thread_sampler:test_validate_collectors --skip_jupyter 1
+    """
+    thread_sampler.validate_collectors(
+        collector_list=[collectors.ProcStatsCollector()])
+    assert_raises(
+        ValueError, thread_sampler.validate_collectors,
+        [collectors.ProcStatsCollector(), collectors.MemoryCollector()])
+
+
+def test_RawLogWriter():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_thread_sampler:test_RawLogWriter --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    os.makedirs(TMP_TEST_LOG_DIR)
+    log_file_path = collector.get_log_file_path(
+        log_dir_path=TMP_TEST_LOG_DIR)
+    tiered_history = history.TieredHistory(
+        column_list=['a'], row_num_per_second=1,
+        tier_setting_list=thread_sampler.get_tier_setting_list(
+            window_seconds=10))
+    capacity = tiered_history.raw_ring_buffer.capacity
+    raw_log_writer = thread_sampler.RawLogWriter(
+        tiered_history=tiered_history, log_dir_path=TMP_TEST_LOG_DIR)
+
+    # The header is written at the first save.
+    raw_log_writer.save()
+    df = pd.read_csv(log_file_path)
+    assert_equal(df.columns.tolist(), ['timestamp', 'a'])
+    assert_equal(len(df), 0)
+
+    # Only the new rows are appended.
+    for timestamp in range(1, 4):
+        tiered_history.append(timestamp=timestamp, row_dict={'a': timestamp})
+    raw_log_writer.save()
+    tiered_history.append(timestamp=4, row_dict={})
+    raw_log_writer.save()
+    raw_log_writer.save()
+    df = pd.read_csv(log_file_path)
+    assert_equal(df['timestamp'].tolist(), [1, 2, 3, 4])
+    assert_equal(df['a'].tolist()[:3], [1, 2, 3])
+    assert_true(pd.isnull(df['a'].tolist()[3]))
+    assert_equal(raw_log_writer.appended_row_num, 4)
+
+    # The log is rewritten with the rows of the ring buffer once the
+    # appended rows have exceeded it.
+    for timestamp in range(5, capacity + 6):
+        tiered_history.append(timestamp=timestamp, row_dict={'a': 1})
+    raw_log_writer.save()
+    df = pd.read_csv(log_file_path)
+    assert_equal(len(df), capacity)
+    assert_equal(df['timestamp'].tolist()[-1], capacity + 5)
+    assert_equal(raw_log_writer.appended_row_num, 0)
+
+    # The log is rewritten when the columns have changed.
+    tiered_history.update_columns(
+        column_list=['a', 'b'], row_num_per_second=1)
+    tiered_history.append(
+        timestamp=capacity + 6, row_dict={'a': 1, 'b': 2})
+    raw_log_writer.save()
+    df = pd.read_csv(log_file_path)
+    assert_equal(df.columns.tolist(), ['timestamp', 'a', 'b'])
+    assert_equal(df['b'].tolist()[-1], 2)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_tick():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_thread_sampler:test_tick --skip_jupyter 1
+    """
+    sampler = _make_test_sampler()
+    tick_stats_dict = sampler.get_tick_stats()
+    assert_equal(tick_stats_dict['tick_num'], 0)
+    assert_equal(tick_stats_dict['p50_us'], None)
+
+    # The ring buffer is allocated in advance and does not grow.
+    capacity = sampler.tiered_history.raw_ring_buffer.capacity
+    assert_equal(sampler.tick(metric_name_list=['unknown']), None)
+    for _ in range(capacity + 10):
+        row_dict = sampler.tick(metric_name_list=['proc_stats'])
+    assert_true(collectors.COLUMN_NAME_KERNEL_RSS in row_dict)
+    timestamp_array, value_array = sampler.tiered_history.get_tier_arrays(
+        tier_name='raw')
+    assert_equal(len(timestamp_array), capacity)
+    assert_equal(sampler.tiered_history.raw_ring_buffer.capacity, capacity)
+    sampler.collector_dict['proc_stats'].close()
+
+    tick_stats_dict = sampler.get_tick_stats()
+    assert_equal(tick_stats_dict['tick_num'], capacity + 10)
+    assert_true(
+        tick_stats_dict['p50_us'] <= tick_stats_dict['p99_us']
+        <= tick_stats_dict['max_us'])
+
+    # The tick saving the log is also measured.
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    os.makedirs(TMP_TEST_LOG_DIR)
+    assert_equal(
+        sampler.tick(metric_name_list=[thread_sampler._JOB_NAME_SAVE_CSV]),
+        None)
+    assert_equal(sampler.get_tick_stats()['tick_num'], capacity + 11)
+    df = pd.read_csv(collector.get_log_file_path(
+        log_dir_path=TMP_TEST_LOG_DIR))
+    assert_equal(len(df), capacity)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_tick_cost_budget():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_thread_sampler:test_tick_cost_budget --skip_jupyter 1
+    """
+    sampler = _make_test_sampler()
+    for _ in range(thread_sampler.TICK_COST_HISTORY_SIZE):
+        sampler.tick(metric_name_list=['proc_stats'])
+    sampler.collector_dict['proc_stats'].close()
+    tick_stats_dict = sampler.get_tick_stats()
+    print('tick cost: %s' % tick_stats_dict)
+    assert_less(
+        tick_stats_dict['p50_us'], thread_sampler.TICK_BUDGET_SECONDS * 1e6)
+    assert_less(
+        tick_stats_dict['over_budget_num'],
+        thread_sampler.TICK_COST_HISTORY_SIZE * 0.1)
+
+
+def test_thread_sampler():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_thread_sampler:test_thread_sampler --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    sampled_row_list = []
+    sampler = _make_test_sampler()
+    sampler.on_sample = sampled_row_list.append
+    assert_false(sampler.is_alive())
+    sampler.start()
+    assert_true(sampler.is_alive())
+    assert_true(sampler.ready_event.wait(timeout=5))
+    assert_true(os.path.exists(collector.get_log_file_path(
+        log_dir_path=TMP_TEST_LOG_DIR)))
+    time.sleep(0.6)
+    sampler.send_command(command_dict={
+        'command': collector.COMMAND_SET_INTERVAL,
+        'metric_name': 'proc_stats',
+        'interval_seconds': 0.2,
+    })
+    time.sleep(0.6)
+    sampler.stop()
+    assert_false(sampler.is_alive())
+    assert_equal(sampler.metric_interval_seconds_dict['proc_stats'], 0.2)
+    assert_greater(len(sampled_row_list), 5)
+    assert_equal(sampler.collector_dict['proc_stats'].reader_dict, None)
+
+    df = pd.read_csv(collector.get_log_file_path(
+        log_dir_path=TMP_TEST_LOG_DIR))
+    assert_greater(len(df), 5)
+    assert_true(collectors.COLUMN_NAME_SYSTEM_MEMORY_USED in df.columns)
+    assert_equal(sampler.error_str, None)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+
+
+def test_thread_sampler_error():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_thread_sampler:test_thread_sampler_error --skip_jupyter 1
+    """
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
+    sampler = _make_test_sampler(collector_list=[_ErrorCollector()])
+    sampler.start()
+    assert_true(sampler.ready_event.wait(timeout=5))
+    sampler._thread.join(timeout=5)
+    assert_false(sampler.is_alive())
+    assert_true('Error for testing.' in sampler.error_str)
+    shutil.rmtree(TMP_TEST_LOG_DIR, ignore_errors=True)
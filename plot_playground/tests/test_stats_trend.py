@@ -0,0 +1,89 @@
+"""
+Test Command
+------------
+$ python run_tests.py --module_name plot_playground.tests.test_stats_trend --skip_jupyter 1
+"""
+
+from nose.tools import assert_equal, assert_true, assert_false, \
+    assert_almost_equal
+
+from plot_playground.stats import trend
+
+
+def test_get_growth_rate_column_name():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_trend:test_get_growth_rate_column_name --skip_jupyter 1
+    """
+    growth_rate_column_name = trend.get_growth_rate_column_name(
+        column_name='memory usage (MB)')
+    assert_equal(growth_rate_column_name, 'memory usage (MB) (growth/min)')
+
+
+def test_get_minutes_to_limit_column_name():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_trend:test_get_minutes_to_limit_column_name --skip_jupyter 1
+    """
+    minutes_to_limit_column_name = trend.get_minutes_to_limit_column_name(
+        column_name='memory usage (MB)')
+    assert_equal(
+        minutes_to_limit_column_name, 'memory usage (MB) (min to limit)')
+
+
+def test_RollingLinearTrend():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_trend:test_RollingLinearTrend --skip_jupyter 1
+    """
+    rolling_trend = trend.RollingLinearTrend(
+        column_name='a', window_seconds=60, limit=1000)
+    assert_equal(rolling_trend.get_slope(), None)
+    for i in range(5):
+        rolling_trend.add(timestamp=1550000000 + i, value=100 + i * 2)
+    # Not enough samples are added yet.
+    assert_false(rolling_trend.is_ready())
+    assert_equal(rolling_trend.get_value_dict(), {})
+    assert_almost_equal(rolling_trend.get_slope(), 2)
+
+    # 2 per second (120 per minute). The samples out of the window
+    # are removed, so the trend follows the latest growth.
+    for i in range(5, 200):
+        value = 100 + i * 2 if i < 100 else 298 + (i - 99) * 0.5
+        rolling_trend.add(timestamp=1550000000 + i, value=value)
+    assert_true(rolling_trend.is_ready())
+    assert_equal(len(rolling_trend.sample_deque), 61)
+    value_dict = rolling_trend.get_value_dict()
+    assert_almost_equal(value_dict['a (growth/min)'], 30)
+    # The last value is 348, and 652 remain at 30 per minute.
+    assert_almost_equal(value_dict['a (min to limit)'], 652 / 30, places=2)
+
+    # Not projected if the value is decreasing or there is no limit.
+    rolling_trend = trend.RollingLinearTrend(
+        column_name='a', window_seconds=60)
+    for i in range(60):
+        rolling_trend.add(timestamp=i, value=100 - i)
+    value_dict = rolling_trend.get_value_dict()
+    assert_almost_equal(value_dict['a (growth/min)'], -60)
+    assert_false('a (min to limit)' in value_dict)
+
+
+def test_RollingLinearTrend_rebase():
+    """
+    Test Command
+    ------------
+    $ python run_tests.py --module_name plot_playground.tests.test_stats_trend:test_RollingLinearTrend_rebase --skip_jupyter 1
+    """
+    rolling_trend = trend.RollingLinearTrend(
+        column_name='a', window_seconds=10, limit=10000)
+    for i in range(10000):
+        rolling_trend.add(timestamp=1550000000 + i * 0.5, value=i * 0.5)
+    # The origin has been moved so that the shifted timestamps stay
+    # small.
+    assert_true(rolling_trend.sample_deque[-1][0] < 10 * 101)
+    assert_almost_equal(rolling_trend.get_slope(), 1)
+    assert_almost_equal(
+        rolling_trend.get_minutes_to_limit(), (10000 - 4999.5) / 60)